@@ -0,0 +1,499 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""bench.py: Benchmark harness that times the analyses of ACABELLA
+on the bundled example schemes and compares runs against a baseline"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import re
+import resource
+import signal
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, "../core")
+
+from parse_config import ParseConfig
+from analysis import AnalysisWithCorruption
+from conditional import ConditionalDecryptionAttack
+from version import __version__
+
+ANALYSIS_TYPES = ['mk', 'da', 'sec', 'cond', 'all']
+
+# stage of every analysis of AnalysisWithCorruption
+STAGE_NAMES = {
+    "SecurityAttack": "security",
+    "MasterKeyAttack": "master_key",
+    "DecryptionAttack": "decryption",
+}
+
+# differences below these are considered noise by compare
+MIN_TIME_DELTA = 0.05
+MIN_RSS_DELTA_KB = 4096
+
+class BenchmarkTimeout(Exception):
+    """
+    Raised inside a worker when a case exceeds its time limit.
+    """
+    pass
+
+class StageTimer:
+    """
+    Accumulates the wall time spent in the stages of an analysis.
+
+    Attributes:
+        stages (dict): Time in seconds of every stage, in order of execution.
+    """
+
+    def __init__(self) -> None:
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Times the enclosed block as the stage name.
+
+        Parameters:
+            name (str): Name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0) + time.perf_counter() - start
+
+def load_suite(path: str, include_slow: bool = False, pattern: str = None) -> list:
+    """
+    Loads the cases of a benchmark suite. The configuration paths of
+    the cases are relative to the suite file.
+
+    Parameters:
+        path (str): Path to the suite file.
+        include_slow (bool): Include the cases marked as slow.
+        pattern (str): Only include the cases whose name matches this
+                       regular expression.
+
+    Returns:
+        (list): Cases (dict) with the name, config and analysis of every case.
+    """
+    with open(path) as suite_file:
+        suite = json.load(suite_file)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    cases = []
+
+    for case in suite["cases"]:
+        if case.get("slow", False) and not include_slow:
+            continue
+        if pattern is not None and re.search(pattern, case["name"]) is None:
+            continue
+        if not case["analysis"] in ANALYSIS_TYPES:
+            raise ValueError("unknown analysis type in case " + case["name"] + ": " + str(case["analysis"]))
+
+        case = dict(case)
+        case["config"] = os.path.normpath(os.path.join(base_dir, case["config"]))
+        cases.append(case)
+
+    return cases
+
+def run_case(config: str, analysis_type: str) -> dict:
+    """
+    Runs one analysis of a configuration and times its stages: parsing
+    the configuration, initializing the analysis, running each analysis
+    and rendering the results.
+
+    Parameters:
+        config (str): Path to the configuration file.
+        analysis_type (str): Type of analysis (mk, da, sec, cond, all).
+
+    Returns:
+        (dict): Time of every stage ("stages"), verdict of the analysis
+                ("verdict") and whether the scheme is fractional.
+    """
+    timer = StageTimer()
+
+    with timer.stage("parse"):
+        parse_config = ParseConfig()
+        parse_config.init(config)
+
+    if analysis_type == "cond":
+        with timer.stage("init"):
+            cd_config = parse_config.generate_conditional_params()
+            cd_attack = ConditionalDecryptionAttack()
+            cd_attack.init(cd_config["alpha"], cd_config["special_s"], cd_config["mpk"], cd_config["k_fixed"], cd_config["k_att"], cd_config["c_fixed"], cd_config["c_att"], cd_config["unknown"], cd_config["prefixes"], cd_config["nr_indexed_encodings"])
+            if cd_config["policy"] is not None:
+                cd_attack.set_policy(cd_config["policy"])
+        with timer.stage("conditional"):
+            cd_attack.run()
+        with timer.stage("render"):
+            cd_attack.show_solution()
+
+        return {"stages": timer.stages, "verdict": {"conditional": cd_attack.result.verdict()}, "fractional": False}
+
+    with timer.stage("init"):
+        match analysis_type:
+            case "mk":
+                master_params, corruptable_vars = parse_config.generate_master_key_params()
+                params = (master_params, None, corruptable_vars, None, None)
+            case "da":
+                dec_params, corruptable_vars = parse_config.generate_dec_key_params()
+                params = (None, dec_params, None, corruptable_vars, None)
+            case "sec":
+                security_params = parse_config.generate_security_analysis_params()
+                params = (None, None, None, None, security_params)
+            case "all":
+                security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
+                params = (master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
+
+        analysis = AnalysisWithCorruption()
+        analysis.init(*params)
+
+    # same as AnalysisWithCorruption.run, timing every analysis
+    for attack in analysis.analysis_list:
+        if attack.enabled == True:
+            with timer.stage(STAGE_NAMES.get(attack.description, attack.description)):
+                attack.run()
+
+    with timer.stage("render"):
+        analysis.show_solution()
+
+    return {"stages": timer.stages, "verdict": analysis.verdict(), "fractional": analysis.is_scheme_fractional()}
+
+def measure_case(case: dict, timeout: float) -> dict:
+    """
+    Worker entry point: runs a case once and measures its wall time
+    and the peak resident set size of the worker.
+
+    Parameters:
+        case (dict): Case of the suite.
+        timeout (float): Time limit in seconds, 0 disables it.
+
+    Returns:
+        (dict): Measurement of the case.
+    """
+    record = {"status": "ok", "verdict": None, "stages": {}}
+
+    def raise_timeout(signum, frame):
+        raise BenchmarkTimeout()
+
+    if timeout:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start = time.perf_counter()
+
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            record.update(run_case(case["config"], case["analysis"]))
+
+        if not record["verdict"]:
+            record["status"] = "skipped"
+    except BenchmarkTimeout:
+        record["status"] = "timeout"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = type(e).__name__ + ": " + str(e)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    record["wall_time"] = time.perf_counter() - start
+
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    record["peak_rss_kb"] = peak_rss
+
+    return record
+
+def summarize(case: dict, runs: list) -> dict:
+    """
+    Combines the repetitions of a case: the wall time and the time of
+    every stage are the medians over the repetitions, the peak RSS is
+    the maximum.
+
+    Parameters:
+        case (dict): Case of the suite.
+        runs (list): Measurements of the repetitions, see measure_case.
+
+    Returns:
+        (dict): Entry of the case in the benchmark report.
+    """
+    entry = {
+        "scheme_id": case.get("scheme_id", case["name"]),
+        "analysis": case["analysis"],
+        "config": os.path.relpath(case["config"]),
+        "status": "ok",
+    }
+
+    failed = [run for run in runs if run["status"] != "ok"]
+    if failed:
+        entry["status"] = failed[0]["status"]
+        if "error" in failed[0]:
+            entry["error"] = failed[0]["error"]
+        return entry
+
+    stages = {}
+    for run in runs:
+        for name, seconds in run["stages"].items():
+            stages.setdefault(name, []).append(seconds)
+
+    entry["wall_time"] = round(statistics.median(run["wall_time"] for run in runs), 4)
+    entry["wall_times"] = [round(run["wall_time"], 4) for run in runs]
+    entry["peak_rss_kb"] = max(run["peak_rss_kb"] for run in runs)
+    entry["stages"] = {name: round(statistics.median(times), 4) for name, times in stages.items()}
+    entry["verdict"] = runs[0]["verdict"]
+    entry["fractional"] = runs[0]["fractional"]
+
+    return entry
+
+def run_suite(cases: list, repeat: int = 3, workers: int = 1, timeout: float = 0):
+    """
+    Runs every case of a suite repeat times. Every repetition runs in
+    a fresh process forked from a server that has already imported
+    SymPy and the ACABELLA core, so that neither the import time nor
+    the caches of SymPy filled by previous runs distort the timings.
+
+    Parameters:
+        cases (list): Cases of the suite, see load_suite.
+        repeat (int): Number of repetitions of every case.
+        workers (int): Number of cases measured concurrently. Running
+                       cases in parallel perturbs their timings.
+        timeout (float): Per-run time limit in seconds, 0 disables it.
+
+    Returns:
+        (generator): (name, entry) of every case, in the order of the suite.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload(["bench"])
+    else:
+        ctx = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, max_tasks_per_child=1) as executor:
+        futures = [[executor.submit(measure_case, case, timeout) for _ in range(repeat)] for case in cases]
+
+        for case, case_futures in zip(cases, futures):
+            runs = [future.result() for future in case_futures]
+            yield case["name"], summarize(case, runs)
+
+def compare_reports(baseline: dict, current: dict, threshold: float = 0.25) -> list:
+    """
+    Compares a benchmark report against a baseline. The wall time,
+    the time of every stage and the peak RSS of a case regress when
+    they grow by more than threshold (relative) and by more than the
+    noise floor (MIN_TIME_DELTA, MIN_RSS_DELTA_KB). Changes of the
+    verdict or of the status of a case are reported as well.
+
+    Parameters:
+        baseline (dict): Baseline report.
+        current (dict): Report to check.
+        threshold (float): Tolerated relative growth, e.g. 0.25 for 25%.
+
+    Returns:
+        (list): Findings (dict) with the case, the metric, the kind
+                (regression, improvement or changed) and both values.
+    """
+    findings = []
+
+    def check(name, metric, old, new, min_delta):
+        if old is None or new is None:
+            return
+        if new - old > max(old * threshold, min_delta):
+            findings.append({"case": name, "metric": metric, "kind": "regression", "baseline": old, "current": new})
+        elif old - new > max(old * threshold, min_delta):
+            findings.append({"case": name, "metric": metric, "kind": "improvement", "baseline": old, "current": new})
+
+    for name, old in baseline["cases"].items():
+        new = current["cases"].get(name)
+        if new is None:
+            continue
+
+        if old["status"] != new["status"]:
+            findings.append({"case": name, "metric": "status", "kind": "changed", "baseline": old["status"], "current": new["status"]})
+            continue
+
+        if old.get("verdict") != new.get("verdict"):
+            findings.append({"case": name, "metric": "verdict", "kind": "changed", "baseline": old.get("verdict"), "current": new.get("verdict")})
+
+        check(name, "wall_time", old.get("wall_time"), new.get("wall_time"), MIN_TIME_DELTA)
+        for stage, seconds in old.get("stages", {}).items():
+            check(name, "stages." + stage, seconds, new.get("stages", {}).get(stage), MIN_TIME_DELTA)
+        check(name, "peak_rss_kb", old.get("peak_rss_kb"), new.get("peak_rss_kb"), MIN_RSS_DELTA_KB)
+
+    return findings
+
+def is_failure(finding: dict) -> bool:
+    """
+    Returns:
+        (bool): The finding of compare_reports is a regression or a
+                change of the verdict or of the status.
+    """
+    return finding["kind"] in ["regression", "changed"]
+
+def print_findings(findings: list) -> None:
+    """
+    Prints the findings of compare_reports.
+
+    Parameters:
+        findings (list): Findings.
+    """
+    if not findings:
+        print("\n[*] No regressions found")
+        return
+
+    print("")
+    for finding in findings:
+        marker = "[!]" if is_failure(finding) else "[*]"
+        print(marker + " " + finding["case"] + " " + finding["metric"] + " " + finding["kind"] + ": " + str(finding["baseline"]) + " -> " + str(finding["current"]))
+
+def run_main(args) -> int:
+    """
+    Entry point of `bench.py run`.
+    """
+    cases = load_suite(args.suite, args.include_slow, args.filter)
+    if not cases:
+        print("[!] No benchmark cases selected")
+        return 1
+
+    report = {
+        "acabella_version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "repeat": args.repeat,
+        "cases": {},
+    }
+
+    print("\n[*] Running " + str(len(cases)) + " benchmark cases, " + str(args.repeat) + " repetitions each\n")
+
+    for name, entry in run_suite(cases, args.repeat, args.workers, args.timeout):
+        report["cases"][name] = entry
+
+        if entry["status"] != "ok":
+            print("\t" + name + ": " + entry["status"])
+        else:
+            stages = ", ".join(stage + " " + "{:.3f}".format(seconds) for stage, seconds in entry["stages"].items())
+            print("\t" + name + ": " + "{:.3f}".format(entry["wall_time"]) + " s, " + str(entry["peak_rss_kb"]) + " KiB (" + stages + ")")
+
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+        output.write("\n")
+
+    print("\n[*] Report written to " + args.output)
+
+    if args.compare is not None:
+        with open(args.compare) as baseline_file:
+            findings = compare_reports(json.load(baseline_file), report, args.threshold)
+        print_findings(findings)
+        if any(is_failure(finding) for finding in findings):
+            return 1
+
+    if any(entry["status"] in ["timeout", "error"] for entry in report["cases"].values()):
+        return 1
+
+    return 0
+
+def compare_main(args) -> int:
+    """
+    Entry point of `bench.py compare`.
+    """
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(args.current) as current_file:
+        current = json.load(current_file)
+
+    findings = compare_reports(baseline, current, args.threshold)
+    print_findings(findings)
+
+    return 1 if any(is_failure(finding) for finding in findings) else 0
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analyses of ACABELLA on the bundled example schemes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmark suite and write a JSON report")
+
+    run_parser.add_argument('-s', '--suite',
+                       default='suite.json',
+                       help='Benchmark suite (default: suite.json)')
+
+    run_parser.add_argument('-o', '--output',
+                       default='bench_report.json',
+                       help='JSON report (default: bench_report.json)')
+
+    run_parser.add_argument('-r', '--repeat',
+                       type=int,
+                       default=3,
+                       help='Repetitions of every case (default: 3)')
+
+    run_parser.add_argument('-j', '--workers',
+                       type=int,
+                       default=1,
+                       help='Number of cases measured concurrently (default: 1)')
+
+    run_parser.add_argument('-t', '--timeout',
+                       type=float,
+                       default=600,
+                       help='Time limit of every run in seconds, 0 disables it (default: 600)')
+
+    run_parser.add_argument('-k', '--filter',
+                       help='Only run the cases whose name matches this regular expression')
+
+    run_parser.add_argument('--include-slow',
+                       action='store_true',
+                       help='Also run the cases marked as slow')
+
+    run_parser.add_argument('--compare',
+                       metavar='BASELINE',
+                       help='Compare the report against this baseline')
+
+    run_parser.add_argument('--threshold',
+                       type=float,
+                       default=0.25,
+                       help='Tolerated relative growth before a regression is reported (default: 0.25)')
+
+    compare_parser = subparsers.add_parser("compare", help="Compare a JSON report against a baseline")
+
+    compare_parser.add_argument('baseline', help='Baseline report')
+    compare_parser.add_argument('current', help='Report to check')
+
+    compare_parser.add_argument('--threshold',
+                       type=float,
+                       default=0.25,
+                       help='Tolerated relative growth before a regression is reported (default: 0.25)')
+
+    args = parser.parse_args(argv)
+
+    match args.command:
+        case "run":
+            return run_main(args)
+        case "compare":
+            return compare_main(args)
+
+if __name__ == "__main__":
+    print("[*] ACABELLA benchmarks")
+    sys.exit(main())
@@ -3,10 +3,9 @@
 from common_methods import *
 from sympy import *
 from trivial_security_and_collusion import *
+from analysis_context import AnalysisContext
 
-init_printing(use_unicode=True)
-
-def FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown) -> str:
+def FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown, context=None) -> str:
     """
     This is the main function that checks whether the FABEO property is satisfied.
 
@@ -17,6 +16,7 @@ def FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown) -> str:
         cenc (list of sp.core.list.Symbol): Ciphertext encodings.
         benc (list of sp.core.list.Symbol): Common variable encodings.
         unknown (list of sp.core.list.Symbol): List of unknown variables.
+        context (AnalysisContext): Shared intermediate results of the scheme, if any.
 
     Returns:
         (str): The result of the checking the FABEO property.
@@ -24,19 +24,22 @@ def FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown) -> str:
 
     process_log = []
 
+    if context is None:
+        context = AnalysisContext()
+
     (correct, kenc, cenc) = correct_form_silent(kenc, cenc, benc, unknown)
 
     blindingvalue = masterkey * special_s
     
-    (nonlones_c, nonlones_k, cpolys, kpolys) = determine_nonlones_and_polys(masterkey, special_s, kenc, cenc, benc, unknown)
+    (nonlones_c, nonlones_k, cpolys, kpolys) = determine_nonlones_and_polys(masterkey, special_s, kenc, cenc, benc, unknown, context)
     
     penc = compute_products_ac17(kpolys, cpolys, nonlones_k, nonlones_c)
     
-    (mat, uvector) = writeencodingasprod(penc, unknown)
+    (mat, uvector) = context.writeencodingasprod(penc, unknown)
     
     mat = Matrix(mat)
     
-    target_vector = Matrix([writepolyasprod(blindingvalue, uvector, unknown)])
+    target_vector = Matrix([writepolyasprod(blindingvalue, uvector, unknown, context.table)])
     
     list_bv_indices = []
     ctr = 0
@@ -59,6 +62,11 @@ def FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown) -> str:
     
     lis_shared_indices_not_bv = [ind for ind in lis_shared_indices if not ind in list_bv_indices]
     
+    # the shared monomials are not spanned by the other ones, see linear_algebra.screen_ranks
+    if context.screen_unspanned_columns(mat, lis_shared_indices):
+        process_log.append("\t The scheme does not satisfy the FABEO property. \n")
+        return '\n'.join(process_log)
+
     rs_shared = []
     for ind in lis_shared_indices:
         vec = zeros(1,len(uvector))
@@ -104,7 +112,7 @@ def compute_products_ac17(kpolys, cpolys, knons, cnons):
             prods.append(cancel(x_c * poly_k))
     return prods
 
-def determine_nonlones_and_polys(masterkey, special_s, kenc, cenc, benc, unknown):
+def determine_nonlones_and_polys(masterkey, special_s, kenc, cenc, benc, unknown, context=None):
     """
     This function determines the non-lone variables and the encoding polynomials
 
@@ -115,6 +123,7 @@ def determine_nonlones_and_polys(masterkey, special_s, kenc, cenc, benc, unknown
         cenc (list of sp.core.list.Symbol): Ciphertext encodings.
         benc (list of sp.core.list.Symbol): Common variable encodings.
         unknown (list of sp.core.list.Symbol): List of unknown variables.
+        context (AnalysisContext): Shared intermediate results of the scheme, if any.
 
     Returns:
         (list): Non-lone ciphertext variables.
@@ -124,19 +133,22 @@ def determine_nonlones_and_polys(masterkey, special_s, kenc, cenc, benc, unknown
     """
 
 
-    (matk, uvectork) = writeencodingasprod(kenc, unknown)
-    (matc, uvectorc) = writeencodingasprod(cenc, unknown)
+    if context is None:
+        context = AnalysisContext()
+
+    (matk, uvectork) = context.writeencodingasprod(kenc, unknown)
+    (matc, uvectorc) = context.writeencodingasprod(cenc, unknown)
     
     matk = Matrix(matk)
     matc = Matrix(matc)
     
-    nonlone_c = determine_non_lone_vars_in_uvector(cenc, benc, uvectorc)
+    nonlone_c = context.determine_non_lone_vars_in_uvector(cenc, benc, uvectorc)
     
     (sublist_nonlones_c, sublist_lones_c) = sublistslonenonlone(nonlone_c)
     
     sublist_nonlones_c = put_special_s_first_entry(special_s, sublist_nonlones_c)
     
-    nonlone_k = determine_non_lone_vars_in_uvector(kenc, benc, uvectork)
+    nonlone_k = context.determine_non_lone_vars_in_uvector(kenc, benc, uvectork)
     
     (sublist_nonlones_k, sublist_lones_k) = sublistslonenonlone(nonlone_k)
     
@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""abgw_bridge.py: Pool of long-lived ABGW solver processes, which
+checks many ABGW problems concurrently.
+
+The solver (solver.native of the ABGW tool) reads one problem per line
+on its standard input and answers with one line on its standard output,
+see tools/abgw_docker/changes/run_examples.py.
+"""
+
+import argparse
+import hashlib
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+
+from generate_abgw_inputs import generate_abgw_input_str
+from result_cache import ResultCache
+
+# dummy problem sent to every new solver process to initialize it
+WARM_UP_PROBLEM = "1 = 0.contradiction."
+
+class SolverVerdict(Enum):
+    """
+    Outcome of an ABGW problem.
+    """
+    proven = 1
+    not_proven = 2
+    error = 3
+    timeout = 4
+    crashed = 5
+
+# verdicts that only depend on the problem, and can be cached
+CACHED_VERDICTS = [SolverVerdict.proven, SolverVerdict.not_proven, SolverVerdict.error]
+
+@dataclass(slots=True)
+class SolverResult:
+    """
+    Answer of the solver to an ABGW problem.
+
+    Attributes:
+        problem_hash (str): See problem_hash.
+        verdict (SolverVerdict): Outcome.
+        output (str): Output line of the solver, empty on a timeout or crash.
+        wall_time (float): Seconds spent by the solver.
+        cached (bool): True if the verdict comes from the cache.
+    """
+    problem_hash: str
+    verdict: SolverVerdict
+    output: str
+    wall_time: float
+    cached: bool = False
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the result.
+        """
+        return {
+            "problem_hash": self.problem_hash,
+            "verdict": self.verdict.name,
+            "output": self.output,
+            "wall_time": self.wall_time,
+            "cached": self.cached,
+        }
+
+def normalize_problem(problem: str) -> str:
+    """
+    Joins the lines of a problem, since the solver reads one problem
+    per line.
+
+    Parameters:
+        problem (str): ABGW problem, e.g. from generate_abgw_input_str.
+
+    Returns:
+        (str): Problem on a single line.
+    """
+    return problem.replace("\n", "")
+
+def problem_hash(problem: str) -> str:
+    """
+    Parameters:
+        problem (str): ABGW problem.
+
+    Returns:
+        (str): SHA-256 digest of the normalized problem in hexadecimal.
+    """
+    return hashlib.sha256(("abgw\n" + normalize_problem(problem)).encode("utf-8")).hexdigest()
+
+def classify_output(output: str) -> SolverVerdict:
+    """
+    Parameters:
+        output (str): Output line of the solver.
+
+    Returns:
+        (SolverVerdict): Verdict, as in run_examples.py.
+    """
+    if "Error" in output or "Failure" in output:
+        return SolverVerdict.error
+    if "no goals" in output:
+        return SolverVerdict.proven
+    return SolverVerdict.not_proven
+
+def abgw_problem(abgw_params: dict) -> str:
+    """
+    Generates the ABGW problem of a scheme.
+
+    Parameters:
+        abgw_params (dict): Output of ParseConfig.generate_abgw_bridge_params.
+
+    Returns:
+        (str): ABGW problem.
+    """
+    return generate_abgw_input_str(abgw_params["key"], abgw_params["k_encodings"], abgw_params["c_encodings"],
+                                   abgw_params["gp_encodings"], abgw_params["unknown"], abgw_params["known"])
+
+class SolverProcess:
+    """
+    A solver process. A thread reads its output lines into a queue, so
+    that the answers can be awaited with a timeout.
+
+    Attributes:
+        command (list): Command line of the solver.
+        process (subprocess.Popen): The running solver.
+        lines (queue.Queue): Output lines, None at the end of the output.
+    """
+
+    def __init__(self) -> None:
+        self.command = None
+        self.process = None
+        self.lines = None
+
+    def start(self, command: list, timeout: float) -> None:
+        """
+        Starts the solver and initializes it with WARM_UP_PROBLEM.
+
+        Parameters:
+            command (list): Command line of the solver.
+            timeout (float): Seconds to wait for the initialization.
+
+        Raises:
+            RuntimeError: The solver does not answer.
+        """
+        self.command = command
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, bufsize=1)
+        self.lines = queue.Queue()
+        threading.Thread(target=self.read_lines, args=(self.process.stdout, self.lines), daemon=True).start()
+
+        try:
+            output = self.request(WARM_UP_PROBLEM, timeout)
+        except queue.Empty:
+            output = None
+        if output is None:
+            self.stop()
+            raise RuntimeError("the solver " + " ".join(command) + " does not answer")
+
+    @staticmethod
+    def read_lines(stdout, lines: queue.Queue) -> None:
+        """
+        Copies the output lines of the solver to a queue.
+
+        Parameters:
+            stdout: Output of the solver.
+            lines (queue.Queue): Destination queue.
+        """
+        for line in stdout:
+            lines.put(line)
+        lines.put(None)
+
+    def request(self, problem: str, timeout: float) -> str:
+        """
+        Sends a problem to the solver and waits for the answer.
+
+        Parameters:
+            problem (str): Problem on a single line.
+            timeout (float): Seconds to wait.
+
+        Returns:
+            (str): Output line, None if the solver exited.
+
+        Raises:
+            queue.Empty: The solver did not answer in time.
+        """
+        if self.process is None:
+            return None
+
+        try:
+            self.process.stdin.write(problem + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            return None
+
+        return self.lines.get(timeout=timeout)
+
+    def stop(self) -> None:
+        """
+        Kills the solver.
+        """
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.wait()
+        try:
+            self.process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self.process = None
+
+class SolverPool:
+    """
+    Pool of warm solver processes. The problems are dispatched to the
+    idle processes; a process that exceeds the timeout is killed, and
+    a process that exits is restarted and the problem retried. The
+    verdicts are cached by problem hash, in memory and optionally in
+    a ResultCache.
+
+    Attributes:
+        command (list): Command line of the solver.
+        size (int): Number of solver processes.
+        timeout (float): Seconds allowed for every problem.
+        retries (int): Retries of a problem after a crash of the solver.
+        result_cache (ResultCache): Optional on-disk cache of the verdicts.
+        verdicts (dict): In-memory cache of the verdicts.
+        processes (list): The solver processes.
+        idle (queue.Queue): Idle solver processes.
+    """
+
+    def __init__(self) -> None:
+        self.command = None
+        self.size = 1
+        self.timeout = 60
+        self.retries = 1
+        self.result_cache = None
+        self.verdicts = {}
+        self.processes = []
+        self.idle = None
+        self.lock = threading.Lock()
+
+    def init(self, command: list, size: int = None, timeout: float = 60, retries: int = 1, result_cache: ResultCache = None) -> None:
+        """
+        Initializes the pool.
+
+        Parameters:
+            command (list): Command line of the solver, e.g. ["./solver.native"].
+            size (int): Number of solver processes (default: number of CPUs).
+            timeout (float): Seconds allowed for every problem.
+            retries (int): Retries of a problem after a crash of the solver.
+            result_cache (ResultCache): Optional on-disk cache of the verdicts.
+        """
+        self.command = list(command)
+        self.size = size if size is not None else (os.cpu_count() or 1)
+        self.timeout = timeout
+        self.retries = retries
+        self.result_cache = result_cache
+
+    def start(self) -> None:
+        """
+        Starts the solver processes.
+        """
+        self.idle = queue.Queue()
+        for _ in range(self.size):
+            process = SolverProcess()
+            process.start(self.command, self.timeout)
+            self.processes.append(process)
+            self.idle.put(process)
+
+    def close(self) -> None:
+        """
+        Stops the solver processes.
+        """
+        for process in self.processes:
+            process.stop()
+        self.processes = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def restart(self, process: SolverProcess) -> None:
+        """
+        Replaces a timed out or crashed solver by a new one. If the new
+        one does not start, the next problem sent to it restarts it again.
+
+        Parameters:
+            process (SolverProcess): The solver process.
+        """
+        process.stop()
+        try:
+            process.start(self.command, self.timeout)
+        except (RuntimeError, OSError):
+            pass
+
+    def lookup(self, key: str) -> SolverResult:
+        """
+        Parameters:
+            key (str): Problem hash.
+
+        Returns:
+            (SolverResult): Cached result, None on a miss.
+        """
+        with self.lock:
+            result = self.verdicts.get(key)
+        if result is None and self.result_cache is not None:
+            stored = self.result_cache.get(key)
+            if stored is not None:
+                result = SolverResult(key, SolverVerdict[stored["verdict"]], stored["output"], stored["wall_time"])
+                with self.lock:
+                    self.verdicts[key] = result
+        if result is None:
+            return None
+
+        return SolverResult(key, result.verdict, result.output, result.wall_time, True)
+
+    def store(self, result: SolverResult) -> None:
+        """
+        Caches a result if its verdict only depends on the problem.
+
+        Parameters:
+            result (SolverResult): Result to cache.
+        """
+        if not result.verdict in CACHED_VERDICTS:
+            return
+        with self.lock:
+            self.verdicts[result.problem_hash] = result
+        if self.result_cache is not None:
+            self.result_cache.put(result.problem_hash, result.to_dict())
+
+    def solve(self, problem: str) -> SolverResult:
+        """
+        Checks a problem with an idle solver process.
+
+        Parameters:
+            problem (str): ABGW problem.
+
+        Returns:
+            (SolverResult): Result.
+        """
+        key = problem_hash(problem)
+        result = self.lookup(key)
+        if result is not None:
+            return result
+
+        line = normalize_problem(problem)
+        process = self.idle.get()
+        try:
+            for attempt in range(self.retries + 1):
+                start = time.perf_counter()
+                try:
+                    output = process.request(line, self.timeout)
+                except queue.Empty:
+                    self.restart(process)
+                    return SolverResult(key, SolverVerdict.timeout, "", round(time.perf_counter() - start, 4))
+
+                if output is not None:
+                    result = SolverResult(key, classify_output(output), output.strip(), round(time.perf_counter() - start, 4))
+                    self.store(result)
+                    return result
+
+                self.restart(process)
+        finally:
+            self.idle.put(process)
+
+        return SolverResult(key, SolverVerdict.crashed, "", round(time.perf_counter() - start, 4))
+
+    def solve_all(self, problems: list) -> list:
+        """
+        Checks problems concurrently. Repeated problems are only sent
+        to the solver once.
+
+        Parameters:
+            problems (list): ABGW problems.
+
+        Returns:
+            (list): SolverResult of every problem, in order.
+        """
+        unique = {}
+        for problem in problems:
+            unique.setdefault(problem_hash(problem), problem)
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            results = dict(zip(unique, executor.map(self.solve, unique.values())))
+
+        return [results[problem_hash(problem)] for problem in problems]
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Check ABGW problems (.ggm files) with a pool of solvers")
+
+    parser.add_argument('files', nargs='+', help='ABGW problems')
+    parser.add_argument('-s', '--solver', default='./solver.native', help='Solver executable (default: ./solver.native)')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Number of solver processes (default: number of CPUs)')
+    parser.add_argument('-t', '--timeout', type=float, default=60, help='Time limit of every problem in seconds (default: 60)')
+
+    args = parser.parse_args()
+
+    problems = []
+    for fname in args.files:
+        with open(fname, "r") as read_file:
+            problems.append(read_file.read())
+
+    solver_pool = SolverPool()
+    solver_pool.init([args.solver], args.workers, args.timeout)
+    with solver_pool:
+        results = solver_pool.solve_all(problems)
+
+    maxlen = max(len(fname) for fname in args.files)
+    for (fname, result) in zip(args.files, results):
+        print(fname.ljust(maxlen) + "  " + result.verdict.name.ljust(10) + "  Time: " + str(result.wall_time))
+
+    sys.exit(0 if all(result.verdict == SolverVerdict.proven for result in results) else 1)
@@ -18,8 +18,6 @@
 from common_methods import *
 from sympy import *
 
-init_printing(use_unicode=True)
-
 """ac17_correctness_checks.py: Methods for checking if an 
 ABE scheme is correct according to the AC17 framework."""     
 
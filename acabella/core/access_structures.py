@@ -21,14 +21,18 @@ analysis methods."""
 
 from common_methods import *
 from sympy import *
+from enum import Enum
+from functools import lru_cache
 
 from decryption import DecryptionAttack
 
-init_printing(use_unicode=True)
 
 
+# the parsed symbols are cached, since the encodings helper requests them
+# for every copy of an attribute or a key
 
 # returns an indexed encoding with prefix, e.g., r_1
+@lru_cache(maxsize=None)
 def get_indexed_encoding(prefix, index):
     """
     Returns an indexed encoding with prefix with extra indices for the 
@@ -44,6 +48,7 @@ def get_indexed_encoding(prefix, index):
     return parse_expr("indexed_enc_" + prefix + "_" + str(index))
 
 
+@lru_cache(maxsize=None)
 def get_indexed_encoding_extra_index(prefix, index1, index2, index_key):
     """
     Returns an indexed encoding with prefix with extra indices (2) for the 
@@ -61,6 +66,7 @@ def get_indexed_encoding_extra_index(prefix, index1, index2, index_key):
     return parse_expr(prefix + "_(" + str(index1) + ",att_" 
                       + str(index2) + "," + str(index_key) + ")")
 
+@lru_cache(maxsize=None)
 def get_attribute_in_group(index):
     """
     Returns a public key b_att for attribute with index
@@ -73,6 +79,7 @@ def get_attribute_in_group(index):
     """      
     return parse_expr("b_" + str(index))
 
+@lru_cache(maxsize=None)
 def get_attribute_as_scalar(index):
     """
     Returns a scalar x_att for some index
@@ -99,8 +106,7 @@ def get_i_of_n_policy_shares(index, length, special_s):
     Returns:
         (sp.core.list.Symbol): Value of lambda vector at index position.
     """      
-    vec_lambda = create_policy_matrix_for_AND(length) * create_share_vector(length, special_s)
-    return vec_lambda[index]
+    return get_and_policy_shares(length, special_s)[index]
 
 
 def get_i_of_n_policy_shares_general(index, length, special_s):
@@ -115,8 +121,81 @@ def get_i_of_n_policy_shares_general(index, length, special_s):
     Returns:
         (sp.core.list.Symbol): Value of lambda vector at index position.
     """      
-    vec_lambda = create_policy_matrix_for_general_access_policy(length) * create_share_vector(length, special_s)
-    return vec_lambda[index]
+    return get_general_policy_shares(length, special_s)[index]
+
+@lru_cache(maxsize=None)
+def get_and_policy_shares(length, special_s):
+    """
+    All the shares of an AND-gate of a given length, as computed with
+    create_policy_matrix_for_AND, but in a single pass over the sparse
+    rows of the policy matrix.
+
+    Parameters:
+        length (int): Length of the AND policy matrix.
+        special_s (sp.core.list.Symbol): Sympy description of s.
+
+    Returns:
+        (tuple): Value of the lambda vector at every position.
+    """
+    lsss = policy_to_lsss(PolicyNode(GateType.AND, [PolicyNode(GateType.ATTRIBUTE, attribute=ind) for ind in range(length)]))
+    return tuple(lsss.shares(special_s))
+
+@lru_cache(maxsize=None)
+def get_general_policy_shares(length, special_s):
+    """
+    All the shares of a general policy matrix of a given length, see
+    create_policy_matrix_for_general_access_policy.
+
+    Parameters:
+        length (int): Length of the policy matrix.
+        special_s (sp.core.list.Symbol): Sympy description of s.
+
+    Returns:
+        (tuple): Value of the lambda vector at every position.
+    """
+    vec_v = create_share_vector(length, special_s)
+    matrix_A = create_policy_matrix_for_general_access_policy(length)
+    return tuple(Add(*[matrix_A[i,j] * vec_v[j] for j in range(length)]) for i in range(length))
+
+@lru_cache(maxsize=None)
+def get_share_variable(index):
+    """
+    Returns the random variable v_index of the share vector.
+
+    Parameters:
+        index (int): Index of the variable, starting at 2.
+
+    Returns:
+        (sp.core.list.Symbol): Encoding starting with v_
+    """
+    return parse_expr("v_" + str(index))
+
+@lru_cache(maxsize=None)
+def get_policy_matrix_entry(row, col):
+    """
+    Returns the entry A_(row,col) of a general policy matrix.
+
+    Parameters:
+        row (int): Row, starting at 1.
+        col (int): Column, starting at 1.
+
+    Returns:
+        (sp.core.list.Symbol): Encoding starting with A_
+    """
+    return parse_expr("A_(" + str(row) + "," + str(col) + ")")
+
+@lru_cache(maxsize=None)
+def get_policy_weight(index):
+    """
+    Returns the weight w_index of a general policy matrix.
+
+    Parameters:
+        index (int): Index of the weight, starting at 2.
+
+    Returns:
+        (sp.core.list.Symbol): Encoding starting with w_
+    """
+    return parse_expr("w_" + str(index))
 
 def create_share_vector(length, special_s):
     """
@@ -132,7 +211,7 @@ def create_share_vector(length, special_s):
     vec_v = zeros(length,1)
     vec_v[0,0] = special_s
     for ind in range(1,length):
-        vec_v[ind,0] = parse_expr("v_" + str(ind+1))
+        vec_v[ind,0] = get_share_variable(ind+1)
     return vec_v
 
 
@@ -169,10 +248,272 @@ def create_policy_matrix_for_general_access_policy(length):
     for i in range(length):
         sum_row = 0
         for j in range(1,length):
-            new_entry = parse_expr("A_(" + str(i+1) + "," + str(j+1) + ")")
+            new_entry = get_policy_matrix_entry(i+1, j+1)
             matrix_A[i,j] = new_entry
-            w_entry = parse_expr("w_" + str(j+1))
+            w_entry = get_policy_weight(j+1)
             sum_row -= new_entry*w_entry
         # matrix_A[i,0] = parse_expr("A_(" + str(i+1) + ",1)")
         matrix_A[i,0] = sum_row
     return matrix_A
+
+class GateType(Enum):
+    """
+    Nodes of a monotone boolean formula.
+    """
+    ATTRIBUTE = 1
+    AND = 2
+    OR = 3
+    THRESHOLD = 4
+
+class PolicyNode:
+    """
+    Node of a monotone boolean formula over the attributes.
+
+    Attributes:
+        gate (GateType): Type of the node.
+        children (list): Children of a gate.
+        threshold (int): Number of children that must be satisfied, for
+            THRESHOLD gates.
+        attribute (int): Attribute of an ATTRIBUTE leaf.
+    """
+
+    def __init__(self, gate: GateType, children: list = None, threshold: int = None, attribute = None) -> None:
+        self.gate = gate
+        self.children = children if children is not None else []
+        self.threshold = threshold
+        self.attribute = attribute
+
+    def __repr__(self) -> str:
+        match self.gate:
+            case GateType.ATTRIBUTE:
+                return str(self.attribute)
+            case GateType.AND:
+                return "(" + " and ".join(repr(child) for child in self.children) + ")"
+            case GateType.OR:
+                return "(" + " or ".join(repr(child) for child in self.children) + ")"
+            case GateType.THRESHOLD:
+                return str(self.threshold) + " of (" + ", ".join(repr(child) for child in self.children) + ")"
+
+    def attributes(self) -> list:
+        """
+        Returns:
+            (list): Attributes of the leaves, from left to right.
+        """
+        if self.gate == GateType.ATTRIBUTE:
+            return [self.attribute]
+        return [att for child in self.children for att in child.attributes()]
+
+    def is_satisfied(self, atts: set) -> bool:
+        """
+        Parameters:
+            atts (set): Attributes.
+
+        Returns:
+            (bool): The attributes satisfy the formula.
+        """
+        match self.gate:
+            case GateType.ATTRIBUTE:
+                return self.attribute in atts
+            case GateType.AND:
+                return all(child.is_satisfied(atts) for child in self.children)
+            case GateType.OR:
+                return any(child.is_satisfied(atts) for child in self.children)
+            case GateType.THRESHOLD:
+                return sum(child.is_satisfied(atts) for child in self.children) >= self.threshold
+
+def parse_policy(policy: str) -> PolicyNode:
+    """
+    Parses a monotone boolean formula, e.g. "(1 and 2) or 2 of (3, 4, 5)".
+    The attributes are integers, "and" binds stronger than "or" and
+    "t of (...)" is a threshold gate.
+
+    Parameters:
+        policy (str): Formula.
+
+    Returns:
+        (PolicyNode): Root of the formula.
+    """
+    tokens = policy.replace("(", " ( ").replace(")", " ) ").replace(",", " , ").split()
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def expect(token):
+        nonlocal pos
+        if peek() != token:
+            raise ValueError("parse_policy: expected '" + token + "' at token " + str(pos) + " of " + policy)
+        pos += 1
+
+    def parse_gate(op, gate, parse_child):
+        children = [parse_child()]
+        while peek() == op:
+            expect(op)
+            children.append(parse_child())
+        return children[0] if len(children) == 1 else PolicyNode(gate, children)
+
+    def parse_or():
+        return parse_gate("or", GateType.OR, parse_and)
+
+    def parse_and():
+        return parse_gate("and", GateType.AND, parse_factor)
+
+    def parse_factor():
+        nonlocal pos
+        token = peek()
+        if token == "(":
+            expect("(")
+            node = parse_or()
+            expect(")")
+            return node
+        if token is None or not token.isdigit():
+            raise ValueError("parse_policy: unexpected token " + str(token) + " in " + policy)
+        pos += 1
+        if peek() != "of":
+            return PolicyNode(GateType.ATTRIBUTE, attribute=int(token))
+        expect("of")
+        expect("(")
+        children = [parse_or()]
+        while peek() == ",":
+            expect(",")
+            children.append(parse_or())
+        expect(")")
+        threshold = int(token)
+        if not 1 <= threshold <= len(children):
+            raise ValueError("parse_policy: invalid threshold " + token + " in " + policy)
+        return PolicyNode(GateType.THRESHOLD, children, threshold)
+
+    root = parse_or()
+    if peek() is not None:
+        raise ValueError("parse_policy: unexpected token " + str(peek()) + " in " + policy)
+    return root
+
+def colluding_attribute_sets(policy: PolicyNode) -> tuple:
+    """
+    Finds two sets of attributes that do not satisfy a formula on their
+    own, but do together, as [1, ..., n-1] and [n] for an AND-gate of n
+    attributes. The first set takes the attributes from left to right
+    that keep it unauthorized, the second one takes the others in the
+    same way.
+
+    Parameters:
+        policy (PolicyNode): Root of the formula.
+
+    Returns:
+        (list): Attributes of the first set.
+        (list): Attributes of the second set.
+    """
+    atts = list(dict.fromkeys(policy.attributes()))
+
+    att_ranges = ([], [])
+    for att_range in att_ranges:
+        for att in atts:
+            if not att in att_ranges[0] and not policy.is_satisfied(set(att_range + [att])):
+                att_range.append(att)
+
+    if not policy.is_satisfied(set(att_ranges[0] + att_ranges[1])):
+        raise ValueError("colluding_attribute_sets: found no two unauthorized sets of attributes that satisfy " + repr(policy))
+    return att_ranges
+
+class LSSSMatrix:
+    """
+    Linear secret sharing scheme of a policy, with sparse rows.
+
+    Attributes:
+        rows (list): Every row maps its columns to their nonzero
+            integer entries.
+        labels (list): Attribute of every row.
+        nr_cols (int): Number of columns.
+    """
+
+    def __init__(self) -> None:
+        self.rows = []
+        self.labels = []
+        self.nr_cols = 1
+
+    def to_matrix(self):
+        """
+        Returns:
+            (Matrix): Dense policy matrix.
+        """
+        matrix_A = zeros(len(self.rows), self.nr_cols)
+        for (i, row) in enumerate(self.rows):
+            for (j, val) in row.items():
+                matrix_A[i,j] = val
+        return matrix_A
+
+    def shares(self, special_s) -> list:
+        """
+        Computes all the shares in a single pass over the sparse rows,
+        with the share vector (s, v_2, ..., v_n) of create_share_vector.
+
+        Parameters:
+            special_s (sp.core.list.Symbol): Sympy description of s.
+
+        Returns:
+            (list): Share of every row.
+        """
+        vec_v = [special_s] + [get_share_variable(j + 1) for j in range(1, self.nr_cols)]
+        return [Add(*[val * vec_v[j] for (j, val) in sorted(row.items())]) for row in self.rows]
+
+def policy_to_lsss(policy: PolicyNode) -> LSSSMatrix:
+    """
+    Converts a monotone boolean formula into an LSSS matrix with the
+    Lewko-Waters construction: the root gets the vector (1), the
+    children of an OR-gate copy the vector of the gate, and an AND-gate
+    of n children adds n - 1 columns, as in create_policy_matrix_for_AND.
+    A threshold gate of t out of n adds t - 1 columns, and its i-th child
+    gets i, i^2, ..., i^(t-1) in them. The rows only have nonzero
+    entries for the gates above their leaf.
+
+    Parameters:
+        policy (PolicyNode): Root of the formula.
+
+    Returns:
+        (LSSSMatrix): Policy matrix, one row per leaf.
+    """
+    lsss = LSSSMatrix()
+
+    # iterative to support deep formulas
+    stack = [(policy, {0: 1})]
+    pending = []
+    while len(stack) > 0:
+        (node, vec) = stack.pop()
+        match node.gate:
+            case GateType.ATTRIBUTE:
+                pending.append((node, vec))
+                continue
+            case GateType.OR:
+                child_vecs = [vec for child in node.children]
+            case GateType.AND:
+                n = len(node.children)
+                first = lsss.nr_cols
+                lsss.nr_cols += n - 1
+                child_vecs = []
+                for i in range(n):
+                    child_vec = dict(vec) if i == 0 else {}
+                    if i > 0:
+                        child_vec[first + i - 1] = -1
+                    if i < n - 1:
+                        child_vec[first + i] = 1
+                    child_vecs.append(child_vec)
+            case GateType.THRESHOLD:
+                t = node.threshold
+                first = lsss.nr_cols
+                lsss.nr_cols += t - 1
+                child_vecs = []
+                for i in range(1, len(node.children) + 1):
+                    child_vec = dict(vec)
+                    for k in range(1, t):
+                        child_vec[first + k - 1] = i**k
+                    child_vecs.append(child_vec)
+        # the leaves are output from left to right
+        for (child, child_vec) in reversed(list(zip(node.children, child_vecs))):
+            stack.append((child, child_vec))
+
+    for (node, vec) in pending:
+        lsss.rows.append(vec)
+        lsss.labels.append(node.attribute)
+
+    return lsss
+
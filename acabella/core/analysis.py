@@ -17,6 +17,9 @@
 
 """analysis.py: Definition of the analysis class that aims to perform different tests on a given ABE scheme"""
 
+import time
+from contextlib import ExitStack, nullcontext
+
 from sympy import *
 from attack import *
 from security import *
@@ -24,8 +27,13 @@ from master_key import *
 from decryption import *
 from security_analysis_ac17 import *
 from trivial_security_and_collusion import analysis_trivial_and_collusion_security
-
-init_printing(use_unicode=True)
+from result_cache import ResultCache, render_cached_solution
+from linear_algebra import LinearAlgebraEngine
+from interned import SymbolTable
+from tracing import traced
+from budget import Budget, BudgetExceeded
+from results import InconclusiveResult
+from events import AnalysisFinished, PartialVerdict, StageStarted
 
 DEBUG = False
 
@@ -90,14 +98,100 @@ class AnalysisWithCorruption(Analysis):
     This class performs the security analysis of the provided
     scheme as well as look for master and decryption attacks if
     sufficient parameters are provided.
+
+    Attributes:
+        result_cache (ResultCache): Optional cache of analysis results.
+        cache_key (str): Key of this analysis in the result cache.
+        cached_solution (dict): Result obtained from the cache, if any.
     """
       
     def __init__(self) -> None:
         self.corruptable_vars_MK = []
         self.corruptable_vars_DK = []
 
+        self.result_cache = None
+        self.cache_key = None
+        self.cached_solution = None
+
         super().__init__()
 
+    def set_result_cache(self, result_cache: ResultCache, cache_key: str) -> None:
+        """
+        Attaches a result cache to the analysis. If the cache holds an
+        entry for cache_key, run and run_logic return immediately and
+        show_solution returns the stored results. Otherwise, the results
+        are stored by show_solution.
+
+        Parameters:
+            result_cache (ResultCache): Initialized result cache.
+            cache_key (str): Key of the analysis, see result_cache.config_key.
+        """
+        self.result_cache = result_cache
+        self.cache_key = cache_key
+
+    def set_modular_screening(self, enabled: bool) -> None:
+        """
+        Enables the randomized screening modulo a prime in every attack
+        of the analysis. Negative results decided by the screening are
+        reported with a bound on the probability of error; positive
+        results are always computed exactly.
+
+        Parameters:
+            enabled (bool): Screen the matrices of the analysis.
+        """
+        for attack in self.analysis_list:
+            attack.set_modular_screening(enabled)
+
+    def set_linear_algebra_engine(self, engine: LinearAlgebraEngine) -> None:
+        """
+        Selects the backend utilized for computing the kernels in every
+        attack of the analysis.
+
+        Parameters:
+            engine (LinearAlgebraEngine): dense, sparse or fraction_free.
+        """
+        for attack in self.analysis_list:
+            attack.set_linear_algebra_engine(engine)
+
+    def set_symbol_table(self, table: SymbolTable) -> None:
+        """
+        Shares a symbol table among every attack of the analysis, so
+        that the encodings of the scheme are interned once. Usually the
+        table of the ParseConfig of the scheme.
+
+        Parameters:
+            table (SymbolTable): Symbol table.
+        """
+        for attack in self.analysis_list:
+            attack.set_symbol_table(table)
+
+    def set_budget(self, budget: Budget) -> None:
+        """
+        Sets the time and memory budget of every attack of the analysis.
+        The budget applies to each attack separately: every attack gets
+        its own copy of it. An attack that exceeds its budget reports an
+        inconclusive result, and the results of the analysis are then
+        not stored in the result cache.
+
+        Parameters:
+            budget (Budget): Per-attack budget, None for no limits.
+        """
+        for attack in self.analysis_list:
+            attack.set_budget(budget.copy() if budget is not None else None)
+
+    def lookup_cache(self) -> bool:
+        """
+        Looks up the analysis in the attached result cache.
+
+        Returns:
+            (bool): The result is available in the cache.
+        """
+        if self.result_cache is None or self.cache_key is None:
+            return False
+
+        self.cached_solution = self.result_cache.get(self.cache_key)
+        return self.cached_solution is not None
+
     def init(self, master_key_params: dict, decryption_key_params: dict, corruptable_vars_MK: list, corruptable_vars_DK: list, security_analysis_params: dict) -> bool:
         """
         Initializes the AnalysisWithCorruption class.
@@ -240,6 +334,9 @@ class AnalysisWithCorruption(Analysis):
         """
         For those analysis with sufficient parameters, it runs them.
         """
+        if self.lookup_cache():
+            return
+
         for attack in self.analysis_list:
             if attack.enabled == True:
                 attack.run()
@@ -251,6 +348,9 @@ class AnalysisWithCorruption(Analysis):
         analysis fails.
         """
 
+        if self.lookup_cache():
+            return
+
         print("[*] Starting complete analysis")
 
         for attack in self.analysis_list:
@@ -275,6 +375,69 @@ class AnalysisWithCorruption(Analysis):
                     if attack.description == "DecryptionAttack":
                         attack.enabled = False
 
+    def stream(self):
+        """
+        Runs the analyses like run, but yields typed events as each stage
+        finishes, the cheap ones first: the type of the scheme, the AC17
+        form and the trivial security screen of the security analysis,
+        then the attacks and finally the complete security analysis with
+        its proofs. Once the generator is exhausted, show_solution,
+        results and to_dict behave as after run.
+
+        The screen and the complete security analysis run within one
+        budget, paused while the attacks run. If it is exceeded during
+        the screen, the inconclusive verdict is final and the complete
+        analysis is skipped.
+
+        Yields:
+            StageStarted, PartialVerdict and AnalysisFinished events.
+        """
+        start = time.perf_counter()
+        elapsed = lambda: round(time.perf_counter() - start, 3)
+
+        if self.lookup_cache():
+            for (kind, verdict) in self.verdict().items():
+                yield PartialVerdict(kind, "cache", verdict, True, elapsed())
+            yield AnalysisFinished(self.verdict(), elapsed())
+            return
+
+        attacks = [attack for attack in self.analysis_list if attack.enabled == True]
+        security_attack = next((attack for attack in attacks if attack.description == "SecurityAttack"), None)
+
+        with ExitStack() as stack:
+            # the screen and the complete security analysis share one
+            # budget, which is paused while the attacks run
+            security_budget = nullcontext()
+            if security_attack is not None:
+                if security_attack.budget is not None:
+                    stack.enter_context(security_attack.budget)
+                    security_budget = security_attack.budget.paused()
+
+                yield StageStarted(security_attack.kind, "screen", elapsed())
+                try:
+                    for (stage, outcome) in security_attack.screen():
+                        yield PartialVerdict(security_attack.kind, stage, outcome, False, elapsed())
+                except BudgetExceeded as exceeded:
+                    security_attack.set_inconclusive(exceeded)
+                    yield PartialVerdict(security_attack.kind, exceeded.stage, security_attack.result.verdict(), True, elapsed())
+                    security_attack = None
+
+            with security_budget:
+                for attack in attacks:
+                    if attack.description == "SecurityAttack":
+                        continue
+                    yield StageStarted(attack.kind, "attack", elapsed())
+                    attack.run()
+                    yield PartialVerdict(attack.result.kind, "attack", attack.result.verdict(), True, elapsed())
+
+            if security_attack is not None:
+                yield StageStarted(security_attack.kind, "proofs", elapsed())
+                security_attack.run()
+                yield PartialVerdict(security_attack.kind, "proofs", security_attack.result.verdict(), True, elapsed())
+
+        yield AnalysisFinished(self.verdict(), elapsed())
+
+    @traced("render")
     def show_solution(self) -> list:
         """
         Returns the results of the performed analysis.
@@ -284,6 +447,9 @@ class AnalysisWithCorruption(Analysis):
             proof_data (list): 
         """
 
+        if self.cached_solution is not None:
+            return self.show_cached_solution()
+
         proof_data = None
         proof_header = None
 
@@ -314,8 +480,67 @@ class AnalysisWithCorruption(Analysis):
                         case _:
                             pass # TODO: catch error      
 
+        inconclusive = any(isinstance(result, InconclusiveResult) for result in self.results())
+        if self.result_cache is not None and self.cache_key is not None and not inconclusive:
+            self.result_cache.put(self.cache_key, {"sol_list": self.sol_list, "proof_data": proof_data, "proof_header": proof_header, **self.to_dict()})
+
+        return self.sol_list, proof_data, proof_header
+
+    def show_cached_solution(self) -> list:
+        """
+        Returns (and prints) the results stored in the result cache.
+
+        Returns:
+            solution (list): The results obtained.
+            proof_data (list): 
+        """
+        (self.sol_list, proof_data, proof_header) = render_cached_solution(self.cached_solution)
+
         return self.sol_list, proof_data, proof_header
 
+    def results(self) -> list:
+        """
+        Returns the typed results of the performed analysis. Unlike
+        show_solution, nothing is rendered as text.
+
+        Returns:
+            (list): SecurityResult and AttackResult objects.
+        """
+        return [attack.result for attack in self.analysis_list
+                if attack.enabled == True and attack.result is not None]
+
+    def to_dict(self) -> dict:
+        """
+        Returns the results of the performed analysis in a JSON
+        serializable form.
+
+        Returns:
+            (dict): Verdict and results of every performed analysis.
+        """
+        if self.cached_solution is not None:
+            return {"verdict": self.cached_solution.get("verdict", {}), "results": self.cached_solution.get("results", [])}
+
+        return {"verdict": self.verdict(), "results": [result.to_dict() for result in self.results()]}
+
+    def verdict(self) -> dict:
+        """
+        Summarizes the outcome of every performed analysis, e.g. for
+        machine-readable reports.
+
+        Returns:
+            (dict): Maps "security", "master_key" and "decryption" to the
+                    outcome of the corresponding analysis.
+        """
+        if self.cached_solution is not None:
+            return self.cached_solution.get("verdict", {})
+
+        verdict = {}
+
+        for result in self.results():
+            verdict[result.kind] = result.verdict()
+
+        return verdict
+
     def is_scheme_fractional(self) -> bool:
         """
         If there is a security analysis attached, it
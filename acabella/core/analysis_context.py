@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""analysis_context.py: Per-scheme memoization of the intermediate
+results (canonical encodings, matrix decompositions, lone/non-lone
+variables and kernels) shared by the stages of the security analysis"""
+
+from sympy import *
+
+from common_methods import canonical, writeencodingasprod
+from interned import SymbolTable
+from linear_algebra import LinearAlgebraEngine, compute_nullspace, screen_independent_columns, screen_unspanned_columns
+from matrix_reduction import reduce_kernel_problem, reduced_nullspace
+
+class AnalysisContext:
+    """
+    Memoizes the intermediate results of the security analysis of one
+    scheme. The trivial security check, the collusion check, the FABEO
+    property and the proof generation decompose the same encodings and
+    compute the kernels of the same matrices; with a shared context
+    every decomposition and kernel is computed once.
+
+    The stored results are never handed out directly: callers receive
+    copies, since several methods of proof_generation modify their
+    inputs in place.
+
+    Attributes:
+        engine (LinearAlgebraEngine): Backend utilized for computing the kernels.
+        screening (bool): Negative results are first screened modulo a prime,
+            see linear_algebra.screen_ranks.
+        error_bound (float): Sum of the error bounds of the negative results
+            decided by the screening, None if there are none.
+        hits (int): Number of results served from the context.
+        misses (int): Number of results computed.
+        reductions (list): Pairs (stage, MatrixReduction) of the kernels
+            computed with reduced_nullspace.
+        table (SymbolTable): Symbol table in which the encodings are
+            interned for the decompositions.
+    """
+
+    def __init__(self, engine: LinearAlgebraEngine = LinearAlgebraEngine.dense, screening: bool = False, table: SymbolTable = None) -> None:
+        self.engine = engine
+        self.screening = screening
+        self.table = table if table is not None else SymbolTable()
+        self.error_bound = None
+        self.hits = 0
+        self.misses = 0
+        self.reductions = []
+
+        self.canonical_encodings = {}
+        self.decompositions = {}
+        self.non_lone_vars = {}
+        self.kernels = {}
+
+    def lookup(self, table: dict, key, compute):
+        """
+        Returns table[key], computing it first if needed.
+
+        Parameters:
+            table (dict): Memoization table.
+            key: Hashable key.
+            compute (function): Computes the value on a miss.
+
+        Returns:
+            The stored value.
+        """
+        if key in table:
+            self.hits += 1
+        else:
+            self.misses += 1
+            table[key] = compute()
+
+        return table[key]
+
+    def canonical(self, enc: list) -> list:
+        """
+        Memoized common_methods.canonical.
+
+        Parameters:
+            enc (list): Encodings.
+
+        Returns:
+            (list): Encodings in canonical form.
+        """
+        return list(self.lookup(self.canonical_encodings, tuple(enc), lambda: canonical(enc)))
+
+    def writeencodingasprod(self, enc: list, unknown: list) -> tuple:
+        """
+        Memoized common_methods.writeencodingasprod.
+
+        Parameters:
+            enc (list): Encodings.
+            unknown (list): Unknown variables.
+
+        Returns:
+            (list): Matrix of the decomposition.
+            (list): Vector of monomials.
+        """
+        key = (tuple(enc), tuple(unknown))
+        (mat, uvector) = self.lookup(self.decompositions, key, lambda: writeencodingasprod(enc, unknown, self.table))
+
+        return ([list(row) for row in mat], list(uvector))
+
+    def determine_non_lone_vars_in_uvector(self, enc: list, benc: list, uvector: list) -> list:
+        """
+        Memoized proof_generation.determine_non_lone_vars_in_uvector.
+
+        Parameters:
+            enc (list): Encodings.
+            benc (list): Public key encodings.
+            uvector (list): Vector of monomials.
+
+        Returns:
+            (list): (variable, is non-lone) pairs.
+        """
+        # imported here since proof_generation depends on this module
+        from proof_generation import determine_non_lone_vars_in_uvector
+
+        key = (tuple(enc), tuple(benc), tuple(uvector))
+        return list(self.lookup(self.non_lone_vars, key, lambda: determine_non_lone_vars_in_uvector(enc, benc, uvector)))
+
+    def nullspace(self, mat) -> list:
+        """
+        Memoized nullspace of mat, computed with the engine of the context.
+
+        Parameters:
+            mat (Matrix): Input matrix.
+
+        Returns:
+            (list): Column vectors (Matrix) that form a basis of the nullspace.
+        """
+        key = (shape(mat), tuple(mat))
+        kern = self.lookup(self.kernels, key, lambda: compute_nullspace(mat, self.engine))
+
+        return [vec.copy() for vec in kern]
+
+    def reduced_nullspace(self, stage: str, mat, targets: list, all_components: bool = False) -> tuple:
+        """
+        Nullspace of mat computed after eliminating its singleton rows
+        and splitting it into components, see matrix_reduction. The
+        reduction is recorded in reductions.
+
+        Parameters:
+            stage (str): Name of the stage that computes the kernel.
+            mat (Matrix): Input matrix.
+            targets (list): Target columns.
+            all_components (bool): Compute the whole kernel, not only the
+                vectors in the components of the targets.
+
+        Returns:
+            (MatrixReduction): Reduction of mat.
+            (list): Column vectors (Matrix) of the kernel, None if every
+                target is forced to zero.
+        """
+        reduction = reduce_kernel_problem(mat, targets, all_components)
+        self.reductions.append((stage, reduction))
+
+        if reduction.infeasible:
+            return (reduction, None)
+
+        return (reduction, reduced_nullspace(mat, reduction, self.nullspace))
+
+    def add_error_bound(self, error_bound: float) -> None:
+        """
+        Accounts for a negative result decided by the screening. The
+        error bounds of the screenings are added (union bound).
+
+        Parameters:
+            error_bound (float): Error bound of the screening.
+        """
+        self.error_bound = (self.error_bound or 0.0) + error_bound
+
+    def screen_independent_columns(self, mat, cols: list) -> bool:
+        """
+        If screening is enabled, screens whether every vector of the
+        nullspace of mat is zero in the entries cols, see
+        linear_algebra.screen_independent_columns.
+
+        Parameters:
+            mat (Matrix): Input matrix.
+            cols (list): Column indices.
+
+        Returns:
+            (bool): The screening decided that the columns are independent.
+        """
+        if not self.screening:
+            return False
+
+        (independent, error_bound) = screen_independent_columns(mat, cols)
+        if independent:
+            self.add_error_bound(error_bound)
+
+        return independent
+
+    def screen_unspanned_columns(self, mat, cols: list) -> bool:
+        """
+        If screening is enabled, screens whether some column in cols is
+        not spanned by the other columns of mat, see
+        linear_algebra.screen_unspanned_columns.
+
+        Parameters:
+            mat (Matrix): Input matrix.
+            cols (list): Column indices.
+
+        Returns:
+            (bool): The screening decided that some column is not spanned.
+        """
+        if not self.screening:
+            return False
+
+        (unspanned, error_bound) = screen_unspanned_columns(mat, cols)
+        if unspanned:
+            self.add_error_bound(error_bound)
+
+        return unspanned
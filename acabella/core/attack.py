@@ -17,11 +17,30 @@
 
 """attack.py: Abstract class with format_solution method"""
 
-from sympy import *
-init_printing(use_unicode=True)
+import functools
 
+from sympy import *
+from results import AttackVector, InconclusiveResult
+from budget import Budget, BudgetExceeded
 DEBUG = False
 
+def budgeted(run):
+    """
+    Decorator of the run methods of the attacks. If the attack has a
+    budget, it runs within the budget; when the budget is exceeded, the
+    result of the attack is an InconclusiveResult with the stage reached.
+    """
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        if self.budget is None:
+            return run(self, *args, **kwargs)
+        try:
+            with self.budget:
+                return run(self, *args, **kwargs)
+        except BudgetExceeded as exceeded:
+            self.set_inconclusive(exceeded)
+    return wrapper
+
 class Attack:
     """
     Base class for performing attacks. 
@@ -29,9 +48,13 @@ class Attack:
     Attributes:
         enabled (bool): The attack is enabled.
         description (str): Description of the attack.
+        kind (str): Kind of the results of the attack.
+        budget (Budget): Time and memory budget of run, if any.
     """
     enabled = True
     description = None
+    kind = None
+    budget = None
 
     def format_solution(self, encoding_list: list, solution_list: list, msg: str) -> str:
         """
@@ -51,19 +74,12 @@ class Attack:
         solution_list                                                              
         ), "format_solution: mismatch in encoding and solution lists"                  
                                                                                    
-    
-        mul_list = [                                                                   
-            simplify(Symbol(str(a)) * Symbol(str(b)))                                  
-            for a, b in zip(encoding_list, solution_list)                              
-            if b != 0                                                                  
-        ]                                                                              
-        
+
         if DEBUG:
             print(encoding_list)
             print(solution_list)
 
-        return(                                                                        
-            msg + " + ".join("{}".format(e) for e in mul_list)         ) 
+        return AttackVector(encoding_list, solution_list).render(msg)
 
     def init(self) -> None:
         """
@@ -82,4 +98,31 @@ class Attack:
         Shows the result of the attack.
         """    
         pass
+
+    def clear_solution(self) -> None:
+        """
+        Discards the rendered result of the attack.
+        """
+        self.sol = None
+
+    def set_inconclusive(self, exceeded: BudgetExceeded) -> None:
+        """
+        Records that the budget of the attack was exceeded: the result
+        of the attack is an InconclusiveResult with the stage reached.
+
+        Parameters:
+            exceeded (BudgetExceeded): Exception raised by the budget.
+        """
+        self.result = InconclusiveResult(self.kind, exceeded.stage, exceeded.resource, exceeded.limit, exceeded.used)
+        self.clear_solution()
+
+    def set_budget(self, budget: Budget) -> None:
+        """
+        Sets the time and memory budget of the attack. If run exceeds
+        it, the result of the attack is an InconclusiveResult.
+
+        Parameters:
+            budget (Budget): Budget, None for no limits.
+        """
+        self.budget = budget
                   
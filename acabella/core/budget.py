@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""budget.py: Wall-clock and memory budgets of the analyses, checked
+cooperatively when a stage starts (see tracing.span) and inside the
+elimination loops of the linear-algebra engines"""
+
+import contextlib
+import os
+import resource
+import time
+
+# budgets in force, innermost last
+ACTIVE_BUDGETS = []
+
+# the resident set size is read at most this often, in seconds
+MEMORY_CHECK_INTERVAL = 0.05
+
+def current_rss_kb() -> int:
+    """
+    Returns:
+        (int): Resident set size of the process in KB. The peak resident
+            set size if the current one is not available (non-Linux).
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class BudgetExceeded(Exception):
+    """
+    Raised by a checkpoint once a budget is exceeded.
+
+    Attributes:
+        stage (str): Stage reached by the analysis.
+        resource (str): "time" or "memory".
+        limit (float): Limit of the budget (seconds or KB).
+        used (float): Time (seconds) or memory (KB) used.
+    """
+
+    def __init__(self, stage: str, resource: str, limit: float, used: float) -> None:
+        self.stage = stage
+        self.resource = resource
+        self.limit = limit
+        self.used = used
+        super().__init__("{} budget exceeded at stage {} ({} > {})".format(resource, stage, used, limit))
+
+    def __reduce__(self) -> tuple:
+        # re-raised in the parent when a budget runs out in a worker process
+        return (BudgetExceeded, (self.stage, self.resource, self.limit, self.used))
+
+class Budget:
+    """
+    Wall-clock and memory limits of an analysis. The limits are enforced
+    cooperatively: while the budget is active (with budget: ...), every
+    checkpoint raises BudgetExceeded once a limit is exceeded. A single
+    SymPy call, e.g. a dense nullspace, is not interrupted, so the
+    budget is noticed at the first checkpoint after it.
+
+    Attributes:
+        wall_time (float): Wall-clock limit in seconds, None for no limit.
+        max_rss_kb (int): Limit of the resident set size in KB, None for no limit.
+        stage (str): Last stage reached.
+        start (float): Time at which the budget became active.
+        depth (int): Nesting depth of the with statements of the budget.
+    """
+
+    def __init__(self, wall_time: float = None, max_rss_kb: int = None) -> None:
+        self.wall_time = wall_time
+        self.max_rss_kb = max_rss_kb
+        self.stage = None
+        self.start = None
+        self.depth = 0
+        self.last_memory_check = 0.0
+
+    def init(self, wall_time: float = None, max_rss_kb: int = None) -> None:
+        """
+        Initializes the limits of the budget.
+
+        Parameters:
+            wall_time (float): Wall-clock limit in seconds.
+            max_rss_kb (int): Limit of the resident set size in KB.
+        """
+        self.wall_time = wall_time
+        self.max_rss_kb = max_rss_kb
+
+    def copy(self) -> "Budget":
+        """
+        Returns:
+            (Budget): Inactive budget with the same limits.
+        """
+        return Budget(self.wall_time, self.max_rss_kb)
+
+    def __enter__(self) -> "Budget":
+        # the clock restarts unless the budget is already active
+        if self.depth == 0:
+            self.stage = None
+            self.start = time.perf_counter()
+            self.last_memory_check = 0.0
+            ACTIVE_BUDGETS.append(self)
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.depth -= 1
+        if self.depth == 0:
+            ACTIVE_BUDGETS.remove(self)
+
+    @contextlib.contextmanager
+    def paused(self):
+        """
+        Suspends an active budget until the with statement ends: it is
+        not checked and its clock stops, e.g. while another analysis
+        runs between two stages of the analysis of the budget.
+        """
+        if not self in ACTIVE_BUDGETS:
+            yield
+            return
+
+        ACTIVE_BUDGETS.remove(self)
+        paused_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.start += time.perf_counter() - paused_at
+            ACTIVE_BUDGETS.append(self)
+
+    def elapsed(self) -> float:
+        """
+        Returns:
+            (float): Seconds since the budget became active.
+        """
+        return time.perf_counter() - self.start if self.start is not None else 0.0
+
+    def check(self, stage: str = None) -> None:
+        """
+        Checks the limits of the budget.
+
+        Parameters:
+            stage (str): Stage reached, None to stay in the current stage.
+
+        Raises:
+            BudgetExceeded: A limit is exceeded.
+        """
+        if stage is not None:
+            self.stage = stage
+
+        now = time.perf_counter()
+        if self.wall_time is not None and now - self.start > self.wall_time:
+            raise BudgetExceeded(self.stage, "time", self.wall_time, round(now - self.start, 3))
+
+        if self.max_rss_kb is not None and now - self.last_memory_check >= MEMORY_CHECK_INTERVAL:
+            self.last_memory_check = now
+            rss = current_rss_kb()
+            if rss > self.max_rss_kb:
+                raise BudgetExceeded(self.stage, "memory", self.max_rss_kb, rss)
+
+def checkpoint(stage: str = None) -> None:
+    """
+    Checks every active budget. Without active budgets, it only tests
+    whether a list is empty.
+
+    Parameters:
+        stage (str): Stage reached, None to stay in the current stage.
+
+    Raises:
+        BudgetExceeded: A limit of an active budget is exceeded.
+    """
+    if ACTIVE_BUDGETS:
+        for budget in ACTIVE_BUDGETS:
+            budget.check(stage)
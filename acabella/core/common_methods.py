@@ -20,7 +20,8 @@ and analysis implementations"""
 
 from sympy import *
 
-init_printing(use_unicode=True)
+from interned import SymbolTable, decompose_encodings, decompose_polynomial, denominators, index_monomials
+from tracing import span, traced
 
 def findsymb(f, g):
     """
@@ -48,10 +49,7 @@ def intersectnotempt(lis1: list, lis2: list) -> bool:
     Returns:
         (bool): According to the intersection of lis1 and list2
     """    
-    for f in lis1:
-        if f in lis2:
-            return True
-    return False
+    return not set(lis2).isdisjoint(lis1)
 
 
 
@@ -166,62 +164,54 @@ def appendzeros(mat, uvector: list) -> None:
 
 
 
-def writepolyasprod(poly, uvector: list, unknown: list) -> None:
+def writepolyasprod(poly, uvector: list, unknown: list, table: SymbolTable = None) -> list:
     """
     This takes as input a polynomial, and a set of unknown variables.
     It outputs a vector decomposition, where the kvector consists of
     integers and known variables, and the uvector of unknown variables.
+    As in writeencodingasprod, the polynomial is interned and its
+    monomials are indexed by tuples of IDs, see
+    interned.decompose_polynomial.
 
     Parameters:
         poly (sp.core.list.Symbol): Polynomial expression.
         uvector (list): Vector decomposition.
         unknown (list): Vector of unknown variables.
+        table (SymbolTable): Symbol table shared with the caller. A new
+            table is used if None.
+
+    Returns:
+        (list): The kvector of poly.
     """   
-    colmono = []
-    # this recovers a list colmono of monomials
-    recovermonos(poly, colmono)
-    cmcpy = []
-    # this eliminates all occurrences of 'None'
-    for f in colmono:
-        if not (f == None):
-            cmcpy.append(f)
-    variables = []
-    # for each monomial in the list, we:
-    for mono in cmcpy:
-        lis = []
-        # recover a list of the variables
-        recovervars(mono, lis)
-        # note that variables is a list of lists of variables
-        # the first entry is the list of variables of the first monomial, etc.
-        variables.append(lis)
-    kvector = [0 for x in uvector]
-    # for each list of variables f
-    for f in variables:
-        # we decompose it into a subset of known and subset of unknown variables
-        liso = decompose(f, unknown)
-        # we add the decomposition to the known and uknown-variable vector
-        # this is done by first checking wether the product of the unknown
-        # variables is already in uvector or not
-        addcomptodecomp(kvector, uvector, liso)
-    return kvector
-
-
-
-def writeencodingasprod(enco: list, unknown: list) -> tuple[list, list]:
+    if table is None:
+        table = SymbolTable()
+    uindex = index_monomials(uvector, table)
+    enc = None if type(poly) == int else table.encode(poly)
+    return decompose_polynomial(enc, table, table.mask(unknown), uvector, uindex)
+
+
+
+def writeencodingasprod(enco: list, unknown: list, table: SymbolTable = None) -> tuple[list, list]:
     """
     This takes as input an encoding and a set of unknown variables.
     It outputs a matrix decomposition, where the matrix consists of
     integers and known variables, and the vector of unknown variables.
+    The encodings are interned in a symbol table, so the monomials are
+    split with a bitmask and the columns are indexed by tuples of IDs,
+    see interned.decompose_encodings.
 
     Parameters:
         enco (list): Input encoding.
         unknown (list): Vector of unknown variables.
+        table (SymbolTable): Symbol table shared with the caller, e.g.
+            the one of the ParseConfig of the scheme. A new table is
+            used if None.
     """   
-    uvector = []
-    mat = []
-    for poly in enco:
-        mat.append(writepolyasprod(poly, uvector, unknown))
-    appendzeros(mat, uvector)
+    if table is None:
+        table = SymbolTable()
+    with span("writeencodingasprod", encodings=len(enco)) as stage:
+        (mat, uvector) = decompose_encodings(enco, table, unknown)
+        stage.set(rows=len(mat), cols=len(uvector))
     return (mat, uvector)
 
 
@@ -236,9 +226,10 @@ def canonical(listpolys: list) -> list:
         (list): List of polynomials in canonical form.
     """   
     copylist = []
-    for x in listpolys:
-        x = x.expand()
-        copylist.append(x)
+    with span("canonical", encodings=len(listpolys)):
+        for x in listpolys:
+            x = x.expand()
+            copylist.append(x)
     return copylist
 
 
@@ -306,10 +297,7 @@ def is_var_not_in_list(var, lis) -> bool:
     Returns:
         (bool): Result of check.
     """   
-    for varx in lis:
-        if var == varx:
-            return False
-    return True
+    return var not in lis
 
 
 def var_contains_unknown(var, unknowns: list) -> bool:
@@ -324,48 +312,28 @@ def var_contains_unknown(var, unknowns: list) -> bool:
     Returns:
         (bool): Result of check.
     """   
-    if var.func == Symbol:
-        return var in unknowns
-
-    for x in var.args:
-        if x.args:
-            for y in x.args:
-                if y in unknowns:
-                    return True
-        if x in unknowns:
-            return True
-    return False
+    return var in unknowns or not var.free_symbols.isdisjoint(unknowns)
 
-def collect_denoms(lis: list, unknowns: list) -> list:
+@traced("collect_denoms")
+def collect_denoms(lis: list, unknowns: list, table: SymbolTable = None) -> list:
     """
     Collects the denominators of the encodings
-    not to be confused with demons
+    not to be confused with demons. The encodings are interned, so the
+    denominators are found by their IDs and the unknowns by a bitmask,
+    see interned.denominators.
 
     Parameters:
         lis (list): Input list of sp.core.list.Symbol expressions.
         unknown (list): List of unknowns as sympy expressions.
+        table (SymbolTable): Symbol table shared with the caller. A new
+            table is used if None.
         
     Returns:
         (list): List of denominators.
     """   
-    ## this part is the same as in writepolyasprod
-    colmono = []
-    for poly in lis:
-        recovermonos(poly, colmono)
-        cmcpy = []
-    for f in colmono:
-        if not (f == None):
-            cmcpy.append(f)
-    variables = []
-    for mono in cmcpy:
-        recovervars(mono, variables)
-    denoms = []
-    for var in variables:
-        if is_var_denom(var):
-            if var_contains_unknown(var.args[0], unknowns):
-                if is_var_not_in_list(var.args[0], denoms):
-                    denoms.append(var.args[0])
-    return denoms
+    if table is None:
+        table = SymbolTable()
+    return denominators(lis, table, unknowns)
 
 
 def denoms_prod(denoms: list):
@@ -384,6 +352,97 @@ def denoms_prod(denoms: list):
     return denomprod
 
 
+def reduced_fraction(enc, unknown: list, factorizations: dict = None) -> tuple:
+    """
+    Writes an encoding as a fraction of polynomials in the unknown
+    variables, whose denominator is factored and shares no factor with
+    the numerator.
+
+    Parameters:
+        enc (sp.core.list.Symbol): Input encoding.
+        unknown (list): List of unknowns as sympy expressions.
+        factorizations (dict): Factorizations of the denominators seen so far.
+
+    Returns:
+        (Poly): Numerator.
+        (sp.core.list.Symbol): Part of the denominator without unknowns.
+        (dict): Multiplicity of every irreducible factor of the denominator.
+    """
+    (num, den) = fraction(together(enc))
+    num = Poly(num, *unknown)
+    if factorizations is None:
+        factorizations = {}
+    if not den in factorizations:
+        factorizations[den] = Poly(den, *unknown).factor_list()
+    (coeff, factors) = factorizations[den]
+
+    multiplicities = {}
+    for (factor, mult) in factors:
+        if factor.is_ground:
+            coeff *= factor.as_expr()**mult
+            continue
+        # common factors of the numerator and the denominator cancel
+        while mult > 0:
+            try:
+                num = num.exquo(factor)
+            except ExactQuotientFailed:
+                break
+            mult -= 1
+        if mult > 0:
+            multiplicities[factor.as_expr()] = mult
+
+    return (num, coeff, multiplicities)
+
+@traced("clear_denominators")
+def clear_denominators(encodings: list, unknowns: list) -> tuple:
+    """
+    Multiplies the encodings by the least common multiple of their
+    denominators, so that they become polynomials in the unknown
+    variables. Every irreducible factor occurs in the multiple as often
+    as in the denominator of a single encoding, e.g. squared only if a
+    product of two encodings has it on both sides. Since all encodings
+    are multiplied by the same polynomial, their linear combinations do
+    not change.
+
+    Parameters:
+        encodings (list): Input list of sp.core.list.Symbol expressions.
+        unknowns (list): List of unknowns as sympy expressions.
+
+    Returns:
+        (list): Encodings multiplied by the multiple, in canonical form.
+        (sp.core.list.Symbol): Least common multiple of the denominators.
+    """
+    if len(unknowns) == 0:
+        return (canonical(encodings), Integer(1))
+
+    try:
+        factorizations = {}
+        fractions = [reduced_fraction(enc, unknowns, factorizations) for enc in encodings]
+    except PolynomialError:
+        # not rational in the unknowns, the denominators are cleared as before
+        denomprod = denoms_prod(collect_denoms(canonical(encodings), unknowns))**2
+        return (canonical([cancel(enc * denomprod) for enc in encodings]), denomprod)
+
+    lcm_multiplicities = {}
+    for (num, coeff, multiplicities) in fractions:
+        for (factor, mult) in multiplicities.items():
+            lcm_multiplicities[factor] = max(mult, lcm_multiplicities.get(factor, 0))
+
+    cleared = []
+    for (num, coeff, multiplicities) in fractions:
+        for (factor, mult) in lcm_multiplicities.items():
+            if mult > multiplicities.get(factor, 0):
+                num = num * Poly(factor, *unknowns)**(mult - multiplicities.get(factor, 0))
+        cleared.append(num.as_expr() / coeff)
+
+    lcm = Integer(1)
+    for (factor, mult) in lcm_multiplicities.items():
+        lcm *= factor**mult
+
+    return (canonical(cleared), lcm)
+
+
+@traced("find_attack_row")
 def find_attack_row(mat):
     """
     Given a matrix finds the
@@ -419,60 +478,178 @@ def merge_lists(lis1, lis2):
         (list): Merged list.
     """   
     lis3 = []
+    seen = set()
     for elem in lis1 + lis2:
-        if not elem in lis3:
+        if not elem in seen:
+            seen.add(elem)
             lis3.append(elem)
     return lis3
 
-def gen_all_p(k, c, mpk, gp):
+# pairs of encodings that an attacker can multiply, in the order of gen_all_p
+PRODUCT_GROUPS = [("k", "c"), ("k", "mpk"), ("c", "mpk"), ("c", "gp"), ("k", "gp")]
+
+def monomial_support(enc, unknown: list) -> tuple:
     """
-    Gives all possible products that an attacker can generate.
+    Splits an encoding into the monomials of its numerator and its
+    denominator, as polynomials in the unknown variables.
+
+    Parameters:
+        enc (sp.core.symbol.Symbol): Encoding.
+        unknown (list): Unknown variables.
+
+    Returns:
+        (set): Exponent vectors of the monomials of the numerator.
+        (Poly): Denominator, None if it does not contain unknown variables.
+    """
+    (num, den) = fraction(cancel(enc))
+    num_poly = Poly(num, *unknown)
+
+    den_poly = Poly(den, *unknown)
+    if den_poly.is_ground:
+        den_poly = None
+
+    return (set(num_poly.monoms()), den_poly)
+
+def sum_supports(supports: list) -> set:
+    """
+    Monomials that may occur in the product of polynomials with the given
+    supports.
+
+    Parameters:
+        supports (list): Sets of exponent vectors.
+
+    Returns:
+        (set): Exponent vectors of the product.
+    """
+    result = supports[0]
+    for support in supports[1:]:
+        result = {tuple(a + b for (a, b) in zip(m1, m2)) for m1 in result for m2 in support}
+    return result
+
+def relevant_products(target, products: list, unknown: list):
+    """
+    Selects the products of encodings that may occur in a linear
+    combination equal to the target.
+
+    Every product is multiplied by the square of the product D of the
+    denominators of the encodings, which makes it polynomial in the
+    unknown variables and leaves the linear combinations unchanged. The
+    products and the monomials form a bipartite graph, and a linear
+    combination equal to the target only involves the products that are
+    reachable from the monomials of the target. The monomials of a
+    product are bounded by the sums of the monomials of its factors, so
+    no product is expanded.
+
+    Parameters:
+        target (sp.core.symbol.Symbol): Target of the attack.
+        products (list): Tuples of at most two encodings, the factors of every product.
+        unknown (list): Unknown variables.
+
+    Returns:
+        (set): Indices of the relevant products, None if the encodings
+            are not rational functions in the unknown variables.
+    """
+    if len(unknown) == 0:
+        return None
+
+    try:
+        cache = {}
+        for factors in [(target,)] + products:
+            for enc in factors:
+                if not enc in cache:
+                    cache[enc] = monomial_support(enc, unknown)
+    except PolynomialError:
+        return None
+
+    denoms = []
+    for (monos, den) in cache.values():
+        if den is not None and not den in denoms:
+            denoms.append(den)
+
+    denom_square = Poly(1, *unknown)
+    for den in denoms:
+        denom_square *= den**2
+
+    # D**2 divided by the denominators of the factors
+    cofactors = {}
+    def support(factors):
+        key = tuple(cache[enc][1] for enc in factors if cache[enc][1] is not None)
+        if not key in cofactors:
+            cofactor = denom_square
+            for den in key:
+                cofactor = cofactor.exquo(den)
+            cofactors[key] = set(cofactor.monoms())
+        return sum_supports([cache[enc][0] for enc in factors] + [cofactors[key]])
+
+    supports = [support(factors) for factors in products]
+
+    products_of_monomial = {}
+    for (ind, monos) in enumerate(supports):
+        for mono in monos:
+            products_of_monomial.setdefault(mono, []).append(ind)
+
+    reached = support((target,))
+    stack = list(reached)
+    relevant = set()
+    while len(stack) > 0:
+        for ind in products_of_monomial.get(stack.pop(), []):
+            if ind in relevant:
+                continue
+            relevant.add(ind)
+            for mono in supports[ind]:
+                if not mono in reached:
+                    reached.add(mono)
+                    stack.append(mono)
+
+    return relevant
+
+def gen_products(encodings: dict, target = None, unknown: list = None):
+    """
+    Lazily generates the products that an attacker can generate, in the
+    order of gen_all_p. If a target is given, only the products that may
+    occur in a linear combination equal to the target are generated, see
+    relevant_products.
+
+    Parameters:
+        encodings (dict): Lists of encodings with the keys "k", "c", "mpk" and "gp".
+        target (sp.core.symbol.Symbol): Target of the attack.
+        unknown (list): Unknown variables.
+
+    Yields:
+        (tuple): (left, i, right, j, product) for the product of
+            encodings[left][i] and encodings[right][j].
+    """
+    pairs = [(left, i, right, j) for (left, right) in PRODUCT_GROUPS
+             for i in range(len(encodings[left])) for j in range(len(encodings[right]))]
+
+    relevant = None
+    if target is not None:
+        factors = [(encodings[left][i], encodings[right][j]) for (left, i, right, j) in pairs]
+        relevant = relevant_products(target, factors, unknown)
+
+    for (ind, (left, i, right, j)) in enumerate(pairs):
+        if relevant is None or ind in relevant:
+            yield (left, i, right, j, encodings[left][i] * encodings[right][j])
+
+def gen_all_p(k, c, mpk, gp, target = None, unknown: list = None):
+    """
+    Gives all possible products that an attacker can generate. If a
+    target is given, only the products that may occur in a linear
+    combination equal to the target are generated, see gen_products.
 
     Parameters:
         k (list): List of key encodings.
         c (list): List of ciphertext encodings.
         mpk (list): List of MPK encodings.
         gp (list): List of global parameter encodings.
+        target (sp.core.symbol.Symbol): Target of the combinations.
+        unknown (list): Unknown variables.
     Returns:
         (list): All possible combinations of encodings. 
     """   
+    encodings = {"k": k, "c": c, "mpk": mpk, "gp": gp}
 
-    # k*c
-    
-    all_k_c = []
-    for i in k:
-        for j in c:
-            all_k_c.append(i * j)
-    
-    # k*mpk
-    
-    all_k_mpk = []
-    for i in k:
-        for j in mpk:
-            all_k_mpk.append(i * j)
-    
-    # c*mpk
-    
-    all_mpk_c = []
-    for i in c:
-        for j in mpk:
-            all_mpk_c.append(i * j)
-    
-    # c*gp
-    
-    all_gp_c = []
-    for i in c:
-        for j in gp:
-            all_gp_c.append(i * j)
-    
-    # k*gp
-    
-    all_gp_k = []
-    for i in k:
-        for j in gp:
-            all_gp_k.append(i * j)
-    
-    return all_k_c + all_k_mpk + all_mpk_c + all_gp_c + all_gp_k
+    return [product for (left, i, right, j, product) in gen_products(encodings, target, unknown)]
 
 def transform_encoding_list(denomprod, p):
     """
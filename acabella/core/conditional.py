@@ -19,13 +19,34 @@
 
 """conditional.py: Conditional decryption attack based on the Venema-Alpar framework"""      
 
+import concurrent.futures
+import contextlib
+import os
+from enum import Enum
+from fractions import Fraction
+
 from common_methods import *
 from sympy import *
-from attack import Attack
+from attack import Attack, budgeted
 from encodings_helper import *
 from access_structures import *
+from interned import SymbolTable, split_mono
+from linear_algebra import IncrementalEchelon
+from tracing import annotate, span, traced
+from results import AttackResult, AttackVector, EncodingDescriptor
+
+class KeySearch(Enum):
+    """
+    Search for the number of copies of the keys in a conditional
+    decryption attack.
 
-init_printing(use_unicode=True)
+    exhaustive: runs a decryption attack for 1, 2, ... copies.
+    incremental: grows one echelon form of the products with each copy.
+    galloping: probes 1, 2, 4, ... copies in parallel and bisects.
+    """
+    exhaustive = 1
+    incremental = 2
+    galloping = 3
 
 class ConditionalDecryptionAttack(Attack):
         """
@@ -35,10 +56,23 @@ class ConditionalDecryptionAttack(Attack):
         Attributes:
             SOL_MSG (str): Default found attack string.
             NOT_FOUND_MSG (str): Default not found attack string.
+            sol (list): Rendered result of the attack, computed on demand by show_solution.
+            result (AttackResult): Result of the attack.
+            search (KeySearch): Search for the number of copies of the keys.
+            workers (int): Number of worker processes of the galloping search.
+            nr_of_keys (int): Number of copies of the keys of the attack found.
+            policy (PolicyNode): Policy of the ciphertext, the AND-policy over
+                ATT_RANGE_CT if None.
         """
 
         SOL_MSG = "[*] Conditional decryption attack found: "
         NOT_FOUND_MSG = "[!] No conditional decryption attack found"
+        kind = "conditional"
+
+        # attributes of the ciphertext and of the two colluding keys
+        ATT_RANGE_CT = [1,2]
+        ATT_RANGE_KEY_1 = [1]
+        ATT_RANGE_KEY_2 = [2]
 
         def init(self, masterkey, special_s, benc, kenc_fixed, kenc_att, cenc_fixed, cenc_att, unknown, prefixes, nr_indexed_encodings) -> None:
             """
@@ -83,11 +117,22 @@ class ConditionalDecryptionAttack(Attack):
             self.prefixes = None
             self.nr_indexed_encodings = None
             self.description = None
+            self.sol = None
+            self.result = None
+            self.cenc = None
+            self.max_nr_of_keys = None
+            self.search = KeySearch.incremental
+            self.workers = None
+            self.nr_of_keys = None
+            self.policy = None
 
         def show_solution(self):
             """
             Returns the result of the attack.
             """
+            if self.sol is None and self.result is not None:
+                self.sol = ['\n' + self.result.render() + '\n']
+
             return self.sol
 
         def set_sol_msg(self, msg: str) -> None:
@@ -108,61 +153,391 @@ class ConditionalDecryptionAttack(Attack):
             """
             self.NOT_FOUND_MSG = msg
 
-        def try_all_conditional_decryption_attacks(self) -> list:
+        def set_key_search(self, search: "KeySearch", workers: int = None) -> None:
             """
-            Looks for conditional decryption attacks.
+            Selects how the number of key copies of the attack is searched.
+
+            Parameters:
+                search (KeySearch): exhaustive, incremental or galloping.
+                workers (int): Number of worker processes of the galloping
+                    search, the number of CPUs if None.
             """
-            att_range_key_1 = [1]
-            att_range_key_2 = [2]
-            att_range_ct = [1,2]
-            
-            self.benc = create_b_encoding([], self.benc, [1,2])
-            cenc = create_ciphertext_encoding(self.cenc_fixed, self.cenc_att, self.special_s, att_range_ct, self.prefixes, self.nr_indexed_encodings)
-            
-            kenc_init = create_key_encoding(self.kenc_fixed, self.kenc_att, att_range_key_1, self.prefixes, self.nr_indexed_encodings, [1])
-            unknown2 = generate_unknown_variable_set(kenc_init, cenc, self.benc, att_range_ct, att_range_key_1 + att_range_key_2)
-            self.unknown = merge_lists(self.unknown, unknown2)
-            
+            self.search = search
+            self.workers = workers
+
+        def set_attribute_ranges(self, att_range_ct: list, att_range_key_1: list, att_range_key_2: list) -> None:
+            """
+            Sets the attributes of the ciphertext and of the two colluding
+            keys, by default [1,2], [1] and [2].
+
+            Parameters:
+                att_range_ct (list): Attributes of the ciphertext (AND-policy).
+                att_range_key_1 (list): Attributes of the first key.
+                att_range_key_2 (list): Attributes of the second key.
+            """
+            self.ATT_RANGE_CT = att_range_ct
+            self.ATT_RANGE_KEY_1 = att_range_key_1
+            self.ATT_RANGE_KEY_2 = att_range_key_2
+
+        def set_policy(self, policy) -> None:
+            """
+            Encrypts the ciphertext under a monotone boolean formula instead
+            of the AND-policy over its attributes. The two colluding keys
+            get the attributes of colluding_attribute_sets.
+
+            Parameters:
+                policy (PolicyNode or str): Formula, parsed with parse_policy if a string.
+            """
+            if isinstance(policy, str):
+                policy = parse_policy(policy)
+
+            (att_range_key_1, att_range_key_2) = colluding_attribute_sets(policy)
+            self.set_attribute_ranges(policy.attributes(), att_range_key_1, att_range_key_2)
+            self.policy = policy
+
+        @traced("conditional_prepare")
+        def prepare(self) -> None:
+            """
+            Generates the public key and ciphertext encodings for the
+            attributes of the attack, and the number of key copies to try.
+            """
+            self.benc = create_b_encoding([], self.benc, self.ATT_RANGE_CT)
+            if self.policy is not None:
+                self.cenc = create_ciphertext_encoding_for_policy(self.cenc_fixed, self.cenc_att, self.special_s, self.policy, self.prefixes, self.nr_indexed_encodings)
+            else:
+                self.cenc = create_ciphertext_encoding(self.cenc_fixed, self.cenc_att, self.special_s, self.ATT_RANGE_CT, self.prefixes, self.nr_indexed_encodings)
+
+            kenc_init = create_key_encoding(list(self.kenc_fixed), self.kenc_att, self.ATT_RANGE_KEY_1, self.prefixes, self.nr_indexed_encodings, [1])
+            self.unknown = self.unknown_variables(kenc_init)
+
             (_,uvectork) = writeencodingasprod(kenc_init, self.unknown)
-            max_nr_of_keys = len(uvectork)
-            
-            msg = []
-            first_attack = True
-
-            for nr_of_keys in range(1,max_nr_of_keys):
-                key_indices1 = [i for i in range(1,nr_of_keys + 1)]
-                key_indices2 = [i + nr_of_keys for i in key_indices1]
-                
-                kenc = create_key_encoding(self.kenc_fixed, self.kenc_att, att_range_key_1, self.prefixes, self.nr_indexed_encodings, key_indices1)
-                kenc += create_key_encoding(self.kenc_fixed, self.kenc_att, att_range_key_2, self.prefixes, self.nr_indexed_encodings, key_indices2)
-                
-                unknown2 = generate_unknown_variable_set(kenc, cenc, self.benc, att_range_ct, att_range_key_1 + att_range_key_2)
-                self.unknown = merge_lists(self.unknown, unknown2)
-                                                                                                            
-                decryption_attack = DecryptionAttack()
-                decryption_attack.SOL_MSG = self.SOL_MSG
-                decryption_attack.NOT_FOUND_MSG = self.NOT_FOUND_MSG                                       
-                decryption_attack.init(self.masterkey * self.special_s, kenc, cenc, self.benc, [], self.unknown)           
-                decryption_attack.run()      
-                
-                if first_attack:                                               
-                    msg.append(decryption_attack.show_solution())
-                    first_attack = False
-                
-            return msg
+            self.max_nr_of_keys = len(uvectork)
+
+        def key_copy(self, key_index: int) -> list:
+            """
+            Key encodings of the copy key_index of the two keys, one
+            for each attribute of the ciphertext. The keys of every copy
+            get their own indices, 2 * key_index - 1 and 2 * key_index,
+            so that no two keys share randomness, even if their
+            attribute ranges overlap.
+
+            Parameters:
+                key_index (int): Index of the copy.
+
+            Returns:
+                (list): Key encodings of the copy.
+            """
+            kenc = create_key_encoding([], self.kenc_att, self.ATT_RANGE_KEY_1, self.prefixes, self.nr_indexed_encodings, [2 * key_index - 1])
+            kenc += create_key_encoding([], self.kenc_att, self.ATT_RANGE_KEY_2, self.prefixes, self.nr_indexed_encodings, [2 * key_index])
+            return kenc
+
+        def key_encodings(self, nr_of_keys: int) -> list:
+            """
+            Key encodings with nr_of_keys copies of the keys. The
+            encodings for n copies are a prefix of the encodings for
+            n + 1 copies, hence the existence of an attack is monotone
+            in the number of copies.
+
+            Parameters:
+                nr_of_keys (int): Number of copies.
+
+            Returns:
+                (list): Key encodings.
+            """
+            kenc = list(self.kenc_fixed)
+            for key_index in range(1, nr_of_keys + 1):
+                kenc += self.key_copy(key_index)
+            return kenc
+
+        def unknown_variables(self, kenc: list) -> list:
+            """
+            Adds the variables of the encodings to the unknown variables.
+
+            Parameters:
+                kenc (list): Key encodings.
+
+            Returns:
+                (list): Unknown variables.
+            """
+            unknown2 = generate_unknown_variable_set(kenc, self.cenc, self.benc, self.ATT_RANGE_CT, self.ATT_RANGE_KEY_1 + self.ATT_RANGE_KEY_2)
+            return merge_lists(self.unknown, unknown2)
+
+        @traced("conditional_attempt")
+        def attempt(self, nr_of_keys: int) -> AttackResult:
+            """
+            Runs the decryption attack with nr_of_keys copies of the keys.
+
+            Parameters:
+                nr_of_keys (int): Number of copies.
+
+            Returns:
+                (AttackResult): Result of the decryption attack.
+            """
+            annotate(nr_of_keys=nr_of_keys)
+            kenc = self.key_encodings(nr_of_keys)
+            unknown = self.unknown_variables(kenc)
+
+            decryption_attack = DecryptionAttack()
+            decryption_attack.SOL_MSG = self.SOL_MSG
+            decryption_attack.NOT_FOUND_MSG = self.NOT_FOUND_MSG
+            decryption_attack.init(self.masterkey * self.special_s, kenc, self.cenc, self.benc, [], unknown)
+            decryption_attack.run()
+
+            return decryption_attack.result
+
+        def not_found(self, nr_of_keys: int) -> AttackResult:
+            """
+            Result reported when no attack is found, with the encodings
+            of the last attempt.
+
+            Parameters:
+                nr_of_keys (int): Number of copies of the last attempt.
+
+            Returns:
+                (AttackResult): Negative result.
+            """
+            kenc = self.key_encodings(nr_of_keys)
+            all_p = DecryptionAttack().gen_all_p_ex_dict(kenc, self.cenc, self.benc, [], self.masterkey * self.special_s, self.unknown_variables(kenc))
+            encodings = [EncodingDescriptor(a_dict["dsc"], a_dict["op"]) for a_dict in all_p]
+
+            return AttackResult("decryption", False, self.SOL_MSG, self.NOT_FOUND_MSG, None, encodings)
+
+        def search_exhaustive(self, first: int = 1) -> tuple:
+            """
+            Runs a decryption attack for every number of copies, starting
+            at first, until an attack is found.
+
+            Parameters:
+                first (int): Smallest number of copies to try.
+
+            Returns:
+                (int): Number of copies of the attack, None if not found.
+                (AttackResult): The attack, None if not found.
+            """
+            for nr_of_keys in range(first, self.max_nr_of_keys):
+                result = self.attempt(nr_of_keys)
+                if result.found:
+                    return (nr_of_keys, result)
+
+            return (None, None)
+
+        def product_rows(self, table: SymbolTable, products: list, unknown: list):
+            """
+            Decomposes products of encodings into sparse rows over the
+            monomials of the unknown variables.
+
+            Parameters:
+                table (SymbolTable): Symbol table.
+                products (list): Products of encodings.
+                unknown (list): Unknown variables.
+
+            Returns:
+                (list): Rows mapping the interned unknown monomials to
+                    their known coefficients, None if an unknown variable
+                    occurs in a denominator.
+            """
+            encs = [table.encode(expand(p)) for p in products]
+            mask = table.mask(unknown)
+
+            rows = []
+            for enc in encs:
+                row = {}
+                for (mono, coeff) in zip(enc.monos, enc.coeffs):
+                    (kmono, umono) = split_mono(mono, mask)
+                    if any(exp < 0 for (atom, exp) in umono):
+                        return None
+                    # SymPy entries, so that the echelon form divides them exactly
+                    row[umono] = row.get(umono, Integer(0)) + table.term(Fraction(coeff), kmono)
+                rows.append({u: val for (u, val) in row.items() if val != 0})
+
+            return rows
+
+        def grow_echelon(self, max_nr_of_keys: int = None):
+            """
+            Grows a single echelon form with the products of each new
+            copy of the keys, whose target is the blinded master key.
+
+            Parameters:
+                max_nr_of_keys (int): Largest number of copies, by default
+                    the one computed by prepare.
+
+            Yields:
+                (int): Number of copies.
+                (IncrementalEchelon): Echelon form of the products, None
+                    if an unknown variable occurs in a denominator, in
+                    which case the generator stops.
+                (set): Monomials of the products.
+                (list): EncodingDescriptor of the products, in the order
+                    of the rows of the echelon form.
+            """
+            if max_nr_of_keys is None:
+                max_nr_of_keys = self.max_nr_of_keys - 1
+
+            table = SymbolTable()
+            kenc = list(self.kenc_fixed)
+            encodings = {"k": kenc, "c": self.cenc, "mpk": self.benc}
+            echelon = None
+            columns = set()
+            descriptors = []
+
+            # products named as in DecryptionAttack.gen_all_p_ex_dict
+            def products(pairs: list) -> list:
+                return [EncodingDescriptor(left + str(i) + "*" + right + str(j), encodings[left][i] * encodings[right][j])
+                        for (left, i, right, j) in pairs]
+
+            right_factors = [("c", j) for j in range(len(self.cenc))] + [("mpk", j) for j in range(len(self.benc))]
+
+            for nr_of_keys in range(1, max_nr_of_keys + 1):
+                with span("grow_echelon", nr_of_keys=nr_of_keys) as stage:
+                    first = len(kenc)
+                    kenc += self.key_copy(nr_of_keys)
+
+                    pairs = [("k", i, right, j) for i in range(first, len(kenc)) for (right, j) in right_factors]
+                    if echelon is None:
+                        # the fixed key encodings and the ciphertext come first
+                        pairs = [("k", i, right, j) for i in range(first) for (right, j) in right_factors] + \
+                                [("c", i, "mpk", j) for i in range(len(self.cenc)) for j in range(len(self.benc))] + pairs
+                    new_products = products(pairs)
 
+                    unknown = self.unknown_variables(kenc)
+                    rows = self.product_rows(table, [self.masterkey * self.special_s] + [p.expr for p in new_products], unknown)
 
+                    if rows is not None:
+                        if echelon is None:
+                            echelon = IncrementalEchelon(rows[0])
+                        for row in rows[1:]:
+                            columns.update(row)
+                            echelon.insert(row)
+                        descriptors += new_products
+                        stage.set(products=len(new_products), columns=len(columns))
+
+                if rows is None:
+                    yield (nr_of_keys, None, None, None)
+                    return
+
+                yield (nr_of_keys, echelon, columns, descriptors)
+
+        def search_incremental(self) -> tuple:
+            """
+            Grows the echelon form of grow_echelon, and stops as soon as
+            the target is in its span. The attack is then read from the
+            echelon form. If an unknown variable occurs in a denominator,
+            the search continues with search_exhaustive.
+
+            Returns:
+                (int): Number of copies of the attack, None if not found.
+                (AttackResult): The attack, None if not found.
+            """
+            for (nr_of_keys, echelon, columns, descriptors) in self.grow_echelon():
+                if echelon is None:
+                    return self.search_exhaustive(nr_of_keys)
+                if echelon.target_reached():
+                    solution = echelon.solution()
+                    vector = AttackVector([d.name for d in descriptors], [solution.get(i, Integer(0)) for i in range(len(descriptors))])
+                    encodings = [descriptors[i] for i in sorted(solution)]
+                    return (nr_of_keys, AttackResult("decryption", True, self.SOL_MSG, self.NOT_FOUND_MSG, vector, encodings))
+
+            return (None, None)
+
+        def search_galloping(self) -> tuple:
+            """
+            Since the existence of an attack is monotone in the number of
+            copies, probes 1, 2, 4, ... copies until an attack is found and
+            then bisects between the last negative and the first positive
+            probe. Every round probes up to self.workers numbers of copies
+            in parallel worker processes.
+
+            Returns:
+                (int): Smallest number of copies of an attack, None if not found.
+                (AttackResult): The attack, None if not found.
+            """
+            workers = self.workers if self.workers is not None else os.cpu_count()
+            max_count = self.max_nr_of_keys - 1
+            results = {}
+
+            with contextlib.ExitStack() as stack:
+                if workers > 1:
+                    executor = stack.enter_context(concurrent.futures.ProcessPoolExecutor(max_workers=workers))
+                    probe = executor.map
+                else:
+                    probe = map
+
+                # lo is the largest number of copies without attack
+                # and hi the smallest one with an attack
+                lo = 0
+                hi = None
+
+                def update(counts: list) -> None:
+                    nonlocal lo, hi
+                    results.update(zip(counts, probe(self.attempt, counts)))
+                    for count in counts:
+                        if results[count].found:
+                            hi = count
+                            break
+                        lo = count
+
+                while hi is None and lo < max_count:
+                    counts = []
+                    count = lo
+                    while len(counts) < workers and count < max_count:
+                        count = min(max_count, 2 * count if count > 0 else 1)
+                        counts.append(count)
+                    update(counts)
+
+                while hi is not None and hi - lo > 1:
+                    nr_probes = min(workers, hi - lo - 1)
+                    update(sorted({lo + (hi - lo) * (i + 1) // (nr_probes + 1) for i in range(nr_probes)}))
+
+            if hi is None:
+                return (None, None)
+            return (hi, results[hi])
+
+        def try_all_conditional_decryption_attacks(self) -> list:
+            """
+            Looks for conditional decryption attacks with an increasing
+            number of copies of the keys, see KeySearch.
+
+            Returns:
+                (list): AttackResult of the attack found, or the negative
+                    result of the last attempt.
+            """
+            self.prepare()
+
+            if self.max_nr_of_keys <= 1:
+                return []
+
+            match self.search:
+                case KeySearch.exhaustive:
+                    (self.nr_of_keys, result) = self.search_exhaustive()
+                case KeySearch.incremental:
+                    (self.nr_of_keys, result) = self.search_incremental()
+                case KeySearch.galloping:
+                    (self.nr_of_keys, result) = self.search_galloping()
+
+            if result is None:
+                result = self.not_found(self.max_nr_of_keys - 1)
+
+            return [result]
+
+        @budgeted
+        @traced("conditional_attack")
         def run(self) -> None:
             """
             Run the attack and initializes the result string
             for the user.
             """
 
-            msg = self.try_all_conditional_decryption_attacks()
-            if msg:
-                self.sol = msg
+            results = self.try_all_conditional_decryption_attacks()
+            annotate(search=self.search.name, nr_of_keys=self.nr_of_keys, max_nr_of_keys=self.max_nr_of_keys)
+
+            # the result is rendered lazily by show_solution
+            self.sol = None
+
+            if results:
+                self.result = results[0]
+                self.result.kind = "conditional"
             else:
-                 self.sol =  self.NOT_FOUND_MSG
+                self.result = AttackResult("conditional", False, self.SOL_MSG, self.NOT_FOUND_MSG)
         
 if __name__ == "__main__":
 
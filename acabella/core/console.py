@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""console.py: Console output of the tools. Importing the core modules
+does not configure the SymPy printers; the tools that print results to
+the console enable the pretty printing here"""
+
+PRETTY_PRINTING = False
+
+def enable_pretty_printing() -> None:
+    """
+    Enables the unicode pretty printing of SymPy, once.
+    """
+    global PRETTY_PRINTING
+    if PRETTY_PRINTING:
+        return
+
+    from sympy import init_printing
+    init_printing(use_unicode=True)
+    PRETTY_PRINTING = True
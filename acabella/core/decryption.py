@@ -16,13 +16,16 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.                 
                                                                                                                                                                        
 from common_methods import *
-from attack import Attack
+from attack import Attack, budgeted
+from linear_algebra import LinearAlgebraEngine, compute_nullspace, is_linear_combination, screen_independent_columns
+from matrix_reduction import reduce_kernel_problem
+from interned import SymbolTable
+from tracing import annotate, span, traced
+from results import AttackResult, AttackVector, EncodingDescriptor
 from enum import Enum
 
 import sympy as sp
 
-init_printing(use_unicode=True)
-
 class DecryptionKeyCorruptedVariable(Enum):
     """
     Describes the origin of corruptable variables in decryption key attacks.
@@ -64,7 +67,8 @@ class DecryptionAttack(Attack):
                 sp.core.symbol.Symbol) related to key, ciphertext, global parameters and master public key components.
             unknown(list): List of variables (of type sp.core.symbol.Symbol) that are
                 supposed to be unknown to the attacker.
-            sol(string): Solution of the attack, if found.
+            sol(string): Rendered result of the attack, computed on demand by show_solution.
+            result(AttackResult): Result of the attack.
             k_encodings(list): List of sp.core.symbol.Symbol types representing the key
                 encodings.
             c_encodings(list): List of sp.core.symbol.Symbol types representing the
@@ -75,6 +79,14 @@ class DecryptionAttack(Attack):
             gp_encodings(list): List of sp.core.symbol.Symbol types representing the 
                 global parameter components involved in the attack (they could be related
                 to corruption of the authorities).    
+            engine(LinearAlgebraEngine): Backend utilized for computing the nullspace
+                of the attack matrix. By default, LinearAlgebraEngine.dense.
+            screening(bool): The attack matrix is first screened modulo a prime
+                and the nullspace is only computed if an attack may exist.
+            error_bound(float): Bound on the probability that the screening
+                missed an attack, None if the screening did not decide the result.
+            reduction(MatrixReduction): Reduction of the attack matrix by the
+                singleton elimination and the component decomposition.
         """
   
         SOL_MSG = "[*] Decryption attack found: "
@@ -84,11 +96,17 @@ class DecryptionAttack(Attack):
         all_p =  None
         unknown = None
         sol = None
+        result = None
         k_encodings = None
         c_encodings = None
         mpk_encodings = None
         gp_encodings = None
         is_master_key_attack = False
+        kind = "decryption"
+        engine = LinearAlgebraEngine.dense
+        screening = False
+        error_bound = None
+        reduction = None
 
         MPK_AAi = []
         MSK_AAi= []
@@ -117,11 +135,10 @@ class DecryptionAttack(Attack):
             self.mpk_encodings = mpk_encodings
             self.gp_encodings = gp_encodings
             self.is_master_key_attack = master_key_attack_only
+            self.kind = "master_key" if master_key_attack_only else "decryption"
 
-            if master_key_attack_only == False:
-                self.all_p = self.gen_all_p_ex_dict(self.k_encodings, self.c_encodings, self.mpk_encodings, self.gp_encodings)
-            else:
-                self.all_p = self.k_encodings
+            # generated by run, see invalidate_products
+            self.invalidate_products()
 
         def __init__(self) -> None:
             """
@@ -131,11 +148,18 @@ class DecryptionAttack(Attack):
             self.all_p =  None
             self.unknown = None
             self.sol = None
+            self.result = None
             self.k_encodings = None
             self.c_encodings = None
             self.mpk_encodings = None
             self.gp_encodings = None
             self.is_master_key_attack = False
+            self.kind = "decryption"
+            self.engine = LinearAlgebraEngine.dense
+            self.screening = False
+            self.error_bound = None
+            self.reduction = None
+            self.table = None
 
             self.MPK_AAi = []
             self.MSK_AAi = []
@@ -153,6 +177,9 @@ class DecryptionAttack(Attack):
             Returns:
                 solution (str): The result of the attack.
             """
+            if self.sol is None and self.result is not None:
+                self.sol = self.result.render()
+
             return '\n' + self.sol + '\n'
 
         def format_encodings(self) -> None:
@@ -293,10 +320,15 @@ class DecryptionAttack(Attack):
             if self.unknown is not None:
                 self.unknown = list(filter((corr).__ne__, self.unknown))
 
-            if self.is_master_key_attack == False:
-                self.all_p = self.gen_all_p_ex_dict(self.k_encodings, self.c_encodings, self.mpk_encodings, self.gp_encodings)
-            else:
-                self.all_p = self.k_encodings
+            self.invalidate_products()
+
+        def invalidate_products(self) -> None:
+            """
+            Discards the products of the encodings once the encodings or
+            the unknown variables change. They are generated by run,
+            lazily and pruned against the key.
+            """
+            self.all_p = None
 
         def add_mpk_variable(self, mpkv: sp.core.symbol.Symbol):
             """
@@ -308,9 +340,7 @@ class DecryptionAttack(Attack):
             if self.mpk_encodings is not None:
                 self.mpk_encodings.append(mpkv)
 
-            # regenerate encodings
-
-            self.all_p = self.gen_all_p_ex_dict(self.k_encodings, self.c_encodings, self.mpk_encodings, self.gp_encodings)
+            self.invalidate_products()
 
 
         def add_gp_variable(self, gpv: list):
@@ -323,9 +353,7 @@ class DecryptionAttack(Attack):
             if self.gp_encodings is not None:
                 self.gp_encodings.append(gpv)
 
-            # regenerate encodings
-
-            self.all_p = self.gen_all_p_ex_dict(self.k_encodings, self.c_encodings, self.mpk_encodings, self.gp_encodings)
+            self.invalidate_products()
 
 
         def set_sol_msg(self, msg: str) -> None:
@@ -374,20 +402,18 @@ class DecryptionAttack(Attack):
                 p (list): list of all possible combinations between the encodings (sp.core.symbol.Symbo).
                 unkonwn (list): list of unkown components for the attacker (sp.core.symbol.Symbo).
             """
-            p = canonical(p)
-
-            # function to select all denoms
-            denoms = collect_denoms(p, unknown)
-            denomprod = denoms_prod(denoms)
+            # no combination of the encodings reaches the key
+            if len(p) == 0:
+                return False, None, None, None
 
             # function that 'normalizes' the encodings
-            # (by multiplying everything with the product of
-            # denominators**2 (because each element in p is paired already))
-            # (master key is multiplied by the product**2)
-            p = self.transform_encoding_list(denomprod**2, p)
-            masterkey = canonical([cancel(masterkey * denomprod**2)])[0]
+            # (by multiplying everything, master key included, with the
+            # least common multiple of the denominators)
+            (cleared, denomlcm) = clear_denominators(p + [masterkey], unknown)
+            p = cleared[:-1]
+            masterkey = cleared[-1]
 
-            (mat, uvector) = writeencodingasprod(p, unknown)
+            (mat, uvector) = writeencodingasprod(p, unknown, self.table)
             # could run either of the following lines - using 'new' here for certainty
             # (mat,uvector) = reordermatuvec_new(masterkey,mat,uvector)
             # (mat, uvector) = reorder_mat_uvec_with_alpha(masterkey, mat, uvector)
@@ -403,29 +429,41 @@ class DecryptionAttack(Attack):
             # attack target_vector
             # use here the function from find_solution or something
             luvec1 = len(uvector)
-            target_vector = Matrix([writepolyasprod(masterkey, uvector, unknown)])
+            target_vector = Matrix([writepolyasprod(masterkey, uvector, unknown, self.table)])
             luvec2 = len(uvector)
             if luvec1 != luvec2:
                 return False, None, None, None
 
             mat2 = mat.row_insert(shape(mat)[0], target_vector)
             
-            ## testing code
-            # """
-            (mat2, uvector, lis_del_rows, lis_del_cols) = trim_matrix_and_uvector(mat2, uvector)
+            # the encodings that cannot occur in an attack are removed and
+            # only the component of the target is solved, see matrix_reduction
+            target_row = shape(mat2)[0] - 1
+            self.reduction = reduce_kernel_problem(mat2.transpose(), [target_row])
+
+            kept_rows = self.reduction.cols
+            kept_cols = self.reduction.rows
+            kept_encodings = [ind for ind in kept_rows if ind != target_row]
+            self.all_p = [self.all_p[ind] for ind in kept_encodings]
+
+            if self.reduction.infeasible:
+                return False, None, None, None
+
+            mat2 = mat2.extract(kept_rows, kept_cols)
+            target_vector = target_vector.extract([0], kept_cols)
+            m1_m = m1_m.extract(kept_encodings, kept_cols)
+            uvector = [uvector[ind] for ind in kept_cols]
             m2_m = Matrix(uvector)
-            
-            for ind in lis_del_cols:
-                target_vector.col_del(ind)
-                m1_m.col_del(ind)
-            
-            for ind in lis_del_rows:
-                del self.all_p[ind]
-                m1_m.row_del(ind)
-            # """
-            ## testing code
 
-            ns = mat2.transpose().nullspace()
+            # the target cannot be recovered, see linear_algebra.screen_ranks
+            if self.screening:
+                with span("screening"):
+                    (independent, self.error_bound) = screen_independent_columns(mat2.transpose(), [shape(mat2)[0] - 1])
+                if independent:
+                    return False, None, None, None
+
+            ns = compute_nullspace(mat2.transpose(), self.engine)
+            annotate(matrix="%dx%d" % shape(mat2), kernel_dim=len(ns))
 
             matns = Matrix([v.transpose() for v in ns])
 
@@ -433,6 +471,17 @@ class DecryptionAttack(Attack):
             if err:
                 return False, None, None, None
 
+            m1 = m1_m.tolist()
+            m2 = m2_m.tolist()
+
+            # the combination is verified exactly over the fraction field,
+            # without simplifying its entries
+            if self.engine == LinearAlgebraEngine.fraction_free:
+                if is_linear_combination(list(f_sol), mat2[:shape(mat2)[0] - 1, :], target_vector):
+                    return True, m1, m2, f_sol
+                else:
+                    return False, None, None, None
+
             n_l = shape(m2_m)[0]
             n_d = shape(mat)[1]
             check_v = zeros(1, n_l)
@@ -445,9 +494,6 @@ class DecryptionAttack(Attack):
                 check_v[ctr] = cancel(check_v[ctr])
                 ctr += 1
             
-            m1 = m1_m.tolist()
-            m2 = m2_m.tolist()
-            
             if check_v == target_vector:
                 return True, m1, m2, f_sol
             else:
@@ -457,20 +503,76 @@ class DecryptionAttack(Attack):
         # version of the super_matrix algorithm with
         # decryption_attack_generalized
         
+        @budgeted
+        @traced("decryption_attack")
         def run(self) -> None:
             """
             Tries to find a decryption attack with the supplied
             ABE scheme parameters.
             """
+            # only the combinations that may occur in an attack are solved
+            with span("generate_products") as stage:
+                if self.is_master_key_attack:
+                    relevant = relevant_products(self.key, [(a_dict["op"],) for a_dict in self.k_encodings], self.unknown)
+                    self.all_p = [a_dict for (ind, a_dict) in enumerate(self.k_encodings) if relevant is None or ind in relevant]
+                else:
+                    self.all_p = self.gen_all_p_ex_dict(self.k_encodings, self.c_encodings, self.mpk_encodings, self.gp_encodings, self.key, self.unknown)
+                stage.set(products=len(self.all_p))
+
             op = [a_dict["op"] for a_dict in self.all_p]
-            dsc = [a_dict["dsc"] for a_dict in self.all_p]
+            self.error_bound = None
 
             result, m, v, sol = self.decryption_attack_generalized_alt(self.key, op, self.unknown)
+            annotate(kind=self.kind, found=result == True)
+
+            # all_p only keeps the products left by the reduction of the attack matrix
+            dsc = [a_dict["dsc"] for a_dict in self.all_p]
+            encodings = [EncodingDescriptor(a_dict["dsc"], a_dict["op"]) for a_dict in self.all_p]
+
+            # the result is rendered lazily by show_solution
+            self.sol = None
+
             if result == True:
-                dsc = [a_dict["dsc"] for a_dict in self.all_p]
-                self.sol = super().format_solution(dsc, sol, self.SOL_MSG)
+                # AttackVector checks that sol has a coefficient for every product
+                self.result = AttackResult(self.kind, True, self.SOL_MSG, self.NOT_FOUND_MSG, AttackVector(dsc, list(sol)), encodings)
             else:
-                self.sol =  self.NOT_FOUND_MSG
+                self.result = AttackResult(self.kind, False, self.SOL_MSG, self.NOT_FOUND_MSG, None, encodings, self.error_bound)
+
+        def set_linear_algebra_engine(self, engine: LinearAlgebraEngine) -> None:
+            """
+            Selects the backend utilized for computing the nullspace of
+            the attack matrix. Every engine returns the same basis, so the
+            reported attack does not depend on this choice. With the
+            fraction_free engine, the attack is also verified without
+            simplifying the entries of the combination.
+    
+            Parameters:
+                engine (LinearAlgebraEngine): dense, sparse or fraction_free.
+            """
+            self.engine = engine
+
+        def set_symbol_table(self, table: SymbolTable) -> None:
+            """
+            Shares a symbol table, e.g. the one of the ParseConfig of the
+            scheme, in which the encodings are interned.
+    
+            Parameters:
+                table (SymbolTable): Symbol table.
+            """
+            self.table = table
+
+        def set_modular_screening(self, enabled: bool) -> None:
+            """
+            Enables the randomized screening of the attack matrix modulo
+            a prime. If the screening shows that the target cannot be
+            recovered, no attack is reported together with a bound on the
+            probability of error, without computing the nullspace.
+            Otherwise, the attack is computed exactly.
+    
+            Parameters:
+                enabled (bool): Screen the attack matrix.
+            """
+            self.screening = enabled
 
         def set_corruption_model(self, corr_m) -> None:
             """
@@ -482,87 +584,31 @@ class DecryptionAttack(Attack):
             """
             self.corr_model = corr_m
         
-        def gen_all_p_ex_dict(self, k: list, c: list, mpk: list, gp: list) -> list:
+        def gen_all_p_ex_dict(self, k: list, c: list, mpk: list, gp: list, key = None, unknown: list = None) -> list:
             """
             Generates all the possible combinations given key, ciphertext, mpk
-            and global parameter related encodings.
+            and global parameter related encodings. If the key to recover is
+            given, only the combinations that may occur in an attack are
+            generated, see common_methods.relevant_products.
             
             Parameters:
                 k (list): Key encodings of type sp.core.symbol.Symbol.
                 c (list): Ciphertext encodings of type sp.core.symbol.Symbol.
                 mpk (list): mpk encodings of type sp.core.symbol.Symbol.
                 gp (list): gp encodings of type sp.core.symbol.Symbol.
+                key (sp.core.symbol.Symbol): Key to recover.
+                unknown (list): Unknown variables.
             """   
+            encodings = {"k": k, "c": c, "mpk": mpk, "gp": gp}
+            corrupted = self.corr_model != DecryptionKeyCorruptionModel.NoCorruption
 
-            # k*c
-
-            all_k_c = []
-            for i in k:
-                for j in c:
-                    if self.corr_model != DecryptionKeyCorruptionModel.NoCorruption:
-                        entry = {"op": i * j, "dsc": "k" + str(k.index(i)) + "[i]" + "*c" + str(c.index(j))}
-                    else:
-                        entry = {"op": i * j, "dsc": "k" + str(k.index(i)) + "*c" + str(c.index(j))}
-
-                    all_k_c.append(entry)
-
-            # k*mpk
-
-            all_k_mpk = []
-            for i in k:
-                for j in mpk:
-                    if self.corr_model != DecryptionKeyCorruptionModel.NoCorruption:
-                        entry = {
-                            "op": i * j,
-                            "dsc": "k" + str(k.index(i)) + "[i]" + "*mpk" + str(mpk.index(j)),
-                        }
-                    else:
-                        entry = {
-                            "op": i * j,
-                            "dsc": "k" + str(k.index(i)) + "*mpk" + str(mpk.index(j)),
-                        }                        
-                    all_k_mpk.append(entry)
-
-            # c*mpk
-
-            all_mpk_c = []
-            for i in c:
-                for j in mpk:
-                    entry = {
-                        "op": i * j,
-                        "dsc": "c" + str(c.index(i)) + "*mpk" + str(mpk.index(j)),
-                    }
-                    all_mpk_c.append(entry)
-
-            # c*gp
-
-            all_gp_c = []
-            for i in c:
-                for j in gp:
-                    entry = {
-                        "op": i * j,
-                        "dsc": "c" + str(c.index(i)) + "*gp" + str(gp.index(j)),
-                    }
-                    all_gp_c.append(entry)
-
-            # k*gp
-
-            all_gp_k = []
-            for i in k:
-                for j in gp:
-                    if self.corr_model != DecryptionKeyCorruptionModel.NoCorruption:
-                        entry = {
-                            "op": i * j,
-                            "dsc": "k" + str(k.index(i)) + "[i]" + "*gp" + str(gp.index(j)),
-                        }
-                    else:
-                        entry = {
-                            "op": i * j,
-                            "dsc": "k" + str(k.index(i)) + "*gp" + str(gp.index(j)),
-                        }                    
-                    all_gp_k.append(entry)
+            all_p = []
+            for (left, i, right, j, product) in gen_products(encodings, key, unknown):
+                # the key encodings are issued by the corrupted authority AA[i]
+                left_dsc = left + str(i) + ("[i]" if left == "k" and corrupted else "")
+                all_p.append({"op": product, "dsc": left_dsc + "*" + right + str(j)})
 
-            return all_k_c + all_k_mpk + all_mpk_c + all_gp_c + all_gp_k
+            return all_p
 
         def add_corruptable_var(self, origin: DecryptionKeyCorruptionModel, corr: sp.core.symbol.Symbol) -> None:
                 """
@@ -4,8 +4,6 @@ from common_methods import *
 from sympy import *
 from trivial_security_and_collusion import *
 
-init_printing(use_unicode=True)
-
 def FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown) -> str:
     """
     This is the main function that checks whether the FABEO property is satisfied.
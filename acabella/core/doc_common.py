@@ -20,8 +20,6 @@ and analysis implementations"""
 
 from sympy import *
 
-init_printing(use_unicode=True)
-
 def findsymb(f, g):
     """
     Adds the symbols occurring in f to g
@@ -22,8 +22,6 @@ from proof_verification import *
 from ac17_correctness_checks import *
 from encodings_helper import *
 
-init_printing(use_unicode=True)
-
 def generate_the_encodings_then_the_proofs(masterkey, special_s, benc, kenc_fixed, kenc_att, cenc_fixed, cenc_att, unknown, prefixes, nr_indexed_encodings):
     """
     This helper function can generate encodings automatically using the encodings_helper.
@@ -21,8 +21,6 @@ from proof_generation import *
 from proof_verification import * 
 from ac17_correctness_checks import *
 
-init_printing(use_unicode=True)
-
 
 def verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints):
     """
@@ -2,36 +2,95 @@
 
 from common_methods import *
 from sympy import *
+from functools import lru_cache
 
 from access_structures import *
 from decryption import DecryptionAttack
 
-init_printing(use_unicode=True)
-
 """encodings_helper.py: This module contains functions for generating
 general encodings utilized in the analysis methods of ACABELLA."""
 
+# placeholders of the attribute-dependent encodings
+ATT_MPK_GROUP = parse_expr("att_mpk_group")
+ATT_SCALAR = parse_expr("att_scalar")
+POLICY_SHARE = parse_expr("lambda_policy_share")
+
+class EncodingTemplate:
+    """
+    Attribute-dependent encodings compiled once for a list of prefixes,
+    so that every copy is instantiated by a single simultaneous
+    replacement of the placeholders, without parsing.
+
+    Attributes:
+        encodings (tuple): Encodings with placeholders.
+        indexed (list): Triples (prefix, index, placeholder) of the
+            indexed encodings that occur in the encodings.
+        has_policy_share (bool): The policy share occurs in the encodings.
+    """
+
+    def __init__(self, encodings: tuple, prefixes: tuple, nr_indexed_encodings: int) -> None:
+        self.encodings = encodings
+
+        free = set()
+        for enc in encodings:
+            free |= enc.free_symbols
+
+        self.indexed = []
+        for pref in prefixes:
+            for ix in range(nr_indexed_encodings):
+                i_e = get_indexed_encoding(pref, ix + 1)
+                if i_e in free:
+                    self.indexed.append((pref, ix + 1, i_e))
+        self.has_policy_share = POLICY_SHARE in free
+
+    def instantiate(self, att, key_nr: int, policy_share = None) -> list:
+        """
+        Instantiates the encodings for an attribute.
+
+        Parameters:
+            att (int): Attribute.
+            key_nr (int): Number of the key, 0 for the ciphertext.
+            policy_share (sp.core.list.Symbol): Share of the attribute,
+                substituted if not None.
+
+        Returns:
+            (list): Encodings of the attribute.
+        """
+        mapping = {ATT_MPK_GROUP: get_attribute_in_group(att),
+                   ATT_SCALAR: get_attribute_as_scalar(att)}
+
+        if policy_share is not None and self.has_policy_share:
+            mapping[POLICY_SHARE] = policy_share
+
+        for (pref, ix, i_e) in self.indexed:
+            mapping[i_e] = get_indexed_encoding_extra_index(pref, ix, att, key_nr)
+
+        return [entry.xreplace(mapping) for entry in self.encodings]
+
+@lru_cache(maxsize=None)
+def compile_encoding_template(encodings: tuple, prefixes: tuple, nr_indexed_encodings: int) -> EncodingTemplate:
+    """
+    Compiles attribute-dependent encodings, see EncodingTemplate. The
+    templates are cached, so each list of encodings is compiled once.
+
+    Parameters:
+        encodings (tuple): Encodings with placeholders.
+        prefixes (tuple): Prefixes of the indexed encodings.
+        nr_indexed_encodings (int): Number of indexed encodings per prefix.
+
+    Returns:
+        (EncodingTemplate): Compiled template.
+    """
+    return EncodingTemplate(encodings, prefixes, nr_indexed_encodings)
+
 def substitute_encodings(enc, special_s, index, att_range, prefixes, nr_indexed_encodings, key_nr):
-    att_mpk_group = parse_expr("att_mpk_group")
-    att_scalar = parse_expr("att_scalar")
-    policy_share = parse_expr("lambda_policy_share")
+    template = compile_encoding_template(tuple(enc), tuple(prefixes), nr_indexed_encodings)
 
-    substitutions = [(att_mpk_group, get_attribute_in_group(att_range[index])), 
-                     (att_scalar, get_attribute_as_scalar(att_range[index]))]
-    
+    policy_share = None
     if key_nr == 0:
-        substitutions.append((policy_share, get_i_of_n_policy_shares(index, len(att_range), special_s)))
-    
-    for pref in prefixes:
-        for ix in range(nr_indexed_encodings):
-            i_e = get_indexed_encoding(pref, ix + 1)
-            i_e_2 = get_indexed_encoding_extra_index(pref, ix + 1, att_range[index], key_nr)
-            substitutions.append((i_e, i_e_2))
-    
-    new_enc = []
-    for entry in enc:
-        new_enc.append(entry.subs(substitutions))
-    return new_enc
+        policy_share = get_i_of_n_policy_shares(index, len(att_range), special_s)
+
+    return template.instantiate(att_range[index], key_nr, policy_share)
 
  
 def create_b_encoding(gp, mpk, att_range):
@@ -65,12 +124,12 @@ def create_key_encoding(k_fixed, k_att, att_range, prefixes, nr_indexed_encoding
     Returns:
         (list): key encodings
     """ 
-    kenc = k_fixed
+    template = compile_encoding_template(tuple(k_att), tuple(prefixes), nr_indexed_encodings)
+
+    kenc = list(k_fixed)
     for ind2 in key_index_range:
-        for ind in range(len(att_range)):
-            no_s = parse_expr("no_s")
-            kenc += substitute_encodings(k_att, no_s, ind, att_range, 
-                                             prefixes, nr_indexed_encodings, ind2)
+        for att in att_range:
+            kenc += template.instantiate(att, ind2)
     return kenc
 
 
@@ -89,13 +148,51 @@ def create_ciphertext_encoding(c_fixed, c_att, special_s, att_range, prefixes, n
     Returns:
         (list): List of generated ciphertext encodings.
     """ 
-    cenc = c_fixed
+    template = compile_encoding_template(tuple(c_att), tuple(prefixes), nr_indexed_encodings)
+
+    # the shares of the AND-policy are computed once for all the attributes
+    shares = None
+    if template.has_policy_share:
+        shares = get_and_policy_shares(len(att_range), special_s)
+
+    cenc = list(c_fixed)
     for ind in range(len(att_range)):
-        cenc += substitute_encodings(c_att, special_s, ind, att_range, 
-                                         prefixes, nr_indexed_encodings, 0)
+        cenc += template.instantiate(att_range[ind], 0, shares[ind] if shares is not None else None)
     return cenc
    
 
+def create_ciphertext_encoding_for_policy(c_fixed, c_att, special_s, policy, prefixes, nr_indexed_encodings):
+    """
+    This function creates a ciphertext encoding for a monotone boolean
+    formula over the attributes, with one copy of c_att per row of the
+    LSSS matrix of the formula, see access_structures.policy_to_lsss.
+
+    Parameters:
+        c_fixed (list): List of fixed ciphertext encodings.
+        c_att (list): List of attribute-dependent ciphertext encodings.
+        special_s (list): Description of s.
+        policy (PolicyNode or str): Formula, parsed with parse_policy if a string.
+        prefixes (list): Prefixes to se.
+        nr_indexed_encodings (list): Indexed encodings.
+    Returns:
+        (list): List of generated ciphertext encodings.
+    """
+    if isinstance(policy, str):
+        policy = parse_policy(policy)
+
+    lsss = policy_to_lsss(policy)
+    if len(set(lsss.labels)) != len(lsss.labels):
+        raise ValueError("create_ciphertext_encoding_for_policy: every attribute must occur once in the policy")
+
+    template = compile_encoding_template(tuple(c_att), tuple(prefixes), nr_indexed_encodings)
+    shares = lsss.shares(special_s) if template.has_policy_share else None
+
+    cenc = list(c_fixed)
+    for (ind, att) in enumerate(lsss.labels):
+        cenc += template.instantiate(att, 0, shares[ind] if shares is not None else None)
+    return cenc
+
+
 def generate_unknown_variable_set(kenc, cenc, benc, att_range_ct, att_range_key):
     """
     Returns all unknown variables by determining all the variables in the 
@@ -110,25 +207,14 @@ def generate_unknown_variable_set(kenc, cenc, benc, att_range_ct, att_range_key)
     Returns:
         (list): List of generated unknown variables.
     """ 
-    all_vars = EmptySet
-    
+    all_vars = set()
     for enc in benc + cenc + kenc:
-        all_vars = Union(all_vars, enc.free_symbols)
-        
-    knowns = EmptySet
-    for ind in att_range_ct + att_range_key:
-        knowns = Union(knowns, {get_attribute_as_scalar(ind)})
-    
-    unknown = []
-    for el in all_vars:
-        contains = False
-        for elp in knowns:
-            if el == elp:
-                contains = True
-        if not contains:
-            unknown.append(el)
-            
-    return unknown
+        all_vars |= enc.free_symbols
+
+    knowns = {get_attribute_as_scalar(ind) for ind in att_range_ct + att_range_key}
+
+    # in the canonical order of the sympy sets
+    return [el for el in ordered(all_vars) if not el in knowns]
 
 # first try at taking into account declared unknown variables
 def generate_unknown_variable_set_new(known, kenc, cenc, benc, att_range_ct, att_range_key):
@@ -145,27 +231,14 @@ def generate_unknown_variable_set_new(known, kenc, cenc, benc, att_range_ct, att
     Returns:
         (list): List of generated unknown variables.
     """ 
-    all_vars = EmptySet
-    
+    all_vars = set()
     for enc in benc + cenc + kenc:
-        all_vars = Union(all_vars, enc.free_symbols)
-        
-    knowns = EmptySet
-    for elem in known:
-        knowns = Union(knowns, {elem})
-    for ind in att_range_ct + att_range_key:
-        knowns = Union(knowns, {get_attribute_as_scalar(ind)})
-    
-    unknown = []
-    for el in all_vars:
-        contains = False
-        for elp in knowns:
-            if str(el)[:len(str(elp))] == str(elp):
-                contains = True
-        if not contains:
-            unknown.append(el)
-            
-    return unknown
+        all_vars |= enc.free_symbols
+
+    knowns = set(known) | {get_attribute_as_scalar(ind) for ind in att_range_ct + att_range_key}
+    prefixes = tuple({str(elp) for elp in knowns})
+
+    return [el for el in ordered(all_vars) if not str(el).startswith(prefixes)]
 
 # first try at taking into account declared unknown variables
 def generate_known_variable_set(unknown, kenc, cenc, benc):
@@ -180,15 +253,9 @@ def generate_known_variable_set(unknown, kenc, cenc, benc):
     Returns:
         (list): List of generated known variables.
     """ 
-    all_vars = EmptySet
-    
+    all_vars = set()
     for enc in benc + cenc + kenc:
-        all_vars = Union(all_vars, enc.free_symbols)
-    
-    all_vars = list(all_vars)
-    
-    knowns = []
-    for var in all_vars:
-        if not var in unknown:
-            knowns.append(var)
-    return knowns
+        all_vars |= enc.free_symbols
+
+    unknown = set(unknown)
+    return [var for var in ordered(all_vars) if not var in unknown]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""events.py: Typed progress events yielded by AnalysisWithCorruption.stream
+as the stages of the analysis finish, from the cheap screens of the
+security analysis to the attacks and the security proofs"""
+
+from dataclasses import dataclass
+from typing import ClassVar
+
+@dataclass(slots=True)
+class StageStarted:
+    """
+    A stage of the analysis has started.
+
+    Attributes:
+        kind (str): "security", "master_key" or "decryption".
+        stage (str): Name of the stage, e.g. "attack" or "proofs".
+        elapsed (float): Seconds since the analysis started.
+    """
+    event: ClassVar[str] = "stage_started"
+
+    kind: str
+    stage: str
+    elapsed: float
+
+    def render(self) -> str:
+        """
+        Returns:
+            (str): The event as presented to the user.
+        """
+        return "[*] {}: {} started ({:.2f} s)".format(self.kind, self.stage, self.elapsed)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the event.
+        """
+        return {"event": self.event, "kind": self.kind, "stage": self.stage, "elapsed": self.elapsed}
+
+@dataclass(slots=True)
+class PartialVerdict:
+    """
+    Outcome of a stage of the analysis. The outcome of a screen is
+    provisional (e.g. "trivially secure" may still become "secure");
+    the final outcome of an analysis is its verdict, as in
+    AnalysisWithCorruption.verdict.
+
+    Attributes:
+        kind (str): "security", "master_key" or "decryption".
+        stage (str): Name of the stage, e.g. "fractional_check".
+        verdict (str): Outcome of the stage.
+        final (bool): The outcome is the verdict of the analysis.
+        elapsed (float): Seconds since the analysis started.
+    """
+    event: ClassVar[str] = "verdict"
+
+    kind: str
+    stage: str
+    verdict: str
+    final: bool
+    elapsed: float
+
+    def render(self) -> str:
+        """
+        Returns:
+            (str): The event as presented to the user.
+        """
+        return "[*] {}: {} -> {}{} ({:.2f} s)".format(self.kind, self.stage, self.verdict, "" if self.final else " (preliminary)", self.elapsed)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the event.
+        """
+        return {"event": self.event, "kind": self.kind, "stage": self.stage, "verdict": self.verdict,
+                "final": self.final, "elapsed": self.elapsed}
+
+@dataclass(slots=True)
+class AnalysisFinished:
+    """
+    Every stage of the analysis has finished.
+
+    Attributes:
+        verdict (dict): Verdict of the analysis, see AnalysisWithCorruption.verdict.
+        elapsed (float): Seconds since the analysis started.
+    """
+    event: ClassVar[str] = "finished"
+
+    verdict: dict
+    elapsed: float
+
+    def render(self) -> str:
+        """
+        Returns:
+            (str): The event as presented to the user.
+        """
+        return "[*] Analysis finished ({:.2f} s)".format(self.elapsed)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the event.
+        """
+        return {"event": self.event, "verdict": self.verdict, "elapsed": self.elapsed}
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""expression_parser.py: Parser of the expressions of the ACABELLA JSON
+format, which builds the SymPy expressions without going through the
+tokenizer and eval of parse_expr"""
+
+import builtins
+import keyword
+import re
+import types
+
+from sympy import Add, Basic, Integer, parse_expr
+
+from interned import SymbolTable
+
+# tokens of the grammar: integers, names and operators
+TOKEN = re.compile(r"\s*(?:(\d+)|([A-Za-z_]\w*)|(\*\*|[-+*/()]))")
+
+def reserved_names() -> set:
+    """
+    Returns the names that parse_expr does not read as symbols, i.e. the
+    Python keywords and the SymPy objects, classes and functions of its
+    default namespace (E, I, pi, gamma, ...).
+
+    Returns:
+        (set): Names.
+    """
+    namespace = {}
+    exec("from sympy import *", namespace)
+    names = {name for (name, obj) in namespace.items() if isinstance(obj, (Basic, type)) or callable(obj)}
+    names |= {name for (name, obj) in vars(builtins).items() if isinstance(obj, types.BuiltinFunctionType)}
+
+    return names | set(keyword.kwlist)
+
+RESERVED_NAMES = reserved_names()
+
+class UnsupportedExpression(Exception):
+    """
+    Raised when an expression is outside the grammar of the parser,
+    which then falls back to parse_expr.
+    """
+    pass
+
+class ExpressionParser:
+    """
+    Recursive descent parser for the expressions of the ACABELLA JSON
+    format:
+
+        expr   := term (("+" | "-") term)*
+        term   := factor (("*" | "/") factor)*
+        factor := ("+" | "-") factor | power
+        power  := atom ("**" factor)?
+        atom   := integer | name | "(" expr ")"
+
+    The operators have the precedence and associativity of Python, so
+    the expressions are equal to the ones of parse_expr. The names are
+    turned into symbols by the SymbolTable, so a name parsed on its own
+    is the same symbol object in every section. Inside sums and
+    products, SymPy's cache may hand back an equal symbol created
+    earlier, so those symbols are equal but not always identical to the
+    ones of the table. Anything else, e.g.
+    floats, function calls or names of SymPy objects, is handed over
+    to parse_expr.
+
+    Attributes:
+        table (SymbolTable): Symbol table shared by the parsed expressions.
+        parsed (dict): Memoized expression of every parsed string.
+        tokens (list): Tokens of the expression being parsed.
+        pos (int): Position of the next token.
+    """
+
+    def __init__(self) -> None:
+        self.table = SymbolTable()
+        self.parsed = {}
+        self.tokens = []
+        self.pos = 0
+
+    def init(self, table: SymbolTable) -> None:
+        """
+        Initializes the parser.
+
+        Parameters:
+            table (SymbolTable): Symbol table shared by the parsed expressions.
+        """
+        self.table = table
+        self.parsed = {}
+
+    def tokenize(self, data: str) -> list:
+        """
+        Splits an expression into (kind, text) tokens, the kind being
+        "int", "name" or "op".
+
+        Parameters:
+            data (str): Expression.
+
+        Returns:
+            (list): Tokens.
+        """
+        tokens = []
+        pos = 0
+        end = len(data.rstrip())
+        while pos < end:
+            match = TOKEN.match(data, pos)
+            if match is None:
+                raise UnsupportedExpression(data)
+            (integer, name, op) = match.groups()
+            if integer is not None:
+                tokens.append(("int", integer))
+            elif name is not None:
+                if name in RESERVED_NAMES:
+                    raise UnsupportedExpression(data)
+                tokens.append(("name", name))
+            else:
+                tokens.append(("op", op))
+            pos = match.end()
+
+        return tokens
+
+    def parse(self, data: str):
+        """
+        Parses an expression. The sections of a configuration repeat
+        many expressions, which are only parsed once.
+
+        Parameters:
+            data (str): Expression.
+
+        Returns:
+            (sp.core.expr.Expr): SymPy expression.
+        """
+        if not isinstance(data, str):
+            return parse_expr(data)
+
+        expr = self.parsed.get(data)
+        if expr is not None:
+            return expr
+
+        try:
+            self.tokens = self.tokenize(data)
+            self.pos = 0
+            expr = self.parse_expr()
+            if self.pos != len(self.tokens):
+                raise UnsupportedExpression(data)
+        except UnsupportedExpression:
+            expr = parse_expr(data)
+
+        self.parsed[data] = expr
+        return expr
+
+    def peek(self) -> tuple:
+        """
+        Returns:
+            (tuple): Next token, (None, None) at the end.
+        """
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def expect(self, op: str) -> None:
+        """
+        Consumes the operator op.
+
+        Parameters:
+            op (str): Expected operator.
+        """
+        if self.peek() != ("op", op):
+            raise UnsupportedExpression(op)
+        self.pos += 1
+
+    def parse_expr(self):
+        """
+        Parses the expr rule of the grammar.
+        """
+        terms = [self.parse_term()]
+        while self.peek() in [("op", "+"), ("op", "-")]:
+            (kind, op) = self.tokens[self.pos]
+            self.pos += 1
+            term = self.parse_term()
+            terms.append(term if op == "+" else -term)
+
+        # a single Add instead of one per operator, which is quadratic
+        return terms[0] if len(terms) == 1 else Add(*terms)
+
+    def parse_term(self):
+        """
+        Parses the term rule of the grammar.
+        """
+        expr = self.parse_factor()
+        while self.peek() in [("op", "*"), ("op", "/")]:
+            (kind, op) = self.tokens[self.pos]
+            self.pos += 1
+            factor = self.parse_factor()
+            expr = expr * factor if op == "*" else expr / factor
+        return expr
+
+    def parse_factor(self):
+        """
+        Parses the factor rule of the grammar.
+        """
+        if self.peek() == ("op", "-"):
+            self.pos += 1
+            return -self.parse_factor()
+        if self.peek() == ("op", "+"):
+            self.pos += 1
+            return +self.parse_factor()
+        return self.parse_power()
+
+    def parse_power(self):
+        """
+        Parses the power rule of the grammar.
+        """
+        base = self.parse_atom()
+        if self.peek() == ("op", "**"):
+            self.pos += 1
+            return base ** self.parse_factor()
+        return base
+
+    def parse_atom(self):
+        """
+        Parses the atom rule of the grammar.
+        """
+        (kind, text) = self.peek()
+        self.pos += 1
+        match kind:
+            case "int":
+                return Integer(int(text))
+            case "name":
+                # a function call
+                if self.peek() == ("op", "("):
+                    raise UnsupportedExpression(text)
+                return self.table.symbol(text)
+            case "op" if text == "(":
+                expr = self.parse_expr()
+                self.expect(")")
+                return expr
+            case _:
+                raise UnsupportedExpression(text)
@@ -22,11 +22,11 @@ translation of ACABELLA inputs to the ABGW format.
 from common_methods import *
 from sympy import *
 
-init_printing(use_unicode=True)
-
 
 from sympy.printing import ccode
+import io
 import re
+import sys
 CPOW = re.compile(r'pow\((?P<var>[A-Za-z_]\w*)\s*,\s*2\s*\)')
 
 def to_c_code(expr):
@@ -48,10 +48,10 @@ def to_c_code(expr):
     return code
 
 # generates an abgw input
-def generate_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known):
+def write_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known, stream):
     """
-    This function generates a valid ABGW input given a description of
-    the ABE scheme.
+    This function writes a valid ABGW input given a description of
+    the ABE scheme to a stream.
 
     Parameters:
         blindingvalue (sp.core.list.Symbol): Blinding value, by default a*s.
@@ -60,8 +60,13 @@ def generate_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known):
         benc (list): List of b encodings
         unknown (unknown): List of unknown values
         known (known): List of known values
-    """   
-    penc = gen_all_p(kenc, cenc, [], [])
+        stream: Text stream, e.g. sys.stdout or an io.StringIO.
+    """
+    # only the products that may occur in a combination equal to the
+    # blinding value, all of them if none can (ABGW then finds no attack)
+    penc = gen_all_p(kenc, cenc, [], [], blindingvalue, unknown)
+    if len(penc) == 0:
+        penc = gen_all_p(kenc, cenc, [], [])
     penc = canonical(penc)
     penc = [to_c_code(i) for i in penc]
 
@@ -75,41 +80,60 @@ def generate_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known):
             coef += "c" + str(ctr2 + 1) + ","
         else:
             coef += "c" + str(ctr2 + 1) + " in Zp."
-    print("\nparams " + coef)
+    stream.write("\nparams " + coef + "\n")
 
     ## vars
 
-    print("vars ", end="")
+    stream.write("vars ")
     for elem in unknown:
         if elem != unknown[-1]:
-            print(str(elem) + ",", end="")
+            stream.write(str(elem) + ",")
         else:
-            print(str(elem) + " in Zp.\n", end="")
+            stream.write(str(elem) + " in Zp.\n")
 
     if not known:
-        print("\n")
+        stream.write("\n\n")
 
     ## extra params
     
     if known:
-        print("params ", end="")
+        stream.write("params ")
         for elem in known:
             if elem != known[-1]:
-                print(str(elem) + ",", end="")
+                stream.write(str(elem) + ",")
             else:
-                print(str(elem) + " in Zp.\n", end="")
-        print("\n")
+                stream.write(str(elem) + " in Zp.\n")
+        stream.write("\n\n")
 
     # prepare constraints
 
     ctr = 1
     for en in penc:
         if en != penc[-1]:
-            print("c" + str(ctr) + "*(" + str(en) + ")" + " +")
+            stream.write("c" + str(ctr) + "*(" + str(en) + ")" + " +\n")
         else:
-            print("c" + str(ctr) + "*(" + str(en) + ")" + "")
-            print("= a * s.\n\ngo.\n")    
+            stream.write("c" + str(ctr) + "*(" + str(en) + ")" + "\n")
+            stream.write("= a * s.\n\ngo.\n\n")
         ctr += 1
+
+def generate_abgw_input_str(blindingvalue, kenc, cenc, benc, unknown, known) -> str:
+    """
+    This function returns a valid ABGW input given a description of
+    the ABE scheme, see write_abgw_input.
+
+    Returns:
+        (str): The ABGW input.
+    """
+    stream = io.StringIO()
+    write_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known, stream)
+    return stream.getvalue()
+
+def generate_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known):
+    """
+    This function prints a valid ABGW input given a description of
+    the ABE scheme, see write_abgw_input.
+    """
+    write_abgw_input(blindingvalue, kenc, cenc, benc, unknown, known, sys.stdout)
     
 if __name__ == "__main__":
 
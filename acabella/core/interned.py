@@ -0,0 +1,399 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""interned.py: Interned, integer-indexed representation of the
+encodings, with converters from and to SymPy expressions"""
+
+from fractions import Fraction
+
+from sympy import *
+
+class Encoding:
+    """
+    Sparse polynomial in the atoms of a SymbolTable. The monomials are
+    tuples of (ID, exponent) pairs sorted by ID, stored in an array
+    parallel to the array of their rational coefficients.
+
+    Attributes:
+        monos (list): Monomials.
+        coeffs (list): Coefficient of every monomial.
+    """
+
+    __slots__ = ("monos", "coeffs")
+
+    def __init__(self, monos: list = None, coeffs: list = None) -> None:
+        self.monos = monos if monos is not None else []
+        self.coeffs = coeffs if coeffs is not None else []
+
+    @classmethod
+    def from_terms(cls, terms: dict) -> "Encoding":
+        """
+        Builds an encoding from a map of monomials to coefficients,
+        dropping the zero coefficients.
+
+        Parameters:
+            terms (dict): Coefficient of every monomial.
+
+        Returns:
+            (Encoding): Encoding with the monomials in the order of terms.
+        """
+        enc = cls()
+        for (mono, coeff) in terms.items():
+            if coeff != 0:
+                enc.monos.append(mono)
+                enc.coeffs.append(coeff)
+        return enc
+
+    def __len__(self) -> int:
+        return len(self.monos)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Encoding) and dict(zip(self.monos, self.coeffs)) == dict(zip(other.monos, other.coeffs))
+
+    def __hash__(self) -> int:
+        return hash(frozenset(zip(self.monos, self.coeffs)))
+
+    def __mul__(self, other: "Encoding") -> "Encoding":
+        terms = {}
+        for (mono1, coeff1) in zip(self.monos, self.coeffs):
+            for (mono2, coeff2) in zip(other.monos, other.coeffs):
+                mono = multiply_monomials(mono1, mono2)
+                terms[mono] = terms.get(mono, 0) + coeff1 * coeff2
+        return Encoding.from_terms(terms)
+
+    def is_zero(self) -> bool:
+        """
+        Returns:
+            (bool): The encoding has no monomials.
+        """
+        return len(self.monos) == 0
+
+    def atoms(self) -> set:
+        """
+        Returns:
+            (set): IDs of the atoms occurring in the encoding.
+        """
+        return {atom for mono in self.monos for (atom, exp) in mono}
+
+def multiply_monomials(mono1: tuple, mono2: tuple) -> tuple:
+    """
+    Multiplies two monomials by merging their sorted (ID, exponent) pairs.
+
+    Parameters:
+        mono1 (tuple): First monomial.
+        mono2 (tuple): Second monomial.
+
+    Returns:
+        (tuple): Product of the monomials.
+    """
+    exps = dict(mono1)
+    for (atom, exp) in mono2:
+        exps[atom] = exps.get(atom, 0) + exp
+    return tuple(sorted((atom, exp) for (atom, exp) in exps.items() if exp != 0))
+
+def split_mono(mono: tuple, mask: int) -> tuple:
+    """
+    Splits a monomial into its known and its unknown part.
+
+    Parameters:
+        mono (tuple): Monomial.
+        mask (int): Bitmask of the IDs of the unknown atoms.
+
+    Returns:
+        (tuple): Known part of the monomial.
+        (tuple): Unknown part of the monomial.
+    """
+    known = tuple(pair for pair in mono if not (mask >> pair[0]) & 1)
+    unknown = tuple(pair for pair in mono if (mask >> pair[0]) & 1)
+    return (known, unknown)
+
+class SymbolTable:
+    """
+    Interns the atoms of the encodings as small integer IDs. The atoms
+    are the bases of the factors of the monomials: the symbols, and the
+    expressions that are not polynomial in them, e.g. b1 + x3 in
+    1/(b1 + x3). Numbers other than rationals are atoms as well.
+
+    Attributes:
+        atoms (list): Atom of every ID.
+        ids (dict): ID of every atom.
+        encodings (dict): Memoized encodings of the converted expressions.
+        monomials (dict): Memoized expressions of the converted monomials.
+        symbols (dict): Symbol of every name read by the ExpressionParser.
+    """
+
+    __slots__ = ("atoms", "ids", "encodings", "monomials", "symbols")
+
+    def __init__(self) -> None:
+        self.atoms = []
+        self.ids = {}
+        self.encodings = {}
+        self.monomials = {}
+        self.symbols = {}
+
+    def symbol(self, name: str) -> Symbol:
+        """
+        Returns the symbol of a name, the same object for every call.
+
+        Parameters:
+            name (str): Name of the symbol.
+
+        Returns:
+            (sp.core.symbol.Symbol): Symbol.
+        """
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            symbol = Symbol(name)
+            self.symbols[name] = symbol
+        return symbol
+
+    def intern(self, atom) -> int:
+        """
+        Returns the ID of an atom, assigning the next free ID to new atoms.
+
+        Parameters:
+            atom (sp.core.symbol.Symbol): Atom.
+
+        Returns:
+            (int): ID of the atom.
+        """
+        ind = self.ids.get(atom)
+        if ind is None:
+            ind = len(self.atoms)
+            self.ids[atom] = ind
+            self.atoms.append(atom)
+        return ind
+
+    def intern_symbols(self, exprs: list) -> None:
+        """
+        Interns the symbols of the expressions, in order of occurrence.
+
+        Parameters:
+            exprs (list): SymPy expressions.
+        """
+        for expr in exprs:
+            for symbol in sorted(sympify(expr).free_symbols, key=str):
+                self.intern(symbol)
+
+    def mask(self, unknown: list) -> int:
+        """
+        Bitmask of the IDs of the atoms that contain an unknown variable.
+        The mask covers the atoms interned so far.
+
+        Parameters:
+            unknown (list): Unknown variables.
+
+        Returns:
+            (int): Bitmask.
+        """
+        unknown = set(unknown)
+        mask = 0
+        for (ind, atom) in enumerate(self.atoms):
+            if atom in unknown or atom.free_symbols & unknown:
+                mask |= 1 << ind
+        return mask
+
+    def encode(self, expr) -> Encoding:
+        """
+        Converts a SymPy expression into an encoding. The expression is
+        not expanded: a factor that is not a power of a symbol with a
+        rational exponent becomes an atom.
+
+        Parameters:
+            expr (sp.core.symbol.Symbol): Expression.
+
+        Returns:
+            (Encoding): Encoding of the expression.
+        """
+        enc = self.encodings.get(expr)
+        if enc is not None:
+            return enc
+
+        terms = {}
+        for term in Add.make_args(expr):
+            coeff = Fraction(1)
+            exps = {}
+            for factor in Mul.make_args(term):
+                if factor.is_Rational:
+                    coeff *= Fraction(int(factor.p), int(factor.q))
+                    continue
+                (base, exp) = factor.as_base_exp()
+                if exp.is_Rational:
+                    exp = int(exp) if exp.is_Integer else Fraction(int(exp.p), int(exp.q))
+                else:
+                    (base, exp) = (factor, 1)
+                atom = self.intern(base)
+                exps[atom] = exps.get(atom, 0) + exp
+            mono = tuple(sorted(exps.items()))
+            terms[mono] = terms.get(mono, 0) + coeff
+
+        enc = Encoding.from_terms(terms)
+        self.encodings[expr] = enc
+        return enc
+
+    def monomial(self, mono: tuple):
+        """
+        Converts a monomial into a SymPy expression.
+
+        Parameters:
+            mono (tuple): Monomial.
+
+        Returns:
+            (sp.core.symbol.Symbol): Product of the atoms, 1 if empty.
+        """
+        expr = self.monomials.get(mono)
+        if expr is None:
+            expr = Mul(*[self.atoms[atom]**Rational(exp) for (atom, exp) in mono]) if mono else 1
+            self.monomials[mono] = expr
+        return expr
+
+    def term(self, coeff, mono: tuple):
+        """
+        Converts a term into a SymPy expression.
+
+        Parameters:
+            coeff (Fraction): Coefficient.
+            mono (tuple): Monomial.
+
+        Returns:
+            (sp.core.symbol.Symbol): Product of the coefficient and the
+                atoms, 1 if both are empty.
+        """
+        if coeff == 1:
+            return self.monomial(mono)
+        return Mul(Rational(coeff.numerator, coeff.denominator), self.monomial(mono))
+
+    def decode(self, enc: Encoding):
+        """
+        Converts an encoding into a SymPy expression.
+
+        Parameters:
+            enc (Encoding): Encoding.
+
+        Returns:
+            (sp.core.symbol.Symbol): Expression.
+        """
+        return Add(*[self.term(Fraction(coeff), mono) for (mono, coeff) in zip(enc.monos, enc.coeffs)])
+
+def index_monomials(uvector: list, table: SymbolTable) -> dict:
+    """
+    Indexes a vector of unknown monomials, given as SymPy expressions,
+    by their interned monomials.
+
+    Parameters:
+        uvector (list): Vector of unknown monomials.
+        table (SymbolTable): Symbol table.
+
+    Returns:
+        (dict): Position in uvector of every interned monomial.
+    """
+    uindex = {}
+    for (c, u) in enumerate(uvector):
+        enc = table.encode(sympify(u))
+        if len(enc.monos) == 1 and enc.coeffs[0] == 1:
+            uindex.setdefault(enc.monos[0], c)
+    return uindex
+
+def decompose_polynomial(enc: Encoding, table: SymbolTable, mask: int, uvector: list, uindex: dict) -> list:
+    """
+    Writes an interned encoding as the vector of the known parts of its
+    monomials, one for every entry of uvector. The unknown monomials
+    that are not in uvector yet are appended to uvector and uindex in
+    the order in which they occur.
+
+    Parameters:
+        enc (Encoding): Encoding, None for a python int.
+        table (SymbolTable): Symbol table.
+        mask (int): Bitmask of the IDs of the unknown atoms.
+        uvector (list): Vector of the unknown monomials.
+        uindex (dict): Position in uvector of every interned monomial.
+
+    Returns:
+        (list): Vector of the known parts.
+    """
+    kvector = [0 for x in uvector]
+    if enc is None:
+        return kvector
+
+    terms = zip(enc.monos, enc.coeffs)
+    # as in addcomptodecomp, zero is a monomial of its own
+    if enc.is_zero():
+        terms = [((), Fraction(0))]
+    for (mono, coeff) in terms:
+        (kmono, umono) = split_mono(mono, mask)
+        kmul = table.term(Fraction(coeff), kmono) if coeff != 0 else Integer(0)
+        c = uindex.get(umono)
+        if c is None:
+            uindex[umono] = len(uvector)
+            uvector.append(table.monomial(umono))
+            kvector.append(kmul)
+        else:
+            kvector[c] = Add(kvector[c], kmul)
+    return kvector
+
+def denominators(encodings: list, table: SymbolTable, unknown: list) -> list:
+    """
+    Collects the atoms that occur with exponent -1 in the encodings and
+    contain an unknown variable.
+
+    Parameters:
+        encodings (list): SymPy expressions, or python ints.
+        table (SymbolTable): Symbol table.
+        unknown (list): Unknown variables.
+
+    Returns:
+        (list): Denominators, in order of occurrence.
+    """
+    interned = [table.encode(poly) for poly in encodings if type(poly) != int]
+    mask = table.mask(unknown)
+
+    denoms = []
+    seen = set()
+    for enc in interned:
+        for mono in enc.monos:
+            for (atom, exp) in mono:
+                if exp == -1 and (mask >> atom) & 1 and atom not in seen:
+                    seen.add(atom)
+                    denoms.append(table.atoms[atom])
+    return denoms
+
+def decompose_encodings(encodings: list, table: SymbolTable, unknown: list) -> tuple:
+    """
+    Same as common_methods.writeencodingasprod, on interned encodings:
+    the monomials are split and indexed as tuples of IDs, and only the
+    entries of the result are converted to SymPy.
+
+    Parameters:
+        encodings (list): SymPy expressions, or python ints.
+        table (SymbolTable): Symbol table.
+        unknown (list): Unknown variables.
+
+    Returns:
+        (list): Matrix of the known parts.
+        (list): Vector of the unknown monomials.
+    """
+    interned = [None if type(poly) == int else table.encode(poly) for poly in encodings]
+    mask = table.mask(unknown)
+
+    uvector = []
+    uindex = {}
+    mat = [decompose_polynomial(enc, table, mask, uvector, uindex) for enc in interned]
+
+    for kvector in mat:
+        kvector.extend(0 for x in range(len(uvector) - len(kvector)))
+
+    return (mat, uvector)
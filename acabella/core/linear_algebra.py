@@ -0,0 +1,650 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""linear_algebra.py: Linear-algebra backends utilized for computing the
+kernels of the attack and proof matrices, and the randomized modular
+screening of their ranks"""
+
+import random
+from enum import Enum
+
+from sympy import *
+from sympy.polys.matrices import DomainMatrix
+
+from budget import checkpoint
+from tracing import span, traced
+
+class LinearAlgebraEngine(Enum):
+    """
+    Backends available for computing nullspaces.
+
+    Attributes:
+        dense (int): SymPy dense `Matrix.nullspace()`.
+        sparse (int): Dict-of-keys `DomainMatrix` over QQ or QQ(known variables).
+        fraction_free (int): Fraction-free (Bareiss) elimination over ZZ[known variables].
+    """
+    dense = 1
+    sparse = 2
+    fraction_free = 3
+
+def nullspace_sparse(mat) -> list:
+    """
+    Computes the nullspace of mat using a sparse DomainMatrix. The
+    entries of mat are converted once into the smallest field that
+    contains them, i.e. QQ or the fraction field over the known
+    variables, and only the non-zero entries are stored.
+
+    The basis is computed from the reduced row echelon form, hence it
+    is equal to the basis returned by `Matrix.nullspace()`.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+
+    Returns:
+        (list): Column vectors (Matrix) that form a basis of the nullspace.
+    """
+    (nr_rows, nr_cols) = shape(mat)
+
+    if nr_rows == 0 or nr_cols == 0:
+        return Matrix(mat).nullspace()
+
+    elems = {}
+    for (i, j), val in mat.todok().items():
+        if val != 0:
+            elems.setdefault(i, {})[j] = val
+
+    if not elems:
+        return Matrix(mat).nullspace()
+
+    dm = DomainMatrix.from_dict_sympy(nr_rows, nr_cols, elems).to_sparse().to_field()
+    ns = dm.nullspace().to_Matrix()
+
+    return [ns.row(i).transpose() for i in range(shape(ns)[0])]
+
+def polynomial_rows(mat) -> tuple:
+    """
+    Converts mat into rows of polynomials with integer coefficients in
+    the known variables. Every row is multiplied by the least common
+    multiple of the denominators of its entries, which does not change
+    the nullspace.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+
+    Returns:
+        (tuple): Fraction field K of the entries, its polynomial ring R
+            and the rows (lists of elements of R), or None if the entries
+            are not rational functions with rational coefficients.
+    """
+    (nr_rows, nr_cols) = shape(mat)
+    (K, elems) = construct_domain(list(mat), field=True)
+
+    if not (K.is_QQ or K.is_FractionField):
+        return None
+
+    R = K.get_ring()
+    rows = []
+
+    for i in range(nr_rows):
+        row = elems[i * nr_cols:(i + 1) * nr_cols]
+        den = R.one
+        for elem in row:
+            den = R.lcm(den, K.denom(elem))
+        rows.append([K.numer(elem) * R.exquo(den, K.denom(elem)) for elem in row])
+
+    return (K, R, rows)
+
+def bareiss_rref(rows: list, R) -> tuple:
+    """
+    Fraction-free Gauss-Jordan elimination (Bareiss). Every update
+    p * a_ij - a_ik * a_kj is divided exactly by the previous pivot, so
+    that every entry stays a minor of the input matrix: the entries
+    remain polynomials whose size is bounded by the size of the minors,
+    instead of the nested fractions produced by the elimination over
+    the fraction field.
+
+    On return, every pivot entry is equal to the last pivot d and the
+    matrix divided by d is the reduced row echelon form of the input.
+
+    Parameters:
+        rows (list): Rows (lists of elements of R), modified in place.
+        R (Domain): Polynomial ring (or ZZ) of the entries.
+
+    Returns:
+        (list): Indices of the pivot columns.
+        (element of R): Last pivot d.
+    """
+    prev = R.one
+    pivots = []
+    nr_cols = len(rows[0]) if rows else 0
+
+    for col in range(nr_cols):
+        checkpoint()
+        rank = len(pivots)
+        pivot = next((i for i in range(rank, len(rows)) if rows[i][col]), None)
+        if pivot is None:
+            continue
+
+        (rows[rank], rows[pivot]) = (rows[pivot], rows[rank])
+        pivot_row = rows[rank]
+        p = pivot_row[col]
+
+        for i in range(len(rows)):
+            if i == rank:
+                continue
+            a = rows[i][col]
+            if a:
+                rows[i] = [R.exquo(p * v - a * w, prev) for v, w in zip(rows[i], pivot_row)]
+            elif p != prev:
+                rows[i] = [R.exquo(p * v, prev) for v in rows[i]]
+
+        prev = p
+        pivots.append(col)
+
+    return (pivots, prev)
+
+def kernel_fraction_free(mat):
+    """
+    Computes a basis of the nullspace of mat with bareiss_rref. The
+    vector of the free column f has the entry d at f and -a_rf at the
+    pivot column of every row r, where a is the eliminated matrix; the
+    content shared by these entries and d is removed. Divided by its
+    denominator, every vector is equal to the vector returned by
+    `Matrix.nullspace()`.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+
+    Returns:
+        (tuple): Fraction field K of the entries, its polynomial ring R
+            and the basis as (numerators, denominator) pairs of elements
+            of R, or None if the entries are not rational functions.
+    """
+    converted = polynomial_rows(mat)
+    if converted is None:
+        return None
+
+    (K, R, rows) = converted
+
+    # a specialization never increases the rank, hence full rank modulo
+    # a prime proves that the nullspace is trivial without eliminating
+    ranks = screen_ranks(mat, [])
+    if ranks is not None and ranks[0] == shape(mat)[1]:
+        return (K, R, [])
+
+    (pivots, d) = bareiss_rref(rows, R)
+
+    basis = []
+    for free in range(shape(mat)[1]):
+        if free in pivots:
+            continue
+
+        nums = [R.zero] * shape(mat)[1]
+        nums[free] = d
+        for (r, col) in enumerate(pivots):
+            nums[col] = -rows[r][free]
+
+        content = d
+        for num in nums:
+            if num:
+                content = R.gcd(content, num)
+        if K.is_QQ and content < 0:
+            content = -content
+
+        basis.append(([R.exquo(num, content) for num in nums], R.exquo(d, content)))
+
+    return (K, R, basis)
+
+def nullspace_fraction_free(mat) -> list:
+    """
+    Computes the nullspace of mat by fraction-free elimination over the
+    polynomials in the known variables, see bareiss_rref. Every vector
+    of the basis is returned as polynomial numerators with a single
+    common denominator.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+
+    Returns:
+        (list): (numerators (Matrix), denominator) pairs, one for every
+            vector of the basis.
+    """
+    (nr_rows, nr_cols) = shape(mat)
+    kernel = kernel_fraction_free(mat) if nr_rows and nr_cols else None
+
+    if kernel is None:
+        return [(vec, Integer(1)) for vec in Matrix(mat).nullspace()]
+
+    (K, R, basis) = kernel
+
+    return [(Matrix([R.to_sympy(num) for num in nums]), R.to_sympy(den)) for (nums, den) in basis]
+
+def compute_nullspace(mat, engine: LinearAlgebraEngine = LinearAlgebraEngine.dense) -> list:
+    """
+    Computes the nullspace of mat with the selected engine. The entries
+    of the vectors computed by the fraction_free engine are rational
+    functions in lowest terms, i.e. `cancel` leaves them unchanged.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        engine (LinearAlgebraEngine): Backend to utilize.
+
+    Returns:
+        (list): Column vectors (Matrix) that form a basis of the nullspace.
+    """
+    with span("nullspace", rows=shape(mat)[0], cols=shape(mat)[1], engine=engine.name) as stage:
+        match engine:
+            case LinearAlgebraEngine.sparse:
+                kern = nullspace_sparse(mat)
+            case LinearAlgebraEngine.fraction_free:
+                kernel = kernel_fraction_free(mat) if shape(mat)[0] and shape(mat)[1] else None
+                if kernel is None:
+                    kern = Matrix(mat).nullspace()
+                else:
+                    (K, R, basis) = kernel
+                    kern = [Matrix([K.to_sympy(K.quo(K.convert_from(num, R), K.convert_from(den, R))) for num in nums])
+                            for (nums, den) in basis]
+            case _:
+                kern = mat.nullspace()
+        stage.set(kernel_dim=len(kern))
+
+    return kern
+
+def combine_rows(coeffs: list, mat, others: list = None) -> tuple:
+    """
+    Computes the linear combination of the rows of mat with the
+    coefficients coeffs exactly in the fraction field of the known
+    variables.
+
+    Parameters:
+        coeffs (list): Coefficient of every row.
+        mat (Matrix): Input matrix.
+        others (list): Further entries converted into the same field,
+            none if None.
+
+    Returns:
+        (tuple): Fraction field K, entries of the combination and the
+            entries of others (elements of K).
+    """
+    if others is None:
+        others = []
+    (nr_rows, nr_cols) = shape(mat)
+    (K, elems) = construct_domain(list(coeffs) + list(mat) + list(others), field=True)
+
+    coeffs_K = elems[:len(coeffs)]
+    mat_K = elems[len(coeffs):len(coeffs) + nr_rows * nr_cols]
+
+    combination = []
+    for j in range(nr_cols):
+        val = K.zero
+        for i in range(nr_rows):
+            if coeffs_K[i] and mat_K[i * nr_cols + j]:
+                val += coeffs_K[i] * mat_K[i * nr_cols + j]
+        combination.append(val)
+
+    return (K, combination, elems[len(coeffs) + nr_rows * nr_cols:])
+
+def linear_combination(coeffs: list, mat):
+    """
+    Computes the linear combination of the rows of mat with the
+    coefficients coeffs. Unlike summing the rows with SymPy, the entries
+    of the result are rational functions in lowest terms, hence they do
+    not need to be simplified with `cancel`.
+
+    Parameters:
+        coeffs (list): Coefficient of every row.
+        mat (Matrix): Input matrix.
+
+    Returns:
+        (Matrix): Row vector sum(coeffs[i] * mat.row(i)).
+    """
+    (K, combination, _) = combine_rows(coeffs, mat)
+
+    return Matrix([[K.to_sympy(val) for val in combination]])
+
+@traced("verify_combination")
+def is_linear_combination(coeffs: list, mat, target) -> bool:
+    """
+    Checks whether the linear combination of the rows of mat with the
+    coefficients coeffs is equal to target, comparing exactly in the
+    fraction field of the known variables.
+
+    Parameters:
+        coeffs (list): Coefficient of every row.
+        mat (Matrix): Input matrix.
+        target (Matrix): Row vector.
+
+    Returns:
+        (bool): sum(coeffs[i] * mat.row(i)) == target.
+    """
+    (K, combination, target_K) = combine_rows(coeffs, mat, list(target))
+
+    return combination == target_K
+
+class IncrementalEchelon:
+    """
+    Row echelon form of a growing set of sparse rows, whose entries are
+    rational functions of the known variables. Every inserted row is
+    reduced by the pivots of the current basis, so inserting rows never
+    modifies the basis computed so far. The residual of a target row
+    is maintained in the same way, which shows as soon as the target
+    is in the span of the inserted rows.
+
+    Attributes:
+        basis (list): Triples (pivot, row, combination), where row is
+            zero in the pivots of the previous triples and combination
+            gives row as a combination of the inserted rows.
+        nr_rows (int): Number of inserted rows.
+        residual (dict): Target reduced by the basis.
+        residual_combination (dict): Coefficients c with
+            residual = target + sum(c[i] * row i).
+    """
+
+    def __init__(self, target: dict) -> None:
+        self.basis = []
+        self.nr_rows = 0
+        self.residual = dict(target)
+        self.residual_combination = {}
+
+    @staticmethod
+    def eliminate(row: dict, combination: dict, pivot, brow: dict, bcomb: dict) -> None:
+        """
+        Subtracts the multiple of brow that clears the pivot of row.
+        The arguments row and combination are modified in place.
+
+        Parameters:
+            row (dict): Sparse row.
+            combination (dict): Combination of row.
+            pivot: Pivot column of brow, where brow is 1.
+            brow (dict): Sparse row of the basis.
+            bcomb (dict): Combination of brow.
+        """
+        c = row.get(pivot)
+        if c is None:
+            return
+        for (vec, bvec) in [(row, brow), (combination, bcomb)]:
+            for (j, val) in bvec.items():
+                new_val = cancel(vec.get(j, 0) - c * val)
+                if new_val == 0:
+                    vec.pop(j, None)
+                else:
+                    vec[j] = new_val
+
+    def insert(self, row: dict) -> bool:
+        """
+        Inserts a row and reduces the residual of the target by it.
+
+        Parameters:
+            row (dict): Sparse row, maps columns to nonzero entries.
+
+        Returns:
+            (bool): The row is independent of the previous rows.
+        """
+        checkpoint()
+        row = dict(row)
+        combination = {self.nr_rows: Integer(1)}
+        self.nr_rows += 1
+        for (pivot, brow, bcomb) in self.basis:
+            self.eliminate(row, combination, pivot, brow, bcomb)
+        if len(row) == 0:
+            return False
+
+        pivot = min(row)
+        c = row[pivot]
+        row = {j: cancel(val / c) for (j, val) in row.items()}
+        combination = {i: cancel(val / c) for (i, val) in combination.items()}
+        self.basis.append((pivot, row, combination))
+
+        # the residual is zero in the previous pivots, and so is row
+        self.eliminate(self.residual, self.residual_combination, pivot, row, combination)
+        return True
+
+    def target_reached(self) -> bool:
+        """
+        Returns:
+            (bool): The target is a combination of the inserted rows.
+        """
+        return len(self.residual) == 0
+
+    def solution(self) -> dict:
+        """
+        Returns:
+            (dict): Coefficient of every inserted row in the combination
+                equal to the target, if the target is reached.
+        """
+        return {i: -val for (i, val) in self.residual_combination.items()}
+
+# prime modulus of the randomized screening, see screen_ranks
+SCREENING_PRIME = 2**61 - 1
+
+def eval_mod_p(entry, point: dict, prime: int) -> int:
+    """
+    Evaluates a rational function of the known variables at point,
+    modulo prime.
+
+    Parameters:
+        entry: Matrix entry (SymPy expression).
+        point (dict): Integer value of every free symbol of entry.
+        prime (int): Modulus.
+
+    Returns:
+        (int): Value of entry modulo prime.
+
+    Raises:
+        ValueError: entry is not a rational function or its
+            denominator vanishes modulo prime.
+    """
+    val = sympify(entry).xreplace(point)
+
+    if not val.is_Rational:
+        raise ValueError("not a rational function: " + str(entry))
+
+    if val.q % prime == 0:
+        raise ValueError("the denominator vanishes modulo the prime")
+
+    return int(val.p) * pow(int(val.q), -1, prime) % prime
+
+def rank_mod_p(rows: list, prime: int) -> int:
+    """
+    Computes the rank of an integer matrix over GF(prime) by Gaussian
+    elimination.
+
+    Parameters:
+        rows (list): Rows (lists of int) of the matrix, modified in place.
+        prime (int): Modulus.
+
+    Returns:
+        (int): Rank of the matrix.
+    """
+    rank = 0
+    nr_cols = len(rows[0]) if rows else 0
+
+    for col in range(nr_cols):
+        checkpoint()
+        pivot = next((i for i in range(rank, len(rows)) if rows[i][col] != 0), None)
+        if pivot is None:
+            continue
+
+        (rows[rank], rows[pivot]) = (rows[pivot], rows[rank])
+        inv = pow(rows[rank][col], -1, prime)
+        pivot_row = [v * inv % prime for v in rows[rank]]
+        rows[rank] = pivot_row
+
+        for i in range(rank + 1, len(rows)):
+            factor = rows[i][col]
+            if factor != 0:
+                rows[i] = [(v - factor * w) % prime for v, w in zip(rows[i], pivot_row)]
+
+        rank += 1
+
+    return rank
+
+def degree_bound(mat) -> int:
+    """
+    Bounds the total degree of the numerators of the minors of mat. A
+    row is cleared of denominators by multiplying it with the product
+    of its denominators, hence it contributes the degrees of its
+    denominators plus the largest degree of its numerators.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+
+    Returns:
+        (int): Degree bound.
+    """
+    bound = 0
+
+    for i in range(shape(mat)[0]):
+        max_num = 0
+        sum_den = 0
+        for entry in mat.row(i):
+            if not entry.free_symbols:
+                continue
+            (num, den) = fraction(together(entry))
+            if num.free_symbols:
+                max_num = max(max_num, Poly(num, *num.free_symbols).total_degree())
+            if den.free_symbols:
+                sum_den += Poly(den, *den.free_symbols).total_degree()
+        bound += max_num + sum_den
+
+    return bound
+
+def screening_error_bound(mat, cols: list, prime: int = SCREENING_PRIME) -> float:
+    """
+    Bounds the probability that screen_ranks underestimates the rank of
+    mat without the columns cols, i.e. that the point is a root of the
+    numerator of its largest non-vanishing minor. By the Schwartz-Zippel
+    lemma this happens with probability at most degree_bound / (prime - 1).
+    The bound assumes that prime does not divide every coefficient of
+    that numerator, which holds for the small integer coefficients of
+    the encodings.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        cols (list): Column indices.
+        prime (int): Modulus.
+
+    Returns:
+        (float): Error bound.
+    """
+    rest = [j for j in range(shape(mat)[1]) if not j in cols]
+
+    if not rest:
+        return 0.0
+
+    return degree_bound(mat.extract(list(range(shape(mat)[0])), rest)) / (prime - 1)
+
+def screen_ranks(mat, cols: list, prime: int = SCREENING_PRIME, rng = None):
+    """
+    Randomized screening of the ranks of mat and of mat without the
+    columns cols. The known variables are replaced by random elements
+    of GF(prime) and both ranks are computed modulo prime with integer
+    arithmetic, which is much cheaper than the exact computation over
+    the rational functions. A specialization never increases the rank
+    and it preserves the rank of mat without cols except with the
+    probability given by screening_error_bound.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        cols (list): Column indices.
+        prime (int): Modulus.
+        rng (random.Random): Source of randomness, by default random.SystemRandom.
+
+    Returns:
+        (tuple): Rank of mat and rank of mat without cols modulo prime,
+            or None if mat cannot be screened.
+    """
+    if rng is None:
+        rng = random.SystemRandom()
+
+    (nr_rows, nr_cols) = shape(mat)
+    if nr_rows == 0 or nr_cols == 0:
+        return None
+
+    free = set().union(*[sympify(entry).free_symbols for entry in mat])
+    point = {sym: Integer(rng.randrange(1, prime)) for sym in free}
+
+    try:
+        rows = [[eval_mod_p(mat[i, j], point, prime) for j in range(nr_cols)] for i in range(nr_rows)]
+    except ValueError:
+        return None
+
+    rest = [j for j in range(nr_cols) if not j in cols]
+
+    rank_all = rank_mod_p([list(row) for row in rows], prime)
+    rank_rest = rank_mod_p([[row[j] for j in rest] for row in rows], prime) if rest else 0
+
+    return (rank_all, rank_rest)
+
+def screen_independent_columns(mat, cols: list, prime: int = SCREENING_PRIME, rng = None) -> tuple:
+    """
+    Screens whether the columns cols of mat are linearly independent
+    modulo the remaining columns, i.e. whether every vector of the
+    nullspace of mat is zero in the entries cols. The attacks and the
+    trivial security checks fail exactly in this case.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        cols (list): Column indices.
+        prime (int): Modulus.
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        (bool): The columns are independent, except with the probability
+                below. False means that the screening is inconclusive and
+                the nullspace has to be computed.
+        (float): Bound on the probability of error, None if inconclusive.
+    """
+    ranks = screen_ranks(mat, cols, prime, rng)
+
+    if ranks is None:
+        return False, None
+
+    (rank_all, rank_rest) = ranks
+    if rank_all != rank_rest + len(cols):
+        return False, None
+
+    return True, screening_error_bound(mat, cols, prime)
+
+def screen_unspanned_columns(mat, cols: list, prime: int = SCREENING_PRIME, rng = None) -> tuple:
+    """
+    Screens whether the columns cols of mat are not all contained in
+    the span of the remaining columns, i.e. whether the projection of
+    the nullspace of mat onto the entries cols is not surjective.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        cols (list): Column indices.
+        prime (int): Modulus.
+        rng (random.Random): Source of randomness.
+
+    Returns:
+        (bool): Some column is not spanned by the others, except with the
+                probability below. False means that the screening is
+                inconclusive.
+        (float): Bound on the probability of error, None if inconclusive.
+    """
+    ranks = screen_ranks(mat, cols, prime, rng)
+
+    if ranks is None:
+        return False, None
+
+    (rank_all, rank_rest) = ranks
+    if rank_all == rank_rest:
+        return False, None
+
+    return True, screening_error_bound(mat, cols, prime)
@@ -16,8 +16,11 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.             
                                                                                    
 from common_methods import *
-from attack import Attack
+from attack import Attack, budgeted
 from decryption import DecryptionAttack
+from linear_algebra import LinearAlgebraEngine
+from interned import SymbolTable
+from tracing import traced
 from enum import Enum
 
 import copy
@@ -69,7 +72,8 @@ class MasterKeyAttack(Attack):
         unknown(list): List of unknown elements (sp.core.symbol.Symbol). These are the elements
             that in theory unknown for the attacker. However, they can be disclosed by corrupting
             an authority for instance.
-        solution(str): Solution of the attack, if found.
+        solution(str): Rendered result of the attack, computed on demand by show_solution.
+        result(AttackResult): Result of the attack.
         description(str): Description of the attack, by default MasterKeyAttack.
         c(list): List of ciphertext encodings. Not used.
         mpk(list): List of mpk related variables.
@@ -80,6 +84,11 @@ class MasterKeyAttack(Attack):
         MSK_CA(list): List of msk variables that belong to the CA.
         MPK_AA(list): List of mpk variables that belong to the AA.
         MSK_AA(list): List of msk variables that belong to the AA.
+        engine(LinearAlgebraEngine): Backend utilized for computing the nullspace
+            of the attack matrix.
+        screening(bool): The attack matrix is first screened modulo a prime.
+        reduction(MatrixReduction): Reduction of the attack matrix, see
+            DecryptionAttack.
     """
   
     SOL_MSG = "[*] Master key attack found: "
@@ -89,11 +98,16 @@ class MasterKeyAttack(Attack):
     keyenco = None
     unknown = None
     solution = None
+    result = None
     description = "MasterKeyAttack"
+    kind = "master_key"
     c = [] 
     mpk = [] 
     gp = [] 
     translation_table = []
+    engine = LinearAlgebraEngine.dense
+    screening = False
+    reduction = None
 
     # for output improvement
     # in corruption cases
@@ -130,12 +144,17 @@ class MasterKeyAttack(Attack):
 
         self.unknown = None
         self.solution = None
+        self.result = None
         self.description = "MasterKeyAttack"
 
         self.c = [] 
         self.mpk = [] 
         self.gp = [] 
         self.translation_table = []
+        self.engine = LinearAlgebraEngine.dense
+        self.screening = False
+        self.reduction = None
+        self.table = None
 
         self.MPK_CA = []
         self.MSK_CA = []
@@ -157,6 +176,8 @@ class MasterKeyAttack(Attack):
         self.keyenco = keyenco
         self.unknown = unknown
 
+    @budgeted
+    @traced("master_key_attack")
     def run(self) -> None:
         """
         Tries to find a master key attack on the given ABE scheme.
@@ -175,9 +196,16 @@ class MasterKeyAttack(Attack):
         decryption_attack.init(self.masterkey, self.keyenco, self.c, self.mpk, self.gp, self.unknown, master_key_attack_only=True)                            
         decryption_attack.set_sol_msg(self.SOL_MSG)
         decryption_attack.set_not_found_msg(self.NOT_FOUND_MSG)
+        decryption_attack.set_linear_algebra_engine(self.engine)
+        decryption_attack.set_symbol_table(self.table)
+        decryption_attack.set_modular_screening(self.screening)
 
         decryption_attack.run()                                                            
-        self.solution = decryption_attack.show_solution()          
+
+        # the result is rendered lazily by show_solution
+        self.result = decryption_attack.result
+        self.reduction = decryption_attack.reduction
+        self.solution = None
 
     def format_encodings(self) -> None:
         """
@@ -322,8 +350,17 @@ class MasterKeyAttack(Attack):
         Returns:
             solution (str): The result of the attack.
         """
+        if self.solution is None and self.result is not None:
+            self.solution = '\n' + self.result.render() + '\n'
+
         return '\n' + self.solution + '\n'
 
+    def clear_solution(self) -> None:
+        """
+        Discards the rendered result of the attack.
+        """
+        self.solution = None
+
     def add_corruptable_var(self, origin: MasterKeyCorruptedVariable, corr: sp.core.symbol.Symbol) -> None:
         """
         Adds a corruptable var from the master pair of CA or AA.
@@ -439,6 +476,36 @@ class MasterKeyAttack(Attack):
         """
         self.MSK_AA.append(elem)
 
+    def set_linear_algebra_engine(self, engine: LinearAlgebraEngine) -> None:
+        """
+        Selects the backend utilized for computing the nullspace of
+        the attack matrix.
+  
+        Parameters:
+            engine (LinearAlgebraEngine): dense, sparse or fraction_free.
+        """
+        self.engine = engine
+
+    def set_symbol_table(self, table: SymbolTable) -> None:
+        """
+        Shares a symbol table in which the encodings are interned,
+        see DecryptionAttack.set_symbol_table.
+  
+        Parameters:
+            table (SymbolTable): Symbol table.
+        """
+        self.table = table
+
+    def set_modular_screening(self, enabled: bool) -> None:
+        """
+        Enables the randomized screening of the attack matrix modulo
+        a prime, see DecryptionAttack.set_modular_screening.
+  
+        Parameters:
+            enabled (bool): Screen the attack matrix.
+        """
+        self.screening = enabled
+
     def set_corruption_model(self, corr_m) -> None:
         """
         Sets the corruption model involved in the attack. By
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""matrix_reduction.py: Reduction of the kernel computations of the
+attack and proof matrices, by iterated elimination of singleton rows and
+decomposition into connected components"""
+
+from sympy import *
+
+from linear_algebra import compute_nullspace
+from budget import checkpoint
+from tracing import annotate, traced
+
+class MatrixReduction:
+    """
+    Reduction of the problem of computing the vectors x with mat * x = 0
+    that are nonzero in some target column.
+
+    A row with a single nonzero entry forces the variable of its column
+    to zero in every vector of the kernel, so the row and the column are
+    deleted. Deleting a column may create new singleton rows, hence the
+    elimination is iterated until no singleton row is left. The rest of
+    the matrix is split into the connected components of the bipartite
+    graph of its rows and columns: the kernel is the direct sum of the
+    kernels of the components.
+
+    Attributes:
+        shape (tuple): Shape of the original matrix.
+        rows (list): Rows of the original matrix that are kept.
+        cols (list): Columns of the original matrix that are kept.
+        forced (list): Columns forced to zero by the singleton elimination.
+        components (list): Pairs (rows, cols) of the components that are kept.
+        nr_components (int): Number of components after the elimination.
+        rounds (int): Number of rounds of the singleton elimination.
+        infeasible (bool): Every target column is forced to zero, so no
+            vector of the kernel is nonzero in the targets.
+        stages (list): Triples (stage, nr_rows, nr_cols) with the size of
+            the problem after each stage.
+    """
+
+    def __init__(self, nr_rows: int, nr_cols: int) -> None:
+        self.shape = (nr_rows, nr_cols)
+        self.rows = list(range(nr_rows))
+        self.cols = list(range(nr_cols))
+        self.forced = []
+        self.components = []
+        self.nr_components = 0
+        self.rounds = 0
+        self.infeasible = False
+        self.stages = [("input", nr_rows, nr_cols)]
+
+    def add_stage(self, stage: str) -> None:
+        """
+        Records the size of the problem after a stage.
+
+        Parameters:
+            stage (str): Name of the stage.
+        """
+        self.stages.append((stage, len(self.rows), len(self.cols)))
+
+    def submatrix(self, mat):
+        """
+        Extracts the kept rows and columns of mat.
+
+        Parameters:
+            mat (Matrix): Original matrix.
+
+        Returns:
+            (Matrix): Reduced matrix.
+        """
+        return mat.extract(self.rows, self.cols)
+
+    def report(self) -> str:
+        """
+        Describes how much each stage shrank the problem.
+
+        Returns:
+            (str): Report, e.g. "40x36 -> singletons (3 rounds): 12x10 -> components (1 of 2): 8x6".
+        """
+        msg = []
+        for (stage, nr_rows, nr_cols) in self.stages:
+            size = str(nr_rows) + "x" + str(nr_cols)
+            match stage:
+                case "input":
+                    msg.append(size)
+                case "singletons":
+                    msg.append("singletons (" + str(self.rounds) + (" round): " if self.rounds == 1 else " rounds): ") + size)
+                case "components":
+                    msg.append("components (" + str(len(self.components)) + " of " + str(self.nr_components) + "): " + size)
+        if self.infeasible:
+            msg.append("infeasible")
+
+        return " -> ".join(msg)
+
+def prune_singletons(row_cols: dict, col_rows: dict) -> tuple:
+    """
+    Eliminates the singleton rows until none is left. The adjacency
+    maps are modified in place.
+
+    Parameters:
+        row_cols (dict): Columns of the nonzero entries of every row.
+        col_rows (dict): Rows of the nonzero entries of every column.
+
+    Returns:
+        (list): Columns forced to zero.
+        (int): Number of rounds.
+    """
+    forced = []
+    rounds = 0
+
+    singletons = [i for i in row_cols if len(row_cols[i]) == 1]
+    while len(singletons) > 0:
+        checkpoint()
+        rounds += 1
+        next_singletons = []
+        for i in singletons:
+            # a previous singleton of this round may have emptied the row
+            if not i in row_cols:
+                continue
+            (j,) = row_cols[i]
+            forced.append(j)
+            for k in col_rows.pop(j):
+                row_cols[k].discard(j)
+                if len(row_cols[k]) == 0:
+                    del row_cols[k]
+                elif len(row_cols[k]) == 1:
+                    next_singletons.append(k)
+        singletons = next_singletons
+
+    return (sorted(forced), rounds)
+
+def connected_components(row_cols: dict, col_rows: dict) -> list:
+    """
+    Splits the bipartite graph of the rows and columns into its
+    connected components.
+
+    Parameters:
+        row_cols (dict): Columns of the nonzero entries of every row.
+        col_rows (dict): Rows of the nonzero entries of every column.
+
+    Returns:
+        (list): Pairs (rows, cols) of sorted indices, ordered by their first column.
+    """
+    components = []
+    visited = set()
+    for j in sorted(col_rows):
+        if j in visited:
+            continue
+        visited.add(j)
+        rows = set()
+        cols = [j]
+        stack = [j]
+        while len(stack) > 0:
+            for i in col_rows[stack.pop()]:
+                if i in rows:
+                    continue
+                rows.add(i)
+                for k in row_cols[i]:
+                    if not k in visited:
+                        visited.add(k)
+                        cols.append(k)
+                        stack.append(k)
+        components.append((sorted(rows), sorted(cols)))
+
+    return components
+
+@traced("reduce_kernel_problem")
+def reduce_kernel_problem(mat, targets: list, all_components: bool = False) -> MatrixReduction:
+    """
+    Reduces the computation of the kernel vectors of mat that are nonzero
+    in some target column, see MatrixReduction.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        targets (list): Target columns.
+        all_components (bool): Keep every component, so that the whole
+            kernel can be recovered. Otherwise, only the components that
+            contain a target are kept.
+
+    Returns:
+        (MatrixReduction): Reduction of the problem.
+    """
+    (nr_rows, nr_cols) = shape(mat)
+    reduction = MatrixReduction(nr_rows, nr_cols)
+
+    row_cols = {}
+    col_rows = {j: set() for j in range(nr_cols)}
+    for (i, j) in mat.todok():
+        row_cols.setdefault(i, set()).add(j)
+        col_rows[j].add(i)
+
+    (reduction.forced, reduction.rounds) = prune_singletons(row_cols, col_rows)
+    reduction.rows = sorted(row_cols)
+    reduction.cols = sorted(col_rows)
+    reduction.add_stage("singletons")
+
+    reduction.infeasible = all(j in reduction.forced for j in targets)
+
+    components = connected_components(row_cols, col_rows)
+    reduction.nr_components = len(components)
+    if not all_components:
+        components = [(rows, cols) for (rows, cols) in components if any(j in cols for j in targets)]
+    reduction.components = components
+    reduction.rows = sorted(i for (rows, cols) in components for i in rows)
+    reduction.cols = sorted(j for (rows, cols) in components for j in cols)
+    reduction.add_stage("components")
+    annotate(rows=nr_rows, cols=nr_cols, kept_rows=len(reduction.rows), kept_cols=len(reduction.cols), rounds=reduction.rounds)
+
+    return reduction
+
+def reduced_nullspace(mat, reduction: MatrixReduction, nullspace = compute_nullspace) -> list:
+    """
+    Computes the kernel of mat from the kernels of the components of
+    the reduction. If every component is kept, the result is the basis
+    computed for the whole matrix.
+
+    Parameters:
+        mat (Matrix): Input matrix.
+        reduction (MatrixReduction): Reduction of mat.
+        nullspace (function): Computes the nullspace of a matrix.
+
+    Returns:
+        (list): Column vectors (Matrix) of the kernel, zero in the
+            columns that are not kept.
+    """
+    kern = []
+    for (rows, cols) in reduction.components:
+        # a column without entries is a component of its own
+        if len(rows) == 0:
+            sub_kern = [Matrix([1])]
+        else:
+            sub_kern = nullspace(mat.extract(rows, cols))
+        for sub_vec in sub_kern:
+            vec = zeros(reduction.shape[1], 1)
+            for (k, j) in enumerate(cols):
+                vec[j] = sub_vec[k]
+            kern.append(vec)
+
+    # the vectors of the echelon basis are ordered by their free column,
+    # which is their last nonzero entry
+    kern.sort(key=lambda vec: max(j for j in range(len(vec)) if vec[j] != 0))
+
+    return kern
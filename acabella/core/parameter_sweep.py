@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""parameter_sweep.py: Re-runs the analyses of a scheme over a grid of
+attribute and key counts, to measure how they scale"""
+
+import math
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from enum import Enum
+
+from sympy import *
+
+from access_structures import colluding_attribute_sets, parse_policy
+from analysis_context import AnalysisContext
+from conditional import ConditionalDecryptionAttack
+from security_proof import generate_the_encodings_then_the_proofs
+
+class SweepAnalysis(Enum):
+    """
+    Analyses that can be swept. Both take the parameters of
+    ParseConfig.generate_conditional_params.
+
+    conditional: conditional decryption attack with n ciphertext
+        attributes and two colluding keys with attributes 1..n-1 and n.
+    security_proof: proof generation with n ciphertext attributes and
+        a key with attributes 1..n-1 and n+1.
+
+    If the parameters have a policy, the ciphertext is encrypted under
+    it and the keys get the attributes of colluding_attribute_sets
+    instead (the first set and the largest attribute + 1 for the
+    security proof).
+    """
+    conditional = 1
+    security_proof = 2
+
+@dataclass(slots=True)
+class SweepPoint:
+    """
+    Measurements of one point of the grid.
+
+    Attributes:
+        nr_attributes (int): Number of attributes of the ciphertext.
+        nr_keys (int): Number of copies of the keys.
+        rows (int): Rows of the largest matrix, None if not measured.
+        cols (int): Columns of the largest matrix, None if not measured.
+        rank (int): Rank of the largest matrix, None if not measured.
+        kernel_dim (int): Dimension of its kernel, None if not measured.
+        verdict (str): Outcome of the analysis.
+        wall_time (float): Seconds, including the points it reuses.
+        peak_memory_kb (int): Peak of the memory allocated by the
+            analysis, in KiB.
+    """
+    nr_attributes: int
+    nr_keys: int
+    rows: int
+    cols: int
+    rank: int
+    kernel_dim: int
+    verdict: str
+    wall_time: float
+    peak_memory_kb: int
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the point.
+        """
+        return asdict(self)
+
+def growth_exponent(xs: list, ys: list) -> float:
+    """
+    Fits ys = c * xs^b by least squares on the logarithms.
+
+    Parameters:
+        xs (list): Sizes.
+        ys (list): Measurements.
+
+    Returns:
+        (float): Exponent b, None if fewer than two distinct positive
+            sizes with positive measurements.
+    """
+    pairs = [(math.log(x), math.log(y)) for (x, y) in zip(xs, ys) if x > 0 and y > 0]
+    if len({lx for (lx, ly) in pairs}) < 2:
+        return None
+
+    mean_x = sum(lx for (lx, ly) in pairs) / len(pairs)
+    mean_y = sum(ly for (lx, ly) in pairs) / len(pairs)
+    cov = sum((lx - mean_x) * (ly - mean_y) for (lx, ly) in pairs)
+    var = sum((lx - mean_x) ** 2 for (lx, ly) in pairs)
+
+    return cov / var
+
+class ParameterSweep:
+    """
+    Runs an analysis over a grid of attribute and key counts.
+
+    For the conditional attack, the points with the same number of
+    attributes share one incremental echelon form (see
+    ConditionalDecryptionAttack.grow_echelon): the point with k copies
+    of the keys extends the one with k - 1 copies. The rows are the
+    products of the encodings, the columns their monomials, and the
+    kernel dimension counts the combinations of products that vanish.
+
+    For the security proof, the number of keys is always 1 and the
+    largest matrix whose kernel is computed is reported. With a policy,
+    the grid has the number of attributes of the policy only.
+
+    Attributes:
+        analysis (SweepAnalysis): Analysis to sweep.
+        params (dict): Parameters of the scheme.
+        policy (PolicyNode): Policy of the ciphertexts, None for the
+            AND-policy over the attributes of every point.
+        attributes (list): Numbers of attributes of the grid.
+        keys (list): Numbers of copies of the keys of the grid.
+        points (list): SweepPoint of every point of the grid.
+    """
+
+    def __init__(self) -> None:
+        self.analysis = None
+        self.params = None
+        self.policy = None
+        self.attributes = []
+        self.keys = []
+        self.points = []
+
+    def init(self, analysis: SweepAnalysis, params: dict, attributes: list, keys: list = None) -> None:
+        """
+        Initializes the sweep.
+
+        Parameters:
+            analysis (SweepAnalysis): Analysis to sweep.
+            params (dict): Parameters of ParseConfig.generate_conditional_params.
+            attributes (list): Numbers of attributes, at least 2, replaced
+                by the number of attributes of the policy if params has one.
+            keys (list): Numbers of copies of the keys, at least 1, [1] if None.
+        """
+        if keys is None:
+            keys = [1]
+
+        policy = params.get("policy")
+        if isinstance(policy, str):
+            policy = parse_policy(policy)
+        if policy is not None:
+            atts = policy.attributes()
+            if len(set(atts)) != len(atts):
+                raise ValueError("ParameterSweep: every attribute must occur once in the policy")
+            colluding_attribute_sets(policy)
+            attributes = [len(atts)]
+
+        if min(attributes) < 2 or min(keys) < 1:
+            raise ValueError("ParameterSweep: the grid needs at least 2 attributes and 1 key")
+
+        self.analysis = analysis
+        self.params = params
+        self.policy = policy
+        self.attributes = sorted(set(attributes))
+        self.keys = sorted(set(keys)) if analysis == SweepAnalysis.conditional else [1]
+        self.points = []
+
+    def conditional_attack(self, nr_attributes: int) -> ConditionalDecryptionAttack:
+        """
+        Parameters:
+            nr_attributes (int): Number of attributes of the ciphertext.
+
+        Returns:
+            (ConditionalDecryptionAttack): Prepared attack for the point.
+        """
+        p = self.params
+        cd_attack = ConditionalDecryptionAttack()
+        cd_attack.init(p["alpha"], p["special_s"], list(p["mpk"]), p["k_fixed"], p["k_att"], p["c_fixed"], p["c_att"], list(p["unknown"]), p["prefixes"], p["nr_indexed_encodings"])
+
+        if self.policy is not None:
+            cd_attack.set_policy(self.policy)
+        else:
+            atts = list(range(1, nr_attributes + 1))
+            cd_attack.set_attribute_ranges(atts, atts[:-1], atts[-1:])
+        cd_attack.prepare()
+
+        return cd_attack
+
+    def sweep_conditional(self, nr_attributes: int) -> None:
+        """
+        Measures the points of the conditional attack with nr_attributes
+        attributes, growing one echelon form over the key counts.
+
+        Parameters:
+            nr_attributes (int): Number of attributes of the ciphertext.
+        """
+        start = time.perf_counter()
+        tracemalloc.start()
+        try:
+            cd_attack = self.conditional_attack(nr_attributes)
+            for (nr_of_keys, echelon, columns, _) in cd_attack.grow_echelon(max(self.keys)):
+                if echelon is None:
+                    break
+                if not nr_of_keys in self.keys:
+                    continue
+
+                rank = len(echelon.basis)
+                verdict = "attack found" if echelon.target_reached() else "no attack found"
+                self.points.append(SweepPoint(nr_attributes, nr_of_keys, echelon.nr_rows, len(columns), rank, echelon.nr_rows - rank,
+                                              verdict, round(time.perf_counter() - start, 4), tracemalloc.get_traced_memory()[1] // 1024))
+        finally:
+            tracemalloc.stop()
+
+        # an unknown variable in a denominator: the remaining points are
+        # attacked one by one
+        measured = {point.nr_keys for point in self.points if point.nr_attributes == nr_attributes}
+        for nr_of_keys in self.keys:
+            if nr_of_keys in measured:
+                continue
+            start = time.perf_counter()
+            tracemalloc.start()
+            try:
+                result = cd_attack.attempt(nr_of_keys)
+                self.points.append(SweepPoint(nr_attributes, nr_of_keys, None, None, None, None,
+                                              result.verdict(), round(time.perf_counter() - start, 4), tracemalloc.get_traced_memory()[1] // 1024))
+            finally:
+                tracemalloc.stop()
+
+    def sweep_security_proof(self, nr_attributes: int) -> None:
+        """
+        Measures the point of the proof generation with nr_attributes
+        attributes.
+
+        Parameters:
+            nr_attributes (int): Number of attributes of the ciphertext.
+        """
+        p = self.params
+        atts = list(range(1, nr_attributes + 1))
+        att_range_key = atts[:-1] + [nr_attributes + 1]
+        if self.policy is not None:
+            atts = self.policy.attributes()
+            att_range_key = colluding_attribute_sets(self.policy)[0] + [max(atts) + 1]
+        context = AnalysisContext()
+
+        start = time.perf_counter()
+        tracemalloc.start()
+        try:
+            log = generate_the_encodings_then_the_proofs(p["alpha"], p["special_s"], list(p["mpk"]), p["k_fixed"], p["k_att"], p["c_fixed"], p["c_att"], list(p["unknown"]),
+                                                         p["prefixes"], p["nr_indexed_encodings"], att_range_key, atts, context, self.policy)
+        except ValueError:
+            # no kernel vector covers the blinding value
+            log = []
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        wall_time = round(time.perf_counter() - start, 4)
+
+        if log is None:
+            verdict = "not in AC17 form"
+        elif any(isinstance(entry, str) and "proof verifies correctly" in entry for entry in log):
+            verdict = "proof found"
+        else:
+            verdict = "no proof found"
+
+        (rows, cols, rank, kernel_dim) = (None, None, None, None)
+        if len(context.kernels) > 0:
+            (mat_shape, kern) = max(((key[0], kern) for (key, kern) in context.kernels.items()), key=lambda item: item[0][0] * item[0][1])
+            (rows, cols) = mat_shape
+            kernel_dim = len(kern)
+            rank = cols - kernel_dim
+
+        self.points.append(SweepPoint(nr_attributes, 1, rows, cols, rank, kernel_dim, verdict, wall_time, peak))
+
+    def run(self) -> None:
+        """
+        Measures every point of the grid.
+        """
+        self.points = []
+        for nr_attributes in self.attributes:
+            match self.analysis:
+                case SweepAnalysis.conditional:
+                    self.sweep_conditional(nr_attributes)
+                case SweepAnalysis.security_proof:
+                    self.sweep_security_proof(nr_attributes)
+
+        self.points.sort(key=lambda point: (point.nr_attributes, point.nr_keys))
+
+    def growth_exponents(self) -> dict:
+        """
+        Fits the growth of the wall time in the number of attributes
+        (with the fewest keys) and in the number of keys (with the fewest
+        attributes), see growth_exponent.
+
+        Returns:
+            (dict): Exponent of every axis, None if it cannot be fitted.
+        """
+        along_attributes = [point for point in self.points if point.nr_keys == self.keys[0]]
+        along_keys = [point for point in self.points if point.nr_attributes == self.attributes[0]]
+
+        return {
+            "attributes": growth_exponent([point.nr_attributes for point in along_attributes], [point.wall_time for point in along_attributes]),
+            "keys": growth_exponent([point.nr_keys for point in along_keys], [point.wall_time for point in along_keys]),
+        }
+
+    def table(self) -> str:
+        """
+        Returns:
+            (str): The points of the grid and the growth exponents as a
+                text table.
+        """
+        header = ["attributes", "keys", "rows", "cols", "rank", "kernel", "verdict", "time (s)", "memory (KiB)"]
+        lines = [[str(point.nr_attributes), str(point.nr_keys), str(point.rows), str(point.cols), str(point.rank), str(point.kernel_dim),
+                  point.verdict, "%.3f" % point.wall_time, str(point.peak_memory_kb)] for point in self.points]
+
+        widths = [max(len(line[i]) for line in [header] + lines) for i in range(len(header))]
+        msg = ["  ".join(line[i].rjust(widths[i]) for i in range(len(header))) for line in [header] + lines]
+
+        msg.append("")
+        for (axis, exponent) in self.growth_exponents().items():
+            if exponent is not None:
+                msg.append("Growth exponent of the wall time in the number of " + axis + ": %.2f" % exponent)
+
+        return "\n".join(msg)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the sweep.
+        """
+        return {
+            "analysis": self.analysis.name,
+            "points": [point.to_dict() for point in self.points],
+            "growth_exponents": self.growth_exponents(),
+        }
@@ -23,8 +23,9 @@ from sympy import *
 from common_methods import *
 from decryption import DecryptionAttack
 from master_key import MasterKeyAttack
-
-init_printing(use_unicode=True)
+from interned import SymbolTable
+from expression_parser import ExpressionParser
+from tracing import traced
 
 class ParseConfig():
     """
@@ -34,10 +35,48 @@ class ParseConfig():
       
     Attributes:
         json_parsed (string): Resulting string after JSON parsing.
+        symbol_table (SymbolTable): Symbols of the parsed parameters,
+            interned once to be shared by the analyses of the scheme.
+        expression_parser (ExpressionParser): Parser of the expressions
+            of every section, sharing symbol_table.
     """
     
     def __init__(self) -> None:
         self.json_parsed = None 
+        self.symbol_table = SymbolTable()
+        self.expression_parser = ExpressionParser()
+        self.expression_parser.init(self.symbol_table)
+
+    def parse(self, data: str):
+        """
+        Parses an expression of the JSON input, see ExpressionParser.
+
+        Parameters:
+            data (str): Expression.
+
+        Returns:
+            (sp.core.expr.Expr): SymPy expression.
+        """
+        return self.expression_parser.parse(data)
+
+    def intern_params(self, params: dict) -> None:
+        """
+        Interns the symbols of the parsed parameters in the symbol
+        table, the unknown variables first.
+
+        Parameters:
+            params (dict): Parsed parameters, or None.
+        """
+        if params is None:
+            return
+
+        exprs = list(params.get("unknown", []))
+        for value in params.values():
+            if isinstance(value, list):
+                exprs += [x for x in value if isinstance(x, Basic)]
+            elif isinstance(value, Basic):
+                exprs.append(value)
+        self.symbol_table.intern_symbols(exprs)
 
     def init(self, config_file: str) -> None:
         """
@@ -61,6 +100,18 @@ class ParseConfig():
         """
         self.json_parsed = json.loads(data)
 
+    def init_with_parsed(self, json_parsed: dict) -> None:
+        """
+        Initializes the parser with JSON data that is already
+        parsed, e.g. by a tool that first looked it up in the
+        result cache.
+
+        Parameters:
+            json_parsed (dict): Parsed JSON data.
+        """
+        self.json_parsed = json_parsed
+
+    @traced("parse_config")
     def generate_master_key_params(self) -> tuple[dict, list]:
         """
         Based on the JSON input files, it generates a dictionary
@@ -80,22 +131,25 @@ class ParseConfig():
         corruptable_vars = {}
 
         try:
-            master_params["keyenco"] = [parse_expr(x) for x in self.json_parsed["k"]] 
-            master_params["masterkey"] = parse_expr(self.json_parsed["master_key"])
-            master_params["unknown"] = [parse_expr(x) for x in self.json_parsed["unknown_vars"]] 
+            master_params["keyenco"] = [self.parse(x) for x in self.json_parsed["k"]] 
+            master_params["masterkey"] = self.parse(self.json_parsed["master_key"])
+            master_params["unknown"] = [self.parse(x) for x in self.json_parsed["unknown_vars"]] 
             master_params["corruption_model"] = self.json_parsed["corruption_model"]
 
-            master_params["MPK_CA"] = [parse_expr(x) for x in self.json_parsed["MPK_CA"]] 
-            master_params["MPK_AA"] = [parse_expr(x) for x in self.json_parsed["MPK_AA"]] 
-            master_params["MPK_vars"] = [parse_expr(x) for x in self.json_parsed["MPK_vars"]] 
-            master_params["GP_vars"] = [parse_expr(x) for x in self.json_parsed["GP_vars"]] 
+            master_params["MPK_CA"] = [self.parse(x) for x in self.json_parsed["MPK_CA"]] 
+            master_params["MPK_AA"] = [self.parse(x) for x in self.json_parsed["MPK_AA"]] 
+            master_params["MPK_vars"] = [self.parse(x) for x in self.json_parsed["MPK_vars"]] 
+            master_params["GP_vars"] = [self.parse(x) for x in self.json_parsed["GP_vars"]] 
 
             corruptable_vars = self.json_parsed["corruptable_vars"]
         except:
             master_params = None
 
+        self.intern_params(master_params)
+
         return master_params, corruptable_vars
 
+    @traced("parse_config")
     def generate_dec_key_params(self) -> tuple[dict, list]:
         """
         Based on the JSON input files, it generates a dictionary
@@ -117,35 +171,41 @@ class ParseConfig():
         corruptable_vars = []
 
         try:
-            dec_params["key"] = parse_expr(self.json_parsed["key"])
-            dec_params["k_encodings"] = [parse_expr(x) for x in self.json_parsed["k"]] 
-            dec_params["c_encodings"] = [parse_expr(x) for x in self.json_parsed["c"]]  
-            dec_params["mpk_encodings"] = [parse_expr(x) for x in self.json_parsed["mpk"]] 
-            dec_params["gp_encodings"] = [parse_expr(x) for x in self.json_parsed["gp"]] 
-            dec_params["unknown"] = [parse_expr(x) for x in self.json_parsed["unknown_vars"]] 
+            dec_params["key"] = self.parse(self.json_parsed["key"])
+            dec_params["k_encodings"] = [self.parse(x) for x in self.json_parsed["k"]] 
+            dec_params["c_encodings"] = [self.parse(x) for x in self.json_parsed["c"]]  
+            dec_params["mpk_encodings"] = [self.parse(x) for x in self.json_parsed["mpk"]] 
+            dec_params["gp_encodings"] = [self.parse(x) for x in self.json_parsed["gp"]] 
+            dec_params["unknown"] = [self.parse(x) for x in self.json_parsed["unknown_vars"]] 
 
             dec_params["corruption_model"] = self.json_parsed["corruption_model"]
 
             # NOTE We suppose every field is always available in the JSON file.
             # It will be empty if it is not related to a particular corruption model.
 
-            dec_params["MPK_AAi"] = [parse_expr(x) for x in self.json_parsed["MPK_AAi"]] 
-            dec_params["MPK_AAj"] = [parse_expr(x) for x in self.json_parsed["MPK_AAj"]] 
+            dec_params["MPK_AAi"] = [self.parse(x) for x in self.json_parsed["MPK_AAi"]] 
+            dec_params["MPK_AAj"] = [self.parse(x) for x in self.json_parsed["MPK_AAj"]] 
 
-            dec_params["misc_vars"] = [parse_expr(x) for x in self.json_parsed["misc_vars"]] 
+            dec_params["misc_vars"] = [self.parse(x) for x in self.json_parsed["misc_vars"]] 
             
             corruptable_vars = self.json_parsed["corruptable_vars"]
         except:
             dec_params = None
 
+        self.intern_params(dec_params)
+
         return dec_params, corruptable_vars 
                         
+    @traced("parse_config")
     def generate_conditional_params(self) -> tuple[dict, list]:
         """
         Based on the JSON input files, it generates a dictionary
         with the corresponding parameters to look for conditional
         attacks. If a list of corruptable variables is supplied,
-        it also generates a list of those variables.
+        it also generates a list of those variables. The optional
+        "policy" field is a monotone boolean formula over the
+        attributes, e.g. "(1 and 2) or 2 of (3, 4, 5)", under which the
+        ciphertext is encrypted instead of the AND-policy.
 
         Returns:
             Parameters (dict): Conditional attack parameters.
@@ -172,17 +232,17 @@ class ParseConfig():
         """
 
         try:
-            att_mpk_group = parse_expr("att_mpk_group")
-            att_scalar = parse_expr("att_scalar")
-            policy_share = parse_expr("lambda_policy_share")
+            att_mpk_group = self.parse("att_mpk_group")
+            att_scalar = self.parse("att_scalar")
+            policy_share = self.parse("lambda_policy_share")
 
             mpk1 = att_mpk_group
-            special_s = parse_expr("s")
-            k_fixed = [parse_expr(x) for x in self.json_parsed["k_fixed"]] 
-            k_att = [parse_expr(x) for x in self.json_parsed["k_indexed"]] 
-            c_fixed = [parse_expr(x) for x in self.json_parsed["c_fixed"]] 
-            c_att = [parse_expr(x) for x in self.json_parsed["c_indexed"]] 
-            unkown = [parse_expr(x) for x in self.json_parsed["unknown"]] 
+            special_s = self.parse("s")
+            k_fixed = [self.parse(x) for x in self.json_parsed["k_fixed"]] 
+            k_att = [self.parse(x) for x in self.json_parsed["k_indexed"]] 
+            c_fixed = [self.parse(x) for x in self.json_parsed["c_fixed"]] 
+            c_att = [self.parse(x) for x in self.json_parsed["c_indexed"]] 
+            unkown = [self.parse(x) for x in self.json_parsed["unknown"]] 
 
             mpk = []
             
@@ -192,7 +252,7 @@ class ParseConfig():
             # prepare conditional params
 
             cd_params = {}
-            cd_params["alpha"] = parse_expr("alpha")
+            cd_params["alpha"] = self.parse("alpha")
             cd_params["special_s"] = special_s
             cd_params["mpk"] = mpk
             cd_params["k_fixed"] = k_fixed
@@ -203,11 +263,13 @@ class ParseConfig():
             cd_params["prefixes"] = prefixes
             cd_params["nr_indexed_encodings"] = nr_indexed_encodings
             cd_params["unknown"] = unkown
+            cd_params["policy"] = self.json_parsed.get("policy")
         except:
             cd_params = None
 
         return cd_params
 
+    @traced("parse_config")
     def generate_abgw_bridge_params(self) -> tuple[dict, list]:
         """
         Based on the JSON input files, it generates a dictionary
@@ -225,27 +287,28 @@ class ParseConfig():
             return None, None
     
         try:
-            k = [parse_expr(x) for x in self.json_parsed["k"]] 
-            c = [parse_expr(x) for x in self.json_parsed["c"]]  
-            mpk = [parse_expr(x) for x in self.json_parsed["mpk"]] 
-            gp = [parse_expr(x) for x in self.json_parsed["gp"]] 
+            k = [self.parse(x) for x in self.json_parsed["k"]] 
+            c = [self.parse(x) for x in self.json_parsed["c"]]  
+            mpk = [self.parse(x) for x in self.json_parsed["mpk"]] 
+            gp = [self.parse(x) for x in self.json_parsed["gp"]] 
 
             # prepare abgw params
         
             abgw_params = {}
-            abgw_params["key"] = parse_expr(self.json_parsed["key"])
+            abgw_params["key"] = self.parse(self.json_parsed["key"])
             abgw_params["k_encodings"] = k
             abgw_params["c_encodings"] = c
             abgw_params["mpk_encodings"] = mpk
             abgw_params["gp_encodings"] = gp
 
-            abgw_params["unknown"] = [parse_expr(x) for x in self.json_parsed["unknown_vars"]] 
-            abgw_params["known"] = [parse_expr(x) for x in self.json_parsed["known_vars"]] 
+            abgw_params["unknown"] = [self.parse(x) for x in self.json_parsed["unknown_vars"]] 
+            abgw_params["known"] = [self.parse(x) for x in self.json_parsed["known_vars"]] 
         except:
             abgw_params = None
 
         return abgw_params
 
+    @traced("parse_config")
     def generate_security_analysis_params(self) -> tuple[dict, list]:
         """
         Based on the JSON input files, it generates a dictionary
@@ -265,17 +328,20 @@ class ParseConfig():
         security_analysis_params = {}
 
         try:
-            security_analysis_params["key"] = parse_expr(self.json_parsed["key"])
-            security_analysis_params["k_encodings"] = [parse_expr(x) for x in self.json_parsed["k"]] 
-            security_analysis_params["c_encodings"] = [parse_expr(x) for x in self.json_parsed["c"]]  
-            security_analysis_params["mpk_encodings"] = [parse_expr(x) for x in self.json_parsed["mpk"]] 
-            security_analysis_params["unknown"] = [parse_expr(x) for x in self.json_parsed["unknown_vars"]] 
-            security_analysis_params["corruptable_vars"] = [parse_expr(x) for x in self.json_parsed["corruptable_vars"]] 
+            security_analysis_params["key"] = self.parse(self.json_parsed["key"])
+            security_analysis_params["k_encodings"] = [self.parse(x) for x in self.json_parsed["k"]] 
+            security_analysis_params["c_encodings"] = [self.parse(x) for x in self.json_parsed["c"]]  
+            security_analysis_params["mpk_encodings"] = [self.parse(x) for x in self.json_parsed["mpk"]] 
+            security_analysis_params["unknown"] = [self.parse(x) for x in self.json_parsed["unknown_vars"]] 
+            security_analysis_params["corruptable_vars"] = [self.parse(x) for x in self.json_parsed["corruptable_vars"]] 
         except:
             security_analysis_params = None
 
+        self.intern_params(security_analysis_params)
+
         return security_analysis_params
 
+    @traced("parse_config")
     def generate_all_params(self):
         """
         Based on the JSON input files, it generates a dictionary
@@ -302,12 +368,12 @@ class ParseConfig():
 
         try:
             security_params_json = self.json_parsed["security"]
-            security_params["key"] = parse_expr(security_params_json["key"])
-            security_params["k_encodings"] = [parse_expr(x) for x in security_params_json["k"]] 
-            security_params["c_encodings"] = [parse_expr(x) for x in security_params_json["c"]]  
-            security_params["mpk_encodings"] = [parse_expr(x) for x in security_params_json["mpk"]] 
-            security_params["unknown"] = [parse_expr(x) for x in security_params_json["unknown_vars"]] 
-            security_params["corruptable_vars"] = [parse_expr(x) for x in security_params_json["corruptable_vars"]] 
+            security_params["key"] = self.parse(security_params_json["key"])
+            security_params["k_encodings"] = [self.parse(x) for x in security_params_json["k"]] 
+            security_params["c_encodings"] = [self.parse(x) for x in security_params_json["c"]]  
+            security_params["mpk_encodings"] = [self.parse(x) for x in security_params_json["mpk"]] 
+            security_params["unknown"] = [self.parse(x) for x in security_params_json["unknown_vars"]] 
+            security_params["corruptable_vars"] = [self.parse(x) for x in security_params_json["corruptable_vars"]] 
         except:
             security_params = None
 
@@ -319,20 +385,20 @@ class ParseConfig():
 
         try:
             dec_params_json = self.json_parsed["decryption"]
-            dec_params["key"] = parse_expr(dec_params_json["key"])
-            dec_params["k_encodings"] = [parse_expr(x) for x in dec_params_json["k"]] 
-            dec_params["c_encodings"] = [parse_expr(x) for x in dec_params_json["c"]]  
-            dec_params["mpk_encodings"] = [parse_expr(x) for x in dec_params_json["mpk"]] 
-            dec_params["gp_encodings"] = [parse_expr(x) for x in dec_params_json["gp"]] 
-            dec_params["unknown"] = [parse_expr(x) for x in dec_params_json["unknown_vars"]] 
+            dec_params["key"] = self.parse(dec_params_json["key"])
+            dec_params["k_encodings"] = [self.parse(x) for x in dec_params_json["k"]] 
+            dec_params["c_encodings"] = [self.parse(x) for x in dec_params_json["c"]]  
+            dec_params["mpk_encodings"] = [self.parse(x) for x in dec_params_json["mpk"]] 
+            dec_params["gp_encodings"] = [self.parse(x) for x in dec_params_json["gp"]] 
+            dec_params["unknown"] = [self.parse(x) for x in dec_params_json["unknown_vars"]] 
             dec_params["corruption_model"] = dec_params_json["corruption_model"]
 
             # NOTE We suppose every field is always available in the JSON file.
             # It will be empty if it is not related to a particular corruption model.
 
-            dec_params["MPK_AAi"] = [parse_expr(x) for x in dec_params_json["MPK_AAi"]] 
-            dec_params["MPK_AAj"] = [parse_expr(x) for x in dec_params_json["MPK_AAj"]] 
-            dec_params["misc_vars"] = [parse_expr(x) for x in dec_params_json["misc_vars"]] 
+            dec_params["MPK_AAi"] = [self.parse(x) for x in dec_params_json["MPK_AAi"]] 
+            dec_params["MPK_AAj"] = [self.parse(x) for x in dec_params_json["MPK_AAj"]] 
+            dec_params["misc_vars"] = [self.parse(x) for x in dec_params_json["misc_vars"]] 
             corruptable_vars_dec = dec_params_json["corruptable_vars"]
         except:
             dec_params = None
@@ -345,19 +411,22 @@ class ParseConfig():
         try:
             master_params_json = self.json_parsed["master_key"]
 
-            master_params["keyenco"] = [parse_expr(x) for x in master_params_json["k"]] 
-            master_params["masterkey"] = parse_expr(master_params_json["master_key"])
-            master_params["unknown"] = [parse_expr(x) for x in master_params_json["unknown_vars"]] 
+            master_params["keyenco"] = [self.parse(x) for x in master_params_json["k"]] 
+            master_params["masterkey"] = self.parse(master_params_json["master_key"])
+            master_params["unknown"] = [self.parse(x) for x in master_params_json["unknown_vars"]] 
             master_params["corruption_model"] = master_params_json["corruption_model"]
 
-            master_params["MPK_CA"] = [parse_expr(x) for x in master_params_json["MPK_CA"]] 
-            master_params["MPK_AA"] = [parse_expr(x) for x in master_params_json["MPK_AA"]] 
-            master_params["MPK_vars"] = [parse_expr(x) for x in master_params_json["MPK_vars"]] 
-            master_params["GP_vars"] = [parse_expr(x) for x in master_params_json["GP_vars"]] 
+            master_params["MPK_CA"] = [self.parse(x) for x in master_params_json["MPK_CA"]] 
+            master_params["MPK_AA"] = [self.parse(x) for x in master_params_json["MPK_AA"]] 
+            master_params["MPK_vars"] = [self.parse(x) for x in master_params_json["MPK_vars"]] 
+            master_params["GP_vars"] = [self.parse(x) for x in master_params_json["GP_vars"]] 
             corruptable_vars_master = master_params_json["corruptable_vars"]
         except:
             master_params = None
 
+        for params in [security_params, dec_params, master_params]:
+            self.intern_params(params)
+
         return security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec 
 
 
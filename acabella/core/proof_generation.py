@@ -17,13 +17,14 @@
                                                  
 from common_methods import *
 from sympy import *
-
-init_printing(use_unicode=True)
+from analysis_context import AnalysisContext
+from tracing import annotate, traced
 
 """proof_generation.py: Methods utilized for the automatic
 generation of proofs of ABE schemes."""     
 
-def generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown):
+@traced("generate_proof_co_selective")
+def generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown, context=None):
     """
     Generates an AC17 co-selective proof.
    
@@ -34,11 +35,12 @@ def generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown)
         cenc (list): Ciphertext encodings.
         benc (list): Public key encodings.
         unknown (list): Unknown variables.
+        context (AnalysisContext): Shared intermediate results of the scheme, if any.
         
     Returns:
         (list): Co-selective proof.
     """    
-    output = generate_proof_selective(masterkey, special_s, cenc, kenc, benc, unknown)
+    output = generate_proof_selective(masterkey, special_s, cenc, kenc, benc, unknown, context)
     (benc_mats, rvectors_nonlone, rvectors_lone, svectors_nonlone, svectors_lone) = output
     
     if benc_mats == None:
@@ -72,7 +74,8 @@ def generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown)
     output = (benc_mats_new, svectors_nonlone_new, svectors_lone_new, rvectors_nonlone_new, rvectors_lone_new)
     return output
 
-def generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown):
+@traced("generate_proof_selective")
+def generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown, context=None):
     """
     Generates an AC17 selective proof.
    
@@ -83,19 +86,23 @@ def generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown):
         cenc (list): Ciphertext encodings.
         benc (list): Public key encodings.
         unknown (list): Unknown variables.
+        context (AnalysisContext): Shared intermediate results of the scheme, if any.
         
     Returns:
         (list): Selective proof.
     """    
-    kenc = canonical(kenc)
-    cenc = canonical(cenc)
-    (matk, uvectork) = writeencodingasprod(kenc, unknown)
-    (matc, uvectorc) = writeencodingasprod(cenc, unknown)
+    if context is None:
+        context = AnalysisContext()
+
+    kenc = context.canonical(kenc)
+    cenc = context.canonical(cenc)
+    (matk, uvectork) = context.writeencodingasprod(kenc, unknown)
+    (matc, uvectorc) = context.writeencodingasprod(cenc, unknown)
     
     Mat_k = Matrix(matk)
     Mat_c = Matrix(matc)
     
-    nonlone_c = determine_non_lone_vars_in_uvector(cenc, benc, uvectorc)
+    nonlone_c = context.determine_non_lone_vars_in_uvector(cenc, benc, uvectorc)
     
     (sublist_nonlones_c, sublist_lones_c) = sublistslonenonlone(nonlone_c)
     
@@ -104,14 +111,15 @@ def generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown):
     # this can also be run with extend_mat_and_vec but yields larger vectors and matrices
     (Mat_c, uvectorc) = extend_mat_and_vec2(Mat_c, uvectorc, benc, sublist_nonlones_c)
     
-    kern_c = Mat_c.nullspace()
+    kern_c = context.nullspace(Mat_c)
+    annotate(ciphertext_matrix="%dx%d" % shape(Mat_c), ciphertext_kernel_dim=len(kern_c))
     
     if len(kern_c) == 0:
         # print("\n - No proof found.\n")
         return (None, None, None, None, None)
     (benc_mats, _) = construct_benc_mats(benc, sublist_nonlones_c, uvectorc, kern_c)
     
-    nonlone_k = determine_non_lone_vars_in_uvector(kenc, benc, uvectork)
+    nonlone_k = context.determine_non_lone_vars_in_uvector(kenc, benc, uvectork)
     
     (sublist_nonlones_k, sublist_lones_k) = sublistslonenonlone(nonlone_k)
     
@@ -130,7 +138,8 @@ def generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown):
     svectors_lone = construct_lone_vects(benc, sublist_lones_c, uvectorc, kern_c, bm_columns)
     
     (big_matrix, big_uvector) = merge_matrices(Mat_c, Mat_k, uvectorc, uvectork, sublist_nonlones_c, sublist_nonlones_k)
-    kern_bm = big_matrix.nullspace()
+    kern_bm = context.nullspace(big_matrix)
+    annotate(merged_matrix="%dx%d" % shape(big_matrix), merged_kernel_dim=len(kern_bm))
     if len(kern_bm) == 0:
         return (None, None, None, None, None)
     
@@ -142,6 +151,7 @@ def generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown):
     output = (benc_mats, svectors_nonlone, svectors_lone, rvectors_nonlone, rvectors_lone)
     return output
 
+@traced("normalize_substitutions")
 def normalize_substitutions(masterkey, special_s, proofs):
     """
     Ensures that the first entry of the master-key and special non-lone s is 1.
@@ -586,7 +596,8 @@ def determine_non_lone_vars_in_uvector(enc, benc, uvector):
         list_nonlone.append((x, non_lone))
     return list_nonlone
 
-def check_kernel_products(masterkey, special_s, kenc, cenc, benc, unknown):
+@traced("check_kernel_products")
+def check_kernel_products(masterkey, special_s, kenc, cenc, benc, unknown, context=None):
     """
     Checks whether the kernel contains vectors that are not zero in the important entries.
 
@@ -597,20 +608,24 @@ def check_kernel_products(masterkey, special_s, kenc, cenc, benc, unknown):
         cenc (list): Ciphertext encodings.
         benc (list): Public key encodings.
         unknown (list): Unknown variables.
+        context (AnalysisContext): Shared intermediate results of the scheme, if any.
 
     Returns:
         (list): Equations found.
         (list): Equations.
     """   
-    kenc = canonical(kenc)
-    cenc = canonical(cenc)
+    if context is None:
+        context = AnalysisContext()
+
+    kenc = context.canonical(kenc)
+    cenc = context.canonical(cenc)
     
     penc = []
     for k_el in kenc:
         for c_el in cenc:
             penc.append(cancel(k_el*c_el))
     
-    (mat,uvector) = writeencodingasprod(penc, unknown)
+    (mat,uvector) = context.writeencodingasprod(penc, unknown)
     
     BigMat = Matrix(mat)
     
@@ -621,7 +636,15 @@ def check_kernel_products(masterkey, special_s, kenc, cenc, benc, unknown):
             mk_index = ctr
         ctr += 1
     
-    kern = BigMat.nullspace()
+    # the master key cannot be isolated, see linear_algebra.screen_ranks
+    if context.screen_independent_columns(BigMat, [mk_index]):
+        return (False, [])
+
+    # only the component of the master key is solved, see matrix_reduction
+    (reduction, kern) = context.reduced_nullspace("kernel products", BigMat, [mk_index])
+    annotate(matrix="%dx%d" % shape(BigMat), kernel_dim=len(kern) if kern is not None else 0)
+    if kern is None:
+        return (False, [])
     
     eqs = []
     eqsfound = False
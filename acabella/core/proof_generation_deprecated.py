@@ -3,8 +3,6 @@
 from common_methods import *
 from sympy import *
 
-init_printing(use_unicode=True)
-
 def generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown):
     output = generate_proof_selective(masterkey, special_s, cenc, kenc, benc, unknown)
     (benc_mats, rvectors_nonlone, rvectors_lone, svectors_nonlone, svectors_lone) = output
@@ -17,12 +17,12 @@
                
 from common_methods import *
 from sympy import *
-
-init_printing(use_unicode=True)
+from tracing import traced
 
 """proof_verification.py: Methods utilized for the automatic
 verification of proofs."""     
 
+@traced("verify_proof")
 def verify_proof(masterkey, special_s, kenc, cenc, benc, proofs):
     """
     Checks if the symbolic property holds.
@@ -293,6 +293,7 @@ def eval_poly(is_key_encoding, poly, substitutions, benc):
         return sum_poly
 
 
+@traced("verify_collusion_security_only")
 def verify_collusion_security_only(masterkey, special_s, kenc, cenc, benc, proofs):
     """
     Verifies the security against collusion by inspecting the security proofs
@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""result_cache.py: Persistent, content-addressed cache of analysis results"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from version import source_version
+
+# JSON entries that describe sets of variables, their order is irrelevant
+SET_KEYS = ["unknown_vars", "known_vars", "unknown"]
+
+# JSON entries that do not influence the result of the analysis
+IGNORED_KEYS = ["scheme_id"]
+
+# JSON entries that are policies, not expressions
+POLICY_KEYS = ["policy"]
+
+def default_cache_dir() -> str:
+    """
+    Returns the default location of the cache, i.e.
+    $XDG_CACHE_HOME/acabella or ~/.cache/acabella.
+
+    Returns:
+        (str): Path to the cache directory.
+    """
+    base = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+    return os.path.join(base, "acabella")
+
+def canonical_expr(data: str) -> str:
+    """
+    Normalizes an expression of the ACABELLA JSON format, so that
+    e.g. "(alpha + r) / b" and "(alpha+r)/b" are equal.
+
+    Parameters:
+        data (str): Expression.
+
+    Returns:
+        (str): srepr of the parsed expression, or data if it cannot be parsed.
+    """
+    # SymPy is only loaded once a key has to be computed
+    from sympy import parse_expr, srepr
+
+    try:
+        return srepr(parse_expr(data))
+    except Exception:
+        return data
+
+def canonical_policy(data: str) -> str:
+    """
+    Normalizes a policy of the ACABELLA JSON format, so that e.g.
+    "1 and (2 or 3)" and "1 and (2  or 3)" are equal. Policies are not
+    parsed as expressions, where "and" and "or" would be evaluated.
+
+    Parameters:
+        data (str): Policy.
+
+    Returns:
+        (str): Parsed policy, or data if it cannot be parsed.
+    """
+    # imported lazily as well, access_structures loads SymPy
+    from access_structures import parse_policy
+
+    try:
+        return repr(parse_policy(data))
+    except ValueError:
+        return data
+
+def canonicalize_config(data):
+    """
+    Normalizes (a section of) a parsed ACABELLA JSON configuration:
+    keys are sorted, expressions are replaced by their srepr and the
+    lists of variables are sorted.
+
+    Parameters:
+        data: Parsed JSON data (dict, list or str).
+
+    Returns:
+        Normalized data.
+    """
+    if isinstance(data, dict):
+        normalized = {}
+        for key in sorted(data):
+            if key in IGNORED_KEYS:
+                continue
+            if key in POLICY_KEYS and isinstance(data[key], str):
+                value = canonical_policy(data[key])
+            else:
+                value = canonicalize_config(data[key])
+            if key in SET_KEYS and isinstance(value, list):
+                value = sorted(value, key=json.dumps)
+            normalized[key] = value
+        return normalized
+    if isinstance(data, list):
+        return [canonicalize_config(x) for x in data]
+    if isinstance(data, str):
+        return canonical_expr(data)
+    return data
+
+def config_key(json_parsed: dict, analysis: str) -> str:
+    """
+    Computes the cache key of an analysis of a configuration.
+
+    Parameters:
+        json_parsed (dict): ParseConfig.json_parsed.
+        analysis (str): Type of analysis (mk, da, sec, all, comp).
+
+    Returns:
+        (str): SHA-256 digest in hexadecimal.
+    """
+    canonical = {
+        "version": source_version(),
+        "analysis": analysis,
+        "config": canonicalize_config(json_parsed),
+    }
+    data = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def raw_config_key(json_parsed: dict, analysis: str) -> str:
+    """
+    Computes a key of an analysis from the configuration as written,
+    without parsing its expressions, so that a cached result can be
+    found without loading SymPy. It is stored as an alias of the
+    config_key, see ResultCache.link.
+
+    Parameters:
+        json_parsed (dict): ParseConfig.json_parsed.
+        analysis (str): Type of analysis (mk, da, sec, all, comp).
+
+    Returns:
+        (str): SHA-256 digest in hexadecimal.
+    """
+    if isinstance(json_parsed, dict):
+        json_parsed = {key: value for (key, value) in json_parsed.items() if not key in IGNORED_KEYS}
+
+    raw = {
+        "version": source_version(),
+        "analysis": analysis,
+        "raw_config": json_parsed,
+    }
+    data = json.dumps(raw, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def render_cached_solution(entry: dict) -> tuple:
+    """
+    Prints a result stored by AnalysisWithCorruption.show_solution.
+
+    Parameters:
+        entry (dict): Cached result.
+
+    Returns:
+        solution (list): The results obtained.
+        proof_data (list): LaTeX proof data.
+        proof_header (str): LaTeX proof header.
+    """
+    print("\n[*] Results obtained from the cache:\n")
+
+    for line in entry["sol_list"]:
+        if not line in ["sec_placeholder", "mk_placeholder", "da_placeholder"]:
+            print(line)
+
+    if entry["proof_header"]:
+        print(entry["proof_header"])
+
+    return list(entry["sol_list"]), entry["proof_data"], entry["proof_header"]
+
+class ResultCache:
+    """
+    On-disk cache of analysis results. Every entry is stored as a JSON
+    file named after its key. The least recently used entries are
+    evicted when the cache exceeds max_entries or max_bytes. Aliases
+    are stored beside the entries, in files holding the key of their
+    entry; they do not count towards the limits and are removed with
+    their entry.
+
+    Attributes:
+        cache_dir (str): Directory holding the entries.
+        max_entries (int): Maximum number of entries.
+        max_bytes (int): Maximum total size of the entries.
+    """
+
+    def __init__(self) -> None:
+        self.cache_dir = None
+        self.max_entries = 256
+        self.max_bytes = 64 * 1024 * 1024
+
+    def init(self, cache_dir: str = None, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Initializes the cache.
+
+        Parameters:
+            cache_dir (str): Directory holding the entries, by default default_cache_dir().
+            max_entries (int): Maximum number of entries.
+            max_bytes (int): Maximum total size of the entries.
+        """
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_path(self, key: str) -> str:
+        """
+        Returns the path of the entry with the given key.
+
+        Parameters:
+            key (str): Cache key.
+
+        Returns:
+            (str): Path to the entry.
+        """
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def alias_path(self, alias: str) -> str:
+        """
+        Returns the path of the alias with the given name.
+
+        Parameters:
+            alias (str): Alias.
+
+        Returns:
+            (str): Path to the alias.
+        """
+        return os.path.join(self.cache_dir, alias + ".alias")
+
+    def get(self, key: str):
+        """
+        Returns the stored result for key, or None on a miss. A hit
+        marks the entry as recently used.
+
+        Parameters:
+            key (str): Cache key or alias.
+
+        Returns:
+            (dict): Stored result.
+        """
+        path = self.entry_path(key)
+        if not os.path.exists(path):
+            try:
+                with open(self.alias_path(key), "r") as read_file:
+                    path = self.entry_path(read_file.read().strip())
+            except OSError:
+                return None
+
+        try:
+            with open(path, "r") as read_file:
+                value = json.load(read_file)
+        except (OSError, ValueError):
+            return None
+        self.touch(path)
+        return value
+
+    def link(self, alias: str, key: str) -> None:
+        """
+        Makes the entry of key also available under alias, until the
+        entry is evicted.
+
+        Parameters:
+            alias (str): Alias, e.g. a raw_config_key.
+            key (str): Key of the entry.
+        """
+        if alias != key:
+            self.write(self.alias_path(alias), key)
+
+    def touch(self, path: str) -> None:
+        """
+        Marks the entry at path as the most recently used one.
+
+        Parameters:
+            path (str): Path to the entry.
+        """
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except OSError:
+            pass
+
+    def put(self, key: str, value: dict) -> None:
+        """
+        Stores a result and evicts the least recently used entries if needed.
+
+        Parameters:
+            key (str): Cache key.
+            value (dict): JSON serializable result.
+        """
+        path = self.entry_path(key)
+        self.write(path, json.dumps(value))
+        self.touch(path)
+        self.evict()
+
+    def write(self, path: str, data: str) -> None:
+        """
+        Atomically replaces the file at path, through a temporary file
+        of its own, as processes and threads may write the same path.
+
+        Parameters:
+            path (str): Path to the file.
+            data (str): Contents of the file.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as write_file:
+                write_file.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def evict(self) -> None:
+        """
+        Removes the least recently used entries until the cache fits
+        in max_entries and max_bytes, and the aliases of the entries
+        that no longer exist.
+        """
+        entries = []
+        aliases = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".alias"):
+                aliases.append(name)
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, name))
+
+        entries.sort(reverse=True)
+        total = 0
+        for index, (_, size, name) in enumerate(entries):
+            total += size
+            if index >= self.max_entries or total > self.max_bytes:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+        for name in aliases:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path, "r") as read_file:
+                    key = read_file.read().strip()
+                if not os.path.exists(self.entry_path(key)):
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Removes every entry of the cache.
+        """
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json") or name.endswith(".alias"):
+                os.remove(os.path.join(self.cache_dir, name))
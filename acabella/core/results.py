@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""results.py: Typed results of the attacks and the security analysis.
+The results keep the SymPy objects computed by the analysis and only
+render them as text, LaTeX or JSON when asked for"""
+
+from dataclasses import dataclass, field
+
+from sympy import Symbol, latex, simplify
+
+# note appended to the negative results decided by the modular screening
+SCREENING_NOTE = "(decided by modular screening, error probability <= {:.1e})"
+
+# markers of the proof log generated by security_proof.generate_the_proofs
+SELECTIVE_PROOF_MARKER = "\n The selective proof: \n"
+CO_SELECTIVE_PROOF_MARKER = "\n The co-selective proof: \n"
+
+@dataclass(slots=True)
+class EncodingDescriptor:
+    """
+    An encoding involved in an attack, e.g. "k0" or "k0[i]*c0".
+
+    Attributes:
+        name (str): Name of the encoding.
+        expr: Encoding (SymPy expression).
+    """
+    name: str
+    expr: object
+
+    def render(self) -> str:
+        """
+        Returns the encoding as it is listed in the reports.
+
+        Returns:
+            (str): "name : expr".
+        """
+        return str(self.name) + " : " + str(self.expr)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the encoding.
+        """
+        return {"name": str(self.name), "expr": str(self.expr)}
+
+@dataclass(slots=True)
+class AttackVector:
+    """
+    Linear combination of the encodings that recovers the target.
+
+    Attributes:
+        encodings (list): Names of the encodings.
+        coefficients (list): Coefficient (SymPy expression) of every encoding.
+    """
+    encodings: list
+    coefficients: list
+
+    def __post_init__(self) -> None:
+        if len(self.encodings) != len(self.coefficients):
+            raise ValueError("AttackVector: mismatch in encoding and coefficient lists")
+
+    def terms(self) -> list:
+        """
+        Returns:
+            (list): (encoding, coefficient) pairs with a non-zero coefficient.
+        """
+        return [(e, c) for e, c in zip(self.encodings, self.coefficients) if c != 0]
+
+    def render(self, msg: str) -> str:
+        """
+        Renders the attack vector, see Attack.format_solution.
+
+        Parameters:
+            msg (str): Message that precedes the linear combination.
+
+        Returns:
+            (str): The attack as presented to the user.
+        """
+        mul_list = [simplify(Symbol(str(a)) * Symbol(str(b))) for a, b in self.terms()]
+
+        return msg + " + ".join("{}".format(e) for e in mul_list)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the attack vector.
+        """
+        return {"terms": [{"encoding": str(e), "coefficient": str(c)} for e, c in self.terms()]}
+
+@dataclass(slots=True)
+class AttackResult:
+    """
+    Result of a master key, decryption or conditional decryption attack.
+
+    Attributes:
+        kind (str): "master_key", "decryption" or "conditional".
+        found (bool): An attack was found.
+        sol_msg (str): Message to report if the attack is found.
+        not_found_msg (str): Message to report if the attack is not found.
+        vector (AttackVector): The attack, if found.
+        encodings (list): EncodingDescriptor of the encodings involved in the attack.
+        error_bound (float): Bound on the probability that the attack was
+            missed, if the result was decided by the modular screening.
+    """
+    kind: str
+    found: bool
+    sol_msg: str
+    not_found_msg: str
+    vector: AttackVector = None
+    encodings: list = field(default_factory=list)
+    error_bound: float = None
+
+    def verdict(self) -> str:
+        """
+        Returns:
+            (str): "attack found" or "no attack found".
+        """
+        return "attack found" if self.found else "no attack found"
+
+    def render(self) -> str:
+        """
+        Returns:
+            (str): The result of the attack as presented to the user.
+        """
+        if self.found:
+            return self.vector.render(self.sol_msg)
+        if self.error_bound is not None:
+            return self.not_found_msg + " " + SCREENING_NOTE.format(self.error_bound)
+        return self.not_found_msg
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the result.
+        """
+        return {
+            "kind": self.kind,
+            "verdict": self.verdict(),
+            "vector": self.vector.to_dict() if self.found else None,
+            "encodings": [e.to_dict() for e in self.encodings],
+            "error_bound": self.error_bound,
+        }
+
+@dataclass(slots=True)
+class ProofResult:
+    """
+    Security proofs generated by security_proof.generate_the_proofs.
+
+    Attributes:
+        log (list): Proof log, i.e. messages interleaved with the
+                    selective and co-selective proofs (substitutions).
+    """
+    log: list
+
+    def header(self) -> list:
+        """
+        Returns:
+            (list): Messages that precede the selective proof.
+        """
+        if SELECTIVE_PROOF_MARKER in self.log:
+            return self.log[:self.log.index(SELECTIVE_PROOF_MARKER)]
+        return list(self.log)
+
+    def proof_after(self, marker: str):
+        """
+        Returns the proof that follows marker in the log.
+
+        Parameters:
+            marker (str): SELECTIVE_PROOF_MARKER or CO_SELECTIVE_PROOF_MARKER.
+
+        Returns:
+            The proof, or None if it was not found.
+        """
+        if marker in self.log:
+            index = self.log.index(marker)
+            if index + 1 < len(self.log):
+                return self.log[index + 1]
+        return None
+
+    def render_latex(self) -> tuple:
+        """
+        Renders the proofs in LaTeX for HTML, see SecurityAttack.show_proof_latex.
+
+        Returns:
+            (tuple): Proofs and header of the proof log.
+        """
+        message_log = [SELECTIVE_PROOF_MARKER]
+        post_header = False
+
+        for line in self.log:
+            if self.log[self.log.index(line) -1] == SELECTIVE_PROOF_MARKER:
+                post_header = True
+                message_log.append("\\[ " + latex(line) + " \\]")
+            elif self.log[self.log.index(line) -1] == CO_SELECTIVE_PROOF_MARKER:
+                message_log.append("\\[ " + latex(line) + " \\]")
+            else:
+                if post_header:
+                    message_log.append(line)
+
+        return '\n'.join(message_log), '\n'.join(self.header())
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the proofs.
+        """
+        selective = self.proof_after(SELECTIVE_PROOF_MARKER)
+        co_selective = self.proof_after(CO_SELECTIVE_PROOF_MARKER)
+
+        return {
+            "selective": str(selective) if selective is not None else None,
+            "co_selective": str(co_selective) if co_selective is not None else None,
+        }
+
+@dataclass(slots=True)
+class SecurityResult:
+    """
+    Result of the security analysis of a scheme.
+
+    Attributes:
+        trivial_secure (bool): The scheme is trivially secure.
+        collusion_secure (bool): The scheme is secure against collusion.
+        is_fractional (bool): The scheme is fractional.
+        log (str): Log of the trivial and collusion security checks.
+        proof (ProofResult): Security proofs, if generated.
+        error_bound (float): Bound on the probability of error of the
+            negative results decided by the modular screening, if any.
+    """
+    trivial_secure: bool
+    collusion_secure: bool
+    is_fractional: bool
+    log: str
+    proof: ProofResult = None
+    error_bound: float = None
+
+    @property
+    def kind(self) -> str:
+        return "security"
+
+    def verdict(self) -> str:
+        """
+        Returns:
+            (str): "secure", "trivially secure" or "insecure".
+        """
+        if self.trivial_secure and self.collusion_secure:
+            return "secure"
+        if self.trivial_secure:
+            return "trivially secure"
+        return "insecure"
+
+    def render(self) -> str:
+        """
+        Returns:
+            (str): The result of the analysis as presented to the user.
+        """
+        msg = "NOTE: If the scheme is MA-ABE you might try to run this check with corruption.\n\n" + str(self.log)
+        if self.error_bound is not None:
+            msg += "\n\t Negative results " + SCREENING_NOTE.format(self.error_bound) + "\n"
+        return msg
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the result.
+        """
+        return {
+            "kind": self.kind,
+            "verdict": self.verdict(),
+            "trivial_secure": bool(self.trivial_secure),
+            "collusion_secure": bool(self.collusion_secure),
+            "is_fractional": bool(self.is_fractional),
+            "proof": self.proof.to_dict() if self.proof is not None else None,
+            "error_bound": self.error_bound,
+        }
+
+@dataclass(slots=True)
+class InconclusiveResult:
+    """
+    Result of an analysis stopped because its budget was exceeded,
+    see budget.Budget.
+
+    Attributes:
+        kind (str): "security", "master_key", "decryption" or "conditional".
+        stage (str): Stage reached by the analysis.
+        resource (str): "time" or "memory".
+        limit (float): Limit of the budget (seconds or KB).
+        used (float): Time (seconds) or memory (KB) used.
+    """
+    kind: str
+    stage: str
+    resource: str
+    limit: float
+    used: float
+
+    def verdict(self) -> str:
+        """
+        Returns:
+            (str): "inconclusive: budget exceeded".
+        """
+        return "inconclusive: budget exceeded"
+
+    def render(self) -> str:
+        """
+        Returns:
+            (str): The result of the analysis as presented to the user.
+        """
+        unit = "s" if self.resource == "time" else " KB"
+        return "[!] Inconclusive: {} budget of {}{} exceeded at stage {} ({}{} used)".format(self.resource, self.limit, unit, self.stage, self.used, unit)
+
+    def to_dict(self) -> dict:
+        """
+        Returns:
+            (dict): JSON serializable form of the result.
+        """
+        return {
+            "kind": self.kind,
+            "verdict": self.verdict(),
+            "stage": self.stage,
+            "resource": self.resource,
+            "limit": self.limit,
+            "used": self.used,
+        }
@@ -16,16 +16,19 @@
 # along with this program. If not, see <http://www.gnu.org/licenses/>.                 
                                                                                                                                                                        
 from common_methods import *
-from attack import Attack
+from attack import Attack, budgeted
 from enum import Enum
 from security_analysis_ac17 import *
 from trivial_security_and_collusion import analysis_trivial_and_collusion_security
 from ac17_correctness_checks import *
+from results import SecurityResult, ProofResult
+from analysis_context import AnalysisContext
+from linear_algebra import LinearAlgebraEngine
+from interned import SymbolTable
+from tracing import annotate, span, traced
 
 import sympy as sp
 
-init_printing(use_unicode=True)
-
 class SecurityAttack(Attack):
         """
         Analyzes the security of an ABE scheme.
@@ -37,7 +40,8 @@ class SecurityAttack(Attack):
             s (sp.core.list.Symbol): Representation of the blinding factor.
             key (sp.core.list.Symbol): Representation of the master key and blinding factor.
             is_fractional (bool): The scheme is fractional.
-            sol (string): Solution of the attack, if found.
+            sol (string): Rendered result of the analysis, computed on demand by show_solution.
+            result (SecurityResult): Result of the analysis.
             k_encodings (list): List of sp.core.symbol.Symbol types representing the key
                 encodings.
             c_encodings (list): List of sp.core.symbol.Symbol types representing the
@@ -49,6 +53,10 @@ class SecurityAttack(Attack):
                 unknown variables.
             trivial_secure (bool): The scheme is trivial secure.
             collusion_secure (bool): The scheme is collusion secure.
+            screening (bool): Negative results are first screened modulo a prime.
+            engine (LinearAlgebraEngine): Backend utilized for computing the kernels.
+            context (AnalysisContext): Intermediate results computed by screen,
+                reused by the next run.
         """
   
         SOL_MSG = "[*] The scheme is secure: "
@@ -65,8 +73,13 @@ class SecurityAttack(Attack):
         trivial_secure = False
         collusion_secure = False
         description = "SecurityAttack"
+        kind = "security"
         result_security = None
         proof_log = None
+        result = None
+        screening = False
+        engine = LinearAlgebraEngine.dense
+        context = None
 
         def init(self, key, k_encodings, c_encodings, mpk_encodings, unknown) -> None:
             #self.alpha = alpha
@@ -82,6 +95,8 @@ class SecurityAttack(Attack):
             self.collusion_secure = False
             self.result_security = None
             self.proof_log = None
+            self.result = None
+            self.context = None
 
         def __init__(self) -> None:
             """
@@ -100,6 +115,11 @@ class SecurityAttack(Attack):
             self.collusion_secure = False
             self.result_security = None
             self.proof_log = None
+            self.result = None
+            self.screening = False
+            self.engine = LinearAlgebraEngine.dense
+            self.table = None
+            self.context = None
 
         def show_solution(self) -> str:
             """
@@ -108,6 +128,9 @@ class SecurityAttack(Attack):
             Returns:
                 solution (str): The result of the attack.
             """
+            if self.sol is None and self.result is not None:
+                self.sol = self.result.render()
+
             return self.sol
 
         def show_proof(self) -> None:
@@ -134,37 +157,8 @@ class SecurityAttack(Attack):
 
             """
 
-            message_log = []
-            header = []
-            post_header = False
-
-            # process proof log
-
-            placeholder_1 = "\n The selective proof: \n"
-            placeholder_2 = "\n The co-selective proof: \n"
-
-            if self.proof_log:
-                for line in self.proof_log:
-                    if line == placeholder_1:
-                        break
-                    else:
-                        header.append(line)
-
-            message_log.append(placeholder_1)
-
-            if self.proof_log:
-                for line in self.proof_log:
-                    if self.proof_log[self.proof_log.index(line) -1] == placeholder_1:
-                        post_header = True
-                        message_log.append("\[ " + latex(line) + " \]")
-                    elif self.proof_log[self.proof_log.index(line) -1] == placeholder_2:
-                        message_log.append("\[ " + latex(line) + " \]")
-                    else:
-                        if post_header:
-                            message_log.append(line)
-            
-            if self.proof_log:
-                return '\n'.join(message_log), '\n'.join(header)
+            if isinstance(self.result, SecurityResult) and self.result.proof is not None:
+                return self.result.proof.render_latex()
             else:
                 return None, None
 
@@ -192,7 +186,40 @@ class SecurityAttack(Attack):
             """
             self.NOT_FOUND_MSG = msg
 
+        def set_modular_screening(self, enabled: bool) -> None:
+            """
+            Enables the randomized screening modulo a prime of the
+            matrices of the trivial security check, the kernel products
+            and the FABEO property. The negative results decided by the
+            screening are reported with a bound on the probability of error.
+  
+            Parameters:
+                enabled (bool): Screen the matrices.
+            """
+            self.screening = enabled
+
+        def set_linear_algebra_engine(self, engine: LinearAlgebraEngine) -> None:
+            """
+            Selects the backend utilized for computing the kernels of
+            the trivial security check and of the proof generation.
+
+            Parameters:
+                engine (LinearAlgebraEngine): dense, sparse or fraction_free.
+            """
+            self.engine = engine
+
+        def set_symbol_table(self, table: SymbolTable) -> None:
+            """
+            Shares a symbol table, e.g. the one of the ParseConfig of the
+            scheme, in which the encodings are interned.
+
+            Parameters:
+                table (SymbolTable): Symbol table.
+            """
+            self.table = table
         
+        @budgeted
+        @traced("security_attack")
         def run(self) -> None:
             """
             Analyze the security of the scheme with the supplied
@@ -200,23 +227,73 @@ class SecurityAttack(Attack):
             """
 
             # First, we determine the type of scheme.
-            is_fractional = not all_enc_contains_no_fractions(self.k_encodings, self.c_encodings, self.unknown)
+            with span("fractional_check"):
+                is_fractional = not all_enc_contains_no_fractions(self.k_encodings, self.c_encodings, self.unknown)
             self.is_fractional = is_fractional
 
+            # the intermediate results of a previous screen are reused
+            context = self.context if self.context is not None else AnalysisContext(self.engine, self.screening, self.table)
+            self.context = None
+
             if not is_fractional:
                 
                 # Second, we need to determine alpha and special s.
-                res, alpha, special_s = blinding_value_correct_form(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown)
+                with span("blinding_value"):
+                    res, alpha, special_s = blinding_value_correct_form(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown)
 
                 if res:
-                    self.trivial_secure, self.collusion_secure, self.result_security, self.proof_log = security_analysis(alpha, special_s, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown, [], [])
+                    self.trivial_secure, self.collusion_secure, self.result_security, self.proof_log = security_analysis(alpha, special_s, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown, [], [], context)
                 else:
-                    self.trivial_secure, self.collusion_secure, self.result_security = analysis_trivial_and_collusion_security(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown)
+                    self.trivial_secure, self.collusion_secure, self.result_security = analysis_trivial_and_collusion_security(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown, context)
             else:
-                self.trivial_secure, self.collusion_secure, self.result_security = analysis_trivial_and_collusion_security(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown)
+                self.trivial_secure, self.collusion_secure, self.result_security = analysis_trivial_and_collusion_security(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown, context)
+
+            annotate(key_encodings=len(self.k_encodings), ciphertext_encodings=len(self.c_encodings), fractional=is_fractional,
+                     context_hits=context.hits, context_misses=context.misses)
 
-            self.sol = "NOTE: If the scheme is MA-ABE you might try to run this check with corruption.\n\n"
-            self.sol += str(self.result_security)
+            # the result is rendered lazily by show_solution
+            self.sol = None
+
+            proof = ProofResult(self.proof_log) if self.proof_log else None
+            self.result = SecurityResult(self.trivial_secure, self.collusion_secure, self.is_fractional, self.result_security, proof, context.error_bound)
+
+        def screen(self):
+            """
+            Runs the cheap checks of the security analysis and yields the
+            outcome of each one as soon as it is known: the type of the
+            scheme, the AC17 form and the trivial security. The kernels
+            computed by the screen are kept for the next run, which
+            performs the complete analysis.
+
+            Yields:
+                (tuple): Stage (str) and its outcome (str), e.g.
+                    ("trivial_security", "insecure").
+            """
+            self.context = AnalysisContext(self.engine, self.screening, self.table)
+
+            with span("fractional_check"):
+                is_fractional = not all_enc_contains_no_fractions(self.k_encodings, self.c_encodings, self.unknown)
+            yield ("fractional_check", "fractional" if is_fractional else "not fractional")
+
+            correct = False
+            if not is_fractional:
+                with span("blinding_value"):
+                    res, alpha, special_s = blinding_value_correct_form(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown)
+                if res:
+                    with span("correct_form"):
+                        (correct, kenc, cenc) = correct_form_silent(self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown)
+            yield ("ac17_form", "AC17 form" if correct else "not in AC17 form")
+
+            # the same checks as security_analysis and
+            # analysis_trivial_and_collusion_security, without the logs
+            with span("trivial_security") as stage:
+                if correct:
+                    (eqsfound, eqs_to_analyze) = check_kernel_products(alpha, special_s, kenc, cenc, self.mpk_encodings, self.unknown, self.context)
+                    trivial_secure = eqsfound and any(eq != 0 for eq in eqs_to_analyze)
+                else:
+                    trivial_secure = verify_trivial_security_generalized(self.key, self.k_encodings, self.c_encodings, self.mpk_encodings, self.unknown, self.context)[0]
+                stage.set(secure=trivial_secure)
+            yield ("trivial_security", "trivially secure" if trivial_secure else "insecure")
 
 
         def add_corruptable_variable_generic(self, corr: sp.core.symbol.Symbol) -> None:
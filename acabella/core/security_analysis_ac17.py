@@ -22,10 +22,11 @@ from encodings_helper import *
 from trivial_security_and_collusion import *
 from security_proof import *
 from FABEO_properties import *
+from analysis_context import AnalysisContext
+from tracing import span, traced
 
-init_printing(use_unicode=True)
-
-def security_analysis(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints):
+@traced("security_analysis")
+def security_analysis(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints, context=None):
     """
     This is the main function that performs all steps relevant to the security analysis of a scheme satisfying the AC17 form
    
@@ -38,6 +39,8 @@ def security_analysis(masterkey, special_s, kenc, cenc, benc, unknown, controlle
         unknown (list): Unknown variables.
         controlled (bool): Flag
         constraints (list): List of constraints.
+        context (AnalysisContext): Shared intermediate results of the scheme. By
+            default, a new context is shared by all the stages of the analysis.
         
     Returns:
         (bool): The scheme is trivial secure.
@@ -48,7 +51,13 @@ def security_analysis(masterkey, special_s, kenc, cenc, benc, unknown, controlle
     analysis_log = []
     proof_log = []
 
-    (correct, kenc, cenc, ac17_log) = correct_form(kenc, cenc, benc, unknown)
+    # every stage decomposes the same encodings and computes the
+    # kernels of the same matrices
+    if context is None:
+        context = AnalysisContext()
+
+    with span("correct_form", key_encodings=len(kenc), ciphertext_encodings=len(cenc)):
+        (correct, kenc, cenc, ac17_log) = correct_form(kenc, cenc, benc, unknown)
     analysis_log.append(ac17_log)
     
     if not correct:
@@ -66,19 +75,24 @@ def security_analysis(masterkey, special_s, kenc, cenc, benc, unknown, controlle
 
         #print("\n == Performing simple trivial security check.. ==")
         analysis_log.append("\n == Performing simple trivial security check.. ==")
-        trivial_secure, log_trivial_security = verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints)
+        with span("trivial_security") as stage:
+            trivial_secure, log_trivial_security = verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints, context)
+            stage.set(secure=trivial_secure)
         analysis_log.append(log_trivial_security)
 
         #print("\n == Performing collusion security checks.. ==")
         analysis_log.append("\n == Performing collusion security checks.. ==")
-        collusion_secure, log = generate_the_proofs_and_check_collusion(masterkey, special_s, kenc, cenc, benc, unknown)
+        with span("collusion_security") as stage:
+            collusion_secure, log = generate_the_proofs_and_check_collusion(masterkey, special_s, kenc, cenc, benc, unknown, context)
+            stage.set(secure=collusion_secure)
         analysis_log.append(log)
         
-        log = FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown)
+        with span("FABEO_properties"):
+            log = FABEO_properties(masterkey, special_s, kenc, cenc, benc, unknown, context)
         analysis_log.append(log)
         
         if trivial_secure and collusion_secure: 
-            proof_log = generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown)
+            proof_log = generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown, context)
 
         return (trivial_secure, collusion_secure, '\n'.join(analysis_log), proof_log)
 
@@ -21,25 +21,37 @@ from proof_generation import *
 from proof_verification import * 
 from ac17_correctness_checks import *
 from encodings_helper import *
-
-init_printing(use_unicode=True)
+from tracing import traced
 
 # this helper function can generate encodings automatically using the encodings_helper
-def generate_the_encodings_then_the_proofs(masterkey, special_s, benc, kenc_fixed, kenc_att, cenc_fixed, cenc_att, unknown, prefixes, nr_indexed_encodings):
-    att_range_key_1 = [1,3]
-    att_range_ct = [1,2]
-    
-    benc = create_b_encoding([], benc, [1,2,3])
-    cenc = create_ciphertext_encoding(cenc_fixed, cenc_att, special_s, att_range_ct, prefixes, nr_indexed_encodings)    
+# the attributes of the key and of the ciphertext default to [1,3] and [1,2]
+# the ciphertext is encrypted under the AND-policy over its attributes, or
+# under policy (a formula, see access_structures.parse_policy) if given
+@traced("generate_the_encodings_then_the_proofs")
+def generate_the_encodings_then_the_proofs(masterkey, special_s, benc, kenc_fixed, kenc_att, cenc_fixed, cenc_att, unknown, prefixes, nr_indexed_encodings, att_range_key_1 = None, att_range_ct = None, context=None, policy=None):
+    if att_range_key_1 is None:
+        att_range_key_1 = [1,3]
+    if att_range_ct is None:
+        att_range_ct = [1,2]
+    if isinstance(policy, str):
+        policy = parse_policy(policy)
+    if policy is not None:
+        att_range_ct = policy.attributes()
+    benc = create_b_encoding([], benc, sorted(set(att_range_key_1) | set(att_range_ct)))
+    if policy is not None:
+        cenc = create_ciphertext_encoding_for_policy(cenc_fixed, cenc_att, special_s, policy, prefixes, nr_indexed_encodings)
+    else:
+        cenc = create_ciphertext_encoding(cenc_fixed, cenc_att, special_s, att_range_ct, prefixes, nr_indexed_encodings)    
     
     kenc = create_key_encoding(kenc_fixed, kenc_att, att_range_key_1, prefixes, nr_indexed_encodings, [1])
     unknown2 = generate_unknown_variable_set(kenc, cenc, benc, att_range_ct, att_range_key_1)
     unknown = merge_lists(unknown, unknown2)
     
-    generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown)
+    return generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown, context)
 
 # this function generates the proofs for the given encodings
-def generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown):
+@traced("generate_the_proofs")
+def generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown, context=None):
 
     process_log = []
 
@@ -53,7 +65,7 @@ def generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown):
         process_log.append("\t\tKey encodings: \t\t\t" + str(kenc) + "\n")
         #pprint("\t\tCiphertext encodings: \t" + str(cenc) + "\n", use_unicode=True)
         process_log.append("\t\tCiphertext encodings: \t" + str(cenc) + "\n")
-        output = generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown)
+        output = generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown, context)
         output = normalize_substitutions(masterkey, special_s, output)
         if output[0] != None:
             #print("\n The selective proof: \n")
@@ -74,7 +86,7 @@ def generate_the_proofs(masterkey, special_s, kenc, cenc, benc, unknown):
             #print("\n No selective proof found.\n")
             process_log.append("\n No selective proof found.\n")
             
-        output2 = generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown)
+        output2 = generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown, context)
         output2 = normalize_substitutions(masterkey, special_s, output2)
         if output2[0] != None:
             #print("\n The co-selective proof: \n")
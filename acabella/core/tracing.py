@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""tracing.py: Spans recording the time spent in the stages of the
+analysis, together with the shapes of the matrices and the dimensions
+of the kernels, exported in the Chrome trace event format. Opening a
+span is also a checkpoint of the active budgets, see budget.py"""
+
+import functools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from budget import ACTIVE_BUDGETS, checkpoint
+
+class Span:
+    """
+    Timed stage of the analysis, utilized as a context manager.
+
+    Attributes:
+        name (str): Name of the stage.
+        args (dict): Annotations of the stage (matrix shapes, kernel dimensions...).
+        tid (int): Thread that executed the stage.
+        start (int): Start time in nanoseconds.
+        end (int): End time in nanoseconds.
+        children (int): Time spent in nested spans in nanoseconds.
+    """
+
+    __slots__ = ("tracer", "name", "args", "tid", "start", "end", "children")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.tid = threading.get_ident()
+        self.start = 0
+        self.end = 0
+        self.children = 0
+
+    def __enter__(self) -> "Span":
+        self.tracer.stack().append(self)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.end = time.perf_counter_ns()
+        stack = self.tracer.stack()
+        stack.pop()
+        if stack:
+            stack[-1].children += self.end - self.start
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.spans.append(self)
+
+    def set(self, **args) -> None:
+        """
+        Annotates the span.
+
+        Parameters:
+            args: Annotations, e.g. rows=3, cols=5.
+        """
+        self.args.update(args)
+
+class DisabledSpan:
+    """
+    Span returned while tracing is disabled, which does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self) -> "DisabledSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+    def set(self, **args) -> None:
+        pass
+
+DISABLED_SPAN = DisabledSpan()
+
+@dataclass(slots=True)
+class SpanSummary:
+    """
+    Aggregated timings of the spans with the same name.
+
+    Attributes:
+        name (str): Name of the stage.
+        calls (int): Number of spans.
+        total (float): Total time in milliseconds.
+        own (float): Time in milliseconds not spent in nested spans.
+        max (float): Longest span in milliseconds.
+    """
+    name: str
+    calls: int = 0
+    total: float = 0.0
+    own: float = 0.0
+    max: float = 0.0
+
+class Tracer:
+    """
+    Collects the spans of the analysis. While disabled, span() returns
+    a shared DisabledSpan, so the instrumented code only pays for one
+    attribute lookup and an empty with statement.
+
+    Attributes:
+        enabled (bool): Spans are recorded.
+        spans (list): Finished spans.
+        origin (int): Time in nanoseconds at which the tracing was enabled.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.spans = []
+        self.origin = 0
+        self.local = threading.local()
+
+    def enable(self) -> None:
+        """
+        Discards the recorded spans and starts recording.
+        """
+        self.spans = []
+        self.origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Stops recording. The recorded spans are kept.
+        """
+        self.enabled = False
+
+    def stack(self) -> list:
+        """
+        Returns:
+            (list): Open spans of the current thread.
+        """
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def span(self, name: str, **args):
+        """
+        Opens a span.
+
+        Parameters:
+            name (str): Name of the stage.
+            args: Annotations of the stage.
+
+        Returns:
+            (Span): Span, a DisabledSpan if tracing is disabled.
+        """
+        if ACTIVE_BUDGETS:
+            checkpoint(name)
+        if not self.enabled:
+            return DISABLED_SPAN
+        return Span(self, name, args)
+
+    def annotate(self, **args) -> None:
+        """
+        Annotates the innermost open span of the current thread.
+
+        Parameters:
+            args: Annotations, e.g. kernel_dim=2.
+        """
+        if not self.enabled:
+            return
+        stack = self.stack()
+        if stack:
+            stack[-1].args.update(args)
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Converts the spans to complete events ("ph": "X") of the Chrome
+        trace event format, which can be loaded in chrome://tracing or
+        https://ui.perfetto.dev.
+
+        Returns:
+            (dict): Trace.
+        """
+        pid = os.getpid()
+        events = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            events.append({"name": span.name, "cat": "acabella", "ph": "X", "pid": pid, "tid": span.tid,
+                           "ts": (span.start - self.origin) / 1000, "dur": (span.end - span.start) / 1000,
+                           "args": {key: value if isinstance(value, (int, float, str, bool)) or value is None else str(value)
+                                    for (key, value) in span.args.items()}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Writes the spans to a file in the Chrome trace event format.
+
+        Parameters:
+            path (str): Output file.
+        """
+        with open(path, "w") as write_file:
+            json.dump(self.to_chrome_trace(), write_file)
+
+    def summary(self) -> list:
+        """
+        Aggregates the spans by name.
+
+        Returns:
+            (list): SpanSummary of every name, the longest first.
+        """
+        summaries = {}
+        for span in self.spans:
+            summary = summaries.setdefault(span.name, SpanSummary(span.name))
+            duration = (span.end - span.start) / 1e6
+            summary.calls += 1
+            summary.total += duration
+            summary.own += duration - span.children / 1e6
+            summary.max = max(summary.max, duration)
+
+        return sorted(summaries.values(), key=lambda summary: summary.total, reverse=True)
+
+    def summary_table(self) -> str:
+        """
+        Returns:
+            (str): Table of the aggregated timings.
+        """
+        lines = ["{:<36} {:>7} {:>12} {:>12} {:>12}".format("stage", "calls", "total (ms)", "own (ms)", "max (ms)")]
+        for summary in self.summary():
+            lines.append("{:<36} {:>7} {:>12.2f} {:>12.2f} {:>12.2f}".format(summary.name, summary.calls, summary.total, summary.own, summary.max))
+
+        return "\n".join(lines)
+
+TRACER = Tracer()
+
+def span(name: str, **args):
+    """
+    Opens a span of the global tracer, see Tracer.span.
+
+    Parameters:
+        name (str): Name of the stage.
+        args: Annotations of the stage.
+
+    Returns:
+        (Span): Span, a DisabledSpan if tracing is disabled.
+    """
+    if ACTIVE_BUDGETS:
+        checkpoint(name)
+    if not TRACER.enabled:
+        return DISABLED_SPAN
+    return Span(TRACER, name, args)
+
+def annotate(**args) -> None:
+    """
+    Annotates the innermost open span of the global tracer.
+
+    Parameters:
+        args: Annotations.
+    """
+    TRACER.annotate(**args)
+
+def traced(name: str):
+    """
+    Decorator wrapping every call of a function in a span of the
+    global tracer.
+
+    Parameters:
+        name (str): Name of the stage.
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if ACTIVE_BUDGETS:
+                checkpoint(name)
+            if not TRACER.enabled:
+                return function(*args, **kwargs)
+            with Span(TRACER, name, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
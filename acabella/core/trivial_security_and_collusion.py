@@ -20,16 +20,16 @@ from sympy import *
 from proof_generation import *
 from proof_verification import * 
 from ac17_correctness_checks import *
-
-init_printing(use_unicode=True)
+from linear_algebra import LinearAlgebraEngine, linear_combination
+from tracing import traced
 
 ## The first two functions are for the AC17 case ##
 # verifies the trivial security of a scheme that satisfies the AC17 form
-def verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints):
+def verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints, context=None):
 
     msg_log = []
 
-    (eqsfound, eqs_to_analyze) = check_kernel_products(masterkey, special_s, kenc, cenc, benc, unknown)
+    (eqsfound, eqs_to_analyze) = check_kernel_products(masterkey, special_s, kenc, cenc, benc, unknown, context)
     if not eqsfound:
         #print("\n\t Failed!")
         msg_log.append("\n\t Failed!")
@@ -56,14 +56,14 @@ def verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, con
 # verifies security against collusion of a scheme that satisfies the AC17 form
 # uses the security proofs for this, which implies the collusion-security check
 # in the generalized variant of this function
-def generate_the_proofs_and_check_collusion(masterkey, special_s, kenc, cenc, benc, unknown):
+def generate_the_proofs_and_check_collusion(masterkey, special_s, kenc, cenc, benc, unknown, context=None):
 
     process_log = []
 
     (correct, kenc, cenc) = correct_form_silent(kenc, cenc, benc, unknown)
     collusion_secure = False
     if correct: 
-        output = generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown)
+        output = generate_proof_selective(masterkey, special_s, kenc, cenc, benc, unknown, context)
         output = normalize_substitutions(masterkey, special_s, output)
         if output[0] != None:
             result, tmp_log = verify_collusion_security_only(masterkey, special_s, kenc, cenc, benc, output)
@@ -77,7 +77,7 @@ def generate_the_proofs_and_check_collusion(masterkey, special_s, kenc, cenc, be
             #print("\n\t [!] No selective proof found. The scheme is possibly insecure against collusion! \n")
             process_log.append("\n\t [!] No selective proof found. The scheme is possibly insecure against collusion! \n")
             
-        output2 = generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown)
+        output2 = generate_proof_co_selective(masterkey, special_s, kenc, cenc, benc, unknown, context)
         output2 = normalize_substitutions(masterkey, special_s, output2)
         if output2[0] != None:
             result2, log = verify_proof(masterkey, special_s, kenc, cenc, benc, output2)
@@ -98,23 +98,28 @@ def generate_the_proofs_and_check_collusion(masterkey, special_s, kenc, cenc, be
 
 # verifies the trivial security of the scheme
 # the blinding value is what masks the message
-def verify_trivial_security_generalized(blindingvalue, kenc, cenc, benc, unknown):
+def verify_trivial_security_generalized(blindingvalue, kenc, cenc, benc, unknown, context=None):
+
+    if context is None:
+        context = AnalysisContext()
 
     string_list = []
 
+    # all the products, not only the ones that can reach the blinding value
+    # (see gen_all_p): the transcript of the collusion check is searched in
+    # the whole kernel
     penc = gen_all_p(kenc, cenc, benc, [])
-    penc = canonical(penc)
-    
-    denoms = collect_denoms(penc, unknown)
-    denomprod = denoms_prod(denoms)
-    penc = transform_encoding_list(denomprod, penc)
-    blindingvalue = canonical([cancel(blindingvalue * denomprod)])[0]
+    # the products and the blinding value are multiplied by the least
+    # common multiple of the denominators
+    (cleared, denomlcm) = clear_denominators(penc + [blindingvalue], unknown)
+    penc = cleared[:-1]
+    blindingvalue = cleared[-1]
     
-    (mat, uvector) = writeencodingasprod(penc, unknown)
+    (mat, uvector) = writeencodingasprod(penc, unknown, context.table)
     mat = Matrix(mat)
     
     luvec1 = len(uvector)
-    target_vector = Matrix([writepolyasprod(blindingvalue, uvector, unknown)])
+    target_vector = Matrix([writepolyasprod(blindingvalue, uvector, unknown, context.table)])
     luvec2 = len(uvector)
     if luvec1 != luvec2:
         #print("\n\t Passed! The blinding value contains terms that cannot be created with the rest of the ciphertext and the key. However, because of this property, collusion security cannot be verified.")
@@ -128,7 +133,16 @@ def verify_trivial_security_generalized(blindingvalue, kenc, cenc, benc, unknown
             list_bv_indices.append(ctr)
         ctr += 1
 
-    kern = mat.nullspace()
+    # no kernel vector reaches the blinding value, see linear_algebra.screen_ranks
+    if context.screen_independent_columns(mat, list_bv_indices):
+        string_list.append("\n\t Failed!")
+        return (False, None, None, None, None, '\n'.join(string_list))
+
+    # the whole kernel is needed for the collusion check, see matrix_reduction
+    (reduction, kern) = context.reduced_nullspace("trivial security", mat, list_bv_indices, all_components=True)
+    if kern is None:
+        string_list.append("\n\t Failed!")
+        return (False, None, None, None, None, '\n'.join(string_list))
     
     kern_red = []
     kern_remainder = []
@@ -157,7 +171,10 @@ def verify_trivial_security_generalized(blindingvalue, kenc, cenc, benc, unknown
         at_least_one_nonzero = False
         for ind2 in range(len(kern_red)):
             eq_is_zero = False
-            el = cancel(kern_red[ind2][list_bv_indices[ind]])
+            el = kern_red[ind2][list_bv_indices[ind]]
+            # the kernels of the fraction_free engine are in lowest terms
+            if context.engine != LinearAlgebraEngine.fraction_free:
+                el = cancel(el)
             if not el.is_integer:
                 eq = "(" + str(el) + ")"
                 at_least_one_nonzero = True
@@ -291,7 +308,10 @@ def remove_kern_unnecessary_vecs(bv_indices, shared_indices_not_bv, kern):
     return new_kern
 
 # checks whether the scheme is secure against collusion
-def verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unknown, kern, uvector, target_vector, list_bv_indices) -> bool:
+def verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unknown, kern, uvector, target_vector, list_bv_indices, context=None) -> bool:
+    if context is None:
+        context = AnalysisContext()
+
     (lis_masterkeys, lis_vars_kenc, lis_vars_cenc, lis_vars_benc) = obtain_masterkeys(blindingvalue, kenc, cenc, benc, unknown)
     
     collusion_msg = []
@@ -313,7 +333,7 @@ def verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unkno
     
     kern = remove_kern_unnecessary_vecs(list_bv_indices, lis_shared_indices_not_bv, kern)
 
-    transcript_found, transcript_msg = print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vector, list_bv_indices, lis_shared_indices_not_bv)
+    transcript_found, transcript_msg = print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vector, list_bv_indices, lis_shared_indices_not_bv, context)
     collusion_msg.append(transcript_msg)
 
     if transcript_found:
@@ -331,7 +351,9 @@ def verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unkno
             at_least_one_nonzero = False
             for ind2 in range(len(kern)):
                 eq_is_zero = False
-                el = cancel(kern[ind2][ind])
+                el = kern[ind2][ind]
+                if context.engine != LinearAlgebraEngine.fraction_free:
+                    el = cancel(el)
                 if not el.is_integer:
                     eq = "(" + str(el) + ")"
                     at_least_one_nonzero = True
@@ -362,7 +384,9 @@ def verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unkno
     return collusion_secure, '\n'.join(collusion_msg)
 
 # generates and prints a transcript that proves trivial and collusion security of the scheme
-def print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vector, list_bv_indices, lis_shared_indices_not_bv):
+def print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vector, list_bv_indices, lis_shared_indices_not_bv, context=None):
+    if context is None:
+        context = AnalysisContext()
 
     msg_output = []
 
@@ -377,7 +401,7 @@ def print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vec
         kern_short.append(vec_s)
     
     mat_kern_short = Matrix([Matrix(vec).transpose() for vec in kern_short])
-    mks_ns = mat_kern_short.transpose().nullspace()
+    mks_ns = context.nullspace(mat_kern_short.transpose())
     
     if len(mks_ns) == 0:
         #print("\n\t The system could not find a transcript.")
@@ -387,6 +411,10 @@ def print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vec
     
     kern_red = []
     for ks_vec in mks_ns:
+        if context.engine == LinearAlgebraEngine.fraction_free:
+            # exact combination with entries in lowest terms
+            kern_red.append(linear_combination(list(ks_vec), Matrix([vec.transpose() for vec in kern])).transpose())
+            continue
         vec = cancel(ks_vec[0]*kern[0])
         for ind in range(1,len(ks_vec)):
             vec += cancel(ks_vec[ind]*kern[ind])
@@ -436,7 +464,8 @@ def print_transcript_to_trivial_and_collusion_security(kern, uvector, target_vec
     return True, '\n'.join(msg_output)
 
 # analyzes the trivial and collusion security of the scheme
-def analysis_trivial_and_collusion_security(blindingvalue, kenc, cenc, benc, unknown):
+@traced("generalized_security")
+def analysis_trivial_and_collusion_security(blindingvalue, kenc, cenc, benc, unknown, context=None):
 
     msg_output = []
 
@@ -453,7 +482,7 @@ def analysis_trivial_and_collusion_security(blindingvalue, kenc, cenc, benc, unk
     #print("\n == Performing simple trivial security check.. ==")
     msg_output.append("\n == Performing simple trivial security check.. ==")
 
-    (trivial_secure, kern, uvector, target_vector, list_bv_indices, trivial_output_s) = verify_trivial_security_generalized(blindingvalue, kenc, cenc, benc, unknown)
+    (trivial_secure, kern, uvector, target_vector, list_bv_indices, trivial_output_s) = verify_trivial_security_generalized(blindingvalue, kenc, cenc, benc, unknown, context)
     msg_output.append(trivial_output_s)
 
     if trivial_secure:
@@ -467,7 +496,7 @@ def analysis_trivial_and_collusion_security(blindingvalue, kenc, cenc, benc, unk
     if kern != None:
         msg_output.append("\n == Performing collusion security check.. ==")
     
-        collusion_secure, collusion_output_s = verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unknown, kern, uvector, target_vector, list_bv_indices)
+        collusion_secure, collusion_output_s = verify_collusion_security_generalized(blindingvalue, kenc, cenc, benc, unknown, kern, uvector, target_vector, list_bv_indices, context)
         msg_output.append(collusion_output_s)
     else:
         msg_output.append("\n == Could not perform the collusion security check.. ==")
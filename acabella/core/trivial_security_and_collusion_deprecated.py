@@ -6,8 +6,6 @@ from proof_generation import *
 from proof_verification import * 
 from ac17_correctness_checks import *
 
-init_printing(use_unicode=True)
-
 ## The first two functions are for the AC17 case ##
 # verifies the trivial security of a scheme that satisfies the AC17 form
 def verify_trivial_security(masterkey, special_s, kenc, cenc, benc, unknown, controlled, constraints):
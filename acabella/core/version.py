@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""version.py: Version of the ACABELLA core"""
+
+import functools
+import hashlib
+import os
+
+__version__ = "0.1.0"
+
+CORE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+@functools.cache
+def source_version() -> str:
+    """
+    Returns the version of the core followed by a digest of its
+    sources, e.g. "0.1.0+3f2a9c1b0d4e". Any change of the analysis or
+    of the rendering of its results gives a new value, so the results
+    computed by other sources are not served from the caches (see
+    result_cache.config_key).
+
+    Returns:
+        (str): Version and digest of the core/*.py files.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(CORE_DIR)):
+        if name.endswith(".py"):
+            digest.update(name.encode("utf-8") + b"\0")
+            with open(os.path.join(CORE_DIR, name), "rb") as source:
+                digest.update(source.read())
+            digest.update(b"\0")
+
+    return __version__ + "+" + digest.hexdigest()[:12]
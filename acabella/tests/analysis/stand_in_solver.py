@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Stand-in for the solver.native executable of the ABGW tool: reads one
+# problem per line and answers with one line.
+
+import sys
+import time
+
+if __name__ == "__main__":
+
+    for line in sys.stdin:
+        if "crash" in line:
+            sys.exit(1)
+        if "sleep" in line:
+            time.sleep(30)
+
+        if "syntax" in line:
+            print("Error: cannot parse the problem", flush=True)
+        elif "contradiction" in line or "= a * s." in line:
+            print("Proof: no goals", flush=True)
+        else:
+            print("Not proven: 1 goal left", flush=True)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+sys.path.insert(0, "../../core")
+
+from sympy import symbols
+
+from abgw_bridge import SolverPool, SolverVerdict, problem_hash
+from generate_abgw_inputs import generate_abgw_input_str
+from result_cache import ResultCache
+
+SOLVER = [sys.executable, "stand_in_solver.py"]
+
+def test_abgw_input_str():
+
+    alpha, b, r, s = symbols("alpha, b, r, s")
+    problem = generate_abgw_input_str(alpha*s, [alpha + r*b, r], [s*b, s], [b], [alpha, b, r, s], [])
+
+    assert problem.startswith("\nparams c1,")
+    assert "vars alpha,b,r,s in Zp.\n" in problem
+    assert problem.endswith("= a * s.\n\ngo.\n\n")
+    assert problem_hash(problem) == problem_hash(problem.replace("\n", ""))
+
+def test_solver_pool():
+
+    solver_pool = SolverPool()
+    solver_pool.init(SOLVER, size=2, timeout=10)
+    with solver_pool:
+        problems = ["c1*(alpha*s) = a * s.\ngo.", "c1*(r) = b.\ngo.", "syntax", "c1*(alpha*s) = a * s.go."]
+        results = solver_pool.solve_all(problems)
+
+        assert [result.verdict for result in results] == [SolverVerdict.proven, SolverVerdict.not_proven, SolverVerdict.error, SolverVerdict.proven]
+        assert results[0] is results[3]
+
+        # the verdicts are cached by problem hash
+        assert solver_pool.solve("c1*(r) = b.\ngo.").cached
+        assert len(solver_pool.processes) == 2
+
+def test_solver_pool_recovery(tmp_path):
+
+    result_cache = ResultCache()
+    result_cache.init(str(tmp_path))
+
+    solver_pool = SolverPool()
+    solver_pool.init(SOLVER, size=1, timeout=1, result_cache=result_cache)
+    with solver_pool:
+        assert solver_pool.solve("crash").verdict == SolverVerdict.crashed
+        assert solver_pool.solve("sleep").verdict == SolverVerdict.timeout
+
+        # the restarted solver answers the next problems
+        assert solver_pool.solve("c1*(alpha*s) = a * s.go.").verdict == SolverVerdict.proven
+        assert not solver_pool.solve("crash").cached
+
+    # the on-disk cache is shared between pools
+    solver_pool = SolverPool()
+    solver_pool.init(SOLVER, size=1, result_cache=result_cache)
+    with solver_pool:
+        result = solver_pool.solve("c1*(alpha*s) = a * s.go.")
+        assert result.cached and result.verdict == SolverVerdict.proven
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+sys.path.insert(0, "../../core")
+
+from sympy import symbols
+
+from analysis_context import AnalysisContext
+from security_analysis_ac17 import security_analysis
+
+def test_shared_context():
+
+    # Wat11
+
+    alpha, b, b0, b1, b2, r, s, s1, sp1, sp2 = symbols('alpha, b, b0, b1, b2, r, s, s1, sp1, sp2')
+
+    k = [alpha + r*b, r*b0, r, r*b1]
+    c = [s*b - s1*b + sp1*b1, s, sp1, s1*b + sp2*b2, sp2]
+    mpk = [b0, b1, b, b2]
+    unknown = [alpha, b, b0, b1, b2, r, s, s1, sp1, sp2]
+
+    context = AnalysisContext()
+    shared = security_analysis(alpha, s, k, c, mpk, unknown, [], [], context)
+    separate = security_analysis(alpha, s, k, c, mpk, unknown, [], [], None)
+
+    assert shared[0] and shared[1]
+    assert shared[:3] == separate[:3]
+
+    # the proofs reuse the decompositions and kernels of the collusion check
+    assert context.hits > context.misses
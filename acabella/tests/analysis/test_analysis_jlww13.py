@@ -23,7 +23,9 @@ from sympy import symbols
 
 from analysis import AnalysisWithCorruption
 from parse_config import ParseConfig
-from conditional import ConditionalDecryptionAttack
+from conditional import ConditionalDecryptionAttack, KeySearch
+from linear_algebra import IncrementalEchelon
+from results import AttackResult
 
 def test_jlww13():
 
@@ -36,4 +38,70 @@ def test_jlww13():
     cd_attack.run()
     msg = cd_attack.show_solution()
 
-    assert msg[0].strip() == "[*] Conditional decryption attack found: 1*k0*c1 + 1*k0*c3 + -1*k1*c1 + 1*k2*c0 + -1*k5*c3 + 1*k6*c2"
+    assert msg[0].strip() == "[*] Conditional decryption attack found: 1*k0*c1 + 1*k0*c3 + -1*k1*c1 + 1*k2*c0 + -1*k3*c3 + 1*k4*c2"
+    assert cd_attack.nr_of_keys == 1
+
+def test_jlww13_key_search():
+
+    parse_config = ParseConfig()
+    parse_config.init("jlww13_config.json")
+
+    msgs = []
+    for search in [KeySearch.exhaustive, KeySearch.incremental, KeySearch.galloping]:
+        cd_config = parse_config.generate_conditional_params()
+        cd_attack = ConditionalDecryptionAttack()
+        cd_attack.init(cd_config["alpha"], cd_config["special_s"], cd_config["mpk"], cd_config["k_fixed"], cd_config["k_att"], cd_config["c_fixed"], cd_config["c_att"], cd_config["unknown"], cd_config["prefixes"], cd_config["nr_indexed_encodings"])
+        cd_attack.set_key_search(search, workers=1)
+        cd_attack.run()
+        msgs.append(cd_attack.show_solution()[0])
+
+    assert msgs[0] == msgs[1] == msgs[2]
+
+def test_overlapping_attribute_ranges():
+
+    parse_config = ParseConfig()
+    parse_config.init("jlww13_config.json")
+    cd_config = parse_config.generate_conditional_params()
+
+    cd_attack = ConditionalDecryptionAttack()
+    cd_attack.init(cd_config["alpha"], cd_config["special_s"], cd_config["mpk"], cd_config["k_fixed"], cd_config["k_att"], cd_config["c_fixed"], cd_config["c_att"], cd_config["unknown"], cd_config["prefixes"], cd_config["nr_indexed_encodings"])
+    cd_attack.set_attribute_ranges([1, 2, 3], [1, 2], [2, 3])
+
+    # the keys and their copies share no randomness, even for attribute 2
+    kenc = cd_attack.key_encodings(2)
+    assert len(set(kenc)) == len(kenc)
+
+class ThresholdAttack(ConditionalDecryptionAttack):
+    """
+    Stand-in attack that is found with at least 5 copies of the keys.
+    """
+
+    def attempt(self, nr_of_keys):
+        return AttackResult("decryption", nr_of_keys >= 5, self.SOL_MSG, self.NOT_FOUND_MSG)
+
+def test_galloping_search():
+
+    cd_attack = ThresholdAttack()
+    cd_attack.max_nr_of_keys = 40
+
+    for workers in [1, 3]:
+        cd_attack.set_key_search(KeySearch.galloping, workers)
+        (nr_of_keys, result) = cd_attack.search_galloping()
+        assert nr_of_keys == 5 and result.found
+
+    cd_attack.max_nr_of_keys = 5
+    assert cd_attack.search_galloping() == (None, None)
+
+def test_incremental_echelon():
+
+    x, y = symbols("x, y")
+
+    echelon = IncrementalEchelon({0: x, 2: -y})
+    assert echelon.insert({0: 1, 1: y})
+    assert not echelon.target_reached()
+    assert not echelon.insert({0: 2, 1: 2*y})
+    assert echelon.insert({1: 1, 2: 1/x})
+    assert echelon.target_reached()
+
+    # target = x*row0 - x*y*row2
+    assert echelon.solution() == {0: x, 2: -x*y}
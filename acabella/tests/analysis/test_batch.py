@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+sys.path.insert(0, '../../tools/acabella_cmd')
+
+from batch import collect_configs, run_batch, run_job
+
+def test_batch_job():
+    record = run_job("cm14_config.json", "da", 120)
+
+    assert record["scheme_id"] == "cm14"
+    assert record["status"] == "ok"
+    assert record["verdict"] == {"decryption": "attack found"}
+    assert record["peak_rss_kb"] > 0
+
+def test_batch_timeout():
+    record = run_job("cm14_config.json", "da", 0.001)
+
+    assert record["status"] == "timeout"
+    assert record["verdict"] is None
+
+def test_batch_pool():
+    configs = collect_configs("cm14_config.json")
+    records = list(run_batch(configs, ["mk", "da"], workers=2, timeout=120))
+
+    assert sorted((r["analysis"], r["status"]) for r in records) == [("da", "ok"), ("mk", "skipped")]
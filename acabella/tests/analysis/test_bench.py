@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+sys.path.insert(0, '../../core')
+sys.path.insert(0, '../../benchmarks')
+
+from bench import compare_reports, is_failure, load_suite, measure_case, summarize
+
+def report(wall_time, peak_rss_kb, verdict):
+    return {"cases": {"cm14-da": {
+        "status": "ok",
+        "wall_time": wall_time,
+        "peak_rss_kb": peak_rss_kb,
+        "stages": {"decryption": wall_time},
+        "verdict": verdict,
+    }}}
+
+def test_bench_suite():
+    cases = load_suite("../../benchmarks/suite.json", include_slow=True)
+
+    assert all(os.path.isfile(case["config"]) for case in cases)
+    assert {case["analysis"] for case in cases} == {"mk", "da", "sec", "cond", "all"}
+
+    fast_cases = load_suite("../../benchmarks/suite.json")
+    assert len(fast_cases) < len(cases)
+    assert [case["name"] for case in load_suite("../../benchmarks/suite.json", pattern="^cm14-da$")] == ["cm14-da"]
+
+def test_bench_case():
+    case = {"name": "cm14-da", "config": "cm14_config.json", "analysis": "da"}
+    entry = summarize(case, [measure_case(case, 120) for _ in range(2)])
+
+    assert entry["status"] == "ok"
+    assert entry["verdict"] == {"decryption": "attack found"}
+    assert list(entry["stages"]) == ["parse", "init", "decryption", "render"]
+    assert len(entry["wall_times"]) == 2
+    assert entry["peak_rss_kb"] > 0
+
+def test_bench_compare():
+    baseline = report(2.0, 100000, {"decryption": "attack found"})
+
+    # noise below the threshold is tolerated
+    assert compare_reports(baseline, report(2.2, 101000, {"decryption": "attack found"})) == []
+
+    findings = compare_reports(baseline, report(3.0, 100000, {"decryption": "attack found"}))
+    assert {(f["metric"], f["kind"]) for f in findings} == {("wall_time", "regression"), ("stages.decryption", "regression")}
+    assert all(is_failure(f) for f in findings)
+
+    findings = compare_reports(baseline, report(1.0, 100000, {"decryption": "no attack found"}), threshold=0.1)
+    assert ("verdict", "changed") in {(f["metric"], f["kind"]) for f in findings}
+    assert not is_failure([f for f in findings if f["metric"] == "wall_time"][0])
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import pickle
+import sys
+import tempfile
+import time
+sys.path.insert(0, "../../core")
+
+from analysis import AnalysisWithCorruption
+from budget import ACTIVE_BUDGETS, Budget, BudgetExceeded, checkpoint
+from conditional import ConditionalDecryptionAttack, KeySearch
+from parse_config import ParseConfig
+from result_cache import ResultCache
+
+def cm14_analysis(budget: Budget) -> AnalysisWithCorruption:
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    dec_params, corruptable_vars = parse_config.generate_dec_key_params()
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(None, dec_params, None, corruptable_vars, None)
+    analysis.set_budget(budget)
+
+    return analysis
+
+def test_checkpoint():
+
+    # no active budget
+    checkpoint("stage")
+
+    budget = Budget(wall_time=0)
+    try:
+        with budget:
+            checkpoint("nullspace")
+        exceeded = None
+    except BudgetExceeded as e:
+        exceeded = e
+    assert exceeded is not None and exceeded.stage == "nullspace" and exceeded.resource == "time"
+    assert ACTIVE_BUDGETS == []
+
+    with Budget(max_rss_kb=1):
+        try:
+            checkpoint("canonical")
+            exceeded = None
+        except BudgetExceeded as e:
+            exceeded = e
+    assert exceeded is not None and exceeded.resource == "memory"
+
+def test_paused_budget():
+
+    budget = Budget(wall_time=0.2)
+    with budget:
+        with budget.paused():
+            assert ACTIVE_BUDGETS == []
+            time.sleep(0.3)
+        assert ACTIVE_BUDGETS == [budget]
+        # the clock stopped while the budget was paused
+        checkpoint("stage")
+    assert ACTIVE_BUDGETS == []
+
+class SlowConditionalAttack(ConditionalDecryptionAttack):
+    """
+    Stand-in attack whose probes take longer than the budget.
+    """
+
+    def prepare(self):
+        self.max_nr_of_keys = 40
+
+    def attempt(self, nr_of_keys):
+        time.sleep(0.2)
+        checkpoint("conditional_attempt")
+
+def test_budget_in_worker():
+
+    exceeded = pickle.loads(pickle.dumps(BudgetExceeded("stage", "time", 1, 2)))
+    assert (exceeded.stage, exceeded.resource, exceeded.limit, exceeded.used) == ("stage", "time", 1, 2)
+
+    # the budget runs out in a galloping worker process
+    cd_attack = SlowConditionalAttack()
+    cd_attack.set_key_search(KeySearch.galloping, workers=2)
+    cd_attack.set_budget(Budget(wall_time=0.1))
+    cd_attack.run()
+
+    assert cd_attack.result.verdict() == "inconclusive: budget exceeded"
+    assert cd_attack.result.stage == "conditional_attempt"
+    assert ACTIVE_BUDGETS == []
+
+def test_inconclusive_attack():
+
+    analysis = cm14_analysis(Budget(wall_time=0))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        result_cache = ResultCache()
+        result_cache.init(cache_dir)
+        analysis.set_result_cache(result_cache, "cm14")
+
+        analysis.run()
+        msgs, _, _ = analysis.show_solution()
+
+        assert analysis.verdict() == {"decryption": "inconclusive: budget exceeded"}
+        assert analysis.to_dict()["results"][0]["stage"] is not None
+        assert "[!] Inconclusive: time budget" in msgs[2]
+        # inconclusive results are not cached
+        assert result_cache.get("cm14") is None
+
+def test_generous_budget():
+
+    analysis = cm14_analysis(Budget(wall_time=600, max_rss_kb=64 * 1024 * 1024))
+    analysis.run()
+    msgs, _, _ = analysis.show_solution()
+
+    assert msgs[2].strip() == "[*] Decryption attack found: 1*k0[i]*c0 + -1/b2*k1[i]*c1"
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import sys
+sys.path.insert(0, "../../core")
+
+from sympy import Matrix, parse_expr
+
+from access_structures import colluding_attribute_sets, create_policy_matrix_for_AND, create_share_vector, get_i_of_n_policy_shares, parse_policy, policy_to_lsss
+from encodings_helper import create_ciphertext_encoding, create_ciphertext_encoding_for_policy, create_key_encoding, generate_unknown_variable_set
+
+def test_compiled_templates():
+
+    k_fixed = [parse_expr("alpha + r")]
+    k_att = [parse_expr("att_mpk_group*indexed_enc_rp_1 + att_scalar*r"), parse_expr("indexed_enc_rp_1")]
+    c_att = [parse_expr("att_mpk_group*lambda_policy_share"), parse_expr("lambda_policy_share")]
+    s = parse_expr("s")
+    atts = [1, 2, 3]
+
+    kenc = create_key_encoding(k_fixed, k_att, atts, ["rp"], 1, [1, 2])
+    cenc = create_ciphertext_encoding([], c_att, s, atts, ["rp"], 1)
+
+    # the fixed encodings are not modified
+    assert k_fixed == [parse_expr("alpha + r")]
+
+    assert len(kenc) == 1 + 2 * 3 * 2
+    assert kenc[5] == parse_expr("b_3*rp_(1,att_3,1) + x_3*r")
+    assert kenc[7] == parse_expr("b_1*rp_(1,att_1,2) + x_1*r")
+    assert cenc[2] == parse_expr("b_2") * get_i_of_n_policy_shares(1, 3, s)
+
+    unknown = generate_unknown_variable_set(kenc, cenc, [], atts, atts)
+    assert not any(str(var).startswith("x_") for var in unknown)
+    assert parse_expr("r") in unknown and parse_expr("v_3") in unknown
+
+def test_policy_shares():
+
+    s = parse_expr("s")
+
+    # an AND-gate gives the matrix of create_policy_matrix_for_AND
+    lsss = policy_to_lsss(parse_policy("1 and 2 and 3 and 4"))
+    assert lsss.to_matrix() == create_policy_matrix_for_AND(4)
+    assert lsss.shares(s) == list(create_policy_matrix_for_AND(4) * create_share_vector(4, s))
+
+    policy = parse_policy("(1 and 2) or 2 of (3, 4 and 5, 6)")
+    lsss = policy_to_lsss(policy)
+    assert lsss.labels == [1, 2, 3, 4, 5, 6]
+    mat = lsss.to_matrix()
+    target = Matrix([[1] + [0] * (lsss.nr_cols - 1)])
+    for (atts, authorized) in [({1, 2}, True), ({3, 6}, True), ({4, 5, 6}, True), ({1, 3, 4}, False), ({6}, False)]:
+        assert policy.is_satisfied(atts) == authorized
+        sub = mat.extract([i for i in range(len(lsss.labels)) if lsss.labels[i] in atts], list(range(lsss.nr_cols)))
+        assert (sub.rank() == sub.col_join(target).rank()) == authorized
+
+    # two unauthorized keys that satisfy the policy together
+    assert colluding_attribute_sets(parse_policy("1 and 2 and 3")) == ([1, 2], [3])
+    assert colluding_attribute_sets(policy) == ([1, 3, 4], [2, 5, 6])
+    with pytest.raises(ValueError):
+        colluding_attribute_sets(parse_policy("1 or 2"))
+
+def test_large_policy():
+
+    c_att = [parse_expr("att_mpk_group*lambda_policy_share"), parse_expr("lambda_policy_share")]
+    policy = " or ".join("(" + " and ".join(str(10 * i + j) for j in range(1, 5)) + ")" for i in range(50))
+
+    cenc = create_ciphertext_encoding_for_policy([], c_att, parse_expr("s"), policy, ["rp"], 1)
+    assert len(cenc) == 2 * 200
+    assert cenc[1] == parse_expr("s + v_2")
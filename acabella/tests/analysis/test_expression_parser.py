@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+sys.path.insert(0, "../../core")
+
+from sympy import parse_expr, srepr
+
+from expression_parser import ExpressionParser
+from interned import SymbolTable
+from parse_config import ParseConfig
+
+def test_same_as_parse_expr():
+
+    expression_parser = ExpressionParser()
+    expression_parser.init(SymbolTable())
+
+    for data in ["alpha_i + r*b/(b_1 + x_1)", "-x**2", "x**y**z", "2**-1*x", "1/2*x - 1/3", "a - b - c", "a*-b",
+                 "-(a + b)*c", "2*(x + y) - 2*x", " (alpha + r) / b ", "x - x",
+                 # handed over to parse_expr
+                 "E*x", "2.5*x", "f(x)", "rp_(1,att_2,1)"]:
+        assert srepr(expression_parser.parse(data)) == srepr(parse_expr(data))
+
+    # invalid expressions raise the errors of parse_expr
+    for data in ["x +", "((x)", "x.y"]:
+        try:
+            expression_parser.parse(data)
+            failed = False
+        except Exception:
+            failed = True
+        assert failed
+
+def test_shared_symbol_table():
+
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    (dec_params, corruptable_vars) = parse_config.generate_dec_key_params()
+
+    # the symbols inside the encodings equal the table's (SymPy's cache may
+    # return older equal objects), the names parsed alone are the table's
+    symbols = parse_config.symbol_table.symbols
+    for enc in dec_params["k_encodings"] + dec_params["c_encodings"]:
+        assert all(symbol == symbols[str(symbol)] for symbol in enc.free_symbols)
+    assert all(symbol is symbols[str(symbol)] for symbol in dec_params["unknown"])
+    assert parse_config.parse(str(dec_params["unknown"][0])) is dec_params["unknown"][0]
+
+    # long sums are built at once
+    data = " + ".join("b_" + str(i) + "*r" for i in range(3000))
+    assert len(parse_config.parse(data).args) == 3000
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+sys.path.insert(0, "../../core")
+
+from sympy import Rational, expand, symbols
+
+from common_methods import addcomptodecomp, appendzeros, collect_denoms, decompose, recovermonos, recovervars, writeencodingasprod, writepolyasprod
+from interned import SymbolTable
+from parse_config import ParseConfig
+
+def writeencodingasprod_recursive(enco: list, unknown: list) -> tuple:
+    # the original recursive decomposition, reference of writeencodingasprod
+    uvector = []
+    mat = []
+    for poly in enco:
+        colmono = []
+        recovermonos(poly, colmono)
+        kvector = [0 for x in uvector]
+        for mono in colmono:
+            if mono is None:
+                continue
+            lis = []
+            recovervars(mono, lis)
+            addcomptodecomp(kvector, uvector, decompose(lis, unknown))
+        mat.append(kvector)
+    appendzeros(mat, uvector)
+    return (mat, uvector)
+
+def test_round_trip():
+
+    alpha, b, b1, r, s, x = symbols("alpha, b, b1, r, s, x")
+    table = SymbolTable()
+
+    encodings = [alpha + r*b, r/(b1 + x), Rational(3, 2)*s*b**2 - s, 0]
+    for enc in encodings:
+        assert table.decode(table.encode(enc)) == enc
+
+    # the product is computed on the IDs
+    product = table.encode(alpha + r*b) * table.encode(s - b)
+    assert table.decode(product) == expand((alpha + r*b) * (s - b))
+    assert table.encode(alpha + r*b) == table.encode(r*b + alpha)
+
+def test_interned_decomposition():
+
+    alpha, b, b1, r, s, x = symbols("alpha, b, b1, r, s, x")
+    unknown = [alpha, r, s, b1]
+
+    enc = [alpha + r*b, r*b*x + 2*r*s/(b1 + x), s*b - r*b, 0, r]
+    assert writeencodingasprod(enc, unknown) == writeencodingasprod_recursive(enc, unknown)
+
+    # a polynomial written over the uvector of the encodings, with a new monomial
+    table = SymbolTable()
+    (mat, uvector) = writeencodingasprod(enc, unknown, table)
+    kvector = writepolyasprod(alpha*s + 3*r*b - b1*s, uvector, unknown, table)
+    (mat, uvector_recursive) = writeencodingasprod_recursive(enc + [alpha*s + 3*r*b - b1*s], unknown)
+    assert (kvector, uvector) == (mat[-1], uvector_recursive)
+
+def test_interned_denominators():
+
+    alpha, b, b1, r, s, x = symbols("alpha, b, b1, r, s, x")
+    unknown = [alpha, r, s, b1]
+
+    enc = [r/(b1 + x) + s/b1, alpha/b, r*s/(b1 + x)]
+    assert collect_denoms(enc, unknown) == [b1 + x, b1]
+
+def test_parse_config_symbol_table():
+
+    parse_config = ParseConfig()
+    parse_config.init("bsw07_config.json")
+    security_params = parse_config.generate_security_analysis_params()
+
+    # the unknown variables are interned first
+    table = parse_config.symbol_table
+    assert table.atoms[:len(security_params["unknown"])] == security_params["unknown"]
+    assert all(table.atoms[table.ids[symbol]] == symbol for symbol in security_params["k_encodings"][0].free_symbols)
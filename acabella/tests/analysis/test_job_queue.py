@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sys
+import time
+sys.path.insert(0, '../../tools/acabella_web')
+
+from flaskr import create_app
+from flaskr.job_queue import JobQueue
+
+def wait_for(job_queue, job_id, timeout=120):
+    deadline = time.monotonic() + timeout
+    while job_queue.status(job_id)["status"] in ["queued", "running"]:
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+    return job_queue.status(job_id)
+
+def test_job_queue_dedupe_and_result(tmp_path):
+    config = open("cm14_config.json").read()
+
+    job_queue = JobQueue()
+    job_queue.init(str(tmp_path / "jobs.sqlite"), workers=1)
+    job_queue.start()
+
+    job_id = job_queue.submit(config, "da")
+
+    # the same scheme, formatted differently, shares the job
+    assert job_queue.submit(json.dumps(json.loads(config)), "da") == job_id
+    assert job_queue.submit(config, "mk") != job_id
+
+    assert wait_for(job_queue, job_id)["status"] == "done"
+    assert "[*] Decryption attack found: 1*k0[i]*c0 + -1/b2*k1[i]*c1" in job_queue.result(job_id)["attack"]
+
+    job_queue.stop()
+
+def test_job_queue_cancel(tmp_path):
+    config = open("cm14_config.json").read()
+
+    # without workers, the job stays queued
+    job_queue = JobQueue()
+    job_queue.init(str(tmp_path / "jobs.sqlite"), workers=0)
+
+    job_id = job_queue.submit(config, "da")
+    assert job_queue.cancel(job_id)
+    assert job_queue.status(job_id)["status"] == "cancelled"
+    assert job_queue.result(job_id) is None
+
+    # a cancelled job is queued again when resubmitted
+    job_queue.submit(config, "da")
+    assert job_queue.status(job_id)["status"] == "queued"
+
+def test_job_queue_stale_run(tmp_path):
+    config = open("cm14_config.json").read()
+
+    job_queue = JobQueue()
+    job_queue.init(str(tmp_path / "jobs.sqlite"), workers=0)
+
+    # a job cancelled and submitted again while its worker still runs
+    job_id = job_queue.submit(config, "da")
+    stale = job_queue.claim()
+    job_queue.cancel(job_id)
+    job_queue.submit(config, "da")
+    current = job_queue.claim()
+    assert current["run"] == stale["run"] + 1
+
+    # the stale run stores neither its events nor its outcome
+    job_queue.execute(stale["id"], stale["config"], stale["analysis"], stale["run"])
+    assert job_queue.status(job_id)["status"] == "running"
+    assert job_queue.events(job_id) == []
+
+    job_queue.execute(current["id"], current["config"], current["analysis"], current["run"])
+    assert job_queue.status(job_id)["status"] == "done"
+    events = job_queue.events(job_id)
+    assert [seq for (seq, _) in events] == list(range(1, len(events) + 1))
+
+def test_job_queue_events(tmp_path):
+    config = open("cm14_config.json").read()
+
+    job_queue = JobQueue()
+    job_queue.init(str(tmp_path / "jobs.sqlite"), workers=1)
+    job_queue.start()
+
+    job_id = job_queue.submit(config, "da")
+    assert wait_for(job_queue, job_id)["status"] == "done"
+    job_queue.stop()
+
+    events = job_queue.events(job_id)
+    assert [seq for (seq, _) in events] == list(range(1, len(events) + 1))
+    assert events[-1][1]["event"] == "finished"
+    assert {"event": "verdict", "kind": "decryption", "stage": "attack", "verdict": "attack found", "final": True} \
+        .items() <= events[-2][1].items()
+    assert job_queue.events(job_id, events[-2][0]) == events[-1:]
+
+def test_job_events_stream(tmp_path):
+    config = open("cm14_config.json").read()
+
+    # without workers, the progress of the job is filled in by hand
+    app = create_app({
+        "TESTING": True,
+        "JOBS_DATABASE": str(tmp_path / "jobs.sqlite"),
+        "JOBS_WORKERS": 0,
+        "PRECOMPUTE_EXAMPLES": False,
+    })
+    job_queue = app.extensions["acabella_jobs"]
+    job_id = job_queue.submit(config, "da")
+
+    event = {"event": "verdict", "kind": "decryption", "stage": "attack", "verdict": "attack found", "final": True, "elapsed": 0.1}
+    with job_queue.connect() as db:
+        db.execute("INSERT INTO events (job_id, seq, data) VALUES (?, 1, ?)", (job_id, json.dumps(event)))
+        db.execute("UPDATE jobs SET status = 'done', result = '{}' WHERE id = ?", (job_id,))
+
+    client = app.test_client()
+    response = client.get("/jobs/" + job_id + "/events")
+    assert response.mimetype == "text/event-stream"
+
+    messages = response.get_data(as_text=True).split("\n\n")
+    assert messages[0] == "id: 1\nevent: verdict\ndata: " + json.dumps(event)
+    assert messages[1].startswith("id: 1\nevent: end\ndata: ")
+    assert json.loads(messages[1].split("data: ")[1])["status"] == "done"
+
+    # a reconnecting client only receives the missed messages
+    response = client.get("/jobs/" + job_id + "/events", headers={"Last-Event-ID": "1"})
+    assert response.get_data(as_text=True).startswith("id: 1\nevent: end")
+    assert client.get("/jobs/unknown/events").status_code == 404
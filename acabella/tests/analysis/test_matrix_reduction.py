@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+sys.path.insert(0, "../../core")
+
+from sympy import Matrix, symbols
+
+from analysis_context import AnalysisContext
+from matrix_reduction import reduce_kernel_problem, reduced_nullspace
+
+def test_singleton_elimination():
+
+    x, y = symbols("x, y")
+
+    # each eliminated column leaves a new singleton row behind
+    mat = Matrix([
+        [1, 0, 0, 0, 0, 0, 0],
+        [x, 1, 0, 0, 0, 0, 0],
+        [0, y, 1, 1, 1, 0, 0],
+        [0, 0, 0, 1, x, 0, 0],
+        [0, 0, 1, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 1, y],
+    ])
+
+    reduction = reduce_kernel_problem(mat, [3])
+
+    assert reduction.forced == [0, 1, 2]
+    assert reduction.rounds == 2
+    assert not reduction.infeasible
+    assert reduction.rows == [2, 3]
+    assert reduction.cols == [3, 4]
+    assert reduction.report() == "6x7 -> singletons (2 rounds): 3x4 -> components (1 of 2): 2x2"
+
+    assert reduce_kernel_problem(mat, [0, 2]).infeasible
+
+def test_reduced_nullspace():
+
+    x, y = symbols("x, y")
+
+    mat = Matrix([
+        [1, x, 0, 0, 0, 1],
+        [0, 0, 1, y, 0, 0],
+        [0, 1, 0, 0, 0, 0],
+        [y, 0, 0, 0, 0, 1 + x],
+    ])
+
+    # the whole kernel is recovered from the components
+    reduction = reduce_kernel_problem(mat, [4], all_components=True)
+    assert reduction.nr_components == 3
+    assert reduced_nullspace(mat, reduction) == mat.nullspace()
+
+    context = AnalysisContext()
+    (reduction, kern) = context.reduced_nullspace("test", mat, [3])
+    assert kern == [mat.nullspace()[0]]
+    assert context.reductions == [("test", reduction)]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sys
+sys.path.insert(0, "../../core")
+
+from parameter_sweep import ParameterSweep, SweepAnalysis, growth_exponent
+from parse_config import ParseConfig
+
+def test_growth_exponent():
+
+    assert abs(growth_exponent([2, 4, 8], [3, 12, 48]) - 2) < 1e-9
+    assert growth_exponent([2, 2], [1, 2]) is None
+
+def test_conditional_sweep():
+
+    parse_config = ParseConfig()
+    parse_config.init("jlww13_config.json")
+
+    sweep = ParameterSweep()
+    sweep.init(SweepAnalysis.conditional, parse_config.generate_conditional_params(), [2, 3], [1, 2])
+    sweep.run()
+
+    assert [(point.nr_attributes, point.nr_keys) for point in sweep.points] == [(2, 1), (2, 2), (3, 1), (3, 2)]
+    assert all(point.verdict == "attack found" for point in sweep.points)
+
+    # the second copy of the keys extends the echelon form of the first
+    for (one_key, two_keys) in [sweep.points[0:2], sweep.points[2:4]]:
+        assert two_keys.rows > one_key.rows and two_keys.cols > one_key.cols
+        assert two_keys.kernel_dim == two_keys.rows - two_keys.rank
+        assert two_keys.wall_time >= one_key.wall_time
+
+    assert set(sweep.to_dict()["growth_exponents"]) == {"attributes", "keys"}
+
+def test_policy_sweep():
+
+    parse_config = ParseConfig()
+    parse_config.init_with_parsed(dict(json.load(open("jlww13_config.json")), policy="(1 and 2) or (3 and 4)"))
+
+    sweep = ParameterSweep()
+    sweep.init(SweepAnalysis.conditional, parse_config.generate_conditional_params(), [2, 3], [1])
+    sweep.run()
+
+    # the grid has the attributes of the policy, keys 1, 3 and 2, 4 collude
+    assert [(point.nr_attributes, point.nr_keys, point.verdict) for point in sweep.points] == [(4, 1, "attack found")]
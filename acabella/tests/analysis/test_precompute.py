@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sys
+import time
+sys.path.insert(0, '../../tools/acabella_web')
+
+from flaskr import create_app
+from flaskr.precompute import FormDefaults, submit_examples
+
+def test_precompute_examples(tmp_path):
+    # without workers, the jobs of the examples stay queued
+    app = create_app({
+        "TESTING": True,
+        "JOBS_DATABASE": str(tmp_path / "jobs.sqlite"),
+        "JOBS_WORKERS": 0,
+        "PRECOMPUTE_EXAMPLES": False,
+    })
+    job_queue = app.extensions["acabella_jobs"]
+
+    job_ids = submit_examples(app)
+
+    for page in ["/cm14_attack", "/ndcw15_attack", "/yj14_attack", "/bsw07_sec", "/wat11_sec", "/abgw17_kpabe_sec"]:
+        assert job_queue.status(job_ids[page])["status"] == "queued"
+
+    # the generic analysis pages have no example
+    assert not "/process_json" in job_ids
+
+    # submitting the examples again reuses their jobs
+    assert submit_examples(app) == job_ids
+
+    client = app.test_client()
+    form = FormDefaults()
+    form.feed(client.get("/cm14_attack").get_data(as_text=True))
+
+    assert form.fields["master_key"] == "alpha_i * s"
+    assert json.loads(form.fields["k"]) == ["(alpha_i + r) / b", "r"]
+    assert form.fields["corruption_select"] == "AA_extended"
+
+    # a finished example is served from the database
+    job_id = job_ids["/cm14_attack"]
+    with job_queue.connect() as db:
+        db.execute("UPDATE jobs SET status = 'done', result = ? WHERE id = ?",
+                   (json.dumps({"json_out": "{}", "attack": "stored result", "proof": None}), job_id))
+
+    start = time.monotonic()
+    response = client.post("/cm14_attack", data=form.fields)
+    assert response.headers["Location"].endswith("/jobs/" + job_id)
+    assert time.monotonic() - start < 0.1
+
+    assert "stored result" in client.get("/jobs/" + job_id).get_data(as_text=True)
+
+    # an edited example is a new job
+    form.fields["master_key"] = "alpha_i * s * b"
+    response = client.post("/cm14_attack", data=form.fields)
+    assert not response.headers["Location"].endswith("/jobs/" + job_id)
+
+def test_examples_shared_by_processes(tmp_path):
+    config = {
+        "TESTING": True,
+        "JOBS_DATABASE": str(tmp_path / "jobs.sqlite"),
+        "JOBS_WORKERS": 0,
+        "PRECOMPUTE_EXAMPLES": False,
+    }
+
+    # the examples are submitted by the first process of the app
+    warm_app = create_app(config)
+    job_id = submit_examples(warm_app)["/cm14_attack"]
+    with warm_app.extensions["acabella_jobs"].connect() as db:
+        db.execute("UPDATE jobs SET status = 'done', result = '{}' WHERE id = ?", (job_id,))
+
+    # and served by the other ones, without submitting them again
+    app = create_app(config)
+    app.extensions["acabella_jobs"].submit = None
+    client = app.test_client()
+    form = FormDefaults()
+    form.feed(client.get("/cm14_attack").get_data(as_text=True))
+
+    response = client.post("/cm14_attack", data=form.fields)
+    assert response.headers["Location"].endswith("/jobs/" + job_id)
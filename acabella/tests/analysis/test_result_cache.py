@@ -0,0 +1,151 @@
+#!/usr/bin/env python                                                                      
+# -*- coding: utf-8 -*-                                                                    
+                                                                                           
+# Copyright (c) 2022                                                                       
+#                                                                                          
+# This program is free software: you can redistribute it and/or modify                     
+# it under the terms of the GNU General Public License as published by                     
+# the Free Software Foundation, version 3.                                                 
+#                                                                                          
+# This program is distributed in the hope that it will be useful, but                      
+# WITHOUT ANY WARRANTY; without even the implied warranty of                           
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU                     
+# General Public License for more details.                                             
+#                                                                                      
+# You should have received a copy of the GNU General Public License                    
+# along with this program. If not, see <http://www.gnu.org/licenses/>.                 
+
+import json
+import os
+import sys
+import threading
+sys.path.insert(0, "../../core")
+
+from analysis import AnalysisWithCorruption
+from parse_config import ParseConfig
+from result_cache import ResultCache, config_key
+import version
+
+def run_cm14(result_cache, cache_key):
+
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    dec_params, corruptable_vars_from_A = parse_config.generate_dec_key_params()
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(None, dec_params, None, corruptable_vars_from_A, None)
+    analysis.set_result_cache(result_cache, cache_key)
+
+    analysis.run()
+    msgs, _, _ = analysis.show_solution()
+    return analysis, msgs
+
+def test_cm14_cached(tmp_path):
+
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    cache_key = config_key(parse_config.json_parsed, "da")
+
+    result_cache = ResultCache()
+    result_cache.init(str(tmp_path))
+
+    analysis, msgs = run_cm14(result_cache, cache_key)
+    assert analysis.cached_solution is None
+
+    analysis, cached_msgs = run_cm14(result_cache, cache_key)
+    assert analysis.cached_solution is not None
+    assert cached_msgs == msgs
+    assert cached_msgs[2].strip() == "[*] Decryption attack found: 1*k0[i]*c0 + -1/b2*k1[i]*c1"
+
+def test_config_key_is_canonical():
+
+    with open("cm14_config.json", "r") as read_file:
+        json_parsed = json.load(read_file)
+
+    json_reformatted = json.loads(json.dumps(json_parsed))
+    json_reformatted["k"] = [x.replace(" ", "") for x in json_reformatted["k"]]
+    json_reformatted["unknown_vars"] = list(reversed(json_reformatted["unknown_vars"]))
+
+    assert config_key(json_parsed, "da") == config_key(json_reformatted, "da")
+    assert config_key(json_parsed, "da") != config_key(json_parsed, "sec")
+
+    json_reformatted["k"] = list(reversed(json_reformatted["k"]))
+    assert config_key(json_parsed, "da") != config_key(json_reformatted, "da")
+
+    # policies are parsed as formulas, not as expressions
+    policies = [config_key(dict(json_parsed, policy=policy), "cond") for policy in ["(1 and 2) or (3 and 4)", "(1 and 2)  or (3 and 4)", "1 and 2"]]
+    assert policies[0] == policies[1] and policies[0] != policies[2]
+
+def test_config_key_depends_on_sources(tmp_path, monkeypatch):
+
+    with open("cm14_config.json", "r") as read_file:
+        json_parsed = json.load(read_file)
+
+    key = config_key(json_parsed, "da")
+    assert version.source_version().startswith(version.__version__ + "+")
+
+    # results of other sources of the core are not served
+    (tmp_path / "analysis.py").write_text("# modified analysis\n")
+    monkeypatch.setattr(version, "CORE_DIR", str(tmp_path))
+    version.source_version.cache_clear()
+    try:
+        assert config_key(json_parsed, "da") != key
+    finally:
+        version.source_version.cache_clear()
+
+def test_lru_eviction(tmp_path):
+
+    result_cache = ResultCache()
+    result_cache.init(str(tmp_path), max_entries=2)
+
+    result_cache.put("a", {"sol_list": ["a"]})
+    result_cache.put("b", {"sol_list": ["b"]})
+    result_cache.get("a")
+    result_cache.put("c", {"sol_list": ["c"]})
+
+    assert result_cache.get("a") is not None
+    assert result_cache.get("b") is None
+    assert result_cache.get("c") is not None
+
+def test_aliases(tmp_path):
+
+    result_cache = ResultCache()
+    result_cache.init(str(tmp_path), max_entries=2)
+
+    result_cache.put("a", {"sol_list": ["a"]})
+    result_cache.link("raw_a", "a")
+    result_cache.put("b", {"sol_list": ["b"]})
+
+    # aliases do not count towards the entries
+    assert result_cache.get("raw_a") == {"sol_list": ["a"]}
+    assert result_cache.get("b") is not None
+
+    # and are removed with their entry
+    result_cache.put("c", {"sol_list": ["c"]})
+    assert result_cache.get("a") is None
+    assert result_cache.get("raw_a") is None
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json"]
+
+def test_concurrent_puts(tmp_path):
+
+    result_cache = ResultCache()
+    result_cache.init(str(tmp_path))
+
+    errors = []
+
+    def put(index):
+        try:
+            for _ in range(20):
+                result_cache.put("a", {"sol_list": [index]})
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=put, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert result_cache.get("a")["sol_list"][0] in range(8)
+    assert os.listdir(tmp_path) == ["a.json"]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+import sys
+sys.path.insert(0, "../../core")
+
+from analysis import AnalysisWithCorruption
+from parse_config import ParseConfig
+from results import AttackVector
+
+def test_cm14_results():
+
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    dec_params, corruptable_vars_from_A = parse_config.generate_dec_key_params()
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(None, dec_params, None, corruptable_vars_from_A, None)
+    analysis.run()
+
+    # nothing has been rendered yet
+    attack = analysis.analysis_list[0]
+    assert attack.sol is None
+
+    (result,) = analysis.results()
+    assert result.kind == "decryption"
+    assert result.found
+    assert [(str(e), str(c)) for e, c in result.vector.terms()] == [("k0[i]*c0", "1"), ("k1[i]*c1", "-1/b2")]
+
+    data = analysis.to_dict()
+    assert data["verdict"] == {"decryption": "attack found"}
+    assert data["results"][0]["vector"]["terms"][1] == {"encoding": "k1[i]*c1", "coefficient": "-1/b2"}
+
+    assert attack.show_solution().strip() == "[*] Decryption attack found: 1*k0[i]*c0 + -1/b2*k1[i]*c1"
+
+def test_attack_vector_lengths():
+
+    with pytest.raises(ValueError):
+        AttackVector(["k0*c0", "k1*c1"], [1])
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import subprocess
+import sys
+
+CMD_DIR = "../../tools/acabella_cmd"
+
+def test_help_does_not_load_sympy():
+
+    output = subprocess.run([sys.executable, "-X", "importtime", "acabella_cmd.py", "--help"], cwd=CMD_DIR,
+                            capture_output=True, text=True, check=True)
+    assert "sympy" not in output.stderr
+
+    output = subprocess.run([sys.executable, "-c", "import sys; sys.path.insert(0, '../../core'); import result_cache, console; print('sympy' in sys.modules)"],
+                            capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import tempfile
+sys.path.insert(0, "../../core")
+
+from analysis import AnalysisWithCorruption
+from budget import ACTIVE_BUDGETS, Budget
+from events import AnalysisFinished, PartialVerdict, StageStarted
+from parse_config import ParseConfig
+from result_cache import ResultCache
+
+def bsw07_analysis() -> AnalysisWithCorruption:
+    parse_config = ParseConfig()
+    parse_config.init("bsw07_config.json")
+    security_params = parse_config.generate_security_analysis_params()
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(None, None, None, None, security_params)
+
+    return analysis
+
+def test_stream_order():
+
+    analysis = bsw07_analysis()
+    events = list(analysis.stream())
+
+    assert [(type(event), getattr(event, "stage", None)) for event in events] == [
+        (StageStarted, "screen"),
+        (PartialVerdict, "fractional_check"),
+        (PartialVerdict, "ac17_form"),
+        (PartialVerdict, "trivial_security"),
+        (StageStarted, "proofs"),
+        (PartialVerdict, "proofs"),
+        (AnalysisFinished, None),
+    ]
+    assert events[1].verdict == "fractional" and not events[1].final
+    assert events[1].elapsed < 1.0
+    assert events[5].final and events[5].verdict == "secure"
+
+    # the same results as run
+    reference = bsw07_analysis()
+    reference.run()
+    assert events[-1].verdict == analysis.verdict() == reference.verdict()
+    assert analysis.show_solution()[0] == reference.show_solution()[0]
+
+def test_stream_attack_and_cache():
+
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    dec_params, corruptable_vars = parse_config.generate_dec_key_params()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        result_cache = ResultCache()
+        result_cache.init(cache_dir)
+
+        for stage in ["attack", "cache"]:
+            analysis = AnalysisWithCorruption()
+            analysis.init(None, dec_params, None, corruptable_vars, None)
+            analysis.set_result_cache(result_cache, "cm14")
+
+            verdicts = [event for event in analysis.stream() if isinstance(event, PartialVerdict)]
+            assert [(event.kind, event.stage, event.verdict, event.final) for event in verdicts] == [("decryption", stage, "attack found", True)]
+            assert verdicts[0].to_dict()["event"] == "verdict"
+            analysis.show_solution()
+
+def test_stream_budget():
+
+    analysis = bsw07_analysis()
+    analysis.set_budget(Budget(wall_time=0))
+    events = list(analysis.stream())
+
+    # the budget is exceeded by the screen, the proofs are skipped
+    assert [type(event) for event in events] == [StageStarted, PartialVerdict, AnalysisFinished]
+    assert events[1].final and events[1].verdict == "inconclusive: budget exceeded"
+    assert analysis.verdict() == {"security": "inconclusive: budget exceeded"}
+    assert ACTIVE_BUDGETS == []
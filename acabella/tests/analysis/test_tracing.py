@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import sys
+sys.path.insert(0, "../../core")
+
+from analysis import AnalysisWithCorruption
+from parse_config import ParseConfig
+from tracing import DISABLED_SPAN, TRACER, Tracer
+
+def test_spans():
+
+    tracer = Tracer()
+    assert tracer.span("stage") is DISABLED_SPAN
+
+    tracer.enable()
+    with tracer.span("outer", rows=2) as outer:
+        with tracer.span("inner"):
+            tracer.annotate(kernel_dim=1)
+        outer.set(cols=3)
+    tracer.disable()
+
+    assert [span.name for span in tracer.spans] == ["inner", "outer"]
+    assert tracer.spans[0].args == {"kernel_dim": 1}
+    assert tracer.spans[1].args == {"rows": 2, "cols": 3}
+
+    summary = {summary.name: summary for summary in tracer.summary()}
+    assert summary["outer"].own <= summary["outer"].total - summary["inner"].total + 1e-9
+
+    trace = tracer.to_chrome_trace()
+    json.dumps(trace)
+    assert [event["name"] for event in trace["traceEvents"]] == ["outer", "inner"]
+    assert all(event["ph"] == "X" for event in trace["traceEvents"])
+
+def test_traced_analysis():
+
+    parse_config = ParseConfig()
+    parse_config.init("cm14_config.json")
+    dec_params, corruptable_vars = parse_config.generate_dec_key_params()
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(None, dec_params, None, corruptable_vars, None)
+
+    TRACER.enable()
+    try:
+        analysis.run()
+    finally:
+        TRACER.disable()
+
+    names = [span.name for span in TRACER.spans]
+    assert "decryption_attack" in names and "nullspace" in names
+    for span in TRACER.spans:
+        if span.name == "nullspace":
+            assert {"rows", "cols", "kernel_dim"} <= set(span.args)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python                                                                  
+# -*- coding: utf-8 -*-                                                                
+                                                                                       
+# Copyright (c) 2022                                                                   
+#                                                                                      
+# This program is free software: you can redistribute it and/or modify                 
+# it under the terms of the GNU General Public License as published by                 
+# the Free Software Foundation, version 3.                                             
+#                                                                                      
+# This program is distributed in the hope that it will be useful, but                  
+# WITHOUT ANY WARRANTY; without even the implied warranty of                       
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU                 
+# General Public License for more details.                                         
+#                                                                                  
+# You should have received a copy of the GNU General Public License                
+# along with this program. If not, see <http://www.gnu.org/licenses/>.             
+"""
+Normalization of the denominators of the encodings by their least
+common multiple.
+"""
+
+import sys
+from sympy import cancel, expand, symbols
+
+sys.path.insert(0, '../../core')
+from common_methods import canonical, clear_denominators, collect_denoms, denoms_prod, gen_all_p, transform_encoding_list, writeencodingasprod
+
+def test_clear_denominators():
+
+    alpha, b, b1, r, s, x = symbols("alpha, b, b1, r, s, x")
+    unknown = [alpha, b, b1, r, s]
+
+    # b is squared only because of the product of 1/b with 1/b
+    p = [(alpha + r) / b * b * s, r / b * s / b, alpha / (b1 + x) * s / x + s / x]
+    (cleared, lcm) = clear_denominators(p + [alpha * s], unknown)
+
+    assert lcm == b**2 * (b1 + x)
+    assert cleared == [expand(cancel(enc * lcm)) for enc in p + [alpha * s]]
+
+def test_uvector_size():
+
+    alpha, b, b1, b2, r, s, x = symbols("alpha, b, b1, b2, r, s, x")
+    unknown = [alpha, b, b1, b2, r, s]
+
+    k = [(alpha + r) / b, r / (b1 + x)]
+    c = [s * b, s * (b1 + x) * b2, s / b]
+    p = gen_all_p(k, c, [b, b1], [])
+
+    (cleared, lcm) = clear_denominators(p, unknown)
+    (mat, uvector) = writeencodingasprod(cleared, unknown)
+
+    # the square of the product of the denominators
+    p = canonical(p)
+    denomprod = denoms_prod(collect_denoms(p, unknown))
+    (mat_prod, uvector_prod) = writeencodingasprod(transform_encoding_list(denomprod**2, p), unknown)
+
+    assert lcm == b**2 * (b1 + x)
+    assert len(uvector) == 41
+    assert len(uvector_prod) > 2 * len(uvector)
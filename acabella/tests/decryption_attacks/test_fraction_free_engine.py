@@ -0,0 +1,92 @@
+#!/usr/bin/env python                                                                  
+# -*- coding: utf-8 -*-                                                                
+                                                                                       
+# Copyright (c) 2022                                                                   
+#                                                                                      
+# This program is free software: you can redistribute it and/or modify                 
+# it under the terms of the GNU General Public License as published by                 
+# the Free Software Foundation, version 3.                                             
+#                                                                                      
+# This program is distributed in the hope that it will be useful, but                  
+# WITHOUT ANY WARRANTY; without even the implied warranty of                       
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU                 
+# General Public License for more details.                                         
+#                                                                                  
+# You should have received a copy of the GNU General Public License                
+# along with this program. If not, see <http://www.gnu.org/licenses/>.             
+"""
+Decryption key attacks against the NDCW15 and CM14 schemes using the
+fraction-free linear-algebra engine. The attacks must be identical to
+the ones found with the dense engine.
+"""
+
+import sys
+from sympy import Matrix, cancel, symbols
+
+sys.path.insert(0, '../../core')
+from decryption import DecryptionAttack
+from decryption import DecryptionKeyCorruptionModel
+from decryption import DecryptionKeyCorruptedVariable
+from linear_algebra import LinearAlgebraEngine, compute_nullspace, is_linear_combination, nullspace_fraction_free
+
+def test_ndcw15_fraction_free():
+
+    alpha, b1, b2, s, x1, x2, x3 = symbols("alpha, b1, b2, s, x1, x2, x3")
+
+    k = [alpha * (1 / (b1 + x3)) + x2 * b2 * (1 / (b1 + x3)), x1, x1 * b1]
+    c = [s, s * b1, s * b2]
+    gp = [b1, b2, 1]
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha * s, k, c, [], gp, [alpha, b1, b2, s])
+    decryption_attack.set_corruption_model(DecryptionKeyCorruptionModel.NoCorruption)
+    decryption_attack.set_linear_algebra_engine(LinearAlgebraEngine.fraction_free)
+
+    decryption_attack.run()
+    msg = decryption_attack.show_solution()
+
+    assert msg.strip() == "[*] Decryption attack found: k0*c0*x3 + 1*k0*c1 + -x2/x1*k1*c2", "[!] No solution found"
+
+def test_cm14_fraction_free():
+
+    alpha_i, b, b2, r, s = symbols("alpha_i, b, b2, r, s")
+
+    k = [(alpha_i + r) / b, r]
+    c = [s * b, s * b2]
+    mpk = [b]
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha_i * s, k, c, mpk, [], [alpha_i, b, b2, r, s])
+    decryption_attack.add_mpk_AAi(b2)
+    decryption_attack.add_mpk_AAj(b)
+    decryption_attack.set_corruption_model(DecryptionKeyCorruptionModel.AA_extended)
+    decryption_attack.add_corruptable_var(DecryptionKeyCorruptedVariable.MPK_AAi, b2)
+    decryption_attack.set_linear_algebra_engine(LinearAlgebraEngine.fraction_free)
+
+    decryption_attack.run()
+    msg = decryption_attack.show_solution()
+
+    assert msg.strip() == "[*] Decryption attack found: 1*k0[i]*c0 + -1/b2*k1[i]*c1", "[!] No solution found"
+
+def test_fraction_free_kernel():
+
+    x1, x2, y = symbols("x1, x2, y")
+
+    mat = Matrix([[1, x1, 1 / y, 0], [x2, 1, 0, y], [1 + x2, 1 + x1, 1 / y, y]])
+
+    kern = nullspace_fraction_free(mat)
+    assert len(kern) == 2
+
+    # polynomial numerators over a single common denominator
+    for (vec, den) in kern:
+        assert all(el.is_polynomial(x1, x2, y) for el in vec)
+        assert den.is_polynomial(x1, x2, y)
+        assert (mat * vec).applyfunc(cancel).is_zero_matrix
+
+    # the entries of the kernel vectors are already in lowest terms
+    for vec in compute_nullspace(mat, LinearAlgebraEngine.fraction_free):
+        assert all(cancel(el) == el for el in vec)
+
+    (vec, den) = kern[0]
+    assert is_linear_combination(list(vec), mat.transpose(), Matrix([[0, 0, 0]]))
+    assert not is_linear_combination([1, 0, 0, 0], mat.transpose(), Matrix([[0, 0, 0]]))
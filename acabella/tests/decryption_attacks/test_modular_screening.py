@@ -0,0 +1,107 @@
+#!/usr/bin/env python                                                                  
+# -*- coding: utf-8 -*-                                                                
+                                                                                       
+# Copyright (c) 2022                                                                   
+#                                                                                      
+# This program is free software: you can redistribute it and/or modify                 
+# it under the terms of the GNU General Public License as published by                 
+# the Free Software Foundation, version 3.                                             
+#                                                                                      
+# This program is distributed in the hope that it will be useful, but                  
+# WITHOUT ANY WARRANTY; without even the implied warranty of                       
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU                 
+# General Public License for more details.                                         
+#                                                                                  
+# You should have received a copy of the GNU General Public License                
+# along with this program. If not, see <http://www.gnu.org/licenses/>.             
+"""
+Decryption key attacks with the modular screening enabled. The screening
+may only decide negative results, so the attacks must be identical to
+the ones found without it.
+"""
+
+import random
+import sys
+from sympy import Matrix, symbols
+
+sys.path.insert(0, '../../core')
+from decryption import DecryptionAttack
+from decryption import DecryptionKeyCorruptionModel
+from linear_algebra import screen_independent_columns, screen_unspanned_columns
+
+def test_screen_columns():
+
+    x = symbols("x")
+    rng = random.Random(1)
+
+    # the first column is x times the second one
+    mat = Matrix([[x, 1], [x**2, x]])
+    assert screen_independent_columns(mat, [0], rng=rng) == (False, None)
+    assert screen_unspanned_columns(mat, [0], rng=rng) == (False, None)
+
+    mat = Matrix([[x, 1], [1, x]])
+    (independent, error_bound) = screen_independent_columns(mat, [0], rng=rng)
+    assert independent and 0 < error_bound < 1e-15
+    (unspanned, error_bound) = screen_unspanned_columns(mat, [0], rng=rng)
+    assert unspanned and 0 < error_bound < 1e-15
+
+def test_ndcw15_screening():
+
+    alpha, b1, b2, s, x1, x2, x3 = symbols("alpha, b1, b2, s, x1, x2, x3")
+
+    k = [alpha * (1 / (b1 + x3)) + x2 * b2 * (1 / (b1 + x3)), x1, x1 * b1]
+    c = [s, s * b1, s * b2]
+    gp = [b1, b2, 1]
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha * s, k, c, [], gp, [alpha, b1, b2, s])
+    decryption_attack.set_corruption_model(DecryptionKeyCorruptionModel.NoCorruption)
+    decryption_attack.set_modular_screening(True)
+
+    decryption_attack.run()
+    msg = decryption_attack.show_solution()
+
+    assert msg.strip() == "[*] Decryption attack found: k0*c0*x3 + 1*k0*c1 + -x2/x1*k1*c2", "[!] No solution found"
+    assert decryption_attack.result.error_bound is None
+
+def test_ndcw15_without_b2_screening():
+
+    alpha, b1, b2, s, x1, x2, x3 = symbols("alpha, b1, b2, s, x1, x2, x3")
+
+    k = [alpha * (1 / (b1 + x3)) + x2 * b2 * (1 / (b1 + x3)), x1, x1 * b1]
+    c = [s, s * b1]
+    gp = [b1, 1]
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha * s, k, c, [], gp, [alpha, b1, b2, s])
+    decryption_attack.set_corruption_model(DecryptionKeyCorruptionModel.NoCorruption)
+    decryption_attack.set_modular_screening(True)
+
+    decryption_attack.run()
+    result = decryption_attack.result
+
+    # the singleton elimination already decides the result exactly
+    assert not result.found
+    assert result.error_bound is None
+    assert decryption_attack.reduction.infeasible
+
+def test_distinct_attributes_screening():
+
+    alpha, b1, b2, r, s, x1, x2 = symbols("alpha, b1, b2, r, s, x1, x2")
+
+    k = [alpha + r * (b1 + x1 * b2), r]
+    c = [s * (b1 + x2 * b2), s]
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha * s, k, c, [], [1], [alpha, b1, b2, r, s])
+    decryption_attack.set_corruption_model(DecryptionKeyCorruptionModel.NoCorruption)
+    decryption_attack.set_modular_screening(True)
+
+    decryption_attack.run()
+    result = decryption_attack.result
+
+    assert not decryption_attack.reduction.infeasible
+    assert not result.found
+    assert 0 < result.error_bound < 1e-15
+    assert result.to_dict()["error_bound"] == result.error_bound
+    assert decryption_attack.show_solution().strip().startswith("[!] No decryption attack found (decided by modular screening")
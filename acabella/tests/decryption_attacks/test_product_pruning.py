@@ -0,0 +1,77 @@
+#!/usr/bin/env python                                                                  
+# -*- coding: utf-8 -*-                                                                
+                                                                                       
+# Copyright (c) 2022                                                                   
+#                                                                                      
+# This program is free software: you can redistribute it and/or modify                 
+# it under the terms of the GNU General Public License as published by                 
+# the Free Software Foundation, version 3.                                             
+#                                                                                      
+# This program is distributed in the hope that it will be useful, but                  
+# WITHOUT ANY WARRANTY; without even the implied warranty of                       
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU                 
+# General Public License for more details.                                         
+#                                                                                  
+# You should have received a copy of the GNU General Public License                
+# along with this program. If not, see <http://www.gnu.org/licenses/>.             
+"""
+Decryption key attacks on products of encodings pruned by their
+reachability from the key. The attacks must be identical to the ones
+found on all the products.
+"""
+
+import sys
+from sympy import symbols
+
+sys.path.insert(0, '../../core')
+from common_methods import relevant_products
+from decryption import DecryptionAttack
+from decryption import DecryptionKeyCorruptionModel
+
+def test_ndcw15_unrelated_mpk():
+
+    alpha, b1, b2, s, x1, x2, x3, u1, u2, u3, v = symbols("alpha, b1, b2, s, x1, x2, x3, u1, u2, u3, v")
+
+    k = [alpha * (1 / (b1 + x3)) + x2 * b2 * (1 / (b1 + x3)), x1, x1 * b1]
+    c = [s, s * b1, s * b2]
+    mpk = [u1, u2, u3 * v]
+    gp = [b1, b2, 1]
+    unknown = [alpha, b1, b2, s, u1, u2, u3, v]
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha * s, k, c, mpk, gp, unknown)
+    decryption_attack.set_corruption_model(DecryptionKeyCorruptionModel.NoCorruption)
+
+    # the products with the mpk cannot occur in an attack, only the
+    # relevant ones are generated by run
+    assert decryption_attack.all_p is None
+    assert len(decryption_attack.gen_all_p_ex_dict(k, c, mpk, gp)) == 45
+
+    decryption_attack.run()
+    assert len(decryption_attack.all_p) == 8
+    msg = decryption_attack.show_solution()
+
+    assert msg.strip() == "[*] Decryption attack found: k0*c0*x3 + 1*k0*c1 + -x2/x1*k1*c2", "[!] No solution found"
+
+def test_duplicate_encodings():
+
+    alpha, r, s = symbols("alpha, r, s")
+
+    decryption_attack = DecryptionAttack()
+    decryption_attack.init(alpha * s, [alpha + r, r, r], [s], [], [], [alpha, r, s])
+
+    decryption_attack.run()
+    assert [a_dict["dsc"] for a_dict in decryption_attack.all_p] == ["k0*c0", "k1*c0", "k2*c0"]
+    msg = decryption_attack.show_solution()
+
+    assert msg.strip() == "[*] Decryption attack found: 1*k0*c0 + -1*k1*c0", "[!] No solution found"
+
+def test_relevant_products():
+
+    alpha, b, r, s, x = symbols("alpha, b, r, s, x")
+
+    # the second product cancels the r*s of the first one
+    products = [((alpha + r) / b, b * s), (r, s), (b, x * b), (b, s)]
+
+    assert relevant_products(alpha * s, products, [alpha, b, r, s]) == {0, 1}
+    assert relevant_products(alpha * s, products, []) is None
@@ -24,6 +24,7 @@ sys.path.insert(0, "../../core")
 
 from parse_config import ParseConfig
 from generate_abgw_inputs import generate_abgw_input
+from abgw_bridge import SolverPool, abgw_problem
 
 if __name__ == "__main__":
     print("[*] ABGW bridge cmd tool")
@@ -33,6 +34,13 @@ if __name__ == "__main__":
     parser.add_argument("json_input", 
                         type=str, 
                         help='The description of the ABE scheme using the ACABELLA format in JSON')
+    parser.add_argument("-s", "--solver",
+                        type=str,
+                        help='Check the input with this ABGW solver executable (e.g. ./solver.native) instead of printing it')
+    parser.add_argument("-t", "--timeout",
+                        type=float,
+                        default=60,
+                        help='Time limit of the solver in seconds (default: 60)')
     
     args = parser.parse_args()
     
@@ -46,7 +54,12 @@ if __name__ == "__main__":
     abgw_params = parse_json.generate_abgw_bridge_params()
 
     # prepare output for ABGW tool
-    
-    generate_abgw_input(abgw_params["key"], abgw_params["k_encodings"], abgw_params["c_encodings"], abgw_params["gp_encodings"], abgw_params["unknown"], abgw_params["known"])
-
 
+    if args.solver is None:
+        generate_abgw_input(abgw_params["key"], abgw_params["k_encodings"], abgw_params["c_encodings"], abgw_params["gp_encodings"], abgw_params["unknown"], abgw_params["known"])
+    else:
+        solver_pool = SolverPool()
+        solver_pool.init([args.solver], 1, args.timeout)
+        with solver_pool:
+            result = solver_pool.solve(abgw_problem(abgw_params))
+        print("[*] ABGW verdict: " + result.verdict.name + " (" + result.output + ")")
@@ -19,16 +19,47 @@
 based on JSON inputs"""
 
 import sys
+import json
 import argparse
 sys.path.insert(0, "../../core")
 
-from parse_config import ParseConfig
-from analysis import AnalysisWithCorruption
-from conditional import ConditionalDecryptionAttack
+# the analysis modules load SymPy, they are only imported once an
+# analysis has to run (not for --help or a cached result)
+from result_cache import ResultCache, config_key, raw_config_key, render_cached_solution
+from tracing import TRACER, span
+from budget import Budget
+
+def run_analysis(analysis, stream: bool) -> None:
+    """
+    Runs the analysis. With stream, the partial verdicts are printed
+    as soon as each stage finishes, see AnalysisWithCorruption.stream.
+
+    Parameters:
+        analysis (AnalysisWithCorruption): Initialized analysis.
+        stream (bool): Print the progress of the analysis.
+    """
+    if not stream:
+        analysis.run()
+        return
+
+    for event in analysis.stream():
+        print(event.render(), flush=True)
 
 if __name__ == "__main__":
     print("[*] ACABELLA cmd tool")
 
+    # batch mode: acabella_cmd.py batch <directory or glob> [options]
+
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from batch import batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+
+    # sweep mode: acabella_cmd.py sweep -c <config> [options]
+
+    if len(sys.argv) > 1 and sys.argv[1] == "sweep":
+        from sweep import sweep_main
+        sys.exit(sweep_main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser()
 
 
@@ -43,12 +74,87 @@ if __name__ == "__main__":
                        help='Configuration file for the analysis type in ACABELLA JSON format',
                        required="true")
 
+    parser.add_argument('--no-cache',
+                       action='store_true',
+                       help='Do not read or store the results in the on-disk result cache')
+
+    parser.add_argument('--cache-dir',
+                       action='store',
+                       help='Directory of the result cache (default: $XDG_CACHE_HOME/acabella)')
+
+    parser.add_argument('--screen',
+                       action='store_true',
+                       help='Screen the attack and proof matrices modulo a prime and only compute them exactly if an attack or proof may exist')
+
+    parser.add_argument('--json',
+                       action='store',
+                       help='Also write the results to this file in JSON format')
+
+    parser.add_argument('--time-budget',
+                       type=float,
+                       help='Wall-clock budget of every attack in seconds; an attack that exceeds it reports an inconclusive result')
+
+    parser.add_argument('--memory-budget',
+                       type=float,
+                       help='Memory (resident set size) budget of every attack in MB; an attack that exceeds it reports an inconclusive result')
+
+    parser.add_argument('--profile',
+                       action='store',
+                       help='Trace the stages of the analysis (without the result cache) and write them to this file in Chrome trace event format')
+
+    parser.add_argument('--stream',
+                       action='store_true',
+                       help='Print the partial verdicts as soon as each stage finishes (the cheap security checks first, then the attacks and the security proofs); not supported by cond and comp')
+
     args = parser.parse_args()
 
+    # the conditional attack has a single stage and comp only runs the
+    # attacks after the complete security analysis
+    if args.stream and args.analysis in ["cond", "comp"]:
+        parser.error("--stream is not supported by the " + args.analysis + " analysis")
+
+    budget = None
+    if args.time_budget is not None or args.memory_budget is not None:
+        budget = Budget(args.time_budget, int(args.memory_budget * 1024) if args.memory_budget is not None else None)
+
     # parse json input
 
+    with open(args.config, "r") as read_file:
+        json_parsed = json.load(read_file)
+
+    # results of identical configurations are served from the cache
+
+    result_cache = None
+    analysis_name = str(args.analysis) + ("-screen" if args.screen else "")
+    raw_key = raw_config_key(json_parsed, analysis_name)
+
+    if args.profile:
+        TRACER.enable()
+
+    if not args.no_cache and not args.profile and args.analysis != "cond":
+        result_cache = ResultCache()
+        result_cache.init(args.cache_dir)
+
+        cached_solution = result_cache.get(raw_key)
+        if cached_solution is not None:
+            print("\n\n[*] Analyzing scheme...\n\n")
+            render_cached_solution(cached_solution)
+            if args.json:
+                with open(args.json, "w") as write_file:
+                    json.dump({"verdict": cached_solution.get("verdict", {}), "results": cached_solution.get("results", [])}, write_file, indent=4)
+            sys.exit(0)
+
+    with span("imports"):
+        from console import enable_pretty_printing
+        from parse_config import ParseConfig
+        from analysis import AnalysisWithCorruption
+        from conditional import ConditionalDecryptionAttack
+
+    enable_pretty_printing()
+
     parse_config = ParseConfig() 
-    parse_config.init(args.config)
+    parse_config.init_with_parsed(json_parsed)
+    cache_key = config_key(parse_config.json_parsed, analysis_name)
 
     # perform analysis
 
@@ -59,41 +165,91 @@ if __name__ == "__main__":
             master_params, corruptable_vars = parse_config.generate_master_key_params()
             analysis = AnalysisWithCorruption()
             analysis.init(master_params, None, corruptable_vars, None, None)
-            analysis.run()
+            analysis.set_modular_screening(args.screen)
+            analysis.set_budget(budget)
+            analysis.set_symbol_table(parse_config.symbol_table)
+            if result_cache is not None:
+                analysis.set_result_cache(result_cache, cache_key)
+            run_analysis(analysis, args.stream)
             msgs = analysis.show_solution()
             #print("\n" + msgs[0])
         case "da":
                 dec_params, corruptable_vars = parse_config.generate_dec_key_params()
                 analysis = AnalysisWithCorruption()
                 analysis.init(None, dec_params, None, corruptable_vars, None)
-                analysis.run()
+                analysis.set_modular_screening(args.screen)
+                analysis.set_budget(budget)
+                analysis.set_symbol_table(parse_config.symbol_table)
+                if result_cache is not None:
+                    analysis.set_result_cache(result_cache, cache_key)
+                run_analysis(analysis, args.stream)
                 msgs = analysis.show_solution()
                 print('\n'.join(msgs))
         case "sec":
                 security_params = parse_config.generate_security_analysis_params()
                 analysis = AnalysisWithCorruption()
                 analysis.init(None, None, None, None, security_params)
-                analysis.run()
+                analysis.set_modular_screening(args.screen)
+                analysis.set_budget(budget)
+                analysis.set_symbol_table(parse_config.symbol_table)
+                if result_cache is not None:
+                    analysis.set_result_cache(result_cache, cache_key)
+                run_analysis(analysis, args.stream)
                 #print('\n'.join(analysis.show_solution()))
                 analysis.show_solution()
         case "cond":
                 cd_config = parse_config.generate_conditional_params()
                 cd_attack = ConditionalDecryptionAttack()
                 cd_attack.init(cd_config["alpha"], cd_config["special_s"], cd_config["mpk"], cd_config["k_fixed"], cd_config["k_att"], cd_config["c_fixed"], cd_config["c_att"], cd_config["unknown"], cd_config["prefixes"], cd_config["nr_indexed_encodings"])
+                if cd_config["policy"] is not None:
+                    cd_attack.set_policy(cd_config["policy"])
+                cd_attack.set_budget(budget)
                 cd_attack.run()
                 msg = cd_attack.show_solution()
                 print(msg[0])
+                analysis = None
         case "all":
                 security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
                 analysis = AnalysisWithCorruption()
                 analysis.init(master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
-                analysis.run()
+                analysis.set_modular_screening(args.screen)
+                analysis.set_budget(budget)
+                analysis.set_symbol_table(parse_config.symbol_table)
+                if result_cache is not None:
+                    analysis.set_result_cache(result_cache, cache_key)
+                run_analysis(analysis, args.stream)
                 msg = analysis.show_solution()
         case "comp":
                 security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
                 analysis = AnalysisWithCorruption()
                 analysis.init(master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
+                analysis.set_modular_screening(args.screen)
+                analysis.set_budget(budget)
+                analysis.set_symbol_table(parse_config.symbol_table)
+                if result_cache is not None:
+                    analysis.set_result_cache(result_cache, cache_key)
                 analysis.run_logic()
                 msg = analysis.show_solution()
         case _:
             pass # should be caught by argparse
+
+    # structured results, rendered without any string processing
+
+    if args.json:
+        if analysis is not None:
+            results = analysis.to_dict()
+        else:
+            results = {"verdict": {"conditional": cd_attack.result.verdict()}, "results": [cd_attack.result.to_dict()]}
+
+        with open(args.json, "w") as write_file:
+            json.dump(results, write_file, indent=4)
+
+    if result_cache is not None and result_cache.get(cache_key) is not None:
+        result_cache.link(raw_key, cache_key)
+
+    # time spent in every stage of the analysis
+
+    if args.profile:
+        TRACER.disable()
+        TRACER.write_chrome_trace(args.profile)
+        print("\n" + TRACER.summary_table(), file=sys.stderr)
@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""batch.py: Batch mode of acabella_cmd, which analyzes a directory
+of ACABELLA JSON configurations in parallel"""
+
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import resource
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.insert(0, "../../core")
+
+from result_cache import ResultCache, config_key
+from budget import Budget
+
+# modules that load SymPy, preloaded by the fork server of the workers
+ANALYSIS_MODULES = ["parse_config", "analysis", "conditional"]
+
+ANALYSIS_TYPES = ['mk', 'da', 'sec', 'cond', 'all', 'comp']
+
+class JobTimeout(Exception):
+    """
+    Raised inside a worker when a job exceeds its time limit.
+    """
+    pass
+
+def collect_configs(target: str) -> list:
+    """
+    Returns the configuration files to analyze.
+
+    Parameters:
+        target (str): Directory (searched recursively for *.json files) or glob pattern.
+
+    Returns:
+        (list): Sorted list of paths.
+    """
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "**", "*.json")
+    else:
+        pattern = target
+
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def run_analysis(parse_config: "ParseConfig", analysis_type: str, result_cache: ResultCache = None, budget: Budget = None) -> dict:
+    """
+    Runs one type of analysis on a parsed configuration, in the same
+    way as the single-configuration mode of acabella_cmd.
+
+    Parameters:
+        parse_config (ParseConfig): Initialized configuration.
+        analysis_type (str): Type of analysis (mk, da, sec, cond, all, comp).
+        result_cache (ResultCache): Optional result cache.
+        budget (Budget): Optional per-attack budget.
+
+    Returns:
+        (dict): Verdict of the analysis, see AnalysisWithCorruption.verdict.
+    """
+    from analysis import AnalysisWithCorruption
+    from conditional import ConditionalDecryptionAttack
+
+    match analysis_type:
+        case "cond":
+            cd_config = parse_config.generate_conditional_params()
+            cd_attack = ConditionalDecryptionAttack()
+            cd_attack.init(cd_config["alpha"], cd_config["special_s"], cd_config["mpk"], cd_config["k_fixed"], cd_config["k_att"], cd_config["c_fixed"], cd_config["c_att"], cd_config["unknown"], cd_config["prefixes"], cd_config["nr_indexed_encodings"])
+            if cd_config["policy"] is not None:
+                cd_attack.set_policy(cd_config["policy"])
+            cd_attack.set_budget(budget)
+            cd_attack.run()
+            return {"conditional": cd_attack.result.verdict()}
+        case "mk":
+            master_params, corruptable_vars = parse_config.generate_master_key_params()
+            params = (master_params, None, corruptable_vars, None, None)
+        case "da":
+            dec_params, corruptable_vars = parse_config.generate_dec_key_params()
+            params = (None, dec_params, None, corruptable_vars, None)
+        case "sec":
+            security_params = parse_config.generate_security_analysis_params()
+            params = (None, None, None, None, security_params)
+        case "all" | "comp":
+            security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
+            params = (master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
+        case _:
+            raise ValueError("unknown analysis type: " + str(analysis_type))
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(*params)
+    analysis.set_symbol_table(parse_config.symbol_table)
+    analysis.set_budget(budget)
+
+    if result_cache is not None:
+        analysis.set_result_cache(result_cache, config_key(parse_config.json_parsed, analysis_type))
+
+    if analysis_type == "comp":
+        analysis.run_logic()
+    else:
+        analysis.run()
+
+    analysis.show_solution()
+
+    return analysis.verdict()
+
+def run_job(config: str, analysis_type: str, timeout: float, cache_dir: str = None, log_dir: str = None, budget: Budget = None) -> dict:
+    """
+    Worker entry point: analyzes one configuration and measures the
+    wall time and the peak resident set size of the worker.
+
+    Parameters:
+        config (str): Path to the configuration file.
+        analysis_type (str): Type of analysis (mk, da, sec, cond, all, comp).
+        timeout (float): Time limit in seconds, 0 disables it.
+        cache_dir (str): Directory of the result cache, None disables it.
+        log_dir (str): Directory where the output of the analysis is stored,
+                       None discards it.
+        budget (Budget): Optional per-attack budget. Unlike the time limit,
+                       an exceeded budget still yields a verdict
+                       ("inconclusive: budget exceeded").
+
+    Returns:
+        (dict): Summary record of the job.
+    """
+    record = {
+        "scheme_id": os.path.splitext(os.path.basename(config))[0],
+        "config": config,
+        "analysis": analysis_type,
+        "status": "ok",
+        "verdict": None,
+    }
+
+    if log_dir is not None:
+        log_name = os.path.splitext(os.path.normpath(config))[0].replace(os.sep, "_").lstrip("._")
+        log_path = os.path.join(log_dir, log_name + "_" + analysis_type + ".log")
+    else:
+        log_path = os.devnull
+
+    start = time.perf_counter()
+
+    # parse_config swallows every exception, hence the expiration of the
+    # time limit is also recorded outside of the raised exception
+    expired = []
+
+    def raise_timeout(signum, frame):
+        expired.append(True)
+        raise JobTimeout()
+
+    if timeout:
+        signal.signal(signal.SIGALRM, raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        with open(log_path, "w") as log_file, contextlib.redirect_stdout(log_file):
+            from parse_config import ParseConfig
+
+            parse_config = ParseConfig()
+            parse_config.init(config)
+
+            if "scheme_id" in parse_config.json_parsed:
+                record["scheme_id"] = str(parse_config.json_parsed["scheme_id"])
+
+            result_cache = None
+            if cache_dir is not None:
+                result_cache = ResultCache()
+                result_cache.init(cache_dir)
+
+            record["verdict"] = run_analysis(parse_config, analysis_type, result_cache, budget)
+
+            # the configuration lacks the parameters of this analysis
+            if not record["verdict"]:
+                record["status"] = "skipped"
+    except JobTimeout:
+        record["status"] = "timeout"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = type(e).__name__ + ": " + str(e)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+    if expired:
+        record["status"] = "timeout"
+        record["verdict"] = None
+        record.pop("error", None)
+
+    record["wall_time"] = round(time.perf_counter() - start, 3)
+
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    record["peak_rss_kb"] = peak_rss
+
+    return record
+
+def run_batch(configs: list, analysis_types: list, workers: int = None, timeout: float = 0, cache_dir: str = None, log_dir: str = None, budget: Budget = None):
+    """
+    Runs every (configuration, analysis) pair in a pool of worker
+    processes. Every job runs in a fresh process forked from a server
+    that has already imported SymPy and the ACABELLA core, so the
+    reported peak RSS belongs to a single job while the import cost is
+    only paid once.
+
+    Parameters:
+        configs (list): Paths to the configuration files.
+        analysis_types (list): Types of analysis to perform on every configuration.
+        workers (int): Number of worker processes, by default the number of CPUs.
+        timeout (float): Per-job time limit in seconds, 0 disables it.
+        cache_dir (str): Directory of the result cache, None disables it.
+        log_dir (str): Directory where the output of every job is stored.
+        budget (Budget): Optional per-attack budget of every job.
+
+    Returns:
+        (generator): Summary records, in order of completion.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        # batch imports the analysis modules lazily, so they are preloaded too
+        ctx.set_forkserver_preload(["batch"] + ANALYSIS_MODULES)
+    else:
+        ctx = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, max_tasks_per_child=1) as executor:
+        futures = [executor.submit(run_job, config, analysis_type, timeout, cache_dir, log_dir, budget)
+                   for config in configs for analysis_type in analysis_types]
+
+        for future in as_completed(futures):
+            yield future.result()
+
+def batch_main(argv: list) -> int:
+    """
+    Entry point of `acabella_cmd.py batch`.
+
+    Parameters:
+        argv (list): Command line arguments after "batch".
+
+    Returns:
+        (int): Exit status, 1 if any job failed or timed out.
+    """
+    parser = argparse.ArgumentParser(prog="acabella_cmd.py batch",
+                                     description="Analyze every ACABELLA JSON configuration of a directory in parallel")
+
+    parser.add_argument('target',
+                       nargs='?',
+                       default='examples',
+                       help='Directory (searched recursively) or glob pattern of the configuration files (default: examples)')
+
+    parser.add_argument('-a', '--analysis',
+                       nargs='+',
+                       choices=ANALYSIS_TYPES,
+                       default=['all'],
+                       help='Types of analysis to perform on every configuration (default: all)')
+
+    parser.add_argument('-j', '--workers',
+                       type=int,
+                       default=None,
+                       help='Number of worker processes (default: number of CPUs)')
+
+    parser.add_argument('-t', '--timeout',
+                       type=float,
+                       default=300,
+                       help='Time limit of every job in seconds, 0 disables it (default: 300)')
+
+    parser.add_argument('--time-budget',
+                       type=float,
+                       help='Wall-clock budget of every attack in seconds; an attack that exceeds it reports an inconclusive verdict')
+
+    parser.add_argument('--memory-budget',
+                       type=float,
+                       help='Memory (resident set size) budget of every attack in MB; an attack that exceeds it reports an inconclusive verdict')
+
+    parser.add_argument('-o', '--output',
+                       action='store',
+                       default='acabella_batch.jsonl',
+                       help='JSONL summary file (default: acabella_batch.jsonl)')
+
+    parser.add_argument('--log-dir',
+                       action='store',
+                       help='Store the output of every job in this directory')
+
+    parser.add_argument('--no-cache',
+                       action='store_true',
+                       help='Do not read or store the results in the on-disk result cache')
+
+    parser.add_argument('--cache-dir',
+                       action='store',
+                       help='Directory of the result cache (default: $XDG_CACHE_HOME/acabella)')
+
+    args = parser.parse_args(argv)
+
+    budget = None
+    if args.time_budget is not None or args.memory_budget is not None:
+        budget = Budget(args.time_budget, int(args.memory_budget * 1024) if args.memory_budget is not None else None)
+
+    configs = collect_configs(args.target)
+    if not configs:
+        print("[!] No configuration files found in " + args.target)
+        return 1
+
+    cache_dir = None
+    if not args.no_cache:
+        result_cache = ResultCache()
+        result_cache.init(args.cache_dir)
+        cache_dir = result_cache.cache_dir
+
+    if args.log_dir is not None:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    nr_jobs = len(configs) * len(args.analysis)
+    print("\n[*] Running " + str(nr_jobs) + " jobs on " + str(len(configs)) + " configurations\n")
+
+    failed = 0
+    with open(args.output, "w") as summary:
+        for record in run_batch(configs, args.analysis, args.workers, args.timeout, cache_dir, args.log_dir, budget):
+            summary.write(json.dumps(record) + "\n")
+            summary.flush()
+
+            if record["status"] in ["timeout", "error"]:
+                failed += 1
+
+            if record["status"] != "ok":
+                outcome = record["status"]
+            else:
+                outcome = ", ".join(k + ": " + v for k, v in record["verdict"].items())
+
+            print("\t" + record["scheme_id"] + " [" + record["analysis"] + "] " + outcome + " (" + str(record["wall_time"]) + " s)")
+
+    print("\n[*] Summary written to " + args.output)
+
+    return 1 if failed else 0
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""sweep.py: Sweep mode of acabella_cmd, which measures how the
+analyses of a configuration scale with the number of attributes and keys"""
+
+import argparse
+import json
+import sys
+
+sys.path.insert(0, "../../core")
+
+from parse_config import ParseConfig
+from parameter_sweep import ParameterSweep, SweepAnalysis
+
+def parse_range(value: str) -> list:
+    """
+    Parses a list of sizes such as "2,3,5" or "2-6".
+
+    Parameters:
+        value (str): Comma separated sizes or ranges.
+
+    Returns:
+        (list): Sizes.
+    """
+    sizes = []
+    for part in value.split(","):
+        if "-" in part:
+            (low, high) = part.split("-")
+            sizes += list(range(int(low), int(high) + 1))
+        else:
+            sizes.append(int(part))
+
+    return sizes
+
+def sweep_main(argv: list) -> int:
+    """
+    Entry point of `acabella_cmd.py sweep`.
+
+    Parameters:
+        argv (list): Command line arguments after "sweep".
+
+    Returns:
+        (int): Exit status.
+    """
+    parser = argparse.ArgumentParser(prog="acabella_cmd.py sweep",
+                                     description="Measure an analysis of a configuration over a grid of attribute and key counts")
+
+    parser.add_argument('-c', '--config',
+                       required=True,
+                       help='Configuration file with the indexed encodings (as for the conditional attack)')
+
+    parser.add_argument('-a', '--analysis',
+                       choices=[analysis.name for analysis in SweepAnalysis],
+                       default='conditional',
+                       help='Analysis to sweep (default: conditional)')
+
+    parser.add_argument('--attributes',
+                       type=parse_range,
+                       default=[2, 3, 4],
+                       help='Numbers of ciphertext attributes, e.g. 2,3,5 or 2-6 (default: 2-4), replaced by the attributes of the policy of the configuration if it has one')
+
+    parser.add_argument('--keys',
+                       type=parse_range,
+                       default=[1, 2],
+                       help='Numbers of copies of the keys, conditional attack only (default: 1-2)')
+
+    parser.add_argument('-o', '--output',
+                       action='store',
+                       help='Write the points of the sweep to this JSON file')
+
+    args = parser.parse_args(argv)
+
+    parse_config = ParseConfig()
+    parse_config.init(args.config)
+    params = parse_config.generate_conditional_params()
+    if params is None:
+        print("[!] The configuration has no indexed encodings")
+        return 1
+
+    sweep = ParameterSweep()
+    try:
+        sweep.init(SweepAnalysis[args.analysis], params, args.attributes, args.keys)
+    except ValueError as error:
+        print("[!] " + str(error))
+        return 1
+
+    print("\n[*] Sweeping the " + args.analysis + " analysis of " + args.config + "\n")
+    sweep.run()
+    print(sweep.table())
+
+    if args.output is not None:
+        with open(args.output, "w") as output:
+            json.dump(sweep.to_dict(), output, indent=2)
+        print("\n[*] Sweep written to " + args.output)
+
+    return 0
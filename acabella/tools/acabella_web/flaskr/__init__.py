@@ -15,6 +15,8 @@
 # You should have received a copy of the GNU General Public License 
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+import os
+
 from flask import Flask
 
 def create_app(test_config=None):
@@ -24,6 +26,12 @@ def create_app(test_config=None):
 
     app.config.from_mapping(
         SECRET_KEY='dev',
+        # background analysis jobs, see jobs.py
+        JOBS_DATABASE=os.path.join(app.instance_path, 'jobs.sqlite'),
+        JOBS_WORKERS=2,
+        JOBS_TIMEOUT=0,
+        # analyze the examples of the analysis pages at startup, see precompute.py
+        PRECOMPUTE_EXAMPLES=True,
     )
 
     if test_config is None:
@@ -35,8 +43,14 @@ def create_app(test_config=None):
 
     from . import acabella_app
     app.register_blueprint(acabella_app.bp)
+
+    from . import jobs
+    jobs.init_app(app)
     app.add_url_rule('/', endpoint='index')
 
+    from . import precompute
+    precompute.init_app(app)
+
     return app
 
 
@@ -23,9 +23,9 @@ from werkzeug.exceptions import abort
 import json
 import sys
 sys.path.insert(0, "../../core")
-from analysis import AnalysisWithCorruption
 from parse_config import ParseConfig
 from conditional import ConditionalDecryptionAttack
+from .jobs import submit_analysis
 
 bp = Blueprint('acabella_app', __name__)
 
@@ -76,14 +76,7 @@ def ndcw15_attack():
                         return render_template('acabella_app/ndcw15_attack.html', 
                                 analysis_type=[{'name':'Complete'}])
 
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(master_params, None, corruptable_vars, None, None)
-                    analysis.run()
-                    attack_result, _, _ = analysis.show_solution()
-                    attack_result.pop(0) # remove mk placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result)) #posts)
+                    return submit_analysis(body, "mk")
 
                 case "Decryption Attack":
                     dec_params, corruptable_vars = parse_config.generate_dec_key_params()
@@ -93,14 +86,7 @@ def ndcw15_attack():
                         return render_template('acabella_app/ndcw15_attack.html', 
                                 analysis_type=[{'name':'Complete'}])
                     
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(None, dec_params, None, corruptable_vars, None)
-                    analysis.run()
-                    attack_result, _, _ = analysis.show_solution()
-                    attack_result.pop(0) # remove mk placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result)) #posts)
+                    return submit_analysis(body, "da")
 
                 case "Security":
                     security_params = parse_config.generate_security_analysis_params()
@@ -110,15 +96,7 @@ def ndcw15_attack():
                         return render_template('acabella_app/ndcw15_attack.html', 
                                 analysis_type=[{'name':'Complete'}])
 
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(None, None, None, None, security_params)
-                    analysis.run()
-                    attack_result, proof_result, proof_header = analysis.show_solution()
-                
-                    attack_result.pop(0) # remove sec placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+                    return submit_analysis(body, "sec")
                 
                 case "Complete":
                     security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
@@ -128,59 +106,7 @@ def ndcw15_attack():
                         return render_template('acabella_app/ndcw15_attack.html', 
                                     analysis_type=[{'name':'Complete'}])
                     
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
-                    
-                    try:
-                        analysis.run()
-                    except:
-                        flash("The analysis process found an error: The JSON input is not correct.")
-                        return render_template('acabella_app/ndcw15_attack.html', 
-                           analysis_type=[{'name':'Complete'}])
-                    
-                    proof_result = None
-
-                    attack_result, proof_result, proof_header = analysis.show_solution()                
-                    
-                    json_out = body
-
-                    master_key_result = []
-                    decryption_attack_result = []
-                    sec_result = []
-
-                    mk_start = False
-                    da_start = False
-
-                    # collect sec analysis
-
-                    attack_result.pop(0)
-
-                    for line in attack_result:
-                        sec_result.append(line)
-                        if line == "mk_placeholder":
-                            sec_result.pop()
-                            break
-
-                    # collect mk analysis
-
-                    for line in attack_result:
-                        if mk_start:
-                            master_key_result.append(line)
-                        if line == "mk_placeholder":
-                            mk_start = True
-                        if line == "da_placeholder":
-                            master_key_result.pop()
-                            break
-
-                    # collect da analysis
-
-                    for line in attack_result:
-                        if da_start:
-                            decryption_attack_result.append(line)
-                        if line == "da_placeholder":
-                            da_start = True
-
-                    return render_template('acabella_app/index.html', master_key_result = '\n'.join(master_key_result), decryption_attack_result = '\n'.join(decryption_attack_result), is_complete = "true", json_out = json_out, attack = '\n'.join(sec_result), proof = proof_result, proof_header = proof_header) #posts)
+                    return submit_analysis(body, "all")
 
                 case _:
                     msg = "Incorrect analysis type"
@@ -298,23 +224,7 @@ def ksw08_attack():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/ksw08_attack.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/ksw08_attack.html',
@@ -486,25 +396,7 @@ def cm14_attack():
 
                            )
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, dec_params, None, corruptable_vars, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/cm14_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'AA_extended'}]
-
-                           )
-
-            attack_result, _, _ = analysis.show_solution()
-           
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "da")
 
 
     return render_template('acabella_app/cm14_attack.html', 
@@ -674,24 +566,7 @@ def qlz13_attack():
                            )
 
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(master_params, None, corruptable_vars, None, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/qlz13_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'No corruption'}, {'name':'CA'}, {'name':'AA'}, {'name':'Mixed CA'}, {'name':'Mixed AA'}]
-
-                           )            
-
-            attack_result, _, _ = analysis.show_solution()
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "mk")
 
     return render_template('acabella_app/qlz13_attack.html', 
                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
@@ -750,21 +625,7 @@ def process_json():
                                 analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
                             
 
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(master_params, None, corruptable_vars, None, None)
-
-                    try:
-                        analysis.run()
-                    except:
-                        flash("The analysis process found an error: The JSON input is not correct.")
-                        return render_template('acabella_app/process_json.html', 
-                                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
-
-                    attack_result, _, _ = analysis.show_solution()
-                    attack_result.pop(0) # remove mk placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, proof=None,  attack = '\n'.join(attack_result)) #posts)
+                    return submit_analysis(body, "mk")
 
                 case "Decryption Attack":
                     dec_params, corruptable_vars = parse_config.generate_dec_key_params()
@@ -774,21 +635,7 @@ def process_json():
                         return render_template('acabella_app/process_json.html', 
                                 analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
                             
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(None, dec_params, None, corruptable_vars, None)
-
-                    try:
-                        analysis.run()
-                    except:
-                        flash("The analysis process found an error: The JSON input is not correct.")
-                        return render_template('acabella_app/process_json.html', 
-                                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
-
-                    attack_result, _, _ = analysis.show_solution()
-                    attack_result.pop(0) # remove mk placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, proof=None, attack = '\n'.join(attack_result)) #posts)
+                    return submit_analysis(body, "da")
 
                 case "Security":
                     security_params = parse_config.generate_security_analysis_params()
@@ -799,22 +646,7 @@ def process_json():
                                 analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
                                                 
 
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(None, None, None, None, security_params)
-
-                    try:
-                        analysis.run()
-                    except:
-                        flash("The analysis process found an error: The JSON input is not correct.")
-                        return render_template('acabella_app/process_json.html', 
-                                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
-
-                    attack_result, proof_result, proof_header = analysis.show_solution()
-                
-                    attack_result.pop(0) # remove sec placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+                    return submit_analysis(body, "sec")
                 case "Complete":
                     security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
                     
@@ -823,59 +655,7 @@ def process_json():
                             return render_template('acabella_app/process_json.html', 
                                 analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
                             
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
-
-                    try:
-                        analysis.run()
-                    except:
-                        flash("The analysis process found an error: The JSON input is not correct.")
-                        return render_template('acabella_app/process_json.html', 
-                                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Complete'}, {'name':'Security'}])
-
-
-                    attack_result, proof_result, proof_header = analysis.show_solution()                
-                    
-                    json_out = body
-
-                    master_key_result = []
-                    decryption_attack_result = []
-                    sec_result = []
-
-                    mk_start = False
-                    da_start = False
-
-                    # collect sec analysis
-
-                    attack_result.pop(0)
-
-                    for line in attack_result:
-                        sec_result.append(line)
-                        if line == "mk_placeholder":
-                            sec_result.pop()
-                            break
-
-                    # collect mk analysis
-
-                    for line in attack_result:
-                        if mk_start:
-                            master_key_result.append(line)
-                        if line == "mk_placeholder":
-                            mk_start = True
-                        if line == "da_placeholder":
-                            master_key_result.pop()
-                            break
-
-                    # collect da analysis
-
-                    for line in attack_result:
-                        if da_start:
-                            decryption_attack_result.append(line)
-                        if line == "da_placeholder":
-                            da_start = True
-
-
-                    return render_template('acabella_app/index.html', master_key_result = '\n'.join(master_key_result), decryption_attack_result = '\n'.join(decryption_attack_result), is_complete = "true", json_out = json_out, attack = '\n'.join(sec_result), proof = proof_result, proof_header = proof_header) #posts)
+                    return submit_analysis(body, "all")
 
                 case _:
                     msg = "Incorrect analysis type"
@@ -1059,24 +839,7 @@ def master_key():
 
                            )
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(master_params, None, corruptable_vars, None, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/master_key.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'No corruption'}, {'name':'CA'}, {'name':'AA'}, {'name':'Mixed CA'}, {'name':'Mixed AA'}]
-
-                           )
-
-            attack_result, _, _ = analysis.show_solution()
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "mk")
 
     return render_template('acabella_app/master_key.html', 
                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
@@ -1251,25 +1014,7 @@ def dec():
 
                            )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, dec_params, None, corruptable_vars, None)
-            
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/dec.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'No corruption'}, {'name':'AA'}, {'name':'AA_extended'}]
-
-                           )
-
-            attack_result, _, _ = analysis.show_solution()
-           
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "da")
 
 
     return render_template('acabella_app/dec.html', 
@@ -1384,34 +1129,7 @@ def sec():
 
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                 flash("The analysis process found an error: The JSON input is not correct.")
-                 return render_template('acabella_app/sec.html',
-                                        fractional=[{'name':'Yes'}, {'name':'No'}]
-
-                ) 
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-
-            # update is_fractional field in JSON
-            # UPDATE: perhaps in the future and only for debugging 
-            #if analysis.is_scheme_fractional():
-            #    default_entry["is_fractional"] = "true"
-            #else:
-            #    default_entry["is_fractional"] = "false"
-    
-            default_entry_json = json.dumps(default_entry, indent=2)
-
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/sec.html',
@@ -1578,24 +1296,7 @@ def lxxh16_attack():
                            )
 
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(master_params, None, corruptable_vars, None, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/lxxh16_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'Mixed CA'}]
-
-                           )            
-
-            attack_result, _, _ = analysis.show_solution()
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "mk")
 
     return render_template('acabella_app/lxxh16_attack.html', 
                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
@@ -1764,24 +1465,7 @@ def mgz19_attack():
                            )
 
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(master_params, None, corruptable_vars, None, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/mgz19_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'Mixed CA'}]
-
-                           )            
-
-            attack_result, _, _ = analysis.show_solution()
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "mk")
 
     return render_template('acabella_app/mgz19_attack.html', 
                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
@@ -1950,24 +1634,7 @@ def yj12_attack():
                            )
 
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(master_params, None, corruptable_vars, None, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/yj12_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'Mixed AA'}]
-
-                           )            
-
-            attack_result, _, _ = analysis.show_solution()
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "mk")
 
     return render_template('acabella_app/yj12_attack.html', 
                            analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
@@ -2140,25 +1807,7 @@ def po17_attack():
 
                            )
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, dec_params, None, corruptable_vars, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/po17_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'AA_extended'}]
-
-                           )
-
-            attack_result, _, _ = analysis.show_solution()
-           
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "da")
 
 
     return render_template('acabella_app/po17_attack.html', 
@@ -2332,25 +1981,7 @@ def yj14_attack():
 
                            )
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, dec_params, None, corruptable_vars, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/yj14_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'AA'}]
-
-                           )
-
-            attack_result, _, _ = analysis.show_solution()
-           
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "da")
 
 
     return render_template('acabella_app/yj14_attack.html', 
@@ -2524,25 +2155,7 @@ def yjr13_attack():
 
                            )
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, dec_params, None, corruptable_vars, None)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/yjr13_attack.html', 
-                           analysis_type=[{'name':'Master key attack'}, {'name':'Decryption Attack'}, {'name':'Conditional Attack'}, {'name':'Complete'}, {'name':'Security'}],
-                           corruption_type=[{'name':'No corruption'}]
-
-                           )
-
-            attack_result, _, _ = analysis.show_solution()
-           
-            attack_result.pop(0) # remove mk placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, proof = None, attack = '\n'.join(attack_result)) #posts)
+            return submit_analysis(default_entry_json, "da")
 
 
     return render_template('acabella_app/yjr13_attack.html', 
@@ -2658,23 +2271,7 @@ def bbibe_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/bbibe_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/bbibe_sec.html',
@@ -2788,23 +2385,7 @@ def rw13_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/rw13_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/rw13_sec.html',
@@ -2918,23 +2499,7 @@ def wat11_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/wat11_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/wat11_sec.html',
@@ -3048,23 +2613,7 @@ def wat11_II_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/wat11_II_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/wat11_II_sec.html',
@@ -3179,23 +2728,7 @@ def bsw07_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/bsw07_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/bsw07_sec.html',
@@ -3248,14 +2781,7 @@ def abgw17_cpabe_sec():
                         return render_template('acabella_app/abgw17_cpabe_sec.html', 
                                 analysis_type=[{'name':'Complete'}])
 
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(master_params, None, corruptable_vars, None, None)
-                    analysis.run()
-                    attack_result, _, _ = analysis.show_solution()
-                    attack_result.pop(0) # remove mk placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result)) #posts)
+                    return submit_analysis(body, "mk")
 
                 case "Decryption Attack":
                     dec_params, corruptable_vars = parse_config.generate_dec_key_params()
@@ -3265,14 +2791,7 @@ def abgw17_cpabe_sec():
                         return render_template('acabella_app/abgw17_cpabe_sec.html', 
                                 analysis_type=[{'name':'Complete'}])
                     
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(None, dec_params, None, corruptable_vars, None)
-                    analysis.run()
-                    attack_result, _, _ = analysis.show_solution()
-                    attack_result.pop(0) # remove mk placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result)) #posts)
+                    return submit_analysis(body, "da")
 
                 case "Security":
                     security_params = parse_config.generate_security_analysis_params()
@@ -3282,15 +2801,7 @@ def abgw17_cpabe_sec():
                         return render_template('acabella_app/abgw17_cpabe_sec.html', 
                                 analysis_type=[{'name':'Complete'}])
 
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(None, None, None, None, security_params)
-                    analysis.run()
-                    attack_result, proof_result, proof_header = analysis.show_solution()
-                
-                    attack_result.pop(0) # remove sec placeholder
-                    json_out = body
-
-                    return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+                    return submit_analysis(body, "sec")
                 
                 case "Complete":
                     security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
@@ -3300,59 +2811,7 @@ def abgw17_cpabe_sec():
                         return render_template('acabella_app/abgw17_cpabe_sec.html', 
                                     analysis_type=[{'name':'Complete'}])
                     
-                    analysis = AnalysisWithCorruption()
-                    analysis.init(master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
-                    
-                    try:
-                        analysis.run()
-                    except:
-                        flash("The analysis process found an error: The JSON input is not correct.")
-                        return render_template('acabella_app/abgw17_cpabe_sec.html', 
-                           analysis_type=[{'name':'Complete'}])
-                    
-                    proof_result = None
-
-                    attack_result, proof_result, proof_header = analysis.show_solution()                
-                    
-                    json_out = body
-
-                    master_key_result = []
-                    decryption_attack_result = []
-                    sec_result = []
-
-                    mk_start = False
-                    da_start = False
-
-                    # collect sec analysis
-
-                    attack_result.pop(0)
-
-                    for line in attack_result:
-                        sec_result.append(line)
-                        if line == "mk_placeholder":
-                            sec_result.pop()
-                            break
-
-                    # collect mk analysis
-
-                    for line in attack_result:
-                        if mk_start:
-                            master_key_result.append(line)
-                        if line == "mk_placeholder":
-                            mk_start = True
-                        if line == "da_placeholder":
-                            master_key_result.pop()
-                            break
-
-                    # collect da analysis
-
-                    for line in attack_result:
-                        if da_start:
-                            decryption_attack_result.append(line)
-                        if line == "da_placeholder":
-                            da_start = True
-
-                    return render_template('acabella_app/index.html', master_key_result = '\n'.join(master_key_result), decryption_attack_result = '\n'.join(decryption_attack_result), is_complete = "true", json_out = json_out, attack = '\n'.join(sec_result), proof = proof_result, proof_header = proof_header) #posts)
+                    return submit_analysis(body, "all")
 
                 case _:
                     msg = "Incorrect analysis type"
@@ -3469,23 +2928,7 @@ def abgw17_ibe1_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/abgw17_ibe1_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/abgw17_ibe1_sec.html',
@@ -3599,23 +3042,7 @@ def abgw17_kpabe_sec():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/abgw17_kpabe_sec.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/abgw17_kpabe_sec.html',
@@ -3729,23 +3156,7 @@ def newcpabe_ii():
                                     fractional=[{'name':'No'}]
                 )                
 
-            analysis = AnalysisWithCorruption()
-            analysis.init(None, None, None, None, security_params)
-
-            try:
-                analysis.run()
-            except:
-                flash("The analysis process found an error: The JSON input is not correct.")
-                return render_template('acabella_app/newcpabe_ii.html',
-                                    fractional=[{'name':'No'}]
-                )
-
-            attack_result, proof_result, proof_header = analysis.show_solution()
-           
-            attack_result.pop(0) # remove sec placeholder
-            json_out = default_entry_json
-
-            return render_template('acabella_app/index.html', json_out = json_out, attack = '\n'.join(attack_result), proof = proof_result, proof_header = proof_header) #posts)
+            return submit_analysis(default_entry_json, "sec")
 
 
     return render_template('acabella_app/newcpabe_ii.html',
@@ -0,0 +1,529 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""job_queue.py: SQLite-backed queue of analysis jobs of the web app,
+executed in the background by a local pool of worker processes"""
+
+import contextlib
+import json
+import multiprocessing
+import multiprocessing.forkserver
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.insert(0, "../../core")
+
+from analysis import AnalysisWithCorruption
+from parse_config import ParseConfig
+from result_cache import config_key
+
+ANALYSIS_TYPES = ['mk', 'da', 'sec', 'all']
+
+ERROR_MSG = "The analysis process found an error: The JSON input is not correct."
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    config TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    worker INTEGER,
+    run INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+# progress events of the running jobs, see AnalysisWithCorruption.stream
+EVENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+)
+"""
+
+def split_complete_result(attack_result: list) -> tuple:
+    """
+    Splits the output of a complete analysis into its security,
+    master key and decryption attack parts.
+
+    Parameters:
+        attack_result (list): First output of AnalysisWithCorruption.show_solution,
+                              without the leading placeholder.
+
+    Returns:
+        (tuple): Security, master key and decryption attack results (lists).
+    """
+    master_key_result = []
+    decryption_attack_result = []
+    sec_result = []
+
+    mk_start = False
+    da_start = False
+
+    # collect sec analysis
+
+    for line in attack_result:
+        sec_result.append(line)
+        if line == "mk_placeholder":
+            sec_result.pop()
+            break
+
+    # collect mk analysis
+
+    for line in attack_result:
+        if mk_start:
+            master_key_result.append(line)
+        if line == "mk_placeholder":
+            mk_start = True
+        if line == "da_placeholder":
+            master_key_result.pop()
+            break
+
+    # collect da analysis
+
+    for line in attack_result:
+        if da_start:
+            decryption_attack_result.append(line)
+        if line == "da_placeholder":
+            da_start = True
+
+    return sec_result, master_key_result, decryption_attack_result
+
+def run_analysis(config: str, analysis_type: str, on_event=None) -> dict:
+    """
+    Analyzes a scheme and renders the result in the form expected by
+    the acabella_app/index.html template.
+
+    Parameters:
+        config (str): Description of the scheme in ACABELLA JSON format.
+        analysis_type (str): Type of analysis (mk, da, sec or all).
+        on_event (function): Called with the JSON serializable form of
+            every progress event of the analysis, if given.
+
+    Returns:
+        (dict): Template variables.
+    """
+    parse_config = ParseConfig()
+    parse_config.init_with_str(config)
+
+    match analysis_type:
+        case "mk":
+            master_params, corruptable_vars = parse_config.generate_master_key_params()
+            params = (master_params, None, corruptable_vars, None, None)
+        case "da":
+            dec_params, corruptable_vars = parse_config.generate_dec_key_params()
+            params = (None, dec_params, None, corruptable_vars, None)
+        case "sec":
+            security_params = parse_config.generate_security_analysis_params()
+            params = (None, None, None, None, security_params)
+        case "all":
+            security_params, master_params, corruptable_vars_master, dec_params, corruptable_vars_dec = parse_config.generate_all_params()
+            params = (master_params, dec_params, corruptable_vars_master, corruptable_vars_dec, security_params)
+        case _:
+            raise ValueError("unknown analysis type: " + str(analysis_type))
+
+    analysis = AnalysisWithCorruption()
+    analysis.init(*params)
+    if on_event is None:
+        analysis.run()
+    else:
+        for event in analysis.stream():
+            on_event(event.to_dict())
+
+    attack_result, proof_result, proof_header = analysis.show_solution()
+    attack_result.pop(0) # remove placeholder
+
+    match analysis_type:
+        case "mk" | "da":
+            return {"json_out": config, "attack": '\n'.join(attack_result), "proof": None}
+        case "sec":
+            return {"json_out": config, "attack": '\n'.join(attack_result), "proof": proof_result, "proof_header": proof_header}
+        case _:
+            sec_result, master_key_result, decryption_attack_result = split_complete_result(attack_result)
+            return {
+                "json_out": config,
+                "attack": '\n'.join(sec_result),
+                "proof": proof_result,
+                "proof_header": proof_header,
+                "master_key_result": '\n'.join(master_key_result),
+                "decryption_attack_result": '\n'.join(decryption_attack_result),
+                "is_complete": "true",
+            }
+
+def process_exists(pid: int) -> bool:
+    """
+    Returns whether a process exists on this host.
+
+    Parameters:
+        pid (int): Process identifier.
+
+    Returns:
+        (bool): The process exists.
+    """
+    if pid is None:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+def job_main(config: str, analysis_type: str, conn) -> None:
+    """
+    Entry point of the worker process of a job.
+
+    Parameters:
+        config (str): Description of the scheme in ACABELLA JSON format.
+        analysis_type (str): Type of analysis (mk, da, sec or all).
+        conn (Connection): Pipe where the progress events and the outcome
+            of the job are sent.
+    """
+    try:
+        conn.send(("done", run_analysis(config, analysis_type, lambda event: conn.send(("event", event)))))
+    except Exception:
+        conn.send(("failed", ERROR_MSG))
+    finally:
+        conn.close()
+
+class JobQueue:
+    """
+    Persistent queue of analysis jobs. The jobs are stored in an SQLite
+    database, so that every process of the web app shares the queue,
+    and are executed by worker threads that run every job in a separate
+    process, which can be terminated when the job is cancelled.
+
+    A job is identified by the content hash of its configuration and
+    analysis type (see result_cache.config_key), so that identical
+    submissions share one job instead of launching a new computation.
+    While a job runs, the progress events of its analysis are stored
+    as they arrive, so that partial verdicts can be shown before the
+    job is done.
+
+    Every time a job is queued again its run number is incremented, so
+    that a worker still executing a previous run of the job, e.g. after
+    a cancellation and a new submission, stops without storing its
+    events or its outcome.
+
+    Attributes:
+        database (str): Path to the SQLite database.
+        workers (int): Number of jobs executed concurrently.
+        timeout (float): Time limit of a job in seconds, 0 disables it.
+        poll_interval (float): Interval in seconds at which a running job
+                               is checked for cancellation.
+    """
+
+    def __init__(self) -> None:
+        self.database = None
+        self.workers = 2
+        self.timeout = 0
+        self.poll_interval = 0.2
+
+        self.threads = []
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            self.ctx = multiprocessing.get_context("forkserver")
+            # the jobs start without importing SymPy and the analysis
+            self.ctx.set_forkserver_preload(["flaskr.job_queue"])
+        else:
+            self.ctx = multiprocessing.get_context("spawn")
+
+    def init(self, database: str, workers: int = 2, timeout: float = 0) -> None:
+        """
+        Initializes the queue and creates the database if needed. Jobs
+        left running by a process that no longer exists are queued again.
+
+        Parameters:
+            database (str): Path to the SQLite database.
+            workers (int): Number of jobs executed concurrently.
+            timeout (float): Time limit of a job in seconds, 0 disables it.
+        """
+        self.database = database
+        self.workers = workers
+        self.timeout = timeout
+
+        with self.connect() as db:
+            db.execute(SCHEMA)
+            db.execute(EVENTS_SCHEMA)
+            for row in db.execute("SELECT id, worker FROM jobs WHERE status = 'running'").fetchall():
+                if not process_exists(row["worker"]):
+                    db.execute("UPDATE jobs SET status = 'queued', started = NULL, worker = NULL WHERE id = ?", (row["id"],))
+
+    @contextlib.contextmanager
+    def connect(self):
+        """
+        Opens a connection to the database, which is committed and
+        closed on exit. Every thread uses its own connections.
+
+        Returns:
+            (sqlite3.Connection): Connection.
+        """
+        db = sqlite3.connect(self.database, timeout=30)
+        db.row_factory = sqlite3.Row
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        """
+        Starts the worker threads.
+        """
+        self.stopping.clear()
+        # the first job does not wait for the fork server to import the analysis
+        if self.workers > 0 and self.ctx.get_start_method() == "forkserver":
+            multiprocessing.forkserver.ensure_running()
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self.worker_loop, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self) -> None:
+        """
+        Stops the worker threads after their current job.
+        """
+        self.stopping.set()
+        self.wakeup.set()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+
+    def submit(self, config: str, analysis_type: str) -> str:
+        """
+        Submits a job. If an identical job is already queued, running
+        or done, it is returned instead; failed and cancelled jobs are
+        queued again.
+
+        Parameters:
+            config (str): Description of the scheme in ACABELLA JSON format.
+            analysis_type (str): Type of analysis (mk, da, sec or all).
+
+        Returns:
+            (str): Identifier of the job.
+        """
+        if not analysis_type in ANALYSIS_TYPES:
+            raise ValueError("unknown analysis type: " + str(analysis_type))
+
+        job_id = config_key(json.loads(config), analysis_type)
+
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                db.execute("INSERT INTO jobs (id, analysis, config, status, created) VALUES (?, ?, ?, 'queued', ?)",
+                           (job_id, analysis_type, config, time.time()))
+            elif row["status"] in ["failed", "cancelled"]:
+                db.execute("UPDATE jobs SET status = 'queued', result = NULL, error = NULL, created = ?, started = NULL, finished = NULL, run = run + 1 WHERE id = ?",
+                           (time.time(), job_id))
+
+        self.wakeup.set()
+
+        return job_id
+
+    def status(self, job_id: str) -> dict:
+        """
+        Returns the status of a job.
+
+        Parameters:
+            job_id (str): Identifier of the job.
+
+        Returns:
+            (dict): job_id, analysis, status (queued, running, done, failed
+                    or cancelled), error and timestamps, None if the job
+                    does not exist.
+        """
+        with self.connect() as db:
+            row = db.execute("SELECT id, analysis, status, error, created, started, finished FROM jobs WHERE id = ?", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        status = dict(row)
+        status["job_id"] = status.pop("id")
+        return status
+
+    def result(self, job_id: str) -> dict:
+        """
+        Returns the result of a finished job.
+
+        Parameters:
+            job_id (str): Identifier of the job.
+
+        Returns:
+            (dict): Template variables, see run_analysis, None if the job
+                    does not exist or is not done.
+        """
+        with self.connect() as db:
+            row = db.execute("SELECT result FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        return json.loads(row["result"])
+
+    def events(self, job_id: str, after: int = 0) -> list:
+        """
+        Returns the progress events of the last execution of a job.
+
+        Parameters:
+            job_id (str): Identifier of the job.
+            after (int): Only the events with a greater sequence number are returned.
+
+        Returns:
+            (list): Pairs (sequence number, event), see events.py for the
+                    JSON serializable form of the events.
+        """
+        with self.connect() as db:
+            rows = db.execute("SELECT seq, data FROM events WHERE job_id = ? AND seq > ? ORDER BY seq", (job_id, after)).fetchall()
+
+        return [(row["seq"], json.loads(row["data"])) for row in rows]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancels a queued or running job. A running job is terminated
+        by its worker thread within poll_interval seconds.
+
+        Parameters:
+            job_id (str): Identifier of the job.
+
+        Returns:
+            (bool): The job was cancelled.
+        """
+        with self.connect() as db:
+            cursor = db.execute("UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status IN ('queued', 'running')",
+                                (time.time(), job_id))
+            return cursor.rowcount > 0
+
+    def claim(self):
+        """
+        Atomically marks the oldest queued job as running.
+
+        Returns:
+            (sqlite3.Row): The claimed job, None if the queue is empty.
+        """
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT id, analysis, config, run FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1").fetchone()
+            if row is not None:
+                db.execute("UPDATE jobs SET status = 'running', started = ?, worker = ? WHERE id = ?", (time.time(), os.getpid(), row["id"]))
+
+        return row
+
+    def is_current(self, job_id: str, run: int) -> bool:
+        """
+        Returns whether a run of a job is still being executed, i.e. the
+        job was neither cancelled nor queued again in the meantime.
+
+        Parameters:
+            job_id (str): Identifier of the job.
+            run (int): Run number of the job, see claim.
+
+        Returns:
+            (bool): The run is current.
+        """
+        with self.connect() as db:
+            row = db.execute("SELECT 1 FROM jobs WHERE id = ? AND run = ? AND status = 'running'", (job_id, run)).fetchone()
+
+        return row is not None
+
+    def worker_loop(self) -> None:
+        """
+        Main loop of a worker thread.
+        """
+        while not self.stopping.is_set():
+            job = self.claim()
+            if job is None:
+                self.wakeup.clear()
+                self.wakeup.wait(1.0)
+                continue
+
+            self.execute(job["id"], job["config"], job["analysis"], job["run"])
+
+    def execute(self, job_id: str, config: str, analysis_type: str, run: int = 0) -> None:
+        """
+        Runs a claimed job in a new process and stores its outcome.
+
+        Parameters:
+            job_id (str): Identifier of the job.
+            config (str): Description of the scheme in ACABELLA JSON format.
+            analysis_type (str): Type of analysis (mk, da, sec or all).
+            run (int): Run number of the job, see claim.
+        """
+        with self.connect() as db:
+            db.execute("DELETE FROM events WHERE job_id = ? AND EXISTS "
+                       "(SELECT 1 FROM jobs WHERE id = ? AND run = ? AND status = 'running')",
+                       (job_id, job_id, run))
+
+        (receiver, sender) = self.ctx.Pipe(duplex=False)
+        process = self.ctx.Process(target=job_main, args=(config, analysis_type, sender), daemon=True)
+        process.start()
+        sender.close()
+
+        start = time.monotonic()
+        outcome = None
+        seq = 0
+
+        while outcome is None:
+            if receiver.poll(self.poll_interval):
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    outcome = ("failed", "The analysis process exited unexpectedly.")
+                    continue
+                if message[0] == "event":
+                    seq += 1
+                    # the events of a stale run are dropped
+                    with self.connect() as db:
+                        db.execute("INSERT INTO events (job_id, seq, data) SELECT ?, ?, ? WHERE EXISTS "
+                                   "(SELECT 1 FROM jobs WHERE id = ? AND run = ? AND status = 'running')",
+                                   (job_id, seq, json.dumps(message[1]), job_id, run))
+                else:
+                    outcome = message
+            elif not self.is_current(job_id, run):
+                process.terminate()
+                outcome = ("cancelled", None)
+            elif self.timeout and time.monotonic() - start > self.timeout:
+                process.terminate()
+                outcome = ("failed", "The analysis exceeded the time limit of " + str(self.timeout) + " seconds.")
+
+        process.join()
+        receiver.close()
+
+        (status, value) = outcome
+        if status == "cancelled":
+            return
+
+        result = json.dumps(value) if status == "done" else None
+        error = value if status == "failed" else None
+
+        # a job cancelled or queued again in the meantime is left as is
+        with self.connect() as db:
+            db.execute("UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ? AND run = ? AND status = 'running'",
+                       (status, result, error, time.time(), job_id, run))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""jobs.py: Submit, poll, result, status, progress (Server-Sent Events)
+and cancellation endpoints of the background analysis jobs"""
+
+import json
+import os
+import time
+
+from flask import (
+    Blueprint, Response, current_app, flash, jsonify, redirect, render_template, request, stream_with_context, url_for
+)
+from werkzeug.exceptions import abort
+
+from .job_queue import ANALYSIS_TYPES, JobQueue
+
+bp = Blueprint('jobs', __name__, url_prefix='/jobs')
+
+def init_app(app) -> None:
+    """
+    Creates the job queue of the app and starts its workers.
+
+    Parameters:
+        app (Flask): The app. JOBS_DATABASE, JOBS_WORKERS and JOBS_TIMEOUT
+                     configure the queue, see JobQueue.init.
+    """
+    os.makedirs(os.path.dirname(app.config["JOBS_DATABASE"]), exist_ok=True)
+
+    job_queue = JobQueue()
+    job_queue.init(app.config["JOBS_DATABASE"], app.config["JOBS_WORKERS"], app.config["JOBS_TIMEOUT"])
+    job_queue.start()
+
+    app.extensions["acabella_jobs"] = job_queue
+    app.register_blueprint(bp)
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns:
+        (JobQueue): Job queue of the current app.
+    """
+    return current_app.extensions["acabella_jobs"]
+
+def submit_analysis(config: str, analysis_type: str):
+    """
+    Submits an analysis and redirects to its status page. Utilized
+    by the analysis forms of acabella_app.
+
+    Parameters:
+        config (str): Description of the scheme in ACABELLA JSON format.
+        analysis_type (str): Type of analysis (mk, da, sec or all).
+
+    Returns:
+        Redirection to the status page of the job.
+    """
+    job_id = get_job_queue().submit(config, analysis_type)
+    return redirect(url_for('jobs.job', job_id=job_id))
+
+def wants_json() -> bool:
+    """
+    Returns:
+        (bool): The client prefers JSON over HTML.
+    """
+    return request.accept_mimetypes.best_match(["application/json", "text/html"]) == "application/json"
+
+@bp.route('', methods=('POST',))
+def submit():
+    """
+    Submits a job. The request body is a JSON object with the fields
+    "config" (ACABELLA JSON description of the scheme, as a string or
+    an object) and "analysis" (mk, da, sec or all).
+    """
+    data = request.get_json(silent=True)
+
+    if not isinstance(data, dict) or not data.get("analysis") in ANALYSIS_TYPES or not "config" in data:
+        return jsonify({"error": "expected {\"config\": ..., \"analysis\": one of " + ", ".join(ANALYSIS_TYPES) + "}"}), 400
+
+    config = data["config"]
+    if not isinstance(config, str):
+        config = json.dumps(config, indent=2)
+
+    try:
+        job_id = get_job_queue().submit(config, data["analysis"])
+    except ValueError:
+        return jsonify({"error": "the configuration is not valid JSON"}), 400
+
+    status = get_job_queue().status(job_id)
+    status["status_url"] = url_for('jobs.status', job_id=job_id)
+    status["result_url"] = url_for('jobs.result', job_id=job_id)
+    status["events_url"] = url_for('jobs.events', job_id=job_id)
+
+    return jsonify(status), 202
+
+@bp.route('/<job_id>/status')
+def status(job_id):
+    """
+    Polls the status of a job.
+    """
+    status = get_job_queue().status(job_id)
+    if status is None:
+        abort(404)
+
+    return jsonify(status)
+
+@bp.route('/<job_id>/result')
+def result(job_id):
+    """
+    Returns the result of a job, or its status with code 202 while it
+    is queued or running.
+    """
+    status = get_job_queue().status(job_id)
+    if status is None:
+        abort(404)
+
+    match status["status"]:
+        case "done":
+            return jsonify(get_job_queue().result(job_id))
+        case "queued" | "running":
+            return jsonify(status), 202
+        case _:
+            return jsonify(status), 409
+
+def format_event(event_id: int, event: str, data: dict) -> str:
+    """
+    Formats a message of a Server-Sent Events stream.
+
+    Parameters:
+        event_id (int): Identifier of the message, sent back by the client
+                        in Last-Event-ID when it reconnects.
+        event (str): Type of the message.
+        data (dict): JSON serializable payload.
+
+    Returns:
+        (str): Message.
+    """
+    return "id: {}\nevent: {}\ndata: {}\n\n".format(event_id, event, json.dumps(data))
+
+@bp.route('/<job_id>/events')
+def events(job_id):
+    """
+    Streams the progress events of a job as Server-Sent Events: the
+    partial verdicts of the analysis as each stage finishes, see
+    events.py, and a final "end" message with the status of the job
+    once it is no longer queued or running.
+    """
+    job_queue = get_job_queue()
+    if job_queue.status(job_id) is None:
+        abort(404)
+
+    last_event_id = request.headers.get("Last-Event-ID", "0")
+    after = int(last_event_id) if last_event_id.isdigit() else 0
+
+    def generate():
+        seq = after
+        while True:
+            # the events of a job are stored before its outcome, so none
+            # is missed once the job is finished
+            status = job_queue.status(job_id)
+            for (seq, event) in job_queue.events(job_id, seq):
+                yield format_event(seq, event["event"], event)
+            if status is None or not status["status"] in ["queued", "running"]:
+                yield format_event(seq, "end", status)
+                return
+            time.sleep(job_queue.poll_interval)
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@bp.route('/<job_id>/cancel', methods=('POST',))
+def cancel(job_id):
+    """
+    Cancels a queued or running job.
+    """
+    if get_job_queue().status(job_id) is None:
+        abort(404)
+
+    cancelled = get_job_queue().cancel(job_id)
+
+    if wants_json():
+        return jsonify({"job_id": job_id, "cancelled": cancelled})
+
+    if not cancelled:
+        flash("The analysis has already finished.")
+    return redirect(url_for('jobs.job', job_id=job_id))
+
+@bp.route('/<job_id>')
+def job(job_id):
+    """
+    Status page of a job, which shows the result of the analysis once
+    it is done.
+    """
+    status = get_job_queue().status(job_id)
+    if status is None:
+        abort(404)
+
+    if status["status"] == "done":
+        return render_template('acabella_app/index.html', **get_job_queue().result(job_id))
+
+    if status["status"] == "failed":
+        flash(status["error"])
+
+    return render_template('acabella_app/job.html', job=status)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2022
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# This program is distributed in the hope that it will be useful, but
+# WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the GNU
+# General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""precompute.py: Warm-up of the results of the example schemes
+bundled with the analysis pages of the web app"""
+
+import json
+import threading
+import time
+
+from html.parser import HTMLParser
+
+import click
+
+from flask import current_app, redirect, request, url_for
+
+from .jobs import get_job_queue
+
+# job of every unedited example form, shared by the processes of the app
+EXAMPLES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    form TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL
+)
+"""
+
+class FormDefaults(HTMLParser):
+    """
+    Collects the values that a browser submits for the first form of
+    a page when the user does not edit it: the value of every input,
+    the text of every textarea and the selected (or first) option of
+    every select.
+
+    Attributes:
+        fields (dict): Name and default value of every field.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.fields = {}
+        self.in_form = False
+        self.textarea = None
+        self.select = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+
+        match tag:
+            case "form" if not self.fields:
+                self.in_form = True
+            case "input" if self.in_form and "name" in attrs:
+                self.fields[attrs["name"]] = attrs.get("value") or ""
+            case "textarea" if self.in_form and "name" in attrs:
+                self.textarea = attrs["name"]
+                self.fields[self.textarea] = ""
+            case "select" if self.in_form and "name" in attrs:
+                self.select = attrs["name"]
+            case "option" if self.select is not None:
+                if not self.select in self.fields or "selected" in attrs:
+                    self.fields[self.select] = attrs.get("value") or ""
+
+    def handle_endtag(self, tag):
+        match tag:
+            case "form":
+                self.in_form = False
+            case "textarea":
+                self.textarea = None
+            case "select":
+                self.select = None
+
+    def handle_data(self, data):
+        if self.textarea is not None:
+            self.fields[self.textarea] += data
+
+def example_pages(app) -> list:
+    """
+    Returns the paths of the analysis pages of the app, which contain
+    a form prefilled with an example scheme.
+
+    Parameters:
+        app (Flask): The app.
+
+    Returns:
+        (list): Paths of the pages.
+    """
+    return sorted(rule.rule for rule in app.url_map.iter_rules()
+                  if rule.endpoint.startswith("acabella_app.") and "POST" in rule.methods)
+
+def form_key(path: str, form) -> str:
+    """
+    Parameters:
+        path (str): Path of the page.
+        form (MultiDict): Submitted form.
+
+    Returns:
+        (str): Key identifying the submission of the form.
+    """
+    return json.dumps([path, sorted(form.items(multi=True))])
+
+def submit_examples(app) -> dict:
+    """
+    Submits the example scheme of every analysis page, exactly as it
+    is submitted by the unedited form of the page, and records the job
+    of every form in the job database so that serve_example, in any
+    process of the app, can answer later submissions
+    of the example without parsing it again. Since the jobs are
+    identified by the hash of the scheme and of the version of the
+    core (see result_cache.config_key), examples analyzed previously
+    are not analyzed again; they are only recomputed when the scheme
+    or ACABELLA change.
+
+    Parameters:
+        app (Flask): The app.
+
+    Returns:
+        (dict): Identifier of the job of every page. Pages without an
+                example are omitted.
+    """
+    job_ids = {}
+    job_queue = app.extensions["acabella_jobs"]
+
+    with app.test_client() as client:
+        for page in example_pages(app):
+            form = FormDefaults()
+            form.feed(client.get(page).get_data(as_text=True))
+
+            response = client.post(page, data=form.fields)
+            location = response.headers.get("Location", "")
+            if response.status_code == 302 and "/jobs/" in location:
+                job_ids[page] = location.rsplit("/", 1)[-1]
+
+                with app.test_request_context(page, method="POST", data=form.fields):
+                    key = form_key(page, request.form)
+                with job_queue.connect() as db:
+                    db.execute("INSERT OR REPLACE INTO examples (form, job_id) VALUES (?, ?)", (key, job_ids[page]))
+
+    return job_ids
+
+def serve_example():
+    """
+    Redirects a submission of an unedited example form to the result
+    of its job, skipping the validation of the scheme by the page.
+    Other submissions are handled by the page as usual.
+    """
+    if request.method != "POST":
+        return None
+
+    job_queue = get_job_queue()
+    with job_queue.connect() as db:
+        row = db.execute("SELECT job_id FROM examples WHERE form = ?", (form_key(request.path, request.form),)).fetchone()
+    if row is None:
+        return None
+
+    job_id = row["job_id"]
+    status = job_queue.status(job_id)
+    if status is None or status["status"] != "done":
+        return None
+
+    return redirect(url_for('jobs.job', job_id=job_id))
+
+def warm_up(app) -> threading.Thread:
+    """
+    Submits the examples in a background thread, so that the startup
+    of the app is not delayed.
+
+    Parameters:
+        app (Flask): The app.
+
+    Returns:
+        (threading.Thread): The thread.
+    """
+    thread = threading.Thread(target=submit_examples, args=(app,), daemon=True)
+    thread.start()
+    return thread
+
+@click.command('precompute')
+@click.option('--timeout', default=0.0, help='Maximum time in seconds to wait for the analyses, 0 waits until they finish.')
+def precompute_command(timeout):
+    """
+    Analyzes the example schemes of the analysis pages and stores the
+    results in the job database.
+    """
+    job_ids = submit_examples(current_app._get_current_object())
+    job_queue = get_job_queue()
+
+    start = time.monotonic()
+    pending = dict(job_ids)
+
+    while pending and not (timeout and time.monotonic() - start > timeout):
+        for page, job_id in list(pending.items()):
+            status = job_queue.status(job_id)["status"]
+            if not status in ["queued", "running"]:
+                click.echo(page + ": " + status)
+                del pending[page]
+        if pending:
+            time.sleep(0.5)
+
+    for page in pending:
+        click.echo(page + ": not finished")
+
+def init_app(app) -> None:
+    """
+    Registers the precompute command and the shortcut for the example
+    forms and, if PRECOMPUTE_EXAMPLES is set, submits the examples at
+    startup.
+
+    Parameters:
+        app (Flask): The app.
+    """
+    with app.extensions["acabella_jobs"].connect() as db:
+        db.execute(EXAMPLES_SCHEMA)
+
+    app.before_request(serve_example)
+    app.cli.add_command(precompute_command)
+
+    if app.config["PRECOMPUTE_EXAMPLES"]:
+        warm_up(app)